@@ -0,0 +1,69 @@
+"""
+Benchmark de make_backup com 1/2/4/8 workers.
+
+Uso:
+    python benchmarks/bench_parallel_zip.py --size-mb 2048 --workers 1 2 4 8
+
+Gera um mundo sintético (regiões de 8 MiB com dados parcialmente
+compressíveis) em um diretório temporário e mede o tempo de cada execução.
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from backup.core import BackupManager  # noqa: E402
+
+REGION_SIZE = 8 * 1024 * 1024
+
+
+def make_world(root, size_mb):
+    """Cria mundo com regiões meio aleatórias, meio repetitivas"""
+    region = root / "mundo" / "region"
+    region.mkdir(parents=True)
+    (root / "mundo" / "level.dat").write_bytes(os.urandom(2048))
+    total = size_mb * 1024 * 1024
+    i = 0
+    while total > 0:
+        n = min(REGION_SIZE, total)
+        half = n // 2
+        data = os.urandom(half) + bytes(range(256)) * ((n - half) // 256)
+        (region / f"r.{i}.0.mca").write_bytes(data)
+        total -= n
+        i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        make_world(tmp / "worlds", args.size_mb)
+        base = None
+        print(f"Mundo sintético: {args.size_mb} MiB")
+        print(f"{'workers':>8} {'tempo (s)':>10} {'MiB/s':>8} {'speedup':>8}")
+        for workers in args.workers:
+            mgr = BackupManager()
+            mgr.backup_dir = str(tmp / f"out{workers}")
+            start = time.perf_counter()
+            assert mgr.make_backup(
+                str(tmp / "worlds"), "mundo", workers=workers
+            )
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(
+                f"{workers:>8} {elapsed:>10.2f} "
+                f"{args.size_mb / elapsed:>8.1f} {base / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""
+Suíte de benchmarks reproduzível: backup, restauração e listagens.
+
+Uso:
+    python benchmarks/bench_suite.py --scale small --out baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json
+
+Os mundos sintéticos (ver worldgen.py) são gerados uma vez em um diretório
+temporário; cada cenário roda em um processo próprio, para que o pico de
+memória (RSS) de um não contamine o outro. O resultado é um JSON com tempo
+(mediana e mínimo das repetições), vazão e pico de RSS por cenário, que
+pode ser comparado com o de outro commit via --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import worldgen  # noqa: E402
+
+from backup.core import BackupManager  # noqa: E402
+from backup.worldinfo import dir_size  # noqa: E402
+
+RESULT_FORMAT = "mvp-bench/1"
+JAVA_WORLD = "bench_java"
+BEDROCK_WORLD = "bench_bedrock"
+# diferenças de tempo abaixo disso são ruído de medição
+NOISE_S = 0.005
+
+SCALES = {
+    "small": {
+        "regions": 4,
+        "chunks": 256,
+        "chunk_kb": 24,
+        "tables": 16,
+        "table_kb": 1024,
+        "mutation": 0.05,
+        "backups": 500,
+        "worlds": 100,
+    },
+    "medium": {
+        "regions": 16,
+        "chunks": 512,
+        "chunk_kb": 24,
+        "tables": 64,
+        "table_kb": 2048,
+        "mutation": 0.05,
+        "backups": 2000,
+        "worlds": 500,
+    },
+    "large": {
+        "regions": 64,
+        "chunks": 1024,
+        "chunk_kb": 24,
+        "tables": 256,
+        "table_kb": 2048,
+        "mutation": 0.02,
+        "backups": 5000,
+        "worlds": 2000,
+    },
+}
+
+
+def peak_rss():
+    """Pico de memória residente deste processo, em bytes (ou None)"""
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB; macOS, em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _peak_rss_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters),
+            counters.cb,
+        )
+        return counters.PeakWorkingSetSize if ok else None
+    except (AttributeError, OSError):
+        return None
+
+
+# --- cenários (executados no processo filho) -------------------------------
+
+
+def _manager(backup_dir):
+    mgr = BackupManager()
+    mgr.backup_dir = mgr.backup_dir_java = mgr.backup_dir_bedrock = backup_dir
+    return mgr
+
+
+def _backup(edition, world, mode="zip"):
+    def scenario(ctx, run):
+        out = os.path.join(run, "out")
+        mgr = _manager(out)
+        src = os.path.join(ctx["root"], "worlds", edition)
+        size = dir_size(os.path.join(src, world))
+
+        def op():
+            assert mgr.make_backup(
+                src, world, edition, mode=mode, workers=ctx["workers"]
+            )
+
+        # run_child mede o tamanho do backup gerado, fora do tempo
+        return op, {"bytes": size, "output": out}
+
+    return scenario
+
+
+def _backup_second(edition, world):
+    """Segundo backup incremental depois de uma sessão de jogo"""
+
+    def scenario(ctx, run):
+        src = os.path.join(run, "worlds")
+        shutil.copytree(
+            os.path.join(ctx["root"], "worlds", edition, world),
+            os.path.join(src, world),
+        )
+        mgr = _manager(os.path.join(run, "out"))
+        assert mgr.make_backup(src, world, edition, mode="incremental")
+        params = ctx["params"]
+        if edition == "java":
+            worldgen.mutate_java(
+                os.path.join(src, world),
+                params["mutation"],
+                chunk_kb=params["chunk_kb"],
+            )
+        else:
+            worldgen.mutate_bedrock(
+                os.path.join(src, world),
+                params["mutation"],
+                table_kb=params["table_kb"],
+            )
+
+        def op():
+            assert mgr.make_backup(src, world, edition, mode="incremental")
+
+        return op, {"bytes": dir_size(os.path.join(src, world))}
+
+    return scenario
+
+
+def _backup_unchanged(edition, world):
+    """Backup de mundo parado (só stat, via statcache)"""
+
+    def scenario(ctx, run):
+        mgr = _manager(os.path.join(run, "out"))
+        src = os.path.join(ctx["root"], "worlds", edition)
+        assert mgr.make_backup(src, world, edition, mode="incremental")
+
+        def op():
+            assert mgr.make_backup(src, world, edition, mode="incremental")
+
+        return op, {"bytes": dir_size(os.path.join(src, world))}
+
+    return scenario
+
+
+def _restore(edition, world, fixture):
+    def scenario(ctx, run):
+        mgr = _manager(os.path.join(ctx["root"], "fixtures", fixture))
+        [name] = [n for n, _ in mgr.list_backups(edition)]
+        dest = os.path.join(run, "restored")
+        size = dir_size(os.path.join(ctx["root"], "worlds", edition, world))
+
+        def op():
+            assert mgr.restore_backup(
+                dest, name, edition, workers=ctx["workers"]
+            )
+
+        return op, {"bytes": size}
+
+    return scenario
+
+
+def _list_backups(warm):
+    def scenario(ctx, run):
+        out = os.path.join(run, "collection")
+        shutil.copytree(os.path.join(ctx["root"], "collection"), out)
+        mgr = _manager(out)
+        if warm:
+            mgr.list_backups("java")
+
+        def op():
+            assert len(mgr.list_backups("java")) == ctx["params"]["backups"]
+
+        return op, {"items": ctx["params"]["backups"]}
+
+    return scenario
+
+
+def _list_worlds(warm):
+    def scenario(ctx, run):
+        mgr = _manager(os.path.join(run, "out"))
+        worlds = os.path.join(ctx["root"], "many")
+        if warm:
+            mgr.list_worlds(worlds)
+        # o índice é recarregado do disco, como em uma nova execução
+        mgr = _manager(os.path.join(run, "out"))
+
+        def op():
+            found = mgr.list_worlds(worlds, sort="last_played")
+            assert len(found) == ctx["params"]["worlds"]
+
+        return op, {"items": ctx["params"]["worlds"]}
+
+    return scenario
+
+
+SCENARIOS = {
+    "backup_java_zip": _backup("java", JAVA_WORLD),
+    "backup_java_incremental": _backup("java", JAVA_WORLD, "incremental"),
+    "backup_java_tarzst": _backup("java", JAVA_WORLD, "tarzst"),
+    "backup_java_incremental_mutated": _backup_second("java", JAVA_WORLD),
+    "backup_java_unchanged": _backup_unchanged("java", JAVA_WORLD),
+    "backup_bedrock_zip": _backup("bedrock", BEDROCK_WORLD),
+    "backup_bedrock_incremental_mutated": _backup_second(
+        "bedrock", BEDROCK_WORLD
+    ),
+    "restore_java_zip": _restore("java", JAVA_WORLD, "java_zip"),
+    "restore_java_incremental": _restore("java", JAVA_WORLD, "java_incr"),
+    "restore_bedrock_zip": _restore("bedrock", BEDROCK_WORLD, "bedrock_zip"),
+    "list_backups_cold": _list_backups(warm=False),
+    "list_backups_warm": _list_backups(warm=True),
+    "list_worlds_cold": _list_worlds(warm=False),
+    "list_worlds_warm": _list_worlds(warm=True),
+}
+
+
+def run_child(name, ctx, result_path):
+    """Prepara e mede um cenário; grava o resultado em result_path"""
+    run = tempfile.mkdtemp(dir=os.path.join(ctx["root"], "runs"))
+    try:
+        op, info = SCENARIOS[name](ctx, run)
+        start = time.perf_counter()
+        op()
+        info["wall_s"] = time.perf_counter() - start
+        output = info.pop("output", None)
+        if output:
+            info["archive_bytes"] = dir_size(output)
+    finally:
+        shutil.rmtree(run, ignore_errors=True)
+    info["peak_rss"] = peak_rss()
+    with open(result_path, "w") as f:
+        json.dump(info, f)
+
+
+# --- processo principal -----------------------------------------------------
+
+
+def generate(root, params, seed):
+    """Gera mundos, coleção de backups e backups usados na restauração"""
+    worlds = os.path.join(root, "worlds")
+    worldgen.java_world(
+        os.path.join(worlds, "java"),
+        JAVA_WORLD,
+        regions=params["regions"],
+        chunks=params["chunks"],
+        chunk_kb=params["chunk_kb"],
+        seed=seed,
+    )
+    worldgen.bedrock_world(
+        os.path.join(worlds, "bedrock"),
+        BEDROCK_WORLD,
+        tables=params["tables"],
+        table_kb=params["table_kb"],
+        seed=seed,
+    )
+    worldgen.small_worlds(os.path.join(root, "many"), params["worlds"], seed)
+    worldgen.backup_collection(
+        os.path.join(root, "collection"), "colecao", params["backups"]
+    )
+    fixtures = [
+        ("java_zip", "java", JAVA_WORLD, "zip"),
+        ("java_incr", "java", JAVA_WORLD, "incremental"),
+        ("bedrock_zip", "bedrock", BEDROCK_WORLD, "zip"),
+    ]
+    for fixture, edition, world, mode in fixtures:
+        mgr = _manager(os.path.join(root, "fixtures", fixture))
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = mgr.make_backup(
+                os.path.join(worlds, edition), world, edition, mode=mode
+            )
+        assert ok, f"falha ao preparar {fixture}"
+    os.makedirs(os.path.join(root, "runs"))
+
+
+def measure(name, ctx, repeat):
+    """Roda o cenário `repeat` vezes, cada uma em um processo novo"""
+    runs = []
+    for _ in range(repeat):
+        result_path = os.path.join(ctx["root"], "result.json")
+        cmd = [sys.executable, __file__, "--child", name]
+        subprocess.run(
+            cmd,
+            input=json.dumps(ctx),
+            text=True,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        with open(result_path) as f:
+            runs.append(json.load(f))
+    walls = [r["wall_s"] for r in runs]
+    result = {
+        "wall_s": statistics.median(walls),
+        "wall_min_s": min(walls),
+        "runs": walls,
+    }
+    rss = [r["peak_rss"] for r in runs if r["peak_rss"] is not None]
+    result["peak_rss_mib"] = max(rss) / 2**20 if rss else None
+    if "bytes" in runs[0]:
+        result["bytes"] = runs[0]["bytes"]
+        result["mib_s"] = runs[0]["bytes"] / 2**20 / result["wall_s"]
+    if "archive_bytes" in runs[0]:
+        result["archive_bytes"] = runs[0]["archive_bytes"]
+    if "items" in runs[0]:
+        result["items"] = runs[0]["items"]
+        result["items_s"] = runs[0]["items"] / result["wall_s"]
+    return result
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old, new, threshold):
+    """Imprime a diferença de tempo por cenário; retorna as regressões"""
+    if old.get("params") != new.get("params"):
+        print("⚠️ Parâmetros diferentes; comparação pouco confiável.")
+    print(f"{'cenário':<36} {'antes':>9} {'agora':>9} {'delta':>8}")
+    regressions = []
+    for name, res in new["results"].items():
+        before = old.get("results", {}).get(name)
+        if not before:
+            continue
+        delta = res["wall_s"] / before["wall_s"] - 1
+        print(
+            f"{name:<36} {before['wall_s']:>8.3f}s {res['wall_s']:>8.3f}s "
+            f"{delta:>+7.1%}"
+        )
+        if delta > threshold and res["wall_s"] - before["wall_s"] > NOISE_S:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for key in SCALES["small"]:
+        kind = float if key == "mutation" else int
+        parser.add_argument(f"--{key.replace('_', '-')}", type=kind)
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        help="cenários a rodar (padrão: todos)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="grava o resultado JSON neste arquivo")
+    parser.add_argument("--compare", help="JSON de referência")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="regressão de tempo tolerada no --compare (padrão: 0.10)",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        ctx = json.load(sys.stdin)
+        run_child(args.child, ctx, os.path.join(ctx["root"], "result.json"))
+        return 0
+    params = dict(SCALES[args.scale])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+    names = args.scenario or list(SCENARIOS)
+    with tempfile.TemporaryDirectory() as root:
+        print(f"Gerando mundos sintéticos ({args.scale})...")
+        generate(root, params, args.seed)
+        ctx = {
+            "root": root,
+            "params": params,
+            "workers": args.workers,
+        }
+        results = {}
+        for name in names:
+            results[name] = res = measure(name, ctx, args.repeat)
+            extra = ""
+            if "mib_s" in res:
+                extra = f"{res['mib_s']:>9.1f} MiB/s"
+            elif "items_s" in res:
+                extra = f"{res['items_s']:>9.0f} itens/s"
+            rss = res["peak_rss_mib"]
+            rss = f"{rss:>7.1f} MiB" if rss is not None else "      n/d"
+            size = ""
+            if "archive_bytes" in res:
+                size = f" {res['archive_bytes'] / 2**20:>8.1f} MiB gerados"
+            print(f"{name:<36} {res['wall_s']:>8.3f}s {extra} {rss}{size}")
+    report = {
+        "format": RESULT_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": args.scale,
+        "params": params,
+        "repeat": args.repeat,
+        "workers": args.workers,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultado salvo em {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print("❌ Regressões: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
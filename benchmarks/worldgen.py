@@ -0,0 +1,230 @@
+"""
+Gerador de mundos sintéticos para os benchmarks.
+
+Tudo é determinístico a partir de `seed`, para que duas execuções (ou dois
+commits) meçam exatamente os mesmos dados:
+- java_world: regiões Anvil (.mca) válidas, com chunks comprimidos em zlib
+  como o jogo grava, além de level.dat, playerdata e data/.
+- bedrock_world: pasta db/ no estilo LevelDB (tabelas .ldb imutáveis,
+  log, MANIFEST e CURRENT), level.dat com cabeçalho e levelname.txt.
+- mutate_java / mutate_bedrock: simulam uma sessão de jogo (chunks
+  regravados, tabelas compactadas) entre dois backups.
+- backup_collection: milhares de backups pequenos para medir listagens.
+"""
+
+import gzip
+import json
+import os
+import pathlib
+import random
+import struct
+import sys
+import time
+import zipfile
+import zlib
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from backup import anvil  # noqa: E402
+
+# fração de bytes aleatórios de cada chunk (o resto é paleta repetida)
+CHUNK_NOISE = 0.15
+# 2023-11-14: timestamp fixo para que a saída não dependa do relógio
+BASE_TIME = 1_700_000_000
+
+
+def random_bytes(rng, n):
+    """n bytes pseudoaleatórios (compatível com Python 3.8)"""
+    if n <= 0:
+        return b""
+    return rng.getrandbits(8 * n).to_bytes(n, "little")
+
+
+def _nbt_string(value, order):
+    raw = value.encode("utf-8")
+    return struct.pack(order + "H", len(raw)) + raw
+
+
+def _nbt_payload(tag, value, order):
+    if tag == 8:
+        return _nbt_string(value, order)
+    if tag == 3:
+        return struct.pack(order + "i", value)
+    if tag == 4:
+        return struct.pack(order + "q", value)
+    if tag == 10:
+        out = [
+            bytes([t]) + _nbt_string(k, order) + _nbt_payload(t, v, order)
+            for k, (t, v) in value.items()
+        ]
+        return b"".join(out) + b"\x00"
+    raise ValueError(f"tag não suportada: {tag}")
+
+
+def level_nbt(fields, little=False):
+    """NBT mínimo: compound raiz com campos (tag, valor).
+
+    Tags aceitas: 3 (int), 4 (long), 8 (string) e 10 (compound, dict).
+    """
+    order = "<" if little else ">"
+    return b"\x0a" + _nbt_string("", order) + _nbt_payload(10, fields, order)
+
+
+def _java_level_dat(name, last_played):
+    data = {
+        "LevelName": (8, name),
+        "LastPlayed": (4, last_played * 1000),
+        "RandomSeed": (4, 42),
+    }
+    return gzip.compress(level_nbt({"Data": (10, data)}))
+
+
+def chunk_record(rng, raw_size):
+    """Registro de chunk (tamanho + tipo 2 = zlib + dados)"""
+    noise = int(raw_size * CHUNK_NOISE)
+    palette = random_bytes(rng, 64)
+    raw = random_bytes(rng, noise) + palette * ((raw_size - noise) // 64)
+    data = zlib.compress(raw, 6)
+    return struct.pack(">IB", len(data) + 1, 2) + data
+
+
+def java_world(
+    worlds_dir, name, regions=4, chunks=256, chunk_kb=24, players=4, seed=0
+):
+    """Cria um mundo Java com `regions` regiões de `chunks` chunks cada"""
+    rng = random.Random(f"java:{name}:{seed}")
+    world = os.path.join(worlds_dir, name)
+    os.makedirs(os.path.join(world, "playerdata"), exist_ok=True)
+    os.makedirs(os.path.join(world, "data"), exist_ok=True)
+    with open(os.path.join(world, "level.dat"), "wb") as f:
+        f.write(_java_level_dat(name, BASE_TIME))
+    for i in range(players):
+        path = os.path.join(world, "playerdata", f"player-{i:04d}.dat")
+        with open(path, "wb") as f:
+            f.write(gzip.compress(random_bytes(rng, 512) * 8))
+    with open(os.path.join(world, "data", "raids.dat"), "wb") as f:
+        f.write(gzip.compress(b"\0" * 4096))
+    side = max(1, int(regions**0.5))
+    chunks = min(chunks, anvil.CHUNKS_PER_REGION)
+    for r in range(regions):
+        x, z = r % side, r // side
+        idxs = sorted(rng.sample(range(anvil.CHUNKS_PER_REGION), chunks))
+        anvil.write_region(
+            os.path.join(world, "region", f"r.{x}.{z}.mca"),
+            {i: (BASE_TIME, chunk_record(rng, chunk_kb * 1024)) for i in idxs},
+        )
+    return world
+
+
+def mutate_java(world, rate, chunk_kb=24, seed=1):
+    """Regrava a fração `rate` dos chunks de cada região e o level.dat"""
+    rng = random.Random(f"mutate:{os.path.basename(world)}:{seed}")
+    region_dir = os.path.join(world, "region")
+    changed = 0
+    now = BASE_TIME + 3600 * seed
+    for fname in sorted(os.listdir(region_dir)):
+        path = os.path.join(region_dir, fname)
+        chunks = anvil.read_region(path)
+        n = round(len(chunks) * rate)
+        if n == 0:
+            continue
+        for idx in rng.sample(sorted(chunks), n):
+            chunks[idx] = (now, chunk_record(rng, chunk_kb * 1024))
+        anvil.write_region(path, chunks)
+        changed += n
+    with open(os.path.join(world, "level.dat"), "wb") as f:
+        f.write(_java_level_dat(os.path.basename(world), now))
+    return changed
+
+
+def _write_db_meta(db, tables, rng, log_kb):
+    with open(os.path.join(db, "MANIFEST-000002"), "wb") as f:
+        f.write(random_bytes(rng, 64) + ",".join(tables).encode())
+    with open(os.path.join(db, "000001.log"), "wb") as f:
+        # log de escrita: registros repetitivos, bem compressíveis
+        f.write((random_bytes(rng, 32) + b"\0" * 224) * (log_kb * 4))
+    with open(os.path.join(db, "CURRENT"), "w") as f:
+        f.write("MANIFEST-000002\n")
+
+
+def bedrock_world(
+    worlds_dir, name, tables=16, table_kb=1024, log_kb=256, seed=0
+):
+    """Cria um mundo Bedrock com `tables` tabelas .ldb em db/"""
+    rng = random.Random(f"bedrock:{name}:{seed}")
+    world = os.path.join(worlds_dir, name)
+    db = os.path.join(world, "db")
+    os.makedirs(db, exist_ok=True)
+    names = []
+    for i in range(tables):
+        fname = f"{i + 10:06d}.ldb"
+        # tabelas LevelDB já são comprimidas: conteúdo quase aleatório
+        with open(os.path.join(db, fname), "wb") as f:
+            f.write(random_bytes(rng, table_kb * 1024))
+        names.append(fname)
+    _write_db_meta(db, names, rng, log_kb)
+    body = level_nbt(
+        {
+            "LevelName": (8, name),
+            "LastPlayed": (4, BASE_TIME),
+            "RandomSeed": (4, 42),
+        },
+        little=True,
+    )
+    with open(os.path.join(world, "level.dat"), "wb") as f:
+        f.write(struct.pack("<ii", 10, len(body)) + body)
+    with open(os.path.join(world, "levelname.txt"), "w") as f:
+        f.write(name)
+    return world
+
+
+def mutate_bedrock(world, rate, table_kb=1024, log_kb=256, seed=1):
+    """Compactação: troca a fração `rate` das tabelas por tabelas novas"""
+    rng = random.Random(f"mutate:{os.path.basename(world)}:{seed}")
+    db = os.path.join(world, "db")
+    tables = sorted(n for n in os.listdir(db) if n.endswith(".ldb"))
+    n = round(len(tables) * rate)
+    last = int(tables[-1][:6]) if tables else 10
+    for fname in rng.sample(tables, n):
+        os.remove(os.path.join(db, fname))
+        tables.remove(fname)
+    for i in range(n):
+        fname = f"{last + 1 + i:06d}.ldb"
+        with open(os.path.join(db, fname), "wb") as f:
+            f.write(random_bytes(rng, table_kb * 1024))
+        tables.append(fname)
+    _write_db_meta(db, tables, rng, log_kb)
+    return n
+
+
+def backup_collection(backup_dir, world, count, edition="java", seed=0):
+    """Cria `count` backups .zip pequenos (um por minuto) do mundo"""
+    rng = random.Random(f"collection:{world}:{seed}")
+    os.makedirs(backup_dir, exist_ok=True)
+    for i in range(count):
+        ts = time.strftime("%Y%m%d_%H%M%S", time.gmtime(BASE_TIME + 60 * i))
+        meta = {
+            "world": world,
+            "edition": edition,
+            "timestamp": ts,
+            "description": f"backup {i}",
+            "profile": "balanced",
+        }
+        path = os.path.join(backup_dir, f"{world}_{ts}.zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+            z.writestr(f"{world}/level.dat", random_bytes(rng, 256))
+            z.writestr("metadata.json", json.dumps(meta))
+
+
+def small_worlds(worlds_dir, count, seed=0):
+    """Cria `count` mundos Java mínimos (level.dat + alguns arquivos)"""
+    rng = random.Random(f"small:{seed}")
+    for i in range(count):
+        world = os.path.join(worlds_dir, f"world_{i:05d}")
+        os.makedirs(os.path.join(world, "region"), exist_ok=True)
+        with open(os.path.join(world, "level.dat"), "wb") as f:
+            f.write(_java_level_dat(f"Mundo {i}", BASE_TIME + i))
+        for r in range(4):
+            path = os.path.join(world, "region", f"r.{r}.0.mca")
+            with open(path, "wb") as f:
+                f.write(random_bytes(rng, 1024))
@@ -0,0 +1,117 @@
+"""
+Módulo backup/anvil.py:
+- Leitura e escrita de arquivos de região Anvil (.mca) da edição Java.
+- O cabeçalho tem 1024 localizações (offset em setores de 4 KiB + número
+  de setores) seguidas de 1024 timestamps big-endian.
+- Cada chunk é gravado como registro: tamanho (4 bytes), tipo de
+  compressão (1 byte) e dados; aqui o registro é tratado como bytes opacos.
+"""
+
+import os
+import struct
+
+SECTOR_SIZE = 4096
+CHUNKS_PER_REGION = 1024
+HEADER_SIZE = 2 * SECTOR_SIZE
+
+
+class RegionError(ValueError):
+    """Arquivo de região com cabeçalho ou registro inválido"""
+
+
+def is_region_file(rel_path):
+    """Indica se o caminho relativo aponta para um arquivo .mca"""
+    return rel_path.lower().endswith(".mca")
+
+
+def chunk_index(x, z):
+    """Índice (0..1023) do chunk local (x, z) dentro da região"""
+    return (x & 31) + (z & 31) * 32
+
+
+def parse_header(header):
+    """Retorna lista de (índice, offset, setores, timestamp) presentes"""
+    if len(header) < HEADER_SIZE:
+        raise RegionError("cabeçalho de região incompleto")
+    locations = struct.unpack(">1024I", header[:SECTOR_SIZE])
+    timestamps = struct.unpack(">1024I", header[SECTOR_SIZE:HEADER_SIZE])
+    chunks = []
+    for idx, loc in enumerate(locations):
+        offset, sectors = loc >> 8, loc & 0xFF
+        if offset == 0 and sectors == 0:
+            continue
+        if offset < 2 or sectors == 0:
+            raise RegionError(f"localização inválida do chunk {idx}")
+        chunks.append((idx, offset, sectors, timestamps[idx]))
+    return chunks
+
+
+def read_header(f):
+    """Lê e interpreta o cabeçalho de um arquivo de região aberto"""
+    f.seek(0)
+    return parse_header(f.read(HEADER_SIZE))
+
+
+def read_record(f, offset, sectors):
+    """Lê o registro bruto (tamanho + tipo + dados) de um chunk"""
+    f.seek(offset * SECTOR_SIZE)
+    return _trim_record(f.read(sectors * SECTOR_SIZE))
+
+
+def _trim_record(raw):
+    """Valida o registro e remove o preenchimento do último setor"""
+    if len(raw) < 5:
+        raise RegionError("registro de chunk truncado")
+    (length,) = struct.unpack(">I", raw[:4])
+    if length == 0 or length + 4 > len(raw):
+        raise RegionError("tamanho de registro de chunk inválido")
+    return raw[: length + 4]
+
+
+def read_region(path):
+    """Retorna {índice: (timestamp, registro)} de um arquivo .mca"""
+    with open(path, "rb") as f:
+        return {
+            idx: (ts, read_record(f, offset, sectors))
+            for idx, offset, sectors, ts in read_header(f)
+        }
+
+
+def parse_region_bytes(data):
+    """Como read_region, mas a partir do conteúdo em memória"""
+    chunks = {}
+    for idx, offset, sectors, ts in parse_header(data[:HEADER_SIZE]):
+        start = offset * SECTOR_SIZE
+        raw = data[start : start + sectors * SECTOR_SIZE]
+        chunks[idx] = (ts, _trim_record(raw))
+    return chunks
+
+
+def region_bytes(chunks):
+    """Monta um .mca válido a partir de {índice: (timestamp, registro)}.
+
+    Os chunks são empacotados em ordem de índice, alinhados a setores.
+    """
+    locations = [0] * CHUNKS_PER_REGION
+    timestamps = [0] * CHUNKS_PER_REGION
+    body = []
+    next_sector = 2
+    for idx in sorted(chunks):
+        ts, record = chunks[idx]
+        sectors = -(-len(record) // SECTOR_SIZE)
+        if sectors > 0xFF:
+            raise RegionError(f"chunk {idx} excede 255 setores")
+        locations[idx] = (next_sector << 8) | sectors
+        timestamps[idx] = ts
+        body.append(record + b"\0" * (sectors * SECTOR_SIZE - len(record)))
+        next_sector += sectors
+    header = struct.pack(">1024I", *locations)
+    header += struct.pack(">1024I", *timestamps)
+    return header + b"".join(body)
+
+
+def write_region(path, chunks):
+    """Grava em path o .mca montado por region_bytes"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as out:
+        out.write(region_bytes(chunks))
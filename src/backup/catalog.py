@@ -0,0 +1,307 @@
+"""
+Módulo backup/catalog.py:
+- Define Catalog, índice SQLite persistente (catalog.sqlite3) dos backups
+  de um diretório, com mundo, edição, timestamp, tamanho, descrição e
+  número de arquivos.
+- sync() só abre arquivos novos ou cujo tamanho/mtime mudou; o restante
+  custa um stat. rebuild() recria o índice a partir dos arquivos.
+- Snapshots de hardlinks (pastas .snap, ver hardlink.py) entram com o
+  stat do seu metadata.json e, como tamanho, os bytes copiados de fato.
+- A tabela verifications guarda o resultado da última verificação de
+  integridade de cada backup (com o stat do arquivo na hora), para que
+  verificações agendadas só releiam os backups vencidos ou alterados.
+"""
+
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zipfile
+
+from backup import hardlink, store, tarzst
+
+CATALOG_FILE = "catalog.sqlite3"
+
+_NAME_RE = re.compile(r"^(?P<world>.+)_(?P<ts>\d{8}_\d{6})(?:-\d+)?\.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    name TEXT PRIMARY KEY,
+    world TEXT NOT NULL,
+    edition TEXT,
+    timestamp TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    file_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS backups_world ON backups (world, timestamp);
+CREATE TABLE IF NOT EXISTS verifications (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    verified_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT
+);
+"""
+
+_COLUMNS = (
+    "name",
+    "world",
+    "edition",
+    "timestamp",
+    "size",
+    "mtime_ns",
+    "description",
+    "file_count",
+)
+
+
+def is_backup_file(fname):
+    """Indica se o nome corresponde a um backup conhecido"""
+    return (
+        fname.lower().endswith(".zip")
+        or store.is_manifest(fname)
+        or tarzst.is_tarzst(fname)
+        or hardlink.is_snapshot(fname)
+    )
+
+
+def backup_stat(path):
+    """stat do backup; para snapshots (pastas), o do metadata.json"""
+    if hardlink.is_snapshot(path) and os.path.isdir(path):
+        return os.stat(os.path.join(path, hardlink.METADATA_FILE))
+    return os.stat(path)
+
+
+def _entries(backup_dir):
+    """{nome: stat} dos backups do diretório"""
+    entries = {}
+    for e in os.scandir(backup_dir):
+        if not is_backup_file(e.name):
+            continue
+        if e.is_file():
+            entries[e.name] = e.stat()
+        elif e.is_dir() and hardlink.is_snapshot(e.name):
+            try:
+                entries[e.name] = backup_stat(e.path)
+            except FileNotFoundError:
+                # snapshot sem metadata.json não é um backup completo
+                continue
+    return entries
+
+
+def parse_name(fname):
+    """Extrai (mundo, timestamp) do nome do arquivo de backup"""
+    m = _NAME_RE.match(fname)
+    if not m:
+        if tarzst.is_tarzst(fname):
+            return fname[: -len(tarzst.SUFFIX)], None
+        return os.path.splitext(fname)[0], None
+    return m.group("world"), m.group("ts")
+
+
+def read_info(path):
+    """Lê metadados de um backup (.zip, .tar.zst, snapshot ou manifesto)"""
+    fname = os.path.basename(path)
+    meta = {}
+    file_count = 0
+    if store.is_manifest(fname):
+        manifest = store.load_manifest(path)
+        file_count = len(manifest.get("files", []))
+        meta = {k: v for k, v in manifest.items() if k != "files"}
+    elif tarzst.is_tarzst(fname):
+        archive = tarzst.TarZstReader(path)
+        archive.close()
+        meta = archive.metadata
+        file_count = len(archive.members)
+    elif hardlink.is_snapshot(fname):
+        meta = hardlink.load_metadata(path)
+        file_count = len(meta.get("sha256") or {})
+    else:
+        with zipfile.ZipFile(path, "r") as z:
+            names = z.namelist()
+            if "metadata.json" in names:
+                meta = json.loads(z.read("metadata.json"))
+            file_count = sum(
+                1
+                for n in names
+                if n != "metadata.json" and not n.endswith("/")
+            )
+    world, ts = parse_name(fname)
+    return {
+        "world": meta.get("world") or world,
+        "edition": meta.get("edition"),
+        "timestamp": meta.get("timestamp") or ts,
+        "description": meta.get("description", "") or "",
+        "file_count": file_count,
+        # snapshots: só o que foi copiado (o resto são hardlinks)
+        "size": meta.get("bytes_copied"),
+    }
+
+
+def _fallback_info(fname):
+    """Metadados deduzidos só do nome, para arquivos ilegíveis"""
+    world, ts = parse_name(fname)
+    return {
+        "world": world,
+        "edition": None,
+        "timestamp": ts,
+        "description": "",
+        "file_count": 0,
+    }
+
+
+def scan(backup_dir, world=None):
+    """Lê os backups direto dos arquivos, sem SQLite (mais lento)"""
+    rows = []
+    for name, st in _entries(backup_dir).items():
+        try:
+            info = read_info(os.path.join(backup_dir, name))
+        except Exception:
+            info = _fallback_info(name)
+        if world is not None and info["world"] != world:
+            continue
+        size = st.st_size if info.get("size") is None else info["size"]
+        rows.append(dict(info, name=name, size=size, mtime_ns=st.st_mtime_ns))
+    rows.sort(key=lambda r: store.backup_sort_key(r["name"]))
+    return rows
+
+
+class Catalog:
+    """Índice SQLite dos backups de um diretório"""
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.path = os.path.join(backup_dir, CATALOG_FILE)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Abre conexão em transação e a fecha ao final"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_SCHEMA)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _upsert(self, conn, name, st, info):
+        conn.execute(
+            f"INSERT OR REPLACE INTO backups ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+            (
+                name,
+                info["world"],
+                info["edition"],
+                info["timestamp"],
+                st.st_size if info.get("size") is None else info["size"],
+                st.st_mtime_ns,
+                info["description"],
+                info["file_count"],
+            ),
+        )
+
+    def add(self, path):
+        """Indexa (ou reindexa) um backup recém-criado"""
+        st = backup_stat(path)
+        info = read_info(path)
+        with self._connect() as conn:
+            self._upsert(conn, os.path.basename(path), st, info)
+
+    def remove(self, name):
+        """Remove um backup do índice"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM backups WHERE name = ?", (name,))
+            conn.execute("DELETE FROM verifications WHERE name = ?", (name,))
+
+    def record_verification(self, name, st, ok, error=None, when=None):
+        """Guarda o resultado da verificação do backup com o stat dado"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verifications "
+                "(name, size, mtime_ns, verified_at, ok, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    st.st_size,
+                    st.st_mtime_ns,
+                    time.time() if when is None else when,
+                    int(ok),
+                    error,
+                ),
+            )
+
+    def last_verification(self, name, st):
+        """Última verificação (dict) se o arquivo não mudou desde ela"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT verified_at, ok, error FROM verifications "
+                "WHERE name = ? AND size = ? AND mtime_ns = ?",
+                (name, st.st_size, st.st_mtime_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "verified_at": row["verified_at"],
+            "ok": bool(row["ok"]),
+            "error": row["error"],
+        }
+
+    def sync(self):
+        """Atualiza o índice com o conteúdo atual do diretório"""
+        try:
+            entries = _entries(self.backup_dir)
+        except FileNotFoundError:
+            entries = {}
+        with self._connect() as conn:
+            known = {
+                row["name"]: (row["size"], row["mtime_ns"])
+                for row in conn.execute(
+                    "SELECT name, size, mtime_ns FROM backups"
+                )
+            }
+            for name in set(known) - set(entries):
+                conn.execute("DELETE FROM backups WHERE name = ?", (name,))
+                conn.execute(
+                    "DELETE FROM verifications WHERE name = ?", (name,)
+                )
+            for name, st in entries.items():
+                old = known.get(name)
+                # o tamanho de um snapshot não é o do seu metadata.json
+                if (
+                    old
+                    and old[1] == st.st_mtime_ns
+                    and (old[0] == st.st_size or hardlink.is_snapshot(name))
+                ):
+                    continue
+                path = os.path.join(self.backup_dir, name)
+                try:
+                    info = read_info(path)
+                except Exception:
+                    # arquivo ilegível continua listado, sem metadados
+                    info = _fallback_info(name)
+                self._upsert(conn, name, st, info)
+
+    def rebuild(self):
+        """Descarta o índice e o recria lendo todos os arquivos"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM backups")
+        self.sync()
+
+    def query(self, world=None):
+        """Retorna dicts dos backups (opcionalmente de um mundo), por nome"""
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM backups"
+        args = ()
+        if world is not None:
+            sql += " WHERE world = ?"
+            args = (world,)
+        with self._connect() as conn:
+            rows = [dict(r) for r in conn.execute(sql, args)]
+        rows.sort(key=lambda r: store.backup_sort_key(r["name"]))
+        return rows
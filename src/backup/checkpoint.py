@@ -0,0 +1,247 @@
+"""
+Módulo backup/checkpoint.py:
+- Pontos de retomada de backups .zip: o arquivo é gravado em
+  <nome>.zip.partial e, a cada INTERVAL_BYTES gravados, passa por fsync
+  e o diário <nome>.zip.checkpoint guarda o tamanho já confirmado e as
+  entradas completas (campos do diretório central, SHA-256 e o stat do
+  arquivo de origem). Só no fim o .partial ganha o nome final.
+- Se o processo morrer no meio, o próximo backup do mesmo mundo trunca o
+  .partial no último ponto confirmado, mantém as entradas cujo arquivo
+  de origem não mudou (mesmo tamanho e mtime_ns) e continua dali.
+  Entradas de arquivos alterados ou apagados saem do diretório central;
+  os bytes delas ficam sem uso dentro do .zip.
+- cleanup() apaga as sobras que não podem ser retomadas: .partial sem
+  diário (.tar.zst, snapshots .snap.partial, downloads), diários sem
+  .partial e pares parados há mais de KEEP_SECONDS (mundo que não teve
+  outro backup). Sobras em uso neste processo (ver running) ou alteradas há
+  menos de STALE_SECONDS são de operações ainda em andamento.
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+
+PARTIAL_SUFFIX = ".partial"
+JOURNAL_SUFFIX = ".checkpoint"
+JOURNAL_FORMAT = 1
+# bytes gravados entre dois pontos de retomada
+INTERVAL_BYTES = 256 * 1024 * 1024
+# sobras paradas há mais tempo que isso são de processos que morreram
+STALE_SECONDS = 15 * 60
+# backup interrompido e não retomado nesse prazo é abandonado
+KEEP_SECONDS = 7 * 24 * 3600
+
+_running = set()
+_lock = threading.Lock()
+
+
+def _claim(path):
+    with _lock:
+        _running.add(os.path.abspath(path))
+
+
+def _release(path):
+    with _lock:
+        _running.discard(os.path.abspath(path))
+
+
+@contextlib.contextmanager
+def running(path):
+    """Marca a sobra `path` como em uso por este processo durante o bloco"""
+    _claim(path)
+    try:
+        yield
+    finally:
+        _release(path)
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def _newest_mtime(path):
+    """mtime mais recente do arquivo ou de qualquer item da pasta"""
+    newest = os.stat(path).st_mtime
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            for name in dirs + files:
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                newest = max(newest, st.st_mtime)
+    return newest
+
+
+def _in_use(path, now):
+    with _lock:
+        if os.path.abspath(path) in _running:
+            return True
+    try:
+        return now - _newest_mtime(path) < STALE_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+class Checkpoint:
+    """Diário de progresso de um backup .zip em andamento"""
+
+    def __init__(self, dst, meta, offset=0, entries=()):
+        self.path = dst
+        self.partial = dst + PARTIAL_SUFFIX
+        self.journal = dst + JOURNAL_SUFFIX
+        self.meta = meta
+        self.offset = offset
+        self.entries = list(entries)
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def _save(self):
+        data = {
+            "format": JOURNAL_FORMAT,
+            "backup": self.name,
+            "meta": self.meta,
+            "offset": self.offset,
+            "entries": self.entries,
+        }
+        # gravado à parte e trocado de uma vez: nunca fica pela metade
+        tmp = self.journal + PARTIAL_SUFFIX
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal)
+
+    def open(self):
+        """Abre o .partial posicionado no último ponto confirmado"""
+        if not self.offset:
+            return open(self.partial, "wb")
+        out = open(self.partial, "r+b")
+        out.truncate(self.offset)
+        out.seek(self.offset)
+        return out
+
+    def restore(self, writer):
+        """Repõe as entradas no ParallelZipWriter; retorna {arcname: dict}"""
+        writer.resume(self.entries, self.offset)
+        return {r["arcname"]: r for r in self.entries}
+
+    def save(self, writer, out):
+        """Confirma no disco o que o writer gravou e atualiza o diário"""
+        out.flush()
+        os.fsync(out.fileno())
+        self.offset = writer.offset
+        self.entries = writer.records()
+        self._save()
+
+    def finish(self):
+        """Dá o nome final ao .partial e apaga o diário"""
+        os.replace(self.partial, self.path)
+        _remove(self.journal)
+        _release(self.partial)
+
+    def keep(self):
+        """Mantém .partial e diário para o próximo backup retomar"""
+        _release(self.partial)
+
+    def discard(self):
+        """Apaga .partial e diário"""
+        _remove(self.partial)
+        _remove(self.journal)
+        _release(self.partial)
+
+
+def start(dst, meta):
+    """Checkpoint de um backup novo, ainda sem entradas"""
+    cp = Checkpoint(dst, meta)
+    _claim(cp.partial)
+    cp._save()
+    return cp
+
+
+def find(backup_dir, world):
+    """Checkpoint de um backup interrompido do mundo, ou None.
+
+    Diários ilegíveis ou com .partial menor que o ponto confirmado são
+    apagados. O checkpoint retornado fica em uso até finish, keep ou
+    discard.
+    """
+    try:
+        names = sorted(os.listdir(backup_dir), reverse=True)
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        dst = os.path.join(backup_dir, name[: -len(JOURNAL_SUFFIX)])
+        cp = Checkpoint(dst, {})
+        with _lock:
+            if os.path.abspath(cp.partial) in _running:
+                continue
+        try:
+            with open(cp.journal, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("meta", {}).get("world") != world:
+                continue
+            if data.get("format") != JOURNAL_FORMAT:
+                raise ValueError("formato de diário desconhecido")
+            cp = Checkpoint(dst, data["meta"], data["offset"], data["entries"])
+            if os.path.getsize(cp.partial) < cp.offset:
+                raise ValueError(".partial menor que o ponto confirmado")
+        except (OSError, ValueError, KeyError):
+            cp.discard()
+            continue
+        _claim(cp.partial)
+        return cp
+    return None
+
+
+def unchanged(record, path):
+    """True se o arquivo de origem é o mesmo da entrada gravada"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return record["stamp"] == [st.st_size, st.st_mtime_ns] and (
+        record["size"] == st.st_size
+    )
+
+
+def cleanup(backup_dir, now=None):
+    """Apaga sobras de backups interrompidos; retorna os nomes apagados.
+
+    .partial com diário fica para o próximo backup do mundo retomar,
+    por até KEEP_SECONDS.
+    """
+    now = time.time() if now is None else now
+    try:
+        names = set(os.listdir(backup_dir))
+    except FileNotFoundError:
+        return []
+    removed = []
+    for name in sorted(names):
+        if name.endswith(JOURNAL_SUFFIX):
+            pair = name[: -len(JOURNAL_SUFFIX)] + PARTIAL_SUFFIX
+        elif name.endswith(PARTIAL_SUFFIX):
+            pair = name[: -len(PARTIAL_SUFFIX)] + JOURNAL_SUFFIX
+        else:
+            continue
+        path = os.path.join(backup_dir, name)
+        if _in_use(path, now):
+            continue
+        if pair in names:
+            with contextlib.suppress(FileNotFoundError):
+                if now - os.stat(path).st_mtime < KEEP_SECONDS:
+                    continue
+        _remove(path)
+        removed.append(name)
+    return removed
@@ -0,0 +1,97 @@
+"""
+Módulo backup/codec.py:
+- Escolha adaptativa do codec de cada arquivo no backup.
+- Uma amostra do início do arquivo é comprimida com zlib nível 1; se quase
+  não encolher (dados já comprimidos: chunks zlib, tabelas .ldb, level.dat
+  em gzip), o arquivo é apenas armazenado.
+- Em regiões .mca a amostra (ver sample) pula o cabeçalho de 8 KiB, que
+  comprime bem e faria os chunks já em zlib parecerem compressíveis.
+- O perfil do backup (fast, balanced, smallest) define o codec usado nos
+  arquivos compressíveis e é gravado em metadata.json.
+"""
+
+import bz2
+import zipfile
+import zlib
+
+from backup import anvil
+
+SAMPLE_SIZE = 64 * 1024
+DEFAULT_PROFILE = "balanced"
+
+# perfil: (método, nível, razão mínima para considerar incompressível)
+PROFILES = {
+    "fast": (zipfile.ZIP_DEFLATED, 1, 0.90),
+    "balanced": (zipfile.ZIP_DEFLATED, 6, 0.95),
+    "smallest": (zipfile.ZIP_LZMA, None, 0.98),
+}
+
+# Assinaturas de formatos já comprimidos (dispensam a amostragem)
+_COMPRESSED_MAGIC = (
+    b"\x1f\x8b",  # gzip (level.dat)
+    b"\x89PNG",  # world_icon.png
+    b"PK\x03\x04",  # zip
+    b"\x28\xb5\x2f\xfd",  # zstd
+)
+
+
+def check_profile(profile):
+    """Valida o nome do perfil e retorna o nome efetivo"""
+    profile = profile or DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil de compressão inválido: {profile}")
+    return profile
+
+
+def sample(data, name):
+    """Amostra para is_compressible a partir do início `data` de `name`.
+
+    Em regiões .mca a amostra começa depois do cabeçalho de posições e
+    timestamps, que comprime bem e esconderia que os chunks já estão em
+    zlib; nos demais arquivos é o próprio `data`.
+    """
+    if anvil.is_region_file(name) and len(data) > anvil.HEADER_SIZE:
+        return data[anvil.HEADER_SIZE :]
+    return data
+
+
+def compress_ratio(sample):
+    """Razão tamanho comprimido / original da amostra (zlib nível 1)"""
+    if not sample:
+        return 1.0
+    return len(zlib.compress(sample[:SAMPLE_SIZE], 1)) / min(
+        len(sample), SAMPLE_SIZE
+    )
+
+
+def is_compressible(sample, threshold=PROFILES[DEFAULT_PROFILE][2]):
+    """Indica se vale a pena comprimir dados parecidos com a amostra"""
+    if len(sample) < 64:
+        # arquivos minúsculos: o cabeçalho do codec não compensa
+        return False
+    if sample.startswith(_COMPRESSED_MAGIC):
+        return False
+    return compress_ratio(sample) < threshold
+
+
+def choose(sample, profile=DEFAULT_PROFILE):
+    """Retorna (método ZIP, nível) para um arquivo com esta amostra"""
+    method, level, threshold = PROFILES[check_profile(profile)]
+    if not is_compressible(sample, threshold):
+        return zipfile.ZIP_STORED, None
+    return method, level
+
+
+def compressor(method, level=None):
+    """Cria o compressor de streaming para o método ZIP (None = stored)"""
+    if method == zipfile.ZIP_STORED:
+        return None
+    if method == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(
+            6 if level is None else level, zlib.DEFLATED, -15
+        )
+    if method == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if method == zipfile.ZIP_LZMA:
+        return zipfile.LZMACompressor()
+    raise ValueError(f"Método de compressão não suportado: {method}")
@@ -1,13 +1,35 @@
 # para metadata dos backups
+import contextlib
 import json
 import os
-import zipfile
+import shutil
+import sqlite3
+import threading
 from datetime import datetime
 
 # noqa to suppress linting error for missing module
 import colorama  # noqa
 from colorama import Fore  # noqa
 
+from backup import (
+    catalog,
+    checkpoint,
+    codec,
+    diff,
+    hardlink,
+    parallel_zip,
+    partial,
+    restore,
+    retention,
+    statcache,
+    storage,
+    store,
+    tarzst,
+    worldinfo,
+)
+from backup.progress import Cancelled, Progress
+from backup.snapshot import snapshot_path, stage
+
 # Inicializa colorama para cores no console
 colorama.init(autoreset=True)
 
@@ -20,134 +42,1072 @@ BACKUP_DIR_BEDROCK = "backups_worlds/bedrock"
 class BackupManager:
     """Gerencia criação e restauração de backups de mundos Minecraft"""
 
-    def __init__(self):
+    def __init__(self, backup_dir=None):
         # Diretórios de backup
         self.backup_dir = BACKUP_DIR
         self.backup_dir_java = BACKUP_DIR_JAVA
         self.backup_dir_bedrock = BACKUP_DIR_BEDROCK
+        if backup_dir is not None:
+            self.use_backup_dir(backup_dir)
+        # cache de metadados dos mundos (criado na primeira listagem)
+        self._world_index = None
+        # funções chamadas com o registro de métricas (ver metrics.py) ao
+        # fim de cada backup e restauração
+        self.metrics_hooks = []
+        # registro da última operação de cada thread (ver last_report)
+        self._local = threading.local()
+        # destino remoto das cópias (ver storage.py); None: só local
+        self.storage = None
+
+    @property
+    def last_report(self):
+        """Registro de métricas da última operação desta thread, ou None.
+
+        Backups, restaurações e verificações em outras threads não o
+        alteram; status "skipped" indica mundo sem alterações.
+        """
+        return getattr(self._local, "report", None)
+
+    def use_backup_dir(self, backup_dir):
+        """Troca a pasta de backups (as edições ficam em java/ e bedrock/)"""
+        self.backup_dir = backup_dir
+        self.backup_dir_java = os.path.join(backup_dir, "java")
+        self.backup_dir_bedrock = os.path.join(backup_dir, "bedrock")
+
+    def use_storage(self, destination):
+        """Envia cópias dos backups .zip e .tar.zst para o destino"""
+        self.storage = destination
+
+    def _dir_for(self, edition):
+        """Retorna o diretório de backup correspondente à edição"""
+        if edition == "java":
+            return self.backup_dir_java
+        if edition == "bedrock":
+            return self.backup_dir_bedrock
+        return self.backup_dir
+
+    def list_worlds(self, worlds_path, sort=None):
+        """Retorna lista de tuplas (folder_name, display_name).
+
+        O nome vem do levelname.txt ou do LevelName do level.dat.
+        sort="name" ordena por nome e sort="last_played" pelos mais
+        recentes primeiro; sem sort, segue a ordem do diretório.
+        """
+        return [
+            (w["folder"], w["name"])
+            for w in self.world_details(worlds_path, sort)
+        ]
+
+    def world_details(self, worlds_path, sort=None):
+        """Metadados dos mundos (ver worldinfo.py), com cache em disco.
 
-    def list_worlds(self, worlds_path):
-        """Retorna lista de tuplas (folder_name, display_name) lendo levelname.txt"""
+        Cada item tem folder, name, edition, last_played (epoch), version,
+        seed e size; só mundos com level.dat alterado são relidos. O cache
+        só é gravado se a pasta de backups já existe: listar mundos não
+        cria pastas.
+        """
         try:
-            result = []
-            for d in os.listdir(worlds_path):
-                full = os.path.join(worlds_path, d)
-                if not os.path.isdir(full):
-                    continue
-                name = d
-                display = d
-                # tenta ler display name em levelname.txt
-                level_file = os.path.join(full, "levelname.txt")
-                try:
-                    with open(level_file, "r", encoding="utf-8") as f:
-                        text = f.read().strip()
-                        if text:
-                            display = text
-                except Exception:
-                    pass
-                result.append((name, display))
-            return result
+            names = os.listdir(worlds_path)
         except FileNotFoundError:
             return []
+        index = self._worlds_index()
+        result = []
+        for d in names:
+            full = os.path.join(worlds_path, d)
+            # ignora staging/rollback (.mundo.staging, .mundo.rollback)
+            if d.startswith(".") or not os.path.isdir(full):
+                continue
+            result.append(dict(index.get(full), folder=d))
+        index.prune(
+            worlds_path,
+            [os.path.join(worlds_path, w["folder"]) for w in result],
+        )
+        if os.path.isdir(self.backup_dir):
+            index.save()
+        if sort == "name":
+            result.sort(key=lambda w: w["name"].lower())
+        elif sort == "last_played":
+            result.sort(key=lambda w: -(w["last_played"] or 0))
+        elif sort is not None:
+            raise ValueError(f"Ordenação inválida: {sort}")
+        return result
 
-    def list_backups(self, edition=None):
-        """Retorna arquivos .zip em diretório de backup da edição"""
-        if edition == "java":
-            dir_ = self.backup_dir_java
-        elif edition == "bedrock":
-            dir_ = self.backup_dir_bedrock
-        else:
-            dir_ = self.backup_dir
-        try:
-            backups = []
-            for fname in os.listdir(dir_):
-                if not fname.lower().endswith(".zip"):
-                    continue
-                desc = ""
-                try:
-                    with zipfile.ZipFile(os.path.join(dir_, fname), "r") as z:
-                        if "metadata.json" in z.namelist():
-                            data = json.loads(z.read("metadata.json"))
-                            desc = data.get("description", "")
-                except Exception:
-                    pass
-                backups.append((fname, desc))
-            return backups
-        except FileNotFoundError:
+    def _worlds_index(self):
+        """Cache de metadados em <backups>/.state/.worlds.json"""
+        path = os.path.join(
+            self.backup_dir, statcache.STATE_DIR, ".worlds.json"
+        )
+        if self._world_index is None or self._world_index.path != path:
+            self._world_index = worldinfo.WorldIndex(path)
+        return self._world_index
+
+    def list_backups(self, edition=None, world=None):
+        """Retorna (arquivo, descrição) dos backups da edição.
+
+        Os dados vêm do catálogo SQLite do diretório, que só abre arquivos
+        novos ou alterados. Com `world`, retorna apenas os daquele mundo.
+        """
+        return [
+            (r["name"], r["description"])
+            for r in self.backup_rows(edition, world)
+        ]
+
+    def backup_rows(self, edition=None, world=None):
+        """Linhas do catálogo (dicts com world, timestamp, size etc.)"""
+        dir_ = self._dir_for(edition)
+        if not os.path.isdir(dir_):
             return []
+        self._clean_partials(dir_)
+        try:
+            cat = catalog.Catalog(dir_)
+            cat.sync()
+            return cat.query(world)
+        except sqlite3.Error:
+            # sem catálogo (ex.: diretório somente leitura): lê os arquivos
+            return catalog.scan(dir_, world)
 
     def make_backup(
-        self, worlds_path, world_name, edition=None, description=None
+        self,
+        worlds_path,
+        world_name,
+        edition=None,
+        description=None,
+        mode="zip",
+        workers=None,
+        profile=None,
+        progress=None,
+        cancel=None,
+        force=False,
+        snapshot=False,
+        server=None,
+        throttle=None,
     ):
-        """Cria backup com metadata de descrição e retorna status"""
+        """Cria backup com metadata de descrição e retorna status.
+
+        mode="zip" gera um .zip completo, comprimido em paralelo por
+        `workers` threads (padrão: núcleos da máquina); mode="tarzst" gera
+        um .tar.zst com acesso aleatório (ver tarzst.py); mode="incremental"
+        grava o conteúdo no armazenamento deduplicado e salva um manifesto;
+        mode="hardlink" grava uma pasta .snap com hardlinks para o snapshot
+        anterior (ver hardlink.py). `profile` (fast, balanced, smallest)
+        define o codec de cada arquivo. `progress(feito, total)` recebe os
+        bytes processados e `cancel` (ex.: threading.Event) interrompe o
+        backup, sem deixar arquivo parcial. O modo "zip" grava pontos de
+        retomada (ver checkpoint.py): se o processo morrer no meio, o
+        próximo backup do mesmo mundo continua do último ponto em vez de
+        recomeçar. Mundos sem alterações desde o último backup do mesmo
+        modo (ver statcache.py) são ignorados, a menos que force=True; o
+        status fica em last_report. Tempos por fase e contadores vão para os
+        hooks de metrics_hooks.
+
+        Com snapshot=True o mundo é copiado para uma pasta de staging (ver
+        snapshot.py) e o backup lê essa cópia. `server` (ServerControl)
+        pausa as gravações do servidor só durante a varredura e a cópia.
+        `throttle` (ver fleet.TokenBucket) limita a leitura em bytes/s.
+
+        Com um destino remoto (use_storage), os modos "zip" e "tarzst"
+        enviam o arquivo enquanto ele é gravado; se o envio falhar, o
+        backup local é mantido e upload_backup retoma o envio.
+        """
+        tracker = Progress(callback=progress, cancel=cancel, throttle=throttle)
+        report = {
+            "world": world_name,
+            "edition": edition,
+            "mode": mode,
+            "status": "failed",
+        }
+        metrics = tracker.metrics
+        staged = None
         try:
             # seleciona pasta
-            if edition == "java":
-                backup_dir = self.backup_dir_java
-            elif edition == "bedrock":
-                backup_dir = self.backup_dir_bedrock
-            else:
-                backup_dir = self.backup_dir
+            backup_dir = self._dir_for(edition)
             os.makedirs(backup_dir, exist_ok=True)
             src = os.path.join(worlds_path, world_name)
+            if not os.path.isdir(src):
+                raise FileNotFoundError(f"Mundo não encontrado: {src}")
+            if mode not in ("zip", "tarzst", "incremental", "hardlink"):
+                raise ValueError(f"Modo de backup inválido: {mode}")
+            if mode == "zip":
+                profile = codec.check_profile(profile)
+            self._clean_partials(backup_dir)
+            # só stat (e hash dos arquivos com stat alterado)
+            cache = statcache.StatCache(backup_dir, world_name)
+            with self._paused(server, metrics):
+                with metrics.phase("scan"):
+                    changes = cache.diff(src)
+                clean = changes.clean and changes.mode == mode and not force
+                if snapshot and not clean:
+                    staged = snapshot_path(worlds_path, world_name)
+                    shutil.rmtree(staged, ignore_errors=True)
+                    with metrics.phase("stage"):
+                        staged_stats = stage(src, staged)
+                    metrics.count("staged_bytes", staged_stats["bytes"])
+            resume = self._resume_point(
+                backup_dir, world_name, mode, profile, clean
+            )
+            if clean:
+                # renova o estado para que arquivos "racy" deixem de ser
+                with metrics.phase("state"):
+                    self._save_state(cache, changes, changes.base, mode)
+                report.update(status="skipped", backup=changes.base)
+                ok = (
+                    f"✅ {world_name} sem alterações desde "
+                    f"{changes.base}; backup ignorado."
+                )
+                print(Fore.GREEN + ok)
+                return True
             now = datetime.now().strftime("%Y%m%d_%H%M%S")
-            dst = os.path.join(backup_dir, f"{world_name}_{now}.zip")
-            with zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(src):
-                    for file in files:
-                        abs_file = os.path.join(root, file)
-                        rel_path = os.path.relpath(abs_file, src)
-                        arc = os.path.join(world_name, rel_path)
-                        zipf.write(abs_file, arcname=arc)
-                # adiciona metadata.json dentro do zip
+            tracker.total = sum(e[0] for e in changes.snapshot.values())
+            # com snapshot, a compressão lê a cópia congelada
+            src = staged or src
+            if mode == "incremental":
+                dst = self._make_incremental(
+                    backup_dir,
+                    src,
+                    world_name,
+                    edition,
+                    description,
+                    now,
+                    tracker,
+                    changes,
+                )
+                self._finish(backup_dir, cache, changes, dst, mode, metrics)
+                report.update(status="ok", backup=os.path.basename(dst))
+                ok = f"✅ Backup incremental salvo: {dst}"
+                print(Fore.GREEN + ok)
+                return True
+            if mode == "hardlink":
+                dst = _unique_path(
+                    backup_dir, f"{world_name}_{now}", hardlink.SUFFIX
+                )
+                meta = {
+                    "world": world_name,
+                    "edition": edition,
+                    "timestamp": now,
+                    "description": description or "",
+                }
+                with checkpoint.running(dst + hardlink.PARTIAL_SUFFIX):
+                    self._make_hardlink(
+                        backup_dir, dst, src, meta, workers, tracker, changes
+                    )
+                self._finish(backup_dir, cache, changes, dst, mode, metrics)
+                report.update(status="ok", backup=os.path.basename(dst))
+                ok = f"✅ Snapshot salvo: {dst}"
+                print(Fore.GREEN + ok)
+                return True
+            profile = codec.check_profile(profile)
+            if resume is not None:
+                # mesmo nome e timestamp do backup interrompido
+                dst = resume.path
+                resume.meta["description"] = description or ""
+                meta = resume.meta
+                print(Fore.YELLOW + f"⏯️ Retomando backup interrompido: {dst}")
+            else:
+                suffix = tarzst.SUFFIX if mode == "tarzst" else ".zip"
+                dst = _unique_path(backup_dir, f"{world_name}_{now}", suffix)
                 meta = {
                     "world": world_name,
                     "edition": edition,
                     "timestamp": now,
                     "description": description or "",
+                    "profile": profile,
                 }
-                zipf.writestr("metadata.json", json.dumps(meta))
+            # o envio em streaming não tem como continuar do meio
+            upload = None if resume else self._open_upload(backup_dir, dst)
+            if mode == "tarzst":
+                self._make_tarzst(
+                    dst, src, world_name, meta, workers, tracker, upload
+                )
+            else:
+                journal = resume or checkpoint.start(dst, meta)
+                self._make_zip(
+                    dst,
+                    src,
+                    world_name,
+                    meta,
+                    workers,
+                    tracker,
+                    upload,
+                    journal,
+                )
+            self._finish(backup_dir, cache, changes, dst, mode, metrics)
+            report.update(status="ok", backup=os.path.basename(dst))
             ok = f"✅ Backup salvo: {dst}"
             print(Fore.GREEN + ok)
+            if upload is not None:
+                with metrics.phase("upload"):
+                    report["upload"] = self._complete_upload(upload)
+            elif resume is not None and self.storage is not None:
+                with metrics.phase("upload"):
+                    sent = self.upload_backup(os.path.basename(dst), edition)
+                report["upload"] = "ok" if sent else "pending"
             return True
+        except Cancelled:
+            report["status"] = "cancelled"
+            print(Fore.YELLOW + f"⚠️ Backup de {world_name} cancelado.")
+            return False
         except Exception as e:
+            report["error"] = str(e)
             err = f"❌ Falha ao criar backup: {e}"
             print(Fore.RED + err)
             return False
+        finally:
+            if staged:
+                shutil.rmtree(staged, ignore_errors=True)
+            self._emit_metrics(metrics.record("backup", **report))
 
-    def restore_backup(self, worlds_path, backup_name, edition=None):
-        """Restaura backup selecionado e salva metadata no mundo"""
-        if edition == "java":
-            backup_dir = self.backup_dir_java
-        elif edition == "bedrock":
-            backup_dir = self.backup_dir_bedrock
-        else:
-            backup_dir = self.backup_dir
+    @contextlib.contextmanager
+    def _paused(self, server, metrics):
+        """Mantém as gravações do servidor pausadas durante o bloco"""
+        if server is None:
+            yield
+            return
+        with metrics.phase("pause"):
+            server.pause()
+            try:
+                yield
+            finally:
+                server.resume()
+
+    def _emit_metrics(self, record):
+        """Entrega o registro aos hooks; falha de um hook só gera aviso"""
+        self._local.report = record
+        for hook in list(self.metrics_hooks):
+            try:
+                hook(record)
+            except Exception as e:
+                print(Fore.YELLOW + f"⚠️ Falha ao exportar métricas: {e}")
+
+    def _clean_partials(self, backup_dir):
+        """Apaga sobras de backups interrompidos (ver checkpoint.py)"""
+        try:
+            removed = checkpoint.cleanup(backup_dir)
+        except OSError:
+            return
+        for name in removed:
+            print(
+                Fore.YELLOW
+                + f"🧹 Sobra de backup interrompido removida: {name}"
+            )
+
+    def _resume_point(self, backup_dir, world_name, mode, profile, clean):
+        """Checkpoint do backup .zip interrompido do mundo, se servir.
+
+        O que não pode ser retomado (outro modo ou perfil, mundo sem
+        alterações) é apagado.
+        """
+        journal = checkpoint.find(backup_dir, world_name)
+        if journal is None:
+            return None
+        same = journal.meta.get("profile") == profile
+        if not clean and mode == "zip" and same:
+            return journal
+        journal.discard()
+        print(
+            Fore.YELLOW + f"🧹 Backup interrompido descartado: {journal.name}"
+        )
+        return None
+
+    def _finish(self, backup_dir, cache, changes, dst, mode, metrics):
+        """Registra o backup novo no catálogo e no estado de stat"""
+        with metrics.phase("index"):
+            self._index(backup_dir, dst)
+        with metrics.phase("state"):
+            self._save_state(cache, changes, dst, mode)
+
+    def _index(self, backup_dir, path):
+        """Registra o backup no catálogo; falhas ficam para o próximo sync"""
+        try:
+            catalog.Catalog(backup_dir).add(path)
+        except sqlite3.Error:
+            pass
+
+    def _save_state(self, cache, changes, path, mode):
+        """Grava o estado de stat do mundo; falha só desativa o atalho"""
+        try:
+            cache.save(changes, os.path.basename(path), mode)
+        except OSError:
+            pass
+
+    def _remote_name(self, path):
+        """Nome do backup no destino remoto: <edição>/<arquivo>"""
+        rel = os.path.relpath(path, self.backup_dir)
+        return rel.replace(os.sep, "/")
+
+    def _open_upload(self, backup_dir, dst):
+        """Inicia o envio em streaming; None sem destino ou se falhar"""
+        if self.storage is None:
+            return None
+        name = self._remote_name(dst)
+        journal = storage.journal_path(backup_dir, os.path.basename(dst))
+        try:
+            return self.storage.open_upload(name, journal)
+        except (OSError, storage.StorageError) as e:
+            print(Fore.YELLOW + f"⚠️ Envio remoto não iniciado: {e}")
+            return None
+
+    def _complete_upload(self, upload):
+        """Conclui o envio; a falha fica registrada para upload_backup"""
+        try:
+            upload.complete()
+        except (OSError, storage.StorageError) as e:
+            print(
+                Fore.YELLOW + f"⚠️ Envio de {upload.name} pendente ({e}); "
+                "retome com upload_backup."
+            )
+            return "pending"
+        print(Fore.GREEN + f"☁️ Backup enviado: {upload.name}")
+        return "ok"
+
+    def _make_zip(
+        self,
+        dst,
+        src,
+        world_name,
+        meta,
+        workers=None,
+        tracker=None,
+        upload=None,
+        journal=None,
+    ):
+        """Grava o .zip do mundo; remove o arquivo parcial em caso de erro.
+
+        O arquivo passa por fsync antes de ser registrado: o estado de stat
+        não pode apontar para um backup que um desligamento truncou. Com
+        `upload`, os bytes também alimentam o envio remoto. Com `journal`
+        (checkpoint.Checkpoint), o .zip é gravado no .partial a partir do
+        último ponto confirmado, e uma falha depois do primeiro ponto
+        mantém o .partial para o próximo backup retomar.
+        """
+        tracker = tracker or Progress()
+        metrics = tracker.metrics
+        try:
+            out = journal.open() if journal else open(dst, "wb")
+            save = None
+            if journal is not None:
+
+                def save(writer):
+                    with metrics.phase("checkpoint"):
+                        journal.save(writer, out)
+
+            with out:
+                with parallel_zip.ParallelZipWriter(
+                    storage.TeeWriter(out, upload) if upload else out,
+                    workers,
+                    profile=meta["profile"],
+                    progress=tracker,
+                    checkpoint=save,
+                    checkpoint_bytes=checkpoint.INTERVAL_BYTES,
+                ) as zipf:
+                    done = journal.restore(zipf) if journal else {}
+                    with metrics.phase("walk"):
+                        found = store.walk_files(src)
+                    for abs_file, rel in found:
+                        tracker.check()
+                        arcname = f"{world_name}/{rel}"
+                        record = done.pop(arcname, None)
+                        if record is not None:
+                            if checkpoint.unchanged(record, abs_file):
+                                # gravado antes da interrupção
+                                metrics.count("files_resumed")
+                                tracker.advance(record["size"], read=False)
+                                continue
+                            zipf.drop(arcname)
+                        zipf.add_file(abs_file, arcname)
+                    # apagados do mundo desde a interrupção
+                    for arcname in done:
+                        zipf.drop(arcname)
+                    # adiciona metadata.json, com o SHA-256 de cada arquivo
+                    prefix = world_name + "/"
+                    hashes = {
+                        arcname[len(prefix) :]: digest
+                        for arcname, digest in zipf.digests().items()
+                    }
+                    zipf.writestr(
+                        "metadata.json", json.dumps(dict(meta, sha256=hashes))
+                    )
+                with metrics.phase("fsync"):
+                    out.flush()
+                    os.fsync(out.fileno())
+            if journal is not None:
+                journal.finish()
+        except BaseException as e:
+            if upload is not None:
+                upload.abort()
+            if journal is None:
+                if os.path.exists(dst):
+                    os.remove(dst)
+            elif journal.offset and not isinstance(e, Cancelled):
+                journal.keep()
+            else:
+                journal.discard()
+            raise
+
+    def _make_tarzst(
+        self,
+        dst,
+        src,
+        world_name,
+        meta,
+        workers=None,
+        tracker=None,
+        upload=None,
+    ):
+        """Grava o .tar.zst do mundo (ver tarzst.py), como em _make_zip.
+
+        O arquivo só ganha o nome final depois de completo; sem pontos de
+        retomada, um .partial interrompido é apagado por checkpoint.cleanup.
+        """
+        tracker = tracker or Progress()
+        metrics = tracker.metrics
+        tmp = dst + checkpoint.PARTIAL_SUFFIX
+        try:
+            with checkpoint.running(tmp), open(tmp, "wb") as out:
+                with tarzst.TarZstWriter(
+                    storage.TeeWriter(out, upload) if upload else out,
+                    workers,
+                    profile=meta["profile"],
+                    progress=tracker,
+                ) as tarf:
+                    with metrics.phase("walk"):
+                        found = store.walk_files(src)
+                    for abs_file, rel in found:
+                        tracker.check()
+                        tarf.add_file(abs_file, f"{world_name}/{rel}")
+                    prefix = world_name + "/"
+                    hashes = {
+                        arcname[len(prefix) :]: digest
+                        for arcname, digest in tarf.digests().items()
+                    }
+                    tarf.close(dict(meta, sha256=hashes))
+                with metrics.phase("fsync"):
+                    out.flush()
+                    os.fsync(out.fileno())
+            os.replace(tmp, dst)
+        except BaseException:
+            if upload is not None:
+                upload.abort()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _make_hardlink(
+        self,
+        backup_dir,
+        dst,
+        src,
+        meta,
+        workers=None,
+        tracker=None,
+        changes=None,
+    ):
+        """Grava o snapshot com hardlinks para o anterior (ver hardlink.py)"""
+        world_name = meta["world"]
+        previous = hardlink.latest_snapshot(backup_dir, world_name)
+        base = None
+        if (
+            changes is not None
+            and previous[0]
+            and changes.base == os.path.basename(previous[0])
+        ):
+            # estado de stat do mesmo snapshot: lista exata de alterados
+            base = changes
+        hardlink.write_snapshot(
+            dst, src, world_name, meta, previous, base, workers, tracker
+        )
+
+    def _make_incremental(
+        self,
+        backup_dir,
+        src,
+        world_name,
+        edition,
+        description,
+        now,
+        tracker=None,
+        changes=None,
+    ):
+        """Grava blobs deduplicados e o manifesto; retorna o caminho"""
+        tracker = tracker or Progress()
+        metrics = tracker.metrics
+        blobs = store.BlobStore(backup_dir)
+        prev_path, previous = store.latest_manifest(backup_dir, world_name)
+        base = None
+        if (
+            changes is not None
+            and prev_path
+            and changes.base == os.path.basename(prev_path)
+        ):
+            # estado de stat do mesmo manifesto: lista exata de alterados
+            base = changes
+        files = store.build_manifest(blobs, src, previous, tracker, base)
+        manifest = {
+            "format": store.MANIFEST_FORMAT,
+            "world": world_name,
+            "edition": edition,
+            "timestamp": now,
+            "description": description or "",
+            "files": files,
+        }
+        dst = _unique_path(
+            backup_dir, f"{world_name}_{now}", store.MANIFEST_SUFFIX
+        )
+        with metrics.phase("write"):
+            store.save_manifest(dst, manifest)
+        # entrada: bytes relidos; saída: blobs novos + manifesto
+        metrics.count("bytes_in", blobs.bytes_hashed)
+        metrics.count("bytes_out", blobs.bytes_written + os.path.getsize(dst))
+        return dst
+
+    def restore_backup(
+        self,
+        worlds_path,
+        backup_name,
+        edition=None,
+        workers=None,
+        mode="atomic",
+        delete_extra=False,
+        progress=None,
+        cancel=None,
+    ):
+        """Restaura backup selecionado e salva metadata no mundo.
+
+        mode="atomic" extrai em paralelo (`workers` threads) em uma pasta
+        de staging, que substitui o mundo por rename; o mundo anterior fica
+        em .<mundo>.rollback. mode="delta" reescreve só os arquivos que
+        diferem do disco e, com delete_extra, apaga os que não estão no
+        backup. `progress`, `cancel` e as métricas funcionam como em
+        make_backup.
+        """
+        backup_dir = self._dir_for(edition)
         src = os.path.join(backup_dir, backup_name)
+        tracker = Progress(callback=progress, cancel=cancel)
+        report = {
+            "world": None,
+            "edition": edition,
+            "mode": mode,
+            "backup": backup_name,
+            "status": "failed",
+        }
         try:
-            with zipfile.ZipFile(src, "r") as zipf:
-                # lê metadata antes de extrair
-                metadata = {}
-                if "metadata.json" in zipf.namelist():
-                    metadata = json.loads(zipf.read("metadata.json"))
-                # extrai todos os demais arquivos
-                for member in zipf.namelist():
-                    if member == "metadata.json":
-                        continue
-                    zipf.extract(member, worlds_path)
-                # salva metadata dentro da pasta do mundo como mvp2.json
-                world = metadata.get("world")
-                if world:
-                    dest = os.path.join(worlds_path, world, "mvp2.json")
-                    with open(dest, "w", encoding="utf-8") as mf:
-                        json.dump(metadata, mf, ensure_ascii=False, indent=2)
-            msg = f"✅ Backup restaurado: {backup_name}"
+            with tracker.metrics.phase("open"):
+                source = restore.open_source(src, backup_dir)
+            report["world"] = source.world
+            engine = restore.RestoreEngine(workers, tracker)
+            if mode == "atomic":
+                stats = engine.run(source, worlds_path)
+            elif mode == "delta":
+                stats = engine.run_delta(source, worlds_path, delete_extra)
+            else:
+                source.close()
+                raise ValueError(f"Modo de restauração inválido: {mode}")
+            msg = (
+                f"✅ Backup restaurado: {backup_name} "
+                f"({restore.format_stats(stats)})"
+            )
+            report["status"] = "ok"
             print(Fore.GREEN + msg)
             return True
+        except Cancelled:
+            report["status"] = "cancelled"
+            print(Fore.YELLOW + f"⚠️ Restauração de {backup_name} cancelada.")
+            return False
         except Exception as e:
+            report["error"] = str(e)
             err = f"❌ Falha ao restaurar backup: {e}"
             print(Fore.RED + err)
             return False
+        finally:
+            self._emit_metrics(tracker.metrics.record("restore", **report))
+
+    def _pick_backup(self, worlds, edition):
+        """Pergunta mundo e backup no menu; retorna o nome ou None"""
+        # Seleciona o mundo para restaurar
+        idxw = input("Escolha o número do mundo para restaurar backup: ")
+        try:
+            folder, _ = worlds[int(idxw) - 1]
+        except Exception:
+            print("Entrada inválida.")
+            return None
+        # filtra backups do mundo
+        backs = self.list_backups(edition, world=folder)
+        if not backs:
+            print(f"  (nenhum backup encontrado para {folder})")
+            return None
+        print("\nBackups disponíveis para o mundo:")
+        for j, (b, d) in enumerate(backs):
+            print(f"  {j + 1}. {b} - {d}")
+        idxb = input("Escolha o número do backup para restaurar: ")
+        try:
+            return backs[int(idxb) - 1][0]
+        except Exception:
+            print("Entrada inválida.")
+            return None
+
+    def restore_partial(
+        self,
+        worlds_path,
+        backup_name,
+        edition=None,
+        dimension="overworld",
+        regions=None,
+        chunk_box=None,
+        block_box=None,
+    ):
+        """Restaura só parte de um mundo Java e retorna status.
+
+        Aceita uma dimensão inteira, regiões ('r.X.Z.mca') ou uma área
+        (x1, z1, x2, z2) em chunks ou blocos; os chunks do backup são
+        inseridos nos .mca do mundo sem extrair o backup inteiro.
+        """
+        backup_dir = self._dir_for(edition)
+        src = os.path.join(backup_dir, backup_name)
+        try:
+            selection = partial.Selection(
+                dimension, regions, chunk_box, block_box
+            )
+            source = restore.open_source(src, backup_dir)
+            stats = partial.restore_partial(source, worlds_path, selection)
+            msg = (
+                f"✅ Restauração parcial de {backup_name}: "
+                f"{stats['chunks']} chunks em {stats['regions']} regiões"
+            )
+            print(Fore.GREEN + msg)
+            return True
+        except Exception as e:
+            err = f"❌ Falha na restauração parcial: {e}"
+            print(Fore.RED + err)
+            return False
+
+    def verify_backup(
+        self,
+        backup_name,
+        edition=None,
+        workers=None,
+        max_age=None,
+        progress=None,
+        cancel=None,
+    ):
+        """Relê todas as entradas do backup e confere CRC e SHA-256.
+
+        As entradas são lidas em paralelo (`workers` threads), sem gravar
+        nada em disco. O resultado fica no catálogo; com `max_age`
+        (segundos), um backup verificado com sucesso há menos tempo que
+        isso e não alterado desde então não é relido. Retorna False se
+        algum arquivo estiver corrompido ou faltando.
+        """
+        backup_dir = self._dir_for(edition)
+        src = os.path.join(backup_dir, backup_name)
+        tracker = Progress(callback=progress, cancel=cancel)
+        report = {
+            "world": catalog.parse_name(backup_name)[0],
+            "edition": edition,
+            "backup": backup_name,
+            "status": "failed",
+        }
+        cat = catalog.Catalog(backup_dir)
+        try:
+            st = catalog.backup_stat(src)
+            last = self._last_verification(cat, backup_name, st)
+            if (
+                max_age is not None
+                and last
+                and last["ok"]
+                and datetime.now().timestamp() - last["verified_at"] < max_age
+            ):
+                report["status"] = "cached"
+                when = datetime.fromtimestamp(last["verified_at"])
+                ok = (
+                    f"✅ {backup_name} já verificado em "
+                    f"{when:%Y-%m-%d %H:%M}; ignorado."
+                )
+                print(Fore.GREEN + ok)
+                return True
+            try:
+                with tracker.metrics.phase("open"):
+                    source = restore.open_source(src, backup_dir)
+                report["world"] = source.world
+                try:
+                    stats = restore.verify_source(source, workers, tracker)
+                finally:
+                    source.close()
+                errors = stats["errors"]
+            except (Cancelled, OSError):
+                raise
+            except Exception as e:
+                # zip ou manifesto ilegível
+                stats = {"files": 0}
+                errors = [str(e)]
+            error = "; ".join(errors[:5]) or None
+            self._record_verification(cat, backup_name, st, error)
+            if errors:
+                report.update(status="corrupt", error=error)
+                err = (
+                    f"❌ Backup {backup_name} corrompido "
+                    f"({len(errors)} erros): {error}"
+                )
+                print(Fore.RED + err)
+                return False
+            report["status"] = "ok"
+            msg = (
+                f"✅ Backup íntegro: {backup_name} "
+                f"({stats['files']} arquivos)"
+            )
+            print(Fore.GREEN + msg)
+            return True
+        except Cancelled:
+            report["status"] = "cancelled"
+            print(Fore.YELLOW + f"⚠️ Verificação de {backup_name} cancelada.")
+            return False
+        except Exception as e:
+            report["error"] = str(e)
+            err = f"❌ Falha ao verificar backup: {e}"
+            print(Fore.RED + err)
+            return False
+        finally:
+            self._emit_metrics(tracker.metrics.record("verify", **report))
+
+    def _last_verification(self, cat, name, st):
+        try:
+            return cat.last_verification(name, st)
+        except sqlite3.Error:
+            return None
+
+    def _record_verification(self, cat, name, st, error):
+        """Guarda o resultado no catálogo; falha só desativa o cache"""
+        try:
+            cat.record_verification(name, st, error is None, error)
+        except sqlite3.Error:
+            pass
+
+    def prune_backups(
+        self,
+        edition=None,
+        keep=1,
+        world=None,
+        dry_run=False,
+        policy=None,
+        gc=True,
+    ):
+        """Apaga os backups fora da política de retenção de cada mundo.
+
+        Sem `policy` (ver retention.Policy), mantém os `keep` mais novos.
+        Retorna os nomes removidos (com dry_run=True, só os que seriam).
+        Com gc=True, os blobs que só os incrementais apagados usavam
+        também saem de objects/ (ver collect_garbage).
+        """
+        if policy is None:
+            if keep < 1:
+                raise ValueError("keep deve ser pelo menos 1")
+            policy = retention.Policy(last=keep)
+        backup_dir = self._dir_for(edition)
+        by_world = {}
+        for row in self.backup_rows(edition, world):
+            by_world.setdefault(row["world"], []).append(row)
+        removed = []
+        for rows in by_world.values():
+            # as linhas já vêm em ordem cronológica
+            _, old = retention.select(rows, policy)
+            removed.extend(row["name"] for row in old)
+        if not dry_run:
+            cat = catalog.Catalog(backup_dir)
+            for name in removed:
+                path = os.path.join(backup_dir, name)
+                if os.path.isdir(path):
+                    # snapshot: os hardlinks dos outros continuam válidos
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                try:
+                    cat.remove(name)
+                except sqlite3.Error:
+                    pass
+                print(Fore.YELLOW + f"🗑️ Backup removido: {name}")
+        if gc and any(store.is_manifest(n) for n in removed):
+            self.collect_garbage(edition, exclude=removed, dry_run=dry_run)
+        return removed
+
+    def export_backup(
+        self, backup_name, edition=None, dst=None, workers=None, profile=None
+    ):
+        """Exporta um snapshot de hardlinks para .zip e retorna o caminho.
+
+        Sem `dst`, o arquivo vai para <backups>/exports/. O .zip é igual
+        ao do modo "zip" e pode ser restaurado em outra máquina. Retorna
+        None em caso de falha.
+        """
+        backup_dir = self._dir_for(edition)
+        src = os.path.join(backup_dir, backup_name)
+        try:
+            if not (hardlink.is_snapshot(backup_name) and os.path.isdir(src)):
+                raise ValueError(f"{backup_name} não é um snapshot")
+            meta = hardlink.load_metadata(src)
+            world = meta.get("world")
+            restore.check_world(world)
+            meta = {
+                k: v
+                for k, v in meta.items()
+                if k not in ("sha256", "bytes_copied")
+            }
+            meta["profile"] = codec.check_profile(profile)
+            if dst is None:
+                stem = backup_name[: -len(hardlink.SUFFIX)]
+                dst = os.path.join(backup_dir, "exports", stem + ".zip")
+            os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+            self._make_zip(dst, os.path.join(src, world), world, meta, workers)
+            print(Fore.GREEN + f"✅ Snapshot exportado: {dst}")
+            return dst
+        except Exception as e:
+            print(Fore.RED + f"❌ Falha ao exportar backup: {e}")
+            return None
+
+    def diff_backups(
+        self,
+        old_name,
+        new_name=None,
+        edition=None,
+        worlds_path=None,
+        workers=None,
+    ):
+        """Compara dois backups, ou um backup e o mundo, e retorna o diff.
+
+        Sem `new_name`, o backup é comparado com o mundo de mesmo nome em
+        `worlds_path`. Nada é extraído: valem os hashes e os cabeçalhos
+        das regiões (ver diff.py). Retorna diff.WorldDiff ou None em caso
+        de falha.
+        """
+        backup_dir = self._dir_for(edition)
+        sources = []
+        try:
+            old = restore.open_source(
+                os.path.join(backup_dir, old_name), backup_dir
+            )
+            sources.append(old)
+            if new_name is not None:
+                new = restore.open_source(
+                    os.path.join(backup_dir, new_name), backup_dir
+                )
+            elif worlds_path is not None:
+                restore.check_world(old.world)
+                target = os.path.join(worlds_path, old.world)
+                if not os.path.isdir(target):
+                    raise FileNotFoundError(f"Mundo não encontrado: {target}")
+                new = diff.LiveWorld(target, backup_dir)
+            else:
+                raise ValueError("Informe outro backup ou a pasta de mundos")
+            sources.append(new)
+            result = diff.compare(old, new, workers)
+        except Exception as e:
+            print(Fore.RED + f"❌ Falha ao comparar backups: {e}")
+            return None
+        finally:
+            for source in sources:
+                source.close()
+        info = result.summary()
+        if result.clean:
+            print(
+                Fore.GREEN + f"✅ Sem diferenças entre {result.old} "
+                f"e {result.new} ({info['files_unchanged']} arquivos)"
+            )
+            return result
+        print(
+            Fore.YELLOW + f"🔍 {result.old} → {result.new}: "
+            f"{info['files_added']} adicionados, "
+            f"{info['files_removed']} removidos, "
+            f"{info['files_changed']} alterados; "
+            f"{info['regions_changed']} regiões com "
+            f"{info['chunks_added']} chunks novos, "
+            f"{info['chunks_removed']} removidos e "
+            f"{info['chunks_changed']} alterados"
+        )
+        return result
+
+    def remote_backups(self, edition=None):
+        """{nome: tamanho} dos backups da edição no destino remoto"""
+        if self.storage is None:
+            raise ValueError("Nenhum destino remoto configurado")
+        prefix = self._remote_name(self._dir_for(edition))
+        prefix = "" if prefix == "." else prefix + "/"
+        return {
+            name[len(prefix) :]: size
+            for name, size in self.storage.list(prefix).items()
+            if "/" not in name[len(prefix) :]
+        }
+
+    def upload_backup(self, backup_name, edition=None):
+        """Envia (ou retoma o envio de) um backup .zip ou .tar.zst.
+
+        Partes já recebidas pelo destino não são reenviadas (ver
+        storage.py). Retorna True se o backup está completo no destino.
+        """
+        backup_dir = self._dir_for(edition)
+        src = os.path.join(backup_dir, backup_name)
+        try:
+            if self.storage is None:
+                raise ValueError("Nenhum destino remoto configurado")
+            if not os.path.isfile(src) or store.is_manifest(backup_name):
+                raise ValueError(
+                    f"{backup_name}: só backups .zip e .tar.zst são enviados"
+                )
+            result = self.storage.upload_file(
+                src,
+                self._remote_name(src),
+                storage.journal_path(backup_dir, backup_name),
+            )
+        except Exception as e:
+            print(Fore.RED + f"❌ Falha ao enviar backup: {e}")
+            return False
+        mib = result["bytes_sent"] / (1024 * 1024)
+        msg = f"☁️ Backup enviado: {backup_name} ({mib:.1f} MiB"
+        if result["bytes_reused"]:
+            reused = result["bytes_reused"] / (1024 * 1024)
+            msg += f", {reused:.1f} MiB já estavam no destino"
+        print(Fore.GREEN + msg + ")")
+        return True
+
+    def fetch_backup(self, backup_name, edition=None):
+        """Baixa um backup do destino remoto para a pasta de backups"""
+        backup_dir = self._dir_for(edition)
+        dst = os.path.join(backup_dir, backup_name)
+        tmp = dst + storage.PARTIAL_SUFFIX
+        try:
+            if self.storage is None:
+                raise ValueError("Nenhum destino remoto configurado")
+            if os.path.exists(dst):
+                raise FileExistsError(f"{backup_name} já existe localmente")
+            os.makedirs(backup_dir, exist_ok=True)
+            with checkpoint.running(tmp):
+                self.storage.download(self._remote_name(dst), tmp)
+                os.replace(tmp, dst)
+        except Exception as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            print(Fore.RED + f"❌ Falha ao baixar backup: {e}")
+            return False
+        self._index(backup_dir, dst)
+        print(Fore.GREEN + f"✅ Backup baixado: {dst}")
+        return True
+
+    def collect_garbage(self, edition=None, exclude=(), dry_run=False):
+        """Apaga blobs sem referência e estados órfãos; retorna o resumo.
+
+        `exclude` lista manifestos que serão apagados (útil com dry_run).
+        """
+        backup_dir = self._dir_for(edition)
+        try:
+            result = retention.collect_garbage(
+                backup_dir, exclude=set(exclude), dry_run=dry_run
+            )
+        except (OSError, ValueError) as e:
+            print(Fore.RED + f"❌ Coleta de lixo interrompida: {e}")
+            return None
+        mib = result["bytes"] / (1024 * 1024)
+        verb = "seriam liberados" if dry_run else "liberados"
+        print(
+            Fore.YELLOW + f"🗑️ {result['blobs']} blobs sem uso; "
+            f"{mib:.1f} MiB {verb}"
+        )
+        return result
 
     def menu(self, worlds_path, edition=None):
         """Menu interativo para criar e restaurar backups"""
@@ -165,6 +1125,7 @@ class BackupManager:
             print("\nOpções:")
             print("  b - Criar backup de um mundo")
             print("  r - Restaurar um backup de um mundo")
+            print("  p - Restauração parcial (dimensão, regiões ou área)")
             print("  0 - Sair")
             choice = input("Escolha uma opção: ").strip().lower()
             if choice == "0":
@@ -180,42 +1141,69 @@ class BackupManager:
                     if any(c in desc for c in r"\\/:*?\"<>|"):
                         print("❌ Descrição contém caracteres inválidos.")
                     else:
+                        # com tag, grava mesmo sem alterações no mundo
                         self.make_backup(
-                            worlds_path, world_name, edition, desc
+                            worlds_path,
+                            world_name,
+                            edition,
+                            desc,
+                            force=bool(desc),
                         )
                 except Exception:
                     print("Entrada inválida.")
             elif choice == "r":
-                # Seleciona o mundo para restaurar
-                idxw = input(
-                    "Escolha o número do mundo para restaurar backup: "
+                backup_name = self._pick_backup(worlds, edition)
+                if backup_name:
+                    self.restore_backup(worlds_path, backup_name, edition)
+            elif choice == "p":
+                backup_name = self._pick_backup(worlds, edition)
+                if not backup_name:
+                    continue
+                dim = (
+                    input("Dimensão (overworld/nether/end) [overworld]: ")
+                    .strip()
+                    .lower()
+                    or "overworld"
                 )
+                area = input(
+                    "Regiões (ex: r.0.0.mca,r.-1.0.mca) ou área em blocos "
+                    "x1,z1,x2,z2 (vazio = dimensão inteira): "
+                ).strip()
                 try:
-                    folder, _ = worlds[int(idxw) - 1]
-                except Exception:
+                    regions = block_box = None
+                    if area.startswith("r."):
+                        regions = [r.strip() for r in area.split(",")]
+                    elif area:
+                        block_box = tuple(int(v) for v in area.split(","))
+                        if len(block_box) != 4:
+                            raise ValueError(area)
+                except ValueError:
                     print("Entrada inválida.")
                     continue
-                # filtra backups do mundo
-                all_backs = self.list_backups(edition)
-                backs = [
-                    (b, d) for b, d in all_backs if b.startswith(folder + "_")
-                ]
-                if not backs:
-                    print(f"  (nenhum backup encontrado para {folder})")
-                    continue
-                print("\nBackups disponíveis para o mundo:")
-                for j, (b, d) in enumerate(backs):
-                    print(f"  {j + 1}. {b} - {d}")
-                idxb = input("Escolha o número do backup para restaurar: ")
-                try:
-                    backup_name = backs[int(idxb) - 1][0]
-                    self.restore_backup(worlds_path, backup_name, edition)
-                except Exception:
-                    print("Entrada inválida.")
+                self.restore_partial(
+                    worlds_path,
+                    backup_name,
+                    edition,
+                    dimension=dim,
+                    regions=regions,
+                    block_box=block_box,
+                )
             else:
                 print("Opção inválida.")
 
 
+def _unique_path(directory, stem, suffix):
+    """Gera caminho inexistente, acrescentando -N em caso de colisão"""
+    path = os.path.join(directory, stem + suffix)
+    n = 2
+    while os.path.exists(path) or os.path.exists(
+        path + checkpoint.PARTIAL_SUFFIX
+    ):
+        path = os.path.join(directory, f"{stem}-{n}{suffix}")
+        n += 1
+    return path
+
+
 # Instância padrão para uso no módulo
 manager = BackupManager()
 
@@ -224,4 +1212,12 @@ list_worlds = manager.list_worlds
 list_backups = manager.list_backups
 make_backup = manager.make_backup
 restore_backup = manager.restore_backup
+restore_partial = manager.restore_partial
+verify_backup = manager.verify_backup
+prune_backups = manager.prune_backups
+export_backup = manager.export_backup
+diff_backups = manager.diff_backups
+upload_backup = manager.upload_backup
+fetch_backup = manager.fetch_backup
+collect_garbage = manager.collect_garbage
 menu = manager.menu
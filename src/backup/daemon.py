@@ -0,0 +1,242 @@
+"""
+Módulo backup/daemon.py:
+- Define BackupDaemon, modo contínuo (sem interação) que observa as
+  pastas de mundos Java/Bedrock e faz backup só dos mundos alterados.
+- A detecção é por polling: cada mundo tem uma assinatura (quantidade de
+  arquivos, tamanho total e maior mtime_ns), comparada a cada ciclo.
+- Rajadas de salvamento são agrupadas (debounce): o backup só começa
+  depois de `debounce` segundos sem mudanças, ou após `max_wait` se o
+  mundo nunca para de mudar (servidor ativo).
+- Cada mundo respeita um intervalo mínimo entre backups e um limite
+  global de backups simultâneos. Backup que falha não conta para o
+  intervalo: é tentado de novo depois do debounce.
+- Com snapshot=True, cada backup lê uma cópia congelada do mundo; com
+  `server` (snapshot.ServerControl), o servidor fica sem gravar só
+  durante a cópia.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import catalog
+
+DEFAULT_POLL = 30.0
+DEFAULT_DEBOUNCE = 60.0
+DEFAULT_MAX_WAIT = 15 * 60.0
+DEFAULT_INTERVAL = 60 * 60.0
+DEFAULT_CONCURRENCY = 1
+
+
+def world_signature(world_dir):
+    """Retorna (arquivos, bytes, maior mtime_ns) do mundo"""
+    count = size = newest = 0
+    for root, _, names in os.walk(world_dir):
+        for name in names:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                # arquivo temporário removido durante o save
+                continue
+            count += 1
+            size += st.st_size
+            newest = max(newest, st.st_mtime_ns)
+    return count, size, newest
+
+
+class WorldState:
+    """Situação de um mundo observado pelo daemon"""
+
+    def __init__(self, edition, worlds_path, world):
+        self.edition = edition
+        self.worlds_path = worlds_path
+        self.world = world
+        self.signature = None
+        # assinatura coberta pelo último backup (None = desconhecida)
+        self.backed_up = None
+        self.changed_at = None
+        self.first_change = None
+        self.last_backup = None
+        self.running = False
+
+    def dirty(self):
+        return self.signature is not None and self.signature != self.backed_up
+
+
+class BackupDaemon:
+    """Observa pastas de mundos e agenda backups dos que mudaram.
+
+    sources é uma lista de (edição, pasta de mundos). intervals permite
+    sobrescrever o intervalo mínimo por mundo: {"nome_da_pasta": segundos}.
+    """
+
+    def __init__(
+        self,
+        manager,
+        sources,
+        poll=DEFAULT_POLL,
+        debounce=DEFAULT_DEBOUNCE,
+        max_wait=DEFAULT_MAX_WAIT,
+        interval=DEFAULT_INTERVAL,
+        intervals=None,
+        concurrency=DEFAULT_CONCURRENCY,
+        mode="zip",
+        snapshot=False,
+        server=None,
+        clock=time.monotonic,
+        log=print,
+    ):
+        self.manager = manager
+        self.sources = [(ed, path) for ed, path in sources if path]
+        self.poll = poll
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.concurrency = max(1, concurrency)
+        self.mode = mode
+        self.snapshot = snapshot
+        self.server = server
+        self.clock = clock
+        self.log = log
+        self.states = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._futures = set()
+
+    def scan(self):
+        """Atualiza a assinatura de todos os mundos observados"""
+        now = self.clock()
+        seen = set()
+        for edition, worlds_path in self.sources:
+            for folder, _ in self.manager.list_worlds(worlds_path):
+                key = (edition, worlds_path, folder)
+                seen.add(key)
+                state = self.states.get(key)
+                if state is None:
+                    state = WorldState(edition, worlds_path, folder)
+                    self.states[key] = state
+                signature = world_signature(os.path.join(worlds_path, folder))
+                if state.signature is None:
+                    state.signature = signature
+                    if self._covered_by_backup(state):
+                        state.backed_up = signature
+                    else:
+                        state.changed_at = state.first_change = now
+                elif signature != state.signature:
+                    state.signature = signature
+                    state.changed_at = now
+                    if state.first_change is None:
+                        state.first_change = now
+        # mundos apagados deixam de ser observados
+        for key in list(self.states):
+            if key not in seen and not self.states[key].running:
+                del self.states[key]
+
+    def _covered_by_backup(self, state):
+        """True se já existe backup mais novo que o arquivo mais recente"""
+        backup_dir = self.manager._dir_for(state.edition)
+        if not os.path.isdir(backup_dir):
+            return False
+        try:
+            cat = catalog.Catalog(backup_dir)
+            cat.sync()
+            rows = cat.query(state.world)
+        except sqlite3.Error:
+            rows = catalog.scan(backup_dir, state.world)
+        newest = state.signature[2]
+        return any((r.get("mtime_ns") or 0) >= newest for r in rows)
+
+    def interval_for(self, world):
+        return self.intervals.get(world, self.interval)
+
+    def due(self):
+        """Mundos alterados, estáveis e fora do intervalo mínimo"""
+        now = self.clock()
+        result = []
+        for state in self.states.values():
+            if state.running or not state.dirty():
+                continue
+            quiet = now - state.changed_at >= self.debounce
+            waited = now - state.first_change >= self.max_wait
+            if not (quiet or waited):
+                continue
+            if (
+                state.last_backup is not None
+                and now - state.last_backup < self.interval_for(state.world)
+            ):
+                continue
+            result.append(state)
+        return result
+
+    def tick(self):
+        """Um ciclo: varre os mundos e dispara os backups pendentes"""
+        self.scan()
+        started = []
+        running = sum(s.running for s in self.states.values())
+        for state in self.due():
+            if running >= self.concurrency:
+                break
+            running += 1
+            state.running = True
+            with self._lock:
+                future = self._pool.submit(self._backup, state)
+                self._futures.add(future)
+                future.add_done_callback(self._futures.discard)
+            started.append(state.world)
+        return started
+
+    def _backup(self, state):
+        """Executa o backup (thread do pool) e atualiza o estado"""
+        # o backup cobre o que foi visto antes de começar; mudanças durante
+        # a cópia geram um novo backup no próximo ciclo
+        signature = state.signature
+        self.log(f"🔄 Mudanças em {state.world} ({state.edition}): backup")
+        extra = {}
+        if self.snapshot:
+            extra = {"snapshot": True, "server": self.server}
+        try:
+            ok = self.manager.make_backup(
+                state.worlds_path,
+                state.world,
+                state.edition,
+                "automático (daemon)",
+                mode=self.mode,
+                **extra,
+            )
+        except Exception as e:
+            self.log(f"❌ Daemon: falha no backup de {state.world}: {e}")
+            ok = False
+        now = self.clock()
+        if ok:
+            state.last_backup = now
+            state.backed_up = signature
+            changed = state.signature != signature
+            state.first_change = state.changed_at if changed else None
+        else:
+            # nova tentativa depois do debounce, sem esperar o intervalo
+            state.changed_at = state.first_change = now
+        state.running = False
+        return ok
+
+    def wait(self):
+        """Espera os backups em andamento terminarem"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result()
+
+    def run(self, stop=None):
+        """Laço principal até stop (threading.Event) ser acionado"""
+        stop = stop or threading.Event()
+        folders = ", ".join(path for _, path in self.sources)
+        self.log(f"👀 Observando mundos em: {folders}")
+        try:
+            while not stop.is_set():
+                self.tick()
+                stop.wait(self.poll)
+        finally:
+            self.wait()
+            self._pool.shutdown(wait=True)
@@ -0,0 +1,234 @@
+"""
+Módulo backup/diff.py:
+- Compara dois backups, ou um backup e o mundo em disco, sem extrair o
+  conteúdo: arquivos adicionados, removidos e alterados, e, nas regiões
+  Anvil (.mca), quais chunks entraram, saíram ou mudaram.
+- Arquivos de mesmo tamanho são comparados pelos hashes que o backup já
+  guarda (CRC-32 do diretório central do .zip, SHA-256 do metadata.json
+  ou dos blobs, hashes dos chunks nos incrementais). Nas regiões, só o
+  cabeçalho (8 KiB) é lido de cada lado, e um chunk mudou quando o
+  timestamp mudou; entre backups sem hash em comum (ex.: .zip e
+  incremental), região com os mesmos timestamps conta como igual.
+- No mundo em disco, o estado de stat (ver statcache.py) dispensa a
+  leitura de arquivos que não mudaram desde o backup do estado; os
+  demais são lidos do disco só quando os timestamps não bastam.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import anvil, restore, statcache, store
+
+# ordem de preferência dos hashes em comum
+KINDS = ("chunks", "sha256", "crc32")
+
+
+class LiveWorld:
+    """Mundo em disco com a mesma interface das fontes de restore.py"""
+
+    def __init__(self, path, backup_dir=None):
+        self.path = path
+        self.world = os.path.basename(os.path.normpath(path))
+        self.metadata = {}
+        self.missing = []
+        self._stats = {}
+        for abs_file, rel in store.walk_files(path):
+            try:
+                self._stats[rel] = os.stat(abs_file)
+            except FileNotFoundError:
+                continue
+        self.entries = [
+            (rel, st.st_size, rel) for rel, st in self._stats.items()
+        ]
+        self.base = None
+        self._state = {}
+        state = None
+        if backup_dir is not None:
+            state = statcache.StatCache(backup_dir, self.world).load()
+        if state is not None:
+            self.base = state["backup"]
+            racy_before = state.get("scanned_ns", 0) - statcache.RACY_NS
+            # só entradas fora da janela "racy" são confiáveis pelo stat
+            self._state = {
+                rel: entry
+                for rel, entry in state.get("files", {}).items()
+                if entry[1] < racy_before
+            }
+
+    def _file(self, rel):
+        return restore.safe_join(self.path, rel)
+
+    def unchanged(self, rel):
+        """True se o stat do arquivo é o mesmo do backup do estado"""
+        entry = self._state.get(rel)
+        st = self._stats[rel]
+        return entry is not None and entry[:4] == statcache._stat_key(st)
+
+    def fingerprint(self, rel):
+        """SHA-256 guardado no estado de stat, se ainda vale"""
+        if self.unchanged(rel):
+            digest = self._state[rel][4]
+            if digest:
+                return {"sha256": digest}
+        return {}
+
+    def region_stamps(self, rel):
+        with open(self._file(rel), "rb") as f:
+            return {idx: ts for idx, _, _, ts in anvil.read_header(f)}
+
+    def close(self):
+        pass
+
+
+class WorldDiff:
+    """Resultado de compare: o que mudou de `old` para `new`"""
+
+    def __init__(self, old_name, new_name):
+        self.old = old_name
+        self.new = new_name
+        self.added = []
+        self.removed = []
+        self.changed = []
+        self.unchanged = 0
+        self.bytes_added = 0
+        self.bytes_removed = 0
+        # {região: {"added": [...], "removed": [...], "changed": [...]}}
+        self.regions = {}
+
+    @property
+    def clean(self):
+        """True se nenhum arquivo difere"""
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self):
+        """Contagens de arquivos, bytes e chunks"""
+        chunks = {"added": 0, "removed": 0, "changed": 0}
+        for region in self.regions.values():
+            for kind in chunks:
+                chunks[kind] += len(region[kind])
+        return {
+            "old": self.old,
+            "new": self.new,
+            "files_added": len(self.added),
+            "files_removed": len(self.removed),
+            "files_changed": len(self.changed),
+            "files_unchanged": self.unchanged,
+            "bytes_added": self.bytes_added,
+            "bytes_removed": self.bytes_removed,
+            "regions_changed": len(self.regions),
+            "chunks_added": chunks["added"],
+            "chunks_removed": chunks["removed"],
+            "chunks_changed": chunks["changed"],
+        }
+
+    def to_dict(self):
+        """Resumo mais as listas de arquivos e chunks (para JSON)"""
+        return dict(
+            self.summary(),
+            added=self.added,
+            removed=self.removed,
+            changed=self.changed,
+            regions=self.regions,
+        )
+
+
+def _same_hash(a, b):
+    """True/False pelo primeiro hash em comum; None se não houver"""
+    for kind in KINDS:
+        if kind in a and kind in b:
+            return a[kind] == b[kind]
+    return None
+
+
+def _chunk_diff(old_stamps, new_stamps):
+    return {
+        "added": sorted(set(new_stamps) - set(old_stamps)),
+        "removed": sorted(set(old_stamps) - set(new_stamps)),
+        "changed": sorted(
+            i
+            for i in set(old_stamps) & set(new_stamps)
+            if old_stamps[i] != new_stamps[i]
+        ),
+    }
+
+
+def _compare_one(old, new, rel, old_entry, new_entry):
+    """Retorna (alterado, diferença de chunks ou None) de um arquivo"""
+    _, old_size, old_key = old_entry
+    _, new_size, new_key = new_entry
+    for live, backup in ((old, new), (new, old)):
+        if (
+            isinstance(live, LiveWorld)
+            and live.base == backup_name(backup)
+            and live.unchanged(rel)
+        ):
+            return False, None
+    if old_size != new_size:
+        same = False
+    else:
+        same = _same_hash(old.fingerprint(old_key), new.fingerprint(new_key))
+    chunks = None
+    if same is not True and anvil.is_region_file(rel):
+        try:
+            chunks = _chunk_diff(
+                old.region_stamps(old_key), new.region_stamps(new_key)
+            )
+        except (anvil.RegionError, restore.RestoreError):
+            # região inválida: vale a comparação do arquivo inteiro
+            chunks = None
+        if chunks is not None and any(chunks.values()):
+            return True, chunks
+        live = isinstance(old, LiveWorld) or isinstance(new, LiveWorld)
+        if same is None and chunks is not None and not live:
+            # dois backups sem hash em comum: valem os timestamps
+            same = True
+    if same is None:
+        same = _same_content(old, new, old_key, new_key)
+    return not same, chunks
+
+
+def _same_content(old, new, old_key, new_key):
+    """Último recurso, sem hash em comum: compara o conteúdo"""
+    if isinstance(new, LiveWorld):
+        return old.matches(old_key, new._file(new_key))
+    if isinstance(old, LiveWorld):
+        return new.matches(new_key, old._file(old_key))
+    # backups antigos (sem SHA-256) de formatos diferentes
+    return old.read_bytes(old_key) == new.read_bytes(new_key)
+
+
+def backup_name(source):
+    """Nome do backup (ou da pasta do mundo) da fonte"""
+    return os.path.basename(os.path.normpath(source.path))
+
+
+def compare(old, new, workers=None):
+    """Compara duas fontes (ver restore.open_source e LiveWorld).
+
+    Os arquivos presentes dos dois lados são comparados em paralelo, em
+    `workers` threads. Retorna WorldDiff.
+    """
+    result = WorldDiff(backup_name(old), backup_name(new))
+    old_entries = {e[0]: e for e in old.entries}
+    new_entries = {e[0]: e for e in new.entries}
+    for rel in sorted(set(new_entries) - set(old_entries)):
+        result.added.append(rel)
+        result.bytes_added += new_entries[rel][1]
+    for rel in sorted(set(old_entries) - set(new_entries)):
+        result.removed.append(rel)
+        result.bytes_removed += old_entries[rel][1]
+    common = sorted(set(old_entries) & set(new_entries))
+
+    def one(rel):
+        return _compare_one(old, new, rel, old_entries[rel], new_entries[rel])
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for rel, (changed, chunks) in zip(common, pool.map(one, common)):
+            if not changed:
+                result.unchanged += 1
+                continue
+            result.changed.append(rel)
+            if chunks is not None and any(chunks.values()):
+                result.regions[rel] = chunks
+    return result
@@ -0,0 +1,435 @@
+"""
+Módulo backup/fleet.py:
+- Modo frota: backup de vários servidores na mesma máquina, cada um com
+  sua pasta de mundos, edição e destino, descritos em um arquivo TOML ou
+  JSON (ver load_config).
+- FleetScheduler roda os backups em paralelo com três limites: total de
+  backups simultâneos, backups simultâneos por disco (origem e destino,
+  identificados pelo st_dev) e um orçamento global de leitura em bytes/s.
+- Ordem justa: os servidores se revezam e, dentro de cada um, mundos
+  menores vão primeiro. Um backup que espera um disco ocupado não segura
+  os que usam outros discos.
+- TokenBucket reserva o orçamento em pedaços de até `burst` bytes, na
+  ordem de chegada: um mundo grande entra na fila a cada pedaço e não
+  monopoliza a banda enquanto mundos pequenos esperam.
+- `retention` (global ou por servidor) aplica a política de retenção
+  (ver retention.py) aos mundos copiados, com uma coleta de lixo por
+  destino no final.
+"""
+
+import fnmatch
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from backup import core, retention, store, tarzst
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PER_DISK = 1
+EDITIONS = ("java", "bedrock")
+MODES = ("zip", "incremental", "tarzst", "hardlink")
+
+
+class FleetError(ValueError):
+    """Configuração de frota inválida"""
+
+
+class TokenBucket:
+    """Orçamento de bytes por segundo compartilhado entre threads"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=None):
+        if rate <= 0:
+            raise ValueError("rate deve ser positivo")
+        self.rate = float(rate)
+        # padrão: um segundo de leitura
+        self.burst = float(burst or rate)
+        self._clock = clock
+        self._sleep = sleep or time.sleep
+        self._tokens = self.burst
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes):
+        """Espera até que `nbytes` caibam no orçamento"""
+        while nbytes > 0:
+            part = min(nbytes, self.burst)
+            self._sleep_for(self._reserve(part))
+            nbytes -= part
+
+    def _reserve(self, nbytes):
+        """Desconta os bytes (o saldo pode ficar negativo); retorna a espera"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+            self._tokens -= nbytes
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _sleep_for(self, seconds):
+        if seconds > 0:
+            self._sleep(seconds)
+
+
+class Server:
+    """Um servidor da frota: pasta de mundos, edição e destino"""
+
+    def __init__(
+        self,
+        name,
+        worlds_path,
+        edition,
+        destination,
+        worlds=None,
+        mode="zip",
+        profile=None,
+        snapshot=False,
+        retention=None,
+    ):
+        self.name = name
+        self.worlds_path = worlds_path
+        self.edition = edition
+        self.destination = destination
+        self.worlds = worlds or []
+        self.mode = mode
+        self.profile = profile
+        self.snapshot = snapshot
+        self.retention = retention
+        self.manager = core.BackupManager(destination)
+
+
+class Fleet:
+    """Servidores e limites lidos da configuração"""
+
+    def __init__(
+        self,
+        servers,
+        concurrency=DEFAULT_CONCURRENCY,
+        per_disk=DEFAULT_PER_DISK,
+        disk_limits=None,
+        read_bps=None,
+    ):
+        self.servers = servers
+        self.concurrency = concurrency
+        self.per_disk = per_disk
+        # {pasta: limite}; vale para o disco em que a pasta está
+        self.disk_limits = disk_limits or {}
+        self.read_bps = read_bps
+
+
+class Job:
+    """Backup de um mundo de um servidor"""
+
+    def __init__(self, server, world, size, disks):
+        self.server = server
+        self.world = world
+        self.size = size
+        self.disks = disks
+
+
+def _read_toml(path):
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise FleetError(
+                "Configuração TOML exige Python 3.11+ ou o pacote tomli"
+            )
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def load_config(path):
+    """Lê a configuração (.toml ou .json) e retorna um Fleet.
+
+    Caminhos relativos são resolvidos a partir da pasta do arquivo.
+    """
+    if path.lower().endswith(".toml"):
+        data = _read_toml(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    return parse_config(data, os.path.dirname(os.path.abspath(path)))
+
+
+def parse_config(data, base="."):
+    """Valida o dicionário de configuração e retorna um Fleet"""
+
+    def resolve(p):
+        return os.path.normpath(os.path.join(base, os.path.expanduser(p)))
+
+    def number(key, default, kind=int, owner=data):
+        value = owner.get(key, default)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise FleetError(f"{key} deve ser um número")
+        if value < (0 if kind is float else 1):
+            raise FleetError(f"{key} inválido: {value}")
+        return kind(value)
+
+    backup_root = resolve(data.get("backup_dir", core.BACKUP_DIR))
+    servers = []
+    destinations = set()
+    for i, item in enumerate(data.get("servers") or []):
+        name = item.get("name") or f"server{i + 1}"
+        if "worlds_path" not in item:
+            raise FleetError(f"{name}: worlds_path é obrigatório")
+        edition = item.get("edition", "java")
+        if edition not in EDITIONS:
+            raise FleetError(f"{name}: edição inválida: {edition}")
+        mode = item.get("mode", data.get("mode", "zip"))
+        if mode not in MODES:
+            raise FleetError(f"{name}: modo inválido: {mode}")
+        if mode == "tarzst":
+            try:
+                tarzst.check_available()
+            except RuntimeError as e:
+                raise FleetError(f"{name}: {e}")
+        worlds = item.get("worlds", [])
+        if isinstance(worlds, str):
+            worlds = [worlds]
+        destination = resolve(
+            item.get("destination", os.path.join(backup_root, name))
+        )
+        # o estado de cada mundo (.state/<mundo>.json) é por destino
+        if destination in destinations:
+            raise FleetError(f"{name}: destino repetido: {destination}")
+        destinations.add(destination)
+        policy = item.get("retention", data.get("retention"))
+        if policy is not None:
+            try:
+                policy = retention.Policy.from_dict(policy)
+            except (TypeError, ValueError) as e:
+                raise FleetError(f"{name}: retenção inválida: {e}")
+        servers.append(
+            Server(
+                name,
+                resolve(item["worlds_path"]),
+                edition,
+                destination,
+                worlds=worlds,
+                mode=mode,
+                profile=item.get("profile", data.get("profile")),
+                snapshot=bool(item.get("snapshot", data.get("snapshot"))),
+                retention=policy,
+            )
+        )
+    if not servers:
+        raise FleetError("Nenhum servidor configurado")
+    read_mb = number("read_mb_per_s", None, float)
+    return Fleet(
+        servers,
+        concurrency=number("concurrency", DEFAULT_CONCURRENCY),
+        per_disk=number("per_disk", DEFAULT_PER_DISK),
+        disk_limits={
+            resolve(p): number(p, None, owner=data["disks"])
+            for p in data.get("disks", {})
+        },
+        read_bps=read_mb * 1024 * 1024 if read_mb else None,
+    )
+
+
+def disk_id(path):
+    """Identifica o disco (st_dev) da pasta, subindo até uma existente"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+
+def plan(fleet):
+    """Lista de Jobs em ordem justa (servidores alternados, menores antes)"""
+    queues = []
+    for server in fleet.servers:
+        disks = frozenset(
+            (disk_id(server.worlds_path), disk_id(server.destination))
+        )
+        jobs = [
+            Job(server, w["folder"], w["size"] or 0, disks)
+            for w in server.manager.world_details(server.worlds_path)
+            if _wanted(w, server.worlds)
+        ]
+        jobs.sort(key=lambda j: (j.size, j.world))
+        queues.append(jobs)
+    return [
+        job
+        for round_ in itertools.zip_longest(*queues)
+        for job in round_
+        if job is not None
+    ]
+
+
+def _wanted(world, patterns):
+    if not patterns:
+        return True
+    return any(
+        fnmatch.fnmatch(name, p)
+        for name in (world["folder"], world["name"])
+        for p in patterns
+    )
+
+
+class FleetScheduler:
+    """Executa os Jobs respeitando os limites globais e por disco"""
+
+    def __init__(
+        self,
+        concurrency=DEFAULT_CONCURRENCY,
+        per_disk=DEFAULT_PER_DISK,
+        disk_limits=None,
+        read_bps=None,
+    ):
+        self.concurrency = concurrency
+        self.per_disk = per_disk
+        self.disk_limits = {
+            disk_id(p): n for p, n in (disk_limits or {}).items()
+        }
+        self.bucket = TokenBucket(read_bps) if read_bps else None
+        # threads de compressão de cada backup: divide os núcleos
+        self.workers = max(1, (os.cpu_count() or 1) // concurrency)
+
+    @classmethod
+    def from_fleet(cls, fleet):
+        return cls(
+            fleet.concurrency,
+            fleet.per_disk,
+            fleet.disk_limits,
+            fleet.read_bps,
+        )
+
+    def _limit(self, disk):
+        return self.disk_limits.get(disk, self.per_disk)
+
+    def run(self, jobs, cancel=None):
+        """Roda os Jobs e retorna os registros de métricas (com `server`)"""
+        jobs = list(jobs)
+        pending = list(jobs)
+        cancel = cancel or threading.Event()
+        busy = Counter()
+        cond = threading.Condition()
+        records = []
+        hooks = {}
+        for job in pending:
+            server = job.server
+            if server.name not in hooks:
+                hooks[server.name] = (
+                    server.manager,
+                    lambda r, name=server.name: records.append(
+                        dict(r, server=name)
+                    ),
+                )
+        for manager, hook in hooks.values():
+            manager.metrics_hooks.append(hook)
+
+        def take():
+            with cond:
+                while pending:
+                    for i, job in enumerate(pending):
+                        if all(busy[d] < self._limit(d) for d in job.disks):
+                            del pending[i]
+                            busy.update(job.disks)
+                            return job
+                    cond.wait()
+                return None
+
+        def release(job):
+            with cond:
+                busy.subtract(job.disks)
+                cond.notify_all()
+
+        def worker():
+            while True:
+                job = take()
+                if job is None:
+                    return
+                try:
+                    self._backup(job, cancel)
+                finally:
+                    release(job)
+
+        threads = [
+            threading.Thread(target=worker, name=f"fleet-{n}", daemon=True)
+            for n in range(min(self.concurrency, len(pending)))
+        ]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        except KeyboardInterrupt:
+            # backups em andamento param sem deixar arquivo parcial
+            cancel.set()
+            with cond:
+                pending.clear()
+            for t in threads:
+                t.join()
+            raise
+        finally:
+            for manager, hook in hooks.values():
+                manager.metrics_hooks.remove(hook)
+        order = {(j.server.name, j.world): i for i, j in enumerate(jobs)}
+        records.sort(key=lambda r: order.get((r["server"], r["world"]), 0))
+        return records
+
+    def _backup(self, job, cancel):
+        server = job.server
+        server.manager.make_backup(
+            server.worlds_path,
+            job.world,
+            server.edition,
+            mode=server.mode,
+            workers=self.workers,
+            profile=server.profile,
+            cancel=cancel,
+            snapshot=server.snapshot,
+            throttle=self.bucket,
+        )
+
+
+def apply_retention(fleet, records, dry_run=False):
+    """Aplica a retenção aos mundos dos registros.
+
+    Retorna (servidor, mundo, backup) dos removidos. Mundos cujo backup
+    falhou ficam de fora; cada destino passa por uma única coleta de
+    lixo, depois de todos os seus mundos.
+    """
+    removed = []
+    for server in fleet.servers:
+        if server.retention is None:
+            continue
+        worlds = sorted(
+            {
+                r["world"]
+                for r in records
+                if r["server"] == server.name
+                and r["status"] in ("ok", "skipped")
+            }
+        )
+        names = []
+        for world in worlds:
+            pruned = server.manager.prune_backups(
+                server.edition,
+                world=world,
+                dry_run=dry_run,
+                policy=server.retention,
+                gc=False,
+            )
+            names.extend(pruned)
+            removed.extend((server, world, name) for name in pruned)
+        if any(store.is_manifest(n) for n in names):
+            server.manager.collect_garbage(
+                server.edition, exclude=names, dry_run=dry_run
+            )
+    return removed
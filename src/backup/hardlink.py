@@ -0,0 +1,206 @@
+"""
+Módulo backup/hardlink.py:
+- Backup em pasta comum (<mundo>_<data>.snap/), no estilo do
+  `rsync --link-dest`: arquivos iguais aos do snapshot anterior do mesmo
+  mundo viram hardlinks dele e só os alterados são copiados. Cada
+  snapshot parece completo, mas ocupa só o que mudou.
+- Um arquivo é reaproveitado com mesmo tamanho e mtime_ns do anterior
+  (a cópia preserva o mtime); com o estado de stat do mesmo snapshot
+  (ver statcache.py), vale a lista exata de alterados. Tabelas LevelDB
+  imutáveis só precisam de mesmo nome e tamanho.
+- metadata.json fica na raiz do snapshot, com o SHA-256 de cada arquivo
+  (calculado durante a cópia ou herdado do anterior) e quantos bytes
+  foram copiados de fato. O snapshot é montado em .partial e só aparece
+  com o nome final depois de completo.
+- Os arquivos de um snapshot são compartilhados com os seguintes: nunca
+  devem ser alterados. A restauração (ver restore.SnapshotSource) clona
+  ou copia os arquivos, nunca cria hardlinks para dentro do mundo.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import leveldb, snapshot, store
+from backup.metrics import Metrics
+
+SUFFIX = ".snap"
+PARTIAL_SUFFIX = ".partial"
+METADATA_FILE = "metadata.json"
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_snapshot(fname):
+    """Indica se o nome corresponde a um snapshot de hardlinks"""
+    return fname.lower().endswith(SUFFIX)
+
+
+def load_metadata(path):
+    """Lê o metadata.json do snapshot"""
+    with open(os.path.join(path, METADATA_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latest_snapshot(backup_dir, world_name):
+    """Retorna (caminho, metadata) do snapshot mais recente do mundo"""
+    prefix = world_name + "_"
+    try:
+        names = sorted(
+            (
+                n
+                for n in os.listdir(backup_dir)
+                if n.startswith(prefix) and is_snapshot(n)
+            ),
+            key=store.backup_sort_key,
+            reverse=True,
+        )
+    except FileNotFoundError:
+        return None, None
+    for name in names:
+        path = os.path.join(backup_dir, name)
+        try:
+            meta = load_metadata(path)
+        except (OSError, ValueError):
+            continue
+        if meta.get("world") == world_name:
+            return path, meta
+    return None, None
+
+
+def _copy(src, dst):
+    """Copia preservando o mtime; retorna (SHA-256, bytes copiados)"""
+    sha = hashlib.sha256()
+    size = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for block in iter(lambda: fin.read(CHUNK_SIZE), b""):
+            sha.update(block)
+            fout.write(block)
+            size += len(block)
+        fout.flush()
+        os.fsync(fout.fileno())
+    shutil.copystat(src, dst)
+    return sha.hexdigest(), size
+
+
+def _link(prev, dst):
+    """Hardlink para o arquivo anterior; False se não for possível"""
+    try:
+        os.link(prev, dst)
+        return True
+    except OSError as e:
+        # EMLINK: limite de links do inode; os demais: sem suporte
+        if e.errno in (errno.EMLINK, errno.EXDEV, errno.EPERM, errno.ENOTSUP):
+            return False
+        raise
+
+
+def _unchanged(rel, st, prev, changes):
+    """Indica se o arquivo pode reaproveitar o do snapshot anterior"""
+    try:
+        prev_st = os.stat(prev)
+    except FileNotFoundError:
+        return False
+    if prev_st.st_size != st.st_size:
+        return False
+    if leveldb.is_immutable_table(rel):
+        return True
+    if changes is not None:
+        return changes.unchanged(rel, st)
+    return prev_st.st_mtime_ns == st.st_mtime_ns
+
+
+def write_snapshot(
+    dst,
+    src,
+    world_name,
+    meta,
+    previous=None,
+    changes=None,
+    workers=None,
+    progress=None,
+):
+    """Monta o snapshot do mundo src em dst e retorna os contadores.
+
+    `previous` é (caminho, metadata) do snapshot anterior do mundo;
+    `changes` (statcache.Changes), se presente, diz exatamente quais
+    arquivos mudaram desde ele. As cópias rodam em `workers` threads.
+    """
+    metrics = progress.metrics if progress is not None else Metrics()
+    prev_dir, prev_meta = previous or (None, None)
+    prev_hashes = (prev_meta or {}).get("sha256") or {}
+    tmp = dst + PARTIAL_SUFFIX
+    shutil.rmtree(tmp, ignore_errors=True)
+    root = os.path.join(tmp, world_name)
+
+    def one(item):
+        abs_file, rel = item
+        if progress is not None:
+            progress.check()
+        table = leveldb.is_immutable_table(rel)
+        target = os.path.join(root, *rel.split("/"))
+        try:
+            st = os.stat(abs_file)
+            digest = prev_hashes.get(rel)
+            if prev_dir and digest:
+                prev = os.path.join(prev_dir, world_name, *rel.split("/"))
+                if _unchanged(rel, st, prev, changes) and _link(prev, target):
+                    metrics.count("files")
+                    if progress is not None:
+                        progress.advance(st.st_size, read=False)
+                    return rel, digest, 0, True
+            with metrics.phase("copy"):
+                digest, size = _copy(abs_file, target)
+        except FileNotFoundError:
+            if table:
+                # tabela removida por compactação durante a cópia
+                return None
+            raise
+        metrics.count("files")
+        metrics.count("files_read")
+        if progress is not None:
+            progress.advance(size)
+        return rel, digest, size, False
+
+    try:
+        with metrics.phase("walk"):
+            found = store.walk_files(src)
+            for _, rel in found:
+                parent = os.path.dirname(os.path.join(root, *rel.split("/")))
+                os.makedirs(parent, exist_ok=True)
+        workers = max(1, workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = [r for r in pool.map(one, found) if r]
+        copied = sum(r[2] for r in results)
+        info = dict(
+            meta,
+            sha256={r[0]: r[1] for r in results},
+            bytes_copied=copied,
+        )
+        with metrics.phase("write"):
+            path = os.path.join(tmp, METADATA_FILE)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.rename(tmp, dst)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    metrics.count("bytes_in", copied)
+    metrics.count("bytes_out", copied)
+    return {
+        "files": len(results),
+        "linked": sum(1 for r in results if r[3]),
+        "bytes_copied": copied,
+    }
+
+
+def clone_file(src, dst):
+    """Reflink quando o sistema de arquivos permite; senão, cópia"""
+    try:
+        snapshot.reflink(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
@@ -0,0 +1,72 @@
+"""
+Módulo backup/leveldb.py:
+- Regras para a pasta db/ (LevelDB) dos mundos Bedrock.
+- Tabelas .ldb/.sst são imutáveis: mesmo nome e tamanho implicam mesmo
+  conteúdo, então podem ser reaproveitadas sem leitura.
+- Apenas CURRENT, MANIFEST-* e *.log mudam; eles são lidos primeiro no
+  backup e CURRENT é gravado por último na restauração.
+"""
+
+import os
+
+DB_DIR = "db"
+TABLE_SUFFIXES = (".ldb", ".sst")
+
+
+def _db_name(rel_path):
+    """Nome do arquivo se rel_path estiver diretamente em db/, senão None"""
+    parts = rel_path.split("/")
+    if len(parts) == 2 and parts[0] == DB_DIR:
+        return parts[1]
+    return None
+
+
+def is_immutable_table(rel_path):
+    """Indica se o caminho é uma tabela LevelDB imutável"""
+    name = _db_name(rel_path)
+    return bool(name) and name.lower().endswith(TABLE_SUFFIXES)
+
+
+def read_priority(rel_path):
+    """Ordem de leitura no backup: arquivos mutáveis antes das tabelas.
+
+    CURRENT, MANIFEST e logs são capturados primeiro; uma tabela removida
+    por compactação depois disso ainda pode ser ignorada com segurança.
+    """
+    name = _db_name(rel_path)
+    if name is None:
+        return 0, rel_path
+    if name == "CURRENT":
+        return 1, rel_path
+    if name.startswith("MANIFEST-"):
+        return 2, rel_path
+    if not is_immutable_table(rel_path):
+        return 3, rel_path
+    return 4, rel_path
+
+
+def write_priority(rel_path):
+    """Ordem de escrita na restauração: CURRENT por último"""
+    return _db_name(rel_path) == "CURRENT", rel_path
+
+
+def prune_stale(world_dir, keep_paths):
+    """Remove de db/ arquivos que não pertencem ao backup restaurado.
+
+    Logs e tabelas mais novos que sobrassem seriam reaplicados pelo LevelDB
+    ao abrir o mundo, misturando estados diferentes.
+    """
+    db_dir = os.path.join(world_dir, DB_DIR)
+    removed = []
+    try:
+        names = os.listdir(db_dir)
+    except FileNotFoundError:
+        return removed
+    for name in names:
+        rel = f"{DB_DIR}/{name}"
+        path = os.path.join(db_dir, name)
+        if rel in keep_paths or not os.path.isfile(path):
+            continue
+        os.remove(path)
+        removed.append(rel)
+    return removed
@@ -0,0 +1,220 @@
+"""
+Módulo backup/metrics.py:
+- Define Metrics, tempo por fase (walk, read, compress, write, fsync...)
+  e contadores (arquivos, bytes lidos e gravados) de um backup ou
+  restauração. Cada Progress carrega um Metrics, compartilhado pelas
+  threads da operação.
+- O tempo de uma fase é a soma das threads: fases paralelas (read,
+  compress) podem passar do tempo total (wall) da operação.
+- Ao fim da operação, BackupManager passa o registro (record) aos hooks
+  de metrics_hooks. JsonLinesSink grava uma linha JSON por operação e
+  PrometheusTextfile mantém um arquivo .prom para o textfile collector do
+  node_exporter.
+"""
+
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+# status de sucesso: skipped (mundo sem alterações) e cached (verificação
+# recente) não refazem o trabalho, mas não são falhas
+SUCCESS_STATUSES = ("ok", "skipped", "cached")
+
+
+class Metrics:
+    """Cronômetro por fase e contadores de uma operação"""
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Soma o tempo do bloco à fase `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            total, calls = self.phases.get(name, (0.0, 0))
+            self.phases[name] = (total + seconds, calls + 1)
+
+    def count(self, name, n=1):
+        """Soma n ao contador `name`"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, operation, **fields):
+        """Registro final da operação (dict serializável em JSON)"""
+        with self._lock:
+            phases = {
+                name: {"seconds": total, "calls": calls}
+                for name, (total, calls) in self.phases.items()
+            }
+            counters = dict(self.counters)
+        bytes_in = counters.get("bytes_in", 0)
+        bytes_out = counters.get("bytes_out", 0)
+        record = {
+            "operation": operation,
+            "started": self.started,
+            "wall_seconds": time.perf_counter() - self._start,
+            "phases": phases,
+            "counters": counters,
+            "ratio": bytes_out / bytes_in if bytes_in else None,
+        }
+        record.update(fields)
+        return record
+
+
+class JsonLinesSink:
+    """Hook que acrescenta cada registro como uma linha JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _label(value):
+    text = "" if value is None else str(value)
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    inner = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+class PrometheusTextfile:
+    """Hook que mantém um .prom com a última operação de cada mundo.
+
+    O arquivo é reescrito por inteiro (temporário + rename, como pede o
+    textfile collector). Os últimos registros ficam em <arquivo>.json para
+    que o histórico sobreviva a reinícios do processo.
+    """
+
+    PREFIX = "mvp_backup"
+
+    def __init__(self, path):
+        self.path = path
+        self.state_path = re.sub(r"\.prom$", "", path) + ".json"
+        self._lock = threading.Lock()
+        self._last = None
+
+    def _load(self):
+        if self._last is not None:
+            return
+        self._last = {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self._last = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def __call__(self, record):
+        key = "|".join(
+            str(record.get(k)) for k in ("operation", "edition", "world")
+        )
+        with self._lock:
+            self._load()
+            previous = self._last.get(key, {})
+            entry = {
+                "operation": record.get("operation"),
+                "edition": record.get("edition"),
+                "world": record.get("world"),
+                "status": record.get("status"),
+                "last_run": record["started"],
+                "last_success": previous.get("last_success"),
+                "wall_seconds": record["wall_seconds"],
+                "phases": {
+                    k: v["seconds"] for k, v in record["phases"].items()
+                },
+                "counters": record["counters"],
+                "ratio": record["ratio"],
+            }
+            if record.get("status") in SUCCESS_STATUSES:
+                entry["last_success"] = record["started"]
+            self._last[key] = entry
+            _atomic_write(
+                self.state_path, json.dumps(self._last, ensure_ascii=False)
+            )
+            _atomic_write(self.path, self.render())
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus"""
+        p = self.PREFIX
+        series = {
+            "last_run_timestamp_seconds": (
+                "gauge",
+                "Início da última operação (epoch)",
+            ),
+            "last_success_timestamp_seconds": (
+                "gauge",
+                "Início da última operação bem-sucedida (epoch)",
+            ),
+            "last_status": ("gauge", "1 se a última operação deu certo"),
+            "duration_seconds": ("gauge", "Duração da última operação"),
+            "phase_seconds": ("gauge", "Tempo por fase (soma das threads)"),
+            "files": ("gauge", "Arquivos processados"),
+            "bytes_in": ("gauge", "Bytes lidos"),
+            "bytes_out": ("gauge", "Bytes gravados"),
+            "compression_ratio": ("gauge", "bytes_out / bytes_in"),
+        }
+        samples = {name: [] for name in series}
+        for key in sorted(self._last):
+            e = self._last[key]
+            base = {
+                "operation": e["operation"],
+                "edition": e["edition"],
+                "world": e["world"],
+            }
+            lbl = _labels(**base)
+            samples["last_run_timestamp_seconds"].append((lbl, e["last_run"]))
+            if e.get("last_success") is not None:
+                samples["last_success_timestamp_seconds"].append(
+                    (lbl, e["last_success"])
+                )
+            ok = 1 if e["status"] in SUCCESS_STATUSES else 0
+            samples["last_status"].append((lbl, ok))
+            samples["duration_seconds"].append((lbl, e["wall_seconds"]))
+            for phase in sorted(e["phases"]):
+                samples["phase_seconds"].append(
+                    (_labels(phase=phase, **base), e["phases"][phase])
+                )
+            for name in ("files", "bytes_in", "bytes_out"):
+                if name in e["counters"]:
+                    samples[name].append((lbl, e["counters"][name]))
+            if e.get("ratio") is not None:
+                samples["compression_ratio"].append((lbl, e["ratio"]))
+        lines = []
+        for name, (kind, help_text) in series.items():
+            if not samples[name]:
+                continue
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for lbl, value in samples[name]:
+                lines.append(f"{p}_{name}{lbl} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
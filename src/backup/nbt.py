@@ -0,0 +1,134 @@
+"""
+Módulo backup/nbt.py:
+- Leitor de NBT (Named Binary Tag), o formato do level.dat.
+- Java: level.dat comprimido com gzip, NBT big-endian.
+- Bedrock: cabeçalho de 8 bytes (versão e tamanho, little-endian) seguido
+  de NBT little-endian sem compressão.
+- Compounds viram dict, listas viram list, arrays de bytes viram bytes e
+  arrays de int/long viram list.
+"""
+
+import gzip
+import struct
+import zlib
+
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+
+# tipos numéricos simples: tag -> formato struct
+_SCALARS = {
+    TAG_BYTE: "b",
+    TAG_SHORT: "h",
+    TAG_INT: "i",
+    TAG_LONG: "q",
+    TAG_FLOAT: "f",
+    TAG_DOUBLE: "d",
+}
+_ARRAYS = {TAG_INT_ARRAY: "i", TAG_LONG_ARRAY: "q"}
+# NBT do Minecraft limita o aninhamento a 512 níveis
+MAX_DEPTH = 512
+
+
+class NBTError(ValueError):
+    """Dados NBT truncados ou inválidos"""
+
+
+class _Reader:
+    def __init__(self, data, little):
+        self.data = data
+        self.pos = 0
+        self.order = "<" if little else ">"
+        self._structs = {
+            fmt: struct.Struct(self.order + fmt) for fmt in "bhiqfdH"
+        }
+
+    def _unpack(self, fmt):
+        st = self._structs[fmt]
+        value = st.unpack_from(self.data, self.pos)[0]
+        self.pos += st.size
+        return value
+
+    def _take(self, n):
+        if n < 0 or self.pos + n > len(self.data):
+            raise NBTError("NBT truncado")
+        chunk = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return chunk
+
+    def string(self):
+        # Java usa "modified UTF-8"; caracteres fora do padrão são trocados
+        return self._take(self._unpack("H")).decode("utf-8", "replace")
+
+    def payload(self, tag, depth=0):
+        if depth > MAX_DEPTH:
+            raise NBTError("NBT aninhado demais")
+        fmt = _SCALARS.get(tag)
+        if fmt:
+            return self._unpack(fmt)
+        if tag == TAG_STRING:
+            return self.string()
+        if tag == TAG_BYTE_ARRAY:
+            return bytes(self._take(self._unpack("i")))
+        if tag in _ARRAYS:
+            n = self._unpack("i")
+            fmt = _ARRAYS[tag]
+            raw = self._take(n * struct.calcsize(fmt))
+            return list(struct.unpack(f"{self.order}{n}{fmt}", raw))
+        if tag == TAG_LIST:
+            item = self._unpack("b")
+            n = self._unpack("i")
+            if n > 0 and item == TAG_END:
+                raise NBTError("Lista NBT sem tipo")
+            return [self.payload(item, depth + 1) for _ in range(max(n, 0))]
+        if tag == TAG_COMPOUND:
+            value = {}
+            while True:
+                child = self._unpack("b")
+                if child == TAG_END:
+                    return value
+                name = self.string()
+                value[name] = self.payload(child, depth + 1)
+        raise NBTError(f"Tag NBT desconhecida: {tag}")
+
+
+def loads(data, little=False):
+    """Lê NBT sem compressão e retorna (nome da raiz, valor)"""
+    reader = _Reader(data, little)
+    try:
+        tag = reader._unpack("b")
+        if tag != TAG_COMPOUND:
+            raise NBTError(f"Raiz NBT não é compound: {tag}")
+        name = reader.string()
+        return name, reader.payload(tag)
+    except struct.error as e:
+        raise NBTError(f"NBT truncado: {e}") from None
+
+
+def read_level_dat(path):
+    """Lê um level.dat e retorna (edição, compound raiz).
+
+    A edição é deduzida do formato: gzip (Java) ou cabeçalho Bedrock.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        try:
+            raw = gzip.decompress(data)
+        except (OSError, EOFError, zlib.error) as e:
+            raise NBTError(f"level.dat corrompido: {e}") from None
+        return "java", loads(raw)[1]
+    if len(data) >= 8 and int.from_bytes(data[4:8], "little") == len(data) - 8:
+        return "bedrock", loads(data[8:], little=True)[1]
+    # NBT Java sem compressão (gravado por algumas ferramentas)
+    return "java", loads(data)[1]
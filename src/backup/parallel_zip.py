@@ -0,0 +1,459 @@
+"""
+Módulo backup/parallel_zip.py:
+- Define ParallelZipWriter, que comprime entradas em um pool de threads
+  (zlib libera o GIL) e grava o ZIP em ordem, de forma sequencial.
+- Com um perfil (ver codec.py), cada arquivo recebe seu próprio método:
+  stored, deflate ou LZMA.
+- O arquivo gerado é um ZIP padrão (com extensões ZIP64 quando preciso),
+  legível por zipfile e, portanto, por list_backups e restore_backup.
+- A saída só é escrita para frente (sem seek), o que permite gravar em
+  streams não posicionáveis.
+- Com `progress`, os tempos de leitura, compressão e gravação e os bytes
+  de entrada/saída vão para progress.metrics (ver metrics.py).
+- O SHA-256 de cada entrada é calculado junto com o CRC, nas threads do
+  pool; digests() os entrega para o manifesto de hashes do metadata.json.
+- Com `checkpoint`, o writer o chama a cada `checkpoint_bytes` gravados;
+  records() e resume() permitem continuar um ZIP interrompido a partir
+  das entradas já gravadas (ver checkpoint.py).
+"""
+
+import collections
+import hashlib
+import itertools
+import os
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import codec
+from backup.metrics import Metrics
+
+CHUNK_SIZE = 1024 * 1024
+# Entradas comprimidas acima disso vão para disco temporário
+SPOOL_LIMIT = 32 * 1024 * 1024
+# Valores a partir deste limite exigem campos ZIP64
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_END_RECORD64 = struct.Struct("<IQHHIIQQQQ")
+_END_LOCATOR64 = struct.Struct("<IIQI")
+
+_CREATE_SYSTEM = 0 if os.name == "nt" else 3
+_FLAG_UTF8 = 0x800
+# LZMA no ZIP grava marcador de fim de stream (bit 1), como o zipfile
+_FLAG_LZMA_EOS = 0x02
+
+# versão mínima do leitor exigida por método
+_VERSION_NEEDED = {
+    zipfile.ZIP_STORED: 10,
+    zipfile.ZIP_DEFLATED: 20,
+    zipfile.ZIP_BZIP2: 46,
+    zipfile.ZIP_LZMA: 63,
+}
+
+
+def default_workers():
+    """Número padrão de workers: núcleos disponíveis"""
+    return os.cpu_count() or 1
+
+
+def _flags(entry):
+    flags = _FLAG_UTF8 if not entry.arcname.isascii() else 0
+    if entry.method == zipfile.ZIP_LZMA:
+        flags |= _FLAG_LZMA_EOS
+    return flags
+
+
+def _version(entry, zip64):
+    return max(_VERSION_NEEDED[entry.method], 45 if zip64 else 0)
+
+
+def _dos_time(mtime):
+    """Converte mtime para (data, hora) no formato DOS do ZIP"""
+    t = time.localtime(mtime)
+    year = max(t.tm_year, 1980)
+    if year > 2107:
+        year = 2107
+    date = (year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    dtime = t.tm_hour << 11 | t.tm_min << 5 | (t.tm_sec // 2)
+    return date, dtime
+
+
+class _Entry:
+    """Resultado da compressão de uma entrada, pronto para gravação"""
+
+    def __init__(self, arcname, mtime, mode):
+        self.arcname = arcname
+        self.mtime = mtime
+        self.mode = mode
+        self.method = zipfile.ZIP_DEFLATED
+        self.crc = 0
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.csize = 0
+        self.data = None
+        self.offset = 0
+        # [tamanho, mtime_ns] do arquivo de origem; None para bytes
+        self.stamp = None
+        self.digest = None
+
+
+# campos das entradas guardados pelos pontos de retomada
+_RECORD_FIELDS = (
+    "arcname",
+    "mtime",
+    "mode",
+    "method",
+    "crc",
+    "size",
+    "csize",
+    "offset",
+    "stamp",
+    "digest",
+)
+
+
+def _record(entry):
+    return {field: getattr(entry, field) for field in _RECORD_FIELDS}
+
+
+def _from_record(record):
+    entry = _Entry(record["arcname"], record["mtime"], record["mode"])
+    for field in _RECORD_FIELDS:
+        setattr(entry, field, record[field])
+    return entry
+
+
+def _compress_stream(entry, first, rest, method, level, metrics):
+    """Comprime o primeiro bloco e os demais (iterável) para a entrada"""
+    entry.method = method
+    comp = codec.compressor(method, level)
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+    try:
+        for block in itertools.chain([first], rest):
+            if not block:
+                continue
+            with metrics.phase("compress"):
+                entry.size += len(block)
+                entry.crc = zlib.crc32(block, entry.crc)
+                entry.sha256.update(block)
+                out.write(comp.compress(block) if comp else block)
+        if comp:
+            with metrics.phase("compress"):
+                out.write(comp.flush())
+    except BaseException:
+        out.close()
+        raise
+    entry.csize = out.tell()
+    out.seek(0)
+    entry.data = out
+    return entry
+
+
+def _read_blocks(src, metrics):
+    while True:
+        with metrics.phase("read"):
+            block = src.read(CHUNK_SIZE)
+        if not block:
+            return
+        yield block
+
+
+def _compress_file(path, arcname, level, profile, metrics):
+    """Lê e comprime um arquivo; executado nas threads do pool.
+
+    Com perfil, o codec é escolhido a partir do primeiro bloco lido.
+    """
+    with metrics.phase("read"):
+        st = os.stat(path)
+        src = open(path, "rb")
+    entry = _Entry(arcname, st.st_mtime, st.st_mode)
+    entry.stamp = [st.st_size, st.st_mtime_ns]
+    with src:
+        with metrics.phase("read"):
+            first = src.read(CHUNK_SIZE)
+        if profile:
+            method, level = codec.choose(codec.sample(first, arcname), profile)
+        else:
+            method = zipfile.ZIP_DEFLATED
+        rest = _read_blocks(src, metrics)
+        return _compress_stream(entry, first, rest, method, level, metrics)
+
+
+def _compress_bytes(data, arcname, level, profile, metrics):
+    """Comprime bytes em memória (metadata.json e similares)"""
+    entry = _Entry(arcname, time.time(), 0o600 | 0o100000)
+    if profile:
+        method, level = codec.choose(data, profile)
+    else:
+        method = zipfile.ZIP_DEFLATED
+    return _compress_stream(entry, data, (), method, level, metrics)
+
+
+class ParallelZipWriter:
+    """Escreve um ZIP comprimindo as entradas em paralelo.
+
+    As entradas são gravadas na ordem em que foram adicionadas; no máximo
+    2 * workers entradas ficam comprimidas aguardando gravação. Com
+    `progress` (ver progress.py), cada entrada gravada soma seu tamanho.
+    `checkpoint(writer)` é chamado depois da entrada que completar
+    `checkpoint_bytes` gravados desde a chamada anterior.
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        workers=None,
+        compresslevel=6,
+        profile=None,
+        progress=None,
+        checkpoint=None,
+        checkpoint_bytes=None,
+    ):
+        self.fileobj = fileobj
+        self.progress = progress
+        self.metrics = progress.metrics if progress is not None else Metrics()
+        self.workers = max(1, workers or default_workers())
+        self.compresslevel = compresslevel
+        # com perfil, o codec de cada arquivo é escolhido por amostragem
+        self.profile = codec.check_profile(profile) if profile else None
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = collections.deque()
+        self._written = []
+        self._offset = 0
+        self._closed = False
+        self.checkpoint = checkpoint
+        self.checkpoint_bytes = checkpoint_bytes or 0
+        self._checkpointed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_file(self, path, arcname):
+        """Agenda a compressão de um arquivo do disco"""
+        self._submit(
+            _compress_file,
+            path,
+            arcname,
+            self.compresslevel,
+            self.profile,
+            self.metrics,
+        )
+
+    def writestr(self, arcname, data):
+        """Agenda a gravação de bytes (ou texto UTF-8) como entrada"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._submit(
+            _compress_bytes,
+            data,
+            arcname,
+            self.compresslevel,
+            self.profile,
+            self.metrics,
+        )
+
+    def digests(self):
+        """Grava as entradas pendentes e retorna {arcname: SHA-256}"""
+        while self._pending:
+            self._write_entry(self._pending.popleft().result())
+        return {e.arcname: e.digest for e in self._written}
+
+    @property
+    def offset(self):
+        """Bytes gravados na saída até agora"""
+        return self._offset
+
+    def records(self):
+        """Entradas gravadas de arquivos do disco, como dicts (JSON)"""
+        return [_record(e) for e in self._written if e.stamp is not None]
+
+    def resume(self, records, offset):
+        """Continua um ZIP cuja saída já tem `offset` bytes válidos.
+
+        `records` vem de records(); a saída deve estar posicionada em
+        `offset`, logo depois da última entrada gravada.
+        """
+        self._written = [_from_record(r) for r in records]
+        self._offset = self._checkpointed = offset
+
+    def drop(self, arcname):
+        """Tira a entrada do diretório central (os bytes ficam sem uso)"""
+        self._written = [e for e in self._written if e.arcname != arcname]
+
+    def _submit(self, fn, *args):
+        self._pending.append(self._pool.submit(fn, *args))
+        while len(self._pending) > 2 * self.workers:
+            self._write_entry(self._pending.popleft().result())
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self._offset += len(data)
+
+    def _write_entry(self, entry):
+        """Grava cabeçalho local e dados comprimidos de uma entrada"""
+        with self.metrics.phase("write"):
+            self._write_local(entry)
+        self.metrics.count("files")
+        self.metrics.count("bytes_in", entry.size)
+        if (
+            self.checkpoint is not None
+            and self._offset - self._checkpointed >= self.checkpoint_bytes
+        ):
+            self._checkpointed = self._offset
+            self.checkpoint(self)
+        if self.progress is not None:
+            self.progress.advance(entry.size)
+
+    def _write_local(self, entry):
+        entry.offset = self._offset
+        name = entry.arcname.replace(os.sep, "/").encode("utf-8")
+        flags = _flags(entry)
+        zip64 = entry.size >= ZIP64_LIMIT or entry.csize >= ZIP64_LIMIT
+        extra = b""
+        size, csize = entry.size, entry.csize
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, entry.size, entry.csize)
+            size = csize = 0xFFFFFFFF
+        date, dtime = _dos_time(entry.mtime)
+        header = _LOCAL_HEADER.pack(
+            0x04034B50,
+            _version(entry, zip64),
+            flags,
+            entry.method,
+            dtime,
+            date,
+            entry.crc,
+            csize,
+            size,
+            len(name),
+            len(extra),
+        )
+        self._write(header + name + extra)
+        try:
+            while True:
+                block = entry.data.read(CHUNK_SIZE)
+                if not block:
+                    break
+                self._write(block)
+        finally:
+            entry.data.close()
+            entry.data = None
+        entry.digest = entry.sha256.hexdigest()
+        self._written.append(entry)
+
+    def _write_central_directory(self):
+        start = self._offset
+        for entry in self._written:
+            name = entry.arcname.replace(os.sep, "/").encode("utf-8")
+            flags = _flags(entry)
+            fields = []
+            size, csize, offset = entry.size, entry.csize, entry.offset
+            if size >= ZIP64_LIMIT:
+                fields.append(size)
+                size = 0xFFFFFFFF
+            if csize >= ZIP64_LIMIT:
+                fields.append(csize)
+                csize = 0xFFFFFFFF
+            if offset >= ZIP64_LIMIT:
+                fields.append(offset)
+                offset = 0xFFFFFFFF
+            extra = b""
+            if fields:
+                extra = struct.pack(
+                    f"<HH{len(fields)}Q", 1, 8 * len(fields), *fields
+                )
+            version = _version(entry, bool(fields))
+            date, dtime = _dos_time(entry.mtime)
+            header = _CENTRAL_HEADER.pack(
+                0x02014B50,
+                _CREATE_SYSTEM << 8 | version,
+                version,
+                flags,
+                entry.method,
+                dtime,
+                date,
+                entry.crc,
+                csize,
+                size,
+                len(name),
+                len(extra),
+                0,
+                0,
+                0,
+                (entry.mode & 0xFFFF) << 16,
+                offset,
+            )
+            self._write(header + name + extra)
+        return start, self._offset - start
+
+    def _write_end_records(self, cd_offset, cd_size):
+        count = len(self._written)
+        if (
+            count >= ZIP64_COUNT_LIMIT
+            or cd_offset >= ZIP64_LIMIT
+            or cd_size >= ZIP64_LIMIT
+        ):
+            end64_offset = self._offset
+            self._write(
+                _END_RECORD64.pack(
+                    0x06064B50,
+                    44,
+                    45,
+                    45,
+                    0,
+                    0,
+                    count,
+                    count,
+                    cd_size,
+                    cd_offset,
+                )
+            )
+            self._write(_END_LOCATOR64.pack(0x07064B50, 0, end64_offset, 1))
+            count = min(count, 0xFFFF)
+            cd_offset = min(cd_offset, 0xFFFFFFFF)
+            cd_size = min(cd_size, 0xFFFFFFFF)
+        self._write(
+            _END_RECORD.pack(
+                0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0
+            )
+        )
+
+    def close(self):
+        """Grava entradas pendentes e o diretório central"""
+        if self._closed:
+            return
+        try:
+            while self._pending:
+                self._write_entry(self._pending.popleft().result())
+            with self.metrics.phase("write"):
+                cd_offset, cd_size = self._write_central_directory()
+                self._write_end_records(cd_offset, cd_size)
+            self.metrics.count("bytes_out", self._offset)
+        finally:
+            self._closed = True
+            self._pool.shutdown(wait=True)
+
+    def abort(self):
+        """Descarta entradas pendentes sem finalizar o arquivo"""
+        self._closed = True
+        for future in self._pending:
+            future.cancel()
+        self._pool.shutdown(wait=True)
+        while self._pending:
+            future = self._pending.popleft()
+            if future.done() and not future.cancelled():
+                if future.exception() is None:
+                    future.result().data.close()
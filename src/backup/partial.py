@@ -0,0 +1,190 @@
+"""
+Módulo backup/partial.py:
+- Restauração parcial de mundos Java: uma dimensão inteira, um conjunto
+  de arquivos de região ou uma área (em blocos ou chunks).
+- Só as entradas necessárias são lidas do backup (acesso aleatório no
+  .zip ou blobs de chunk do manifesto), sem extração completa.
+- Os chunks são inseridos nos .mca do mundo; o resto do mundo (e o
+  progresso dos outros jogadores) não é tocado.
+"""
+
+import os
+import re
+
+from backup import anvil, restore
+
+# pasta de cada dimensão dentro do mundo Java
+DIMENSIONS = {"overworld": "", "nether": "DIM-1", "end": "DIM1"}
+# pastas no formato Anvil que usam as mesmas coordenadas de região
+REGION_KINDS = ("region", "entities", "poi")
+
+_REGION_RE = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+
+
+def parse_region_name(name):
+    """Converte 'r.X.Z.mca' em (X, Z)"""
+    m = _REGION_RE.match(os.path.basename(name))
+    if not m:
+        raise ValueError(f"Nome de região inválido: {name}")
+    return int(m.group(1)), int(m.group(2))
+
+
+def block_to_chunk_box(x1, z1, x2, z2):
+    """Converte área em blocos para área em chunks (inclusiva)"""
+    return (
+        min(x1, x2) >> 4,
+        min(z1, z2) >> 4,
+        max(x1, x2) >> 4,
+        max(z1, z2) >> 4,
+    )
+
+
+def chunks_by_region(chunk_box):
+    """Agrupa os chunks da área por região: {(rx, rz): {índices}}"""
+    cx1, cz1, cx2, cz2 = chunk_box
+    regions = {}
+    for cx in range(min(cx1, cx2), max(cx1, cx2) + 1):
+        for cz in range(min(cz1, cz2), max(cz1, cz2) + 1):
+            key = (cx >> 5, cz >> 5)
+            regions.setdefault(key, set()).add(anvil.chunk_index(cx, cz))
+    return regions
+
+
+class Selection:
+    """O que restaurar: dimensão, regiões inteiras ou área de chunks.
+
+    regions aceita nomes 'r.X.Z.mca' ou tuplas (X, Z). block_box e
+    chunk_box são (x1, z1, x2, z2). Sem regiões nem área, a dimensão
+    inteira é restaurada.
+    """
+
+    def __init__(
+        self,
+        dimension="overworld",
+        regions=None,
+        chunk_box=None,
+        block_box=None,
+    ):
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Dimensão inválida: {dimension}")
+        self.dimension = dimension
+        self.regions = None
+        self.chunks = None
+        if block_box is not None:
+            chunk_box = block_to_chunk_box(*block_box)
+        if chunk_box is not None:
+            self.chunks = chunks_by_region(chunk_box)
+        elif regions:
+            self.regions = {
+                parse_region_name(r) if isinstance(r, str) else tuple(r)
+                for r in regions
+            }
+
+    def prefixes(self):
+        """Pastas relativas (region, entities, poi) da dimensão"""
+        base = DIMENSIONS[self.dimension]
+        return [f"{base}/{k}" if base else k for k in REGION_KINDS]
+
+    def wanted(self, rel):
+        """Índices de chunk pedidos no arquivo (None = arquivo inteiro).
+
+        Retorna False se o arquivo não faz parte da seleção.
+        """
+        folder, _, name = rel.rpartition("/")
+        if folder not in self.prefixes():
+            return False
+        try:
+            coords = parse_region_name(name)
+        except ValueError:
+            return False
+        if self.chunks is not None:
+            return self.chunks.get(coords, False)
+        if self.regions is not None and coords not in self.regions:
+            return False
+        return None
+
+    def candidate_files(self):
+        """Caminhos relativos afetados quando a seleção é por área/região"""
+        coords = self.chunks if self.chunks is not None else self.regions
+        if coords is None:
+            return None
+        return {
+            f"{prefix}/r.{rx}.{rz}.mca"
+            for prefix in self.prefixes()
+            for rx, rz in coords
+        }
+
+
+def _write_atomic(path, chunks):
+    """Grava a região em temporário e troca com os.replace"""
+    tmp = path + ".restore-tmp"
+    try:
+        anvil.write_region(tmp, chunks)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def restore_partial(source, worlds_path, selection):
+    """Aplica a seleção do backup ao mundo e retorna estatísticas.
+
+    Chunks (ou regiões) ausentes no backup são removidos do mundo, pois
+    foram gerados depois dele.
+    """
+    try:
+        world = source.world
+        restore.check_world(world)
+        target = os.path.join(worlds_path, world)
+        if not os.path.isdir(target):
+            raise FileNotFoundError(f"Mundo não encontrado: {target}")
+        in_backup = {}
+        for rel, _, key in source.entries:
+            if (
+                anvil.is_region_file(rel)
+                and selection.wanted(rel) is not False
+            ):
+                in_backup[rel] = key
+        files = set(in_backup)
+        candidates = selection.candidate_files()
+        if candidates is None:
+            # dimensão inteira: inclui regiões que só existem no mundo
+            for prefix in selection.prefixes():
+                folder = os.path.join(target, *prefix.split("/"))
+                if os.path.isdir(folder):
+                    files |= {
+                        f"{prefix}/{n}"
+                        for n in os.listdir(folder)
+                        if _REGION_RE.match(n)
+                    }
+        else:
+            files |= {
+                rel
+                for rel in candidates
+                if os.path.isfile(os.path.join(target, *rel.split("/")))
+            }
+        stats = {"world": world, "regions": 0, "chunks": 0, "removed": 0}
+        for rel in sorted(files):
+            wanted = selection.wanted(rel)
+            dst = restore.safe_join(target, rel)
+            key = in_backup.get(rel)
+            backup_chunks = source.read_chunks(key, wanted) if key else {}
+            if wanted is None:
+                if key is None:
+                    os.remove(dst)
+                    stats["removed"] += 1
+                    continue
+                live = {}
+            else:
+                live = anvil.read_region(dst) if os.path.isfile(dst) else {}
+                for idx in wanted:
+                    live.pop(idx, None)
+            live.update(backup_chunks)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            _write_atomic(dst, live)
+            stats["regions"] += 1
+            stats["chunks"] += len(backup_chunks)
+        return stats
+    finally:
+        source.close()
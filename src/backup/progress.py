@@ -0,0 +1,56 @@
+"""
+Módulo backup/progress.py:
+- Define Progress, contador de bytes processados compartilhado pelas
+  threads de backup e restauração, e Cancelled, levantada quando a
+  operação é cancelada.
+- O callback recebe (feito, total); o cancelamento é qualquer objeto com
+  is_set() (ex.: threading.Event), conferido a cada arquivo.
+- Cada Progress carrega um Metrics (ver metrics.py), onde as threads
+  registram tempo por fase e contadores da operação.
+- `throttle` (ex.: fleet.TokenBucket) limita a vazão de leitura: cada
+  advance de bytes lidos do disco espera o orçamento disponível.
+"""
+
+import threading
+
+from backup.metrics import Metrics
+
+
+class Cancelled(Exception):
+    """Operação cancelada pelo usuário"""
+
+
+class Progress:
+    """Acumula bytes processados e avisa o callback"""
+
+    def __init__(
+        self, total=0, callback=None, cancel=None, metrics=None, throttle=None
+    ):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.cancel = cancel
+        self.metrics = metrics or Metrics()
+        self.throttle = throttle
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Levanta Cancelled se o cancelamento foi pedido"""
+        if self.cancel is not None and self.cancel.is_set():
+            raise Cancelled("operação cancelada")
+
+    def advance(self, nbytes, read=True):
+        """Soma bytes processados, avisa o callback e confere cancelamento.
+
+        read=False indica bytes reaproveitados sem leitura, que não
+        consomem o orçamento do throttle.
+        """
+        if self.throttle is not None and read:
+            with self.metrics.phase("throttle"):
+                self.throttle.consume(nbytes)
+        with self._lock:
+            self.done += nbytes
+            done = self.done
+        if self.callback:
+            self.callback(done, self.total)
+        self.check()
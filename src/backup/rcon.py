@@ -0,0 +1,134 @@
+"""
+Módulo backup/rcon.py:
+- Cliente RCON (protocolo Source, usado pelo servidor do Minecraft) para
+  enviar comandos como save-off, save-all flush e save-on.
+- Cada pacote: tamanho (int32 LE), id, tipo e corpo em UTF-8 terminado
+  por dois bytes nulos. Tipo 3 autentica, tipo 2 executa um comando e
+  as respostas chegam com tipo 0 e o mesmo id.
+- O servidor divide respostas longas em fragmentos de até 4096 bytes;
+  fragmentos cheios indicam que há continuação.
+"""
+
+import itertools
+import socket
+import struct
+import threading
+
+DEFAULT_PORT = 25575
+TYPE_AUTH = 3
+TYPE_COMMAND = 2
+TYPE_RESPONSE = 0
+MAX_FRAGMENT = 4096
+# o servidor recusa pacotes com corpo maior que isso
+MAX_REQUEST = 1446
+
+
+class RconError(Exception):
+    """Falha de autenticação ou resposta RCON inválida"""
+
+
+def encode_packet(request_id, kind, body):
+    """Monta um pacote RCON"""
+    data = body.encode("utf-8") + b"\0\0"
+    return struct.pack("<iii", len(data) + 8, request_id, kind) + data
+
+
+def read_packet(sock):
+    """Lê um pacote do socket e retorna (id, tipo, corpo em bytes)"""
+    (length,) = struct.unpack("<i", _recv_exact(sock, 4))
+    if length < 10 or length > MAX_FRAGMENT + 10:
+        raise RconError(f"Pacote RCON com tamanho inválido: {length}")
+    data = _recv_exact(sock, length)
+    request_id, kind = struct.unpack("<ii", data[:8])
+    return request_id, kind, data[8:-2]
+
+
+def _recv_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        part = sock.recv(n - len(buf))
+        if not part:
+            raise RconError("Conexão RCON encerrada pelo servidor")
+        buf += part
+    return buf
+
+
+class RconClient:
+    """Conexão RCON autenticada; command() é seguro entre threads"""
+
+    def __init__(self, host, port=DEFAULT_PORT, password="", timeout=30.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self):
+        """Abre a conexão e autentica; RconError se a senha for recusada"""
+        if self._sock is not None:
+            return
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout
+        )
+        try:
+            request_id = next(self._ids)
+            sock.sendall(encode_packet(request_id, TYPE_AUTH, self.password))
+            while True:
+                reply_id, kind, _ = read_packet(sock)
+                # alguns servidores enviam uma resposta vazia antes
+                if kind == TYPE_RESPONSE:
+                    continue
+                break
+            if reply_id == -1 or reply_id != request_id:
+                raise RconError("Senha RCON recusada")
+        except BaseException:
+            sock.close()
+            raise
+        self._sock = sock
+
+    def command(self, text):
+        """Executa um comando no servidor e retorna a resposta"""
+        if len(text.encode("utf-8")) > MAX_REQUEST:
+            raise RconError("Comando RCON longo demais")
+        with self._lock:
+            self.connect()
+            request_id = next(self._ids)
+            try:
+                self._sock.sendall(
+                    encode_packet(request_id, TYPE_COMMAND, text)
+                )
+                parts = []
+                while True:
+                    reply_id, _, body = read_packet(self._sock)
+                    if reply_id != request_id:
+                        raise RconError(
+                            f"Resposta RCON inesperada (id {reply_id})"
+                        )
+                    parts.append(body)
+                    if len(body) < MAX_FRAGMENT:
+                        return b"".join(parts).decode("utf-8", "replace")
+            except BaseException:
+                # conexão em estado desconhecido: reconecta no próximo uso
+                self._close()
+                raise
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def close(self):
+        """Fecha a conexão"""
+        with self._lock:
+            self._close()
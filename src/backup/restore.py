@@ -0,0 +1,692 @@
+"""
+Módulo backup/restore.py:
+- Define RestoreEngine, restauração atômica e paralela de backups.
+- Os arquivos são extraídos em paralelo para uma pasta de staging ao lado
+  do mundo (.<mundo>.staging), com CRC/hash conferidos em cada entrada.
+- Só depois a pasta é trocada por rename; o mundo anterior fica como
+  cópia de rollback (.<mundo>.rollback). Uma falha em qualquer etapa
+  nunca deixa o mundo misturando arquivos antigos e novos.
+- run_delta reescreve apenas os arquivos que diferem do mundo em disco
+  (tamanho + CRC-32/SHA-256), útil para voltar poucas horas.
+- verify_source relê todas as entradas em paralelo, sem gravar nada,
+  conferindo o CRC-32 e o SHA-256 (do metadata.json nos .zip, .tar.zst
+  e snapshots, dos blobs nos incrementais).
+- SnapshotSource restaura snapshots de hardlinks (ver hardlink.py)
+  clonando os arquivos por reflink, instantâneo em Btrfs/XFS/APFS, ou
+  copiando-os sem descompressão.
+- fingerprint e region_stamps de cada fonte expõem o que o backup já
+  sabe sem extrair o conteúdo (CRC-32 do diretório central, SHA-256 do
+  metadata, timestamps do cabeçalho das regiões); ver diff.py.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import anvil, hardlink, leveldb, store, tarzst
+from backup.progress import Progress
+
+CHUNK_SIZE = 1024 * 1024
+METADATA_FILE = "mvp2.json"
+
+
+class RestoreError(Exception):
+    """Falha na restauração (arquivo corrompido ou inválido)"""
+
+
+def staging_path(worlds_path, world):
+    return os.path.join(worlds_path, f".{world}.staging")
+
+
+def rollback_path(worlds_path, world):
+    return os.path.join(worlds_path, f".{world}.rollback")
+
+
+def check_world(world):
+    if not world or world in (".", "..") or "/" in world or "\\" in world:
+        raise RestoreError(f"Nome de mundo inválido no backup: {world!r}")
+
+
+def safe_join(base, rel):
+    """Junta caminho relativo do backup impedindo saída da pasta base"""
+    parts = [p for p in rel.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        raise RestoreError(f"Caminho inválido no backup: {rel!r}")
+    return os.path.join(base, *parts)
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class ZipSource:
+    """Entradas de um backup .zip; cada thread usa seu próprio handle"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        with zipfile.ZipFile(path, "r") as z:
+            infos = z.infolist()
+            self.metadata = {}
+            if "metadata.json" in z.namelist():
+                self.metadata = json.loads(z.read("metadata.json"))
+        members = [
+            i
+            for i in infos
+            if i.filename != "metadata.json" and not i.is_dir()
+        ]
+        world = self.metadata.get("world")
+        if not world:
+            tops = {i.filename.split("/", 1)[0] for i in members}
+            if len(tops) != 1:
+                raise RestoreError("Backup sem metadata e sem pasta única")
+            world = tops.pop()
+        self.world = world
+        prefix = world + "/"
+        self.entries = []
+        for info in members:
+            if not info.filename.startswith(prefix):
+                raise RestoreError(
+                    f"Entrada fora da pasta do mundo: {info.filename}"
+                )
+            rel = info.filename[len(prefix) :]
+            self.entries.append((rel, info.file_size, info))
+        # SHA-256 gravado no backup (ausente em backups antigos)
+        hashes = self.metadata.get("sha256") or {}
+        self._hashes = {prefix + rel: h for rel, h in hashes.items()}
+        self.missing = sorted(set(hashes) - {e[0] for e in self.entries})
+
+    def _zip(self):
+        z = getattr(self._local, "zip", None)
+        if z is None:
+            z = zipfile.ZipFile(self.path, "r")
+            self._local.zip = z
+            with self._lock:
+                self._handles.append(z)
+        return z
+
+    def extract(self, info, dst):
+        """Extrai uma entrada em streaming, conferindo o CRC-32"""
+        crc = 0
+        with self._zip().open(info) as src, open(dst, "wb") as out:
+            while True:
+                block = src.read(CHUNK_SIZE)
+                if not block:
+                    break
+                crc = zlib.crc32(block, crc)
+                out.write(block)
+        if crc != info.CRC:
+            raise RestoreError(f"CRC inválido em {info.filename}")
+
+    def verify(self, info):
+        """Lê a entrada em streaming e confere o CRC-32 e o SHA-256"""
+        crc = 0
+        expected = self._hashes.get(info.filename)
+        sha = hashlib.sha256() if expected else None
+        with self._zip().open(info) as src:
+            for block in iter(lambda: src.read(CHUNK_SIZE), b""):
+                crc = zlib.crc32(block, crc)
+                if sha:
+                    sha.update(block)
+        if crc != info.CRC:
+            raise RestoreError(f"CRC inválido em {info.filename}")
+        if sha and sha.hexdigest() != expected:
+            raise RestoreError(f"SHA-256 não confere em {info.filename}")
+
+    def read_bytes(self, info):
+        """Lê uma única entrada por acesso aleatório (CRC conferido)"""
+        return self._zip().read(info)
+
+    def read_chunks(self, info, wanted=None):
+        """Chunks {índice: (timestamp, registro)} de uma região do backup"""
+        chunks = anvil.parse_region_bytes(self.read_bytes(info))
+        if wanted is None:
+            return chunks
+        return {i: c for i, c in chunks.items() if i in wanted}
+
+    def fingerprint(self, info):
+        """Hashes já gravados no .zip: CRC-32 do diretório e SHA-256"""
+        return _known(crc32=info.CRC, sha256=self._hashes.get(info.filename))
+
+    def region_stamps(self, info):
+        """Timestamps dos chunks; só o cabeçalho é descomprimido"""
+        with self._zip().open(info) as src:
+            return _stamps(src.read(anvil.HEADER_SIZE))
+
+    def matches(self, info, path):
+        """Indica se o arquivo em disco tem mesmo tamanho e CRC da entrada"""
+        if os.path.getsize(path) != info.file_size:
+            return False
+        return file_crc32(path) == info.CRC
+
+    def close(self):
+        with self._lock:
+            for z in self._handles:
+                z.close()
+            self._handles.clear()
+
+
+class ManifestSource:
+    """Entradas de um backup incremental (manifesto + blobs)"""
+
+    def __init__(self, path, blobs):
+        self.path = path
+        self.blobs = blobs
+        manifest = store.load_manifest(path)
+        self.world = manifest.get("world")
+        self.metadata = {k: v for k, v in manifest.items() if k != "files"}
+        self.entries = [
+            (e["path"], e["size"], e) for e in manifest.get("files", [])
+        ]
+        self.missing = []
+
+    def extract(self, entry, dst):
+        try:
+            store.restore_entry(self.blobs, entry, dst)
+        except store.IntegrityError as e:
+            raise RestoreError(str(e)) from e
+
+    def _read_blob(self, digest, what):
+        data = self.blobs.read(digest)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise RestoreError(f"{what}: hash não confere")
+        return data
+
+    def verify(self, entry):
+        """Confere o SHA-256 de todos os blobs da entrada"""
+        if "chunks" in entry:
+            for idx, _, _, _, digest in entry["chunks"]:
+                self._read_blob(digest, f"{entry['path']}#{idx}")
+            return
+        sha = hashlib.sha256()
+        size = 0
+        for block in self.blobs.iter_blob(entry["blob"]):
+            sha.update(block)
+            size += len(block)
+        if sha.hexdigest() != entry["blob"] or size != entry["size"]:
+            raise RestoreError(f"{entry['path']}: hash não confere")
+
+    def read_bytes(self, entry):
+        """Conteúdo completo de uma entrada, com hash conferido"""
+        if "chunks" in entry:
+            return anvil.region_bytes(self.read_chunks(entry))
+        return self._read_blob(entry["blob"], entry["path"])
+
+    def read_chunks(self, entry, wanted=None):
+        """Chunks de uma região; só os blobs pedidos são lidos"""
+        if "chunks" not in entry:
+            chunks = anvil.parse_region_bytes(self.read_bytes(entry))
+            if wanted is None:
+                return chunks
+            return {i: c for i, c in chunks.items() if i in wanted}
+        return {
+            idx: (ts, self._read_blob(digest, f"{entry['path']}#{idx}"))
+            for idx, ts, _, _, digest in entry["chunks"]
+            if wanted is None or idx in wanted
+        }
+
+    def fingerprint(self, entry):
+        """SHA-256 do blob ou, nas regiões, a lista de hashes dos chunks"""
+        if "chunks" in entry:
+            return {"chunks": tuple((c[0], c[4]) for c in entry["chunks"])}
+        return _known(sha256=entry.get("blob"))
+
+    def region_stamps(self, entry):
+        """Timestamps dos chunks, lidos do manifesto sem abrir blobs"""
+        if "chunks" in entry:
+            return {c[0]: c[1] for c in entry["chunks"]}
+        blocks = self.blobs.iter_blob(entry["blob"])
+        return _stamps(_head(blocks, anvil.HEADER_SIZE))
+
+    def matches(self, entry, path):
+        """Compara o arquivo em disco com a entrada (hash ou chunks)"""
+        if "chunks" in entry:
+            try:
+                live = anvil.read_region(path)
+            except (OSError, anvil.RegionError):
+                return False
+            return {
+                idx: (ts, hashlib.sha256(record).hexdigest())
+                for idx, (ts, record) in live.items()
+            } == {c[0]: (c[1], c[4]) for c in entry["chunks"]}
+        if os.path.getsize(path) != entry["size"]:
+            return False
+        return file_sha256(path) == entry["blob"]
+
+    def close(self):
+        pass
+
+
+class TarZstSource:
+    """Entradas de um backup .tar.zst, lidas pelo índice de frames"""
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = tarzst.TarZstReader(path)
+        self.metadata = self.archive.metadata
+        world = self.metadata.get("world")
+        check_world(world)
+        self.world = world
+        prefix = world + "/"
+        self.entries = []
+        for name, (_, _, size) in self.archive.members.items():
+            if not name.startswith(prefix):
+                raise RestoreError(f"Entrada fora da pasta do mundo: {name}")
+            self.entries.append((name[len(prefix) :], size, name))
+        hashes = self.metadata.get("sha256") or {}
+        self._hashes = {prefix + rel: h for rel, h in hashes.items()}
+        self.missing = sorted(set(hashes) - {e[0] for e in self.entries})
+
+    def _blocks(self, name):
+        """Conteúdo em blocos; o SHA-256 é conferido ao final"""
+        expected = self._hashes.get(name)
+        sha = hashlib.sha256()
+        try:
+            for block in self.archive.iter_member(name):
+                sha.update(block)
+                yield block
+        except tarzst.TarZstError as e:
+            raise RestoreError(str(e)) from e
+        if expected and sha.hexdigest() != expected:
+            raise RestoreError(f"SHA-256 não confere em {name}")
+
+    def extract(self, name, dst):
+        with open(dst, "wb") as out:
+            for block in self._blocks(name):
+                out.write(block)
+
+    def verify(self, name):
+        for _ in self._blocks(name):
+            pass
+
+    def read_bytes(self, name):
+        """Conteúdo completo de uma entrada, com hash conferido"""
+        return b"".join(self._blocks(name))
+
+    def read_chunks(self, name, wanted=None):
+        """Chunks {índice: (timestamp, registro)} de uma região do backup"""
+        chunks = anvil.parse_region_bytes(self.read_bytes(name))
+        if wanted is None:
+            return chunks
+        return {i: c for i, c in chunks.items() if i in wanted}
+
+    def fingerprint(self, name):
+        return _known(sha256=self._hashes.get(name))
+
+    def region_stamps(self, name):
+        """Timestamps dos chunks; só o primeiro frame é descomprimido"""
+        try:
+            head = _head(self.archive.iter_member(name), anvil.HEADER_SIZE)
+        except tarzst.TarZstError as e:
+            raise RestoreError(str(e)) from e
+        return _stamps(head)
+
+    def matches(self, name, path):
+        """Compara tamanho e SHA-256 do arquivo em disco com a entrada"""
+        if os.path.getsize(path) != self.archive.members[name][2]:
+            return False
+        expected = self._hashes.get(name)
+        if expected is None:
+            return self.read_bytes(name) == _read_file(path)
+        return file_sha256(path) == expected
+
+    def close(self):
+        self.archive.close()
+
+
+class SnapshotSource:
+    """Arquivos de um snapshot de hardlinks (pasta .snap)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.metadata = hardlink.load_metadata(path)
+        world = self.metadata.get("world")
+        check_world(world)
+        self.world = world
+        self.root = os.path.join(path, world)
+        self.entries = [
+            (rel, os.path.getsize(abs_file), rel)
+            for abs_file, rel in store.walk_files(self.root)
+        ]
+        self._hashes = self.metadata.get("sha256") or {}
+        self.missing = sorted(set(self._hashes) - {e[0] for e in self.entries})
+
+    def extract(self, rel, dst):
+        """Clona (reflink) ou copia o arquivo do snapshot"""
+        # hardlink não: o jogo altera regiões no lugar e mudaria o snapshot
+        hardlink.clone_file(safe_join(self.root, rel), dst)
+
+    def verify(self, rel):
+        expected = self._hashes.get(rel)
+        if expected is None:
+            raise RestoreError(f"{rel}: fora do metadata.json")
+        if file_sha256(safe_join(self.root, rel)) != expected:
+            raise RestoreError(f"SHA-256 não confere em {rel}")
+
+    def read_bytes(self, rel):
+        return _read_file(safe_join(self.root, rel))
+
+    def read_chunks(self, rel, wanted=None):
+        """Chunks {índice: (timestamp, registro)} de uma região do backup"""
+        chunks = anvil.parse_region_bytes(self.read_bytes(rel))
+        if wanted is None:
+            return chunks
+        return {i: c for i, c in chunks.items() if i in wanted}
+
+    def fingerprint(self, rel):
+        return _known(sha256=self._hashes.get(rel))
+
+    def region_stamps(self, rel):
+        with open(safe_join(self.root, rel), "rb") as f:
+            return _stamps(f.read(anvil.HEADER_SIZE))
+
+    def matches(self, rel, path):
+        """Compara tamanho e SHA-256 do arquivo em disco com o snapshot"""
+        src = safe_join(self.root, rel)
+        if os.path.getsize(path) != os.path.getsize(src):
+            return False
+        expected = self._hashes.get(rel) or file_sha256(src)
+        return file_sha256(path) == expected
+
+    def close(self):
+        pass
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _known(**hashes):
+    """Só os hashes presentes (backups antigos não têm SHA-256)"""
+    return {kind: value for kind, value in hashes.items() if value}
+
+
+def _head(blocks, size):
+    """Primeiros `size` bytes de um iterador de blocos"""
+    data = b""
+    for block in blocks:
+        data += block
+        if len(data) >= size:
+            break
+    return data[:size]
+
+
+def _stamps(head):
+    """{índice: timestamp} dos chunks a partir do cabeçalho da região"""
+    return {idx: ts for idx, _, _, ts in anvil.parse_header(head)}
+
+
+def open_source(path, backup_dir):
+    """Cria a fonte adequada ao tipo de backup"""
+    name = os.path.basename(path)
+    if store.is_manifest(name):
+        return ManifestSource(path, store.BlobStore(backup_dir))
+    if tarzst.is_tarzst(name):
+        return TarZstSource(path)
+    if hardlink.is_snapshot(name) and os.path.isdir(path):
+        return SnapshotSource(path)
+    return ZipSource(path)
+
+
+def verify_source(source, workers=None, progress=None):
+    """Confere todas as entradas da fonte em paralelo, sem gravar nada.
+
+    Retorna {"files", "bytes", "errors"}; errors lista as entradas com
+    CRC/hash divergente, ilegíveis ou ausentes.
+    """
+    progress = progress or Progress()
+    progress.total = sum(size for _, size, _ in source.entries)
+    metrics = progress.metrics
+
+    def check(entry):
+        rel, size, key = entry
+        progress.check()
+        try:
+            with metrics.phase("verify"):
+                source.verify(key)
+        except Exception as e:
+            return f"{rel}: {e}"
+        metrics.count("files")
+        metrics.count("bytes_in", size)
+        progress.advance(size)
+        return None
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = [e for e in pool.map(check, source.entries) if e]
+    errors.extend(f"{rel}: ausente do backup" for rel in source.missing)
+    return {
+        "files": len(source.entries),
+        "bytes": progress.total,
+        "errors": errors,
+    }
+
+
+def recover(worlds_path, world):
+    """Desfaz troca interrompida: volta o rollback se o mundo sumiu"""
+    target = os.path.join(worlds_path, world)
+    rollback = rollback_path(worlds_path, world)
+    if not os.path.exists(target) and os.path.isdir(rollback):
+        os.rename(rollback, target)
+        return True
+    return False
+
+
+def _remove_tree(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+class RestoreEngine:
+    """Extrai em paralelo para staging e troca o mundo por rename.
+
+    `progress` (ver progress.py) recebe os bytes de cada arquivo e pode
+    cancelar a restauração; o staging é descartado e o mundo fica intacto.
+    Os tempos por fase vão para progress.metrics.
+    """
+
+    def __init__(self, workers=None, progress=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.progress = progress or Progress()
+
+    def run(self, source, worlds_path):
+        """Restaura a fonte em worlds_path e retorna estatísticas"""
+        world = source.world
+        check_world(world)
+        recover(worlds_path, world)
+        staging = staging_path(worlds_path, world)
+        _remove_tree(staging)
+        start = time.perf_counter()
+        self.progress.total = sum(size for _, size, _ in source.entries)
+        metrics = self.progress.metrics
+        try:
+            with metrics.phase("prepare"):
+                os.makedirs(staging)
+                jobs = []
+                for rel, size, key in source.entries:
+                    dst = safe_join(staging, rel)
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    jobs.append((key, dst, size))
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(self._extract, source, key, dst, size)
+                    for key, dst, size in jobs
+                ]
+                for future in futures:
+                    future.result()
+            with open(
+                os.path.join(staging, METADATA_FILE), "w", encoding="utf-8"
+            ) as mf:
+                json.dump(source.metadata, mf, ensure_ascii=False, indent=2)
+            with metrics.phase("swap"):
+                self._swap(worlds_path, world, staging)
+        except BaseException:
+            _remove_tree(staging)
+            raise
+        finally:
+            source.close()
+        elapsed = time.perf_counter() - start
+        total = sum(size for _, _, size in jobs)
+        return {
+            "world": world,
+            "files": len(jobs),
+            "bytes": total,
+            "seconds": elapsed,
+            "bytes_per_second": total / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def run_delta(self, source, worlds_path, delete_extra=False):
+        """Reescreve só os arquivos que diferem do mundo em disco.
+
+        Cada entrada é comparada por tamanho e CRC (ou hash) com o arquivo
+        atual; as diferentes são gravadas em temporário e trocadas com
+        os.replace. Com delete_extra, arquivos ausentes no backup são
+        removidos. Em db/ (Bedrock), arquivos velhos sempre são removidos
+        e CURRENT é gravado por último.
+        """
+        world = source.world
+        check_world(world)
+        recover(worlds_path, world)
+        target = os.path.join(worlds_path, world)
+        start = time.perf_counter()
+        self.progress.total = sum(size for _, size, _ in source.entries)
+        written = []
+        try:
+            os.makedirs(target, exist_ok=True)
+            jobs = [
+                (rel, key, safe_join(target, rel), size)
+                for rel, size, key in source.entries
+            ]
+            # CURRENT (LevelDB) só depois de MANIFEST e tabelas
+            current = [j for j in jobs if leveldb.write_priority(j[0])[0]]
+            others = [j for j in jobs if not leveldb.write_priority(j[0])[0]]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for group in (others, current):
+                    results = pool.map(
+                        lambda job: self._delta_one(source, job), group
+                    )
+                    written += [rel for rel in results if rel]
+            keep = {job[0] for job in jobs} | {METADATA_FILE}
+            with self.progress.metrics.phase("delete"):
+                deleted = leveldb.prune_stale(target, keep)
+                if delete_extra:
+                    deleted += _delete_extra(target, keep)
+            self.progress.metrics.count("files_deleted", len(deleted))
+            with open(
+                os.path.join(target, METADATA_FILE), "w", encoding="utf-8"
+            ) as mf:
+                json.dump(source.metadata, mf, ensure_ascii=False, indent=2)
+        finally:
+            source.close()
+        elapsed = time.perf_counter() - start
+        changed = set(written)
+        total = sum(job[3] for job in jobs if job[0] in changed)
+        return {
+            "world": world,
+            "files": len(written),
+            "skipped": len(jobs) - len(written),
+            "deleted": len(deleted),
+            "bytes": total,
+            "seconds": elapsed,
+            "bytes_per_second": total / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _extract(self, source, key, dst, size):
+        """Extrai uma entrada (thread do pool) e registra o progresso"""
+        self.progress.check()
+        with self.progress.metrics.phase("extract"):
+            source.extract(key, dst)
+        self._count_written(size)
+        self.progress.advance(size)
+
+    def _count_written(self, size):
+        self.progress.metrics.count("files")
+        self.progress.metrics.count("bytes_out", size)
+
+    def _delta_one(self, source, job):
+        """Grava a entrada se diferir do disco; retorna rel ou None"""
+        rel, key, dst, size = job
+        self.progress.check()
+        metrics = self.progress.metrics
+        with metrics.phase("compare"):
+            same = os.path.isfile(dst) and source.matches(key, dst)
+        if same:
+            metrics.count("files_skipped")
+            self.progress.advance(size)
+            return None
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = dst + ".restore-tmp"
+        try:
+            with metrics.phase("extract"):
+                source.extract(key, tmp)
+                os.replace(tmp, dst)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._count_written(size)
+        self.progress.advance(size)
+        return rel
+
+    def _swap(self, worlds_path, world, staging):
+        """Troca staging pelo mundo, mantendo o anterior como rollback"""
+        target = os.path.join(worlds_path, world)
+        rollback = rollback_path(worlds_path, world)
+        if os.path.exists(target):
+            _remove_tree(rollback)
+            os.rename(target, rollback)
+        try:
+            os.rename(staging, target)
+        except BaseException:
+            recover(worlds_path, world)
+            raise
+
+
+def _delete_extra(target, keep):
+    """Remove arquivos do mundo que não estão no backup"""
+    removed = []
+    for root, _, names in os.walk(target):
+        for name in names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, target).replace(os.sep, "/")
+            if rel not in keep:
+                os.remove(path)
+                removed.append(rel)
+    return removed
+
+
+def format_stats(stats):
+    """Resumo legível de throughput da restauração"""
+    mib = stats["bytes"] / (1024 * 1024)
+    rate = stats["bytes_per_second"] / (1024 * 1024)
+    text = (
+        f"{stats['files']} arquivos, {mib:.1f} MiB em "
+        f"{stats['seconds']:.2f}s ({rate:.1f} MiB/s)"
+    )
+    if "skipped" in stats:
+        text += (
+            f"; {stats['skipped']} inalterados, "
+            f"{stats['deleted']} removidos"
+        )
+    return text
@@ -0,0 +1,210 @@
+"""
+Módulo backup/retention.py:
+- Policy descreve a retenção de um mundo: os `last` backups mais novos,
+  o mais novo de cada uma das últimas N horas, dias, semanas e meses
+  (avô-pai-filho, GFS) e um teto de bytes (`max_bytes`).
+- select separa os backups de um mundo em mantidos (com os motivos) e
+  removidos. As regras se somam; o teto de bytes vale depois delas e
+  descarta os mais antigos. O backup mais novo nunca é removido.
+- collect_garbage apaga de objects/ os blobs que nenhum manifesto
+  restante referencia (inteiros ou chunks de região) e os estados de
+  stat (.state/<mundo>.json) que apontam para backups apagados.
+"""
+
+import os
+import time
+from datetime import datetime
+
+from backup import statcache, store
+
+# chave do período de cada regra GFS
+PERIODS = {
+    "hourly": lambda t: (t.year, t.month, t.day, t.hour),
+    "daily": lambda t: (t.year, t.month, t.day),
+    "weekly": lambda t: tuple(t.isocalendar()[:2]),
+    "monthly": lambda t: (t.year, t.month),
+}
+# blobs mais novos que isso podem ser de um backup em andamento
+GC_GRACE = 3600
+
+
+class Policy:
+    """Regras de retenção; as contagens zeradas ficam desativadas"""
+
+    def __init__(
+        self,
+        last=0,
+        hourly=0,
+        daily=0,
+        weekly=0,
+        monthly=0,
+        max_bytes=None,
+    ):
+        counts = {
+            "last": last,
+            "hourly": hourly,
+            "daily": daily,
+            "weekly": weekly,
+            "monthly": monthly,
+        }
+        for key, value in counts.items():
+            if value is None or value < 0:
+                raise ValueError(f"{key} inválido: {value}")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes inválido: {max_bytes}")
+        if not any(counts.values()) and max_bytes is None:
+            raise ValueError("Política de retenção vazia")
+        self.last = last
+        self.hourly = hourly
+        self.daily = daily
+        self.weekly = weekly
+        self.monthly = monthly
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cria a política de um dicionário (ex.: configuração da frota)"""
+        data = dict(data)
+        max_mb = data.pop("max_mb", None)
+        if max_mb is not None:
+            data["max_bytes"] = int(max_mb * 1024 * 1024)
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Regra de retenção desconhecida: {e}")
+
+
+def backup_time(row):
+    """Momento do backup: timestamp do nome ou, na falta dele, o mtime"""
+    try:
+        return datetime.strptime(row["timestamp"], "%Y%m%d_%H%M%S")
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(row["mtime_ns"] / 1e9)
+
+
+def select(rows, policy):
+    """Retorna (mantidos, removidos) dos backups de um mundo.
+
+    `rows` são linhas do catálogo em ordem cronológica; mantidos é uma
+    lista de (linha, motivos), do mais novo para o mais antigo.
+    """
+    newest = list(reversed(rows))
+    reasons = {row["name"]: [] for row in newest}
+    for row in newest[: policy.last]:
+        reasons[row["name"]].append("last")
+    for rule, period in PERIODS.items():
+        wanted = getattr(policy, rule)
+        seen = set()
+        for row in newest:
+            if len(seen) >= wanted:
+                break
+            key = period(backup_time(row))
+            if key not in seen:
+                seen.add(key)
+                reasons[row["name"]].append(rule)
+    # só com o teto de bytes, todos são candidatos
+    kept = [r for r in newest if reasons[r["name"]]] or newest
+    if policy.max_bytes is not None:
+        total = 0
+        for i, row in enumerate(kept):
+            total += row["size"] or 0
+            # o mais novo fica mesmo acima do teto
+            if total > policy.max_bytes and i > 0:
+                kept = kept[:i]
+                break
+    names = {row["name"] for row in kept}
+    removed = [row for row in rows if row["name"] not in names]
+    kept = [(row, reasons[row["name"]] or ["max_bytes"]) for row in kept]
+    return kept, removed
+
+
+def referenced_blobs(backup_dir, exclude=()):
+    """Hashes usados pelos manifestos da pasta (exceto os de `exclude`).
+
+    Um manifesto ilegível interrompe a coleta: sem ele não há como saber
+    quais blobs ainda são necessários.
+    """
+    live = set()
+    for name in os.listdir(backup_dir):
+        if not store.is_manifest(name) or name in exclude:
+            continue
+        manifest = store.load_manifest(os.path.join(backup_dir, name))
+        for entry in manifest.get("files", []):
+            if "chunks" in entry:
+                live.update(c[4] for c in entry["chunks"])
+            elif entry.get("blob"):
+                live.add(entry["blob"])
+    return live
+
+
+def collect_garbage(backup_dir, exclude=(), dry_run=False, grace=None):
+    """Apaga blobs sem referência e estados órfãos.
+
+    Retorna {"blobs", "bytes", "states"} com o que foi (ou, com dry_run,
+    seria) apagado. `exclude` lista manifestos que serão removidos.
+    Blobs e temporários gravados há menos de `grace` segundos (padrão:
+    GC_GRACE) ficam, pois podem pertencer a um backup em andamento.
+    """
+    result = {"blobs": 0, "bytes": 0, "states": 0}
+    if not os.path.isdir(backup_dir):
+        return result
+    live = referenced_blobs(backup_dir, exclude)
+    cutoff = time.time() - (GC_GRACE if grace is None else grace)
+    objects = os.path.join(backup_dir, "objects")
+    try:
+        shards = list(os.scandir(objects))
+    except FileNotFoundError:
+        shards = []
+    for shard in shards:
+        if not shard.is_dir():
+            # temporário abandonado por um backup interrompido
+            if shard.name.startswith(".tmp-"):
+                _sweep(shard, cutoff, dry_run, result)
+            continue
+        for blob in os.scandir(shard.path):
+            if blob.name not in live:
+                _sweep(blob, cutoff, dry_run, result)
+    result["states"] = _orphan_states(backup_dir, exclude, dry_run)
+    return result
+
+
+def _sweep(entry, cutoff, dry_run, result):
+    try:
+        st = entry.stat()
+    except FileNotFoundError:
+        return
+    if st.st_mtime > cutoff:
+        return
+    if not dry_run:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            return
+    result["blobs"] += 1
+    result["bytes"] += st.st_size
+
+
+def _orphan_states(backup_dir, exclude, dry_run):
+    """Remove estados de stat cujo backup base não existe mais"""
+    state_dir = os.path.join(backup_dir, statcache.STATE_DIR)
+    try:
+        names = os.listdir(state_dir)
+    except FileNotFoundError:
+        return 0
+    count = 0
+    for name in names:
+        # .worlds.json é o cache da listagem de mundos, não um estado
+        if name.startswith(".") or not name.endswith(".json"):
+            continue
+        world = name[: -len(".json")]
+        cache = statcache.StatCache(backup_dir, world)
+        state = cache.load()
+        if state is not None and state["backup"] not in exclude:
+            continue
+        if not dry_run:
+            try:
+                os.remove(cache.path)
+            except FileNotFoundError:
+                continue
+        count += 1
+    return count
@@ -0,0 +1,154 @@
+"""
+Módulo backup/snapshot.py:
+- Cópia congelada de um mundo em uso: o servidor só fica sem gravar
+  durante a cópia para a pasta de staging; a compressão do backup lê
+  depois essa cópia, com o servidor já de volta ao normal.
+- ServerControl pausa as gravações via RCON (save-off e save-all flush) e
+  as retoma (save-on). Pausas simultâneas (vários backups no daemon) são
+  contadas e só a última retomada envia save-on.
+- stage copia o mundo para .<mundo>.snapshot, na mesma pasta de mundos
+  (mesmo sistema de arquivos), usando reflink (copy-on-write, instantâneo
+  em Btrfs, XFS e APFS) quando possível. Sem reflink, tabelas LevelDB
+  imutáveis viram hardlinks e o resto é copiado: o jogo altera regiões
+  .mca no lugar, então um hardlink delas não ficaria congelado.
+"""
+
+import errno
+import os
+import shutil
+import sys
+import threading
+
+from backup import leveldb
+
+SNAPSHOT_SUFFIX = ".snapshot"
+# ioctl FICLONE do Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+# erros que indicam "sistema de arquivos sem reflink"
+_NO_REFLINK = {
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EPERM,
+}
+
+
+def snapshot_path(worlds_path, world):
+    """Pasta de staging do snapshot do mundo"""
+    return os.path.join(worlds_path, f".{world}{SNAPSHOT_SUFFIX}")
+
+
+def _reflink_linux(src, dst):
+    import fcntl
+
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+
+
+def _reflink_macos(src, dst):
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), src)
+
+
+def reflink(src, dst):
+    """Clona src em dst sem copiar dados; OSError se não suportado"""
+    if sys.platform.startswith("linux"):
+        try:
+            _reflink_linux(src, dst)
+        except BaseException:
+            if os.path.exists(dst):
+                os.remove(dst)
+            raise
+    elif sys.platform == "darwin":
+        _reflink_macos(src, dst)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "reflink não suportado", src)
+    shutil.copystat(src, dst)
+
+
+def stage(src, dst, use_reflink=True, use_hardlinks=True):
+    """Copia o mundo src para dst (que não pode existir).
+
+    Retorna contadores: arquivos por método (reflink, hardlink, copy) e
+    bytes efetivamente copiados. mtimes são preservados, para que o
+    backup incremental reconheça arquivos inalterados.
+    """
+    stats = {"files": 0, "reflink": 0, "hardlink": 0, "copy": 0, "bytes": 0}
+    for root, dirs, names in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        target_root = os.path.normpath(os.path.join(dst, rel_root))
+        os.makedirs(target_root, exist_ok=rel_root != ".")
+        for name in names:
+            path = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            rel = os.path.normpath(os.path.join(rel_root, name))
+            rel = rel.replace(os.sep, "/")
+            try:
+                method = _stage_file(
+                    path, target, rel, use_reflink, use_hardlinks
+                )
+            except FileNotFoundError:
+                # arquivo temporário removido durante a cópia
+                continue
+            if method is None:
+                use_reflink = False
+                method = _stage_file(path, target, rel, False, use_hardlinks)
+            stats["files"] += 1
+            stats[method] += 1
+            if method == "copy":
+                stats["bytes"] += os.path.getsize(target)
+    return stats
+
+
+def _stage_file(path, target, rel, use_reflink, use_hardlinks):
+    """Copia um arquivo; None se o reflink não é suportado aqui"""
+    if use_reflink:
+        try:
+            reflink(path, target)
+            return "reflink"
+        except OSError as e:
+            if e.errno not in _NO_REFLINK:
+                raise
+            return None
+    if use_hardlinks and leveldb.is_immutable_table(rel):
+        try:
+            os.link(path, target)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(path, target)
+    return "copy"
+
+
+class ServerControl:
+    """Pausa e retoma as gravações do servidor via RCON"""
+
+    def __init__(self, rcon):
+        self.rcon = rcon
+        self._paused = 0
+        self._lock = threading.Lock()
+
+    def pause(self):
+        """save-off + save-all flush (só na primeira pausa)"""
+        with self._lock:
+            if self._paused == 0:
+                self.rcon.command("save-off")
+                try:
+                    self.rcon.command("save-all flush")
+                except BaseException:
+                    self.rcon.command("save-on")
+                    raise
+            self._paused += 1
+
+    def resume(self):
+        """save-on quando a última pausa termina"""
+        with self._lock:
+            self._paused -= 1
+            if self._paused == 0:
+                self.rcon.command("save-on")
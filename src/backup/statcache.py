@@ -0,0 +1,133 @@
+"""
+Módulo backup/statcache.py:
+- Define StatCache, manifesto de stat persistido por mundo em
+  <backups>/.state/<mundo>.json: para cada arquivo, tamanho, mtime_ns,
+  ctime_ns, inode e (quando calculado) o SHA-256 do conteúdo.
+- diff compara o mundo com o último backup só com stat; arquivos cujo
+  stat mudou são relidos e o hash fica guardado, então depois disso um
+  simples "touch" não conta como alteração.
+- Arquivos gravados perto do momento da varredura ("racy", como no git)
+  não são confiáveis pelo stat: o hash é guardado e conferido depois, o
+  que cobre reescritas de mesmo tamanho no mesmo tick de mtime e mtimes
+  no futuro (relógio adiantado). A comparação de stat é por igualdade,
+  então mtimes que voltam no tempo também contam como mudança.
+"""
+
+import json
+import os
+import time
+
+from backup import store
+from backup.restore import file_sha256
+
+STATE_DIR = ".state"
+STATE_FORMAT = "mvp-statcache/1"
+# arquivos com mtime até 2s antes da varredura são "racy" (FAT tem 2s)
+RACY_NS = 2 * 10**9
+
+
+def _stat_key(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino]
+
+
+class Changes:
+    """Resultado de StatCache.diff"""
+
+    def __init__(self, base, mode, scanned_ns):
+        self.base = base
+        self.mode = mode
+        self.scanned_ns = scanned_ns
+        self.snapshot = {}
+        self.changed = set()
+        self.removed = set()
+
+    @property
+    def clean(self):
+        """True se nada mudou desde o backup base"""
+        return self.base is not None and not (self.changed or self.removed)
+
+    def unchanged(self, rel, st):
+        """True se o arquivo (stat `st`) não mudou desde o backup base.
+
+        Além de fora de `changed`, o arquivo precisa ter o tamanho e o
+        mtime_ns vistos na varredura: uma gravação feita depois dela, mesmo
+        de mesmo tamanho, obriga a reler o arquivo.
+        """
+        scanned = self.snapshot.get(rel)
+        return (
+            rel not in self.changed
+            and scanned is not None
+            and scanned[:2] == [st.st_size, st.st_mtime_ns]
+        )
+
+
+class StatCache:
+    """Manifesto de stat do mundo no momento do último backup"""
+
+    def __init__(self, backup_dir, world):
+        self.backup_dir = backup_dir
+        self.world = world
+        self.path = os.path.join(backup_dir, STATE_DIR, f"{world}.json")
+
+    def load(self):
+        """Lê o estado salvo; None se ausente, inválido ou órfão"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("format") != STATE_FORMAT:
+            return None
+        base = state.get("backup")
+        # backup apagado (retenção, usuário): o estado não vale mais
+        if not base or not os.path.exists(os.path.join(self.backup_dir, base)):
+            return None
+        return state
+
+    def diff(self, src):
+        """Compara o mundo com o estado salvo e retorna Changes"""
+        state = self.load() or {}
+        files = state.get("files", {})
+        racy_before = state.get("scanned_ns", 0) - RACY_NS
+        changes = Changes(
+            state.get("backup"), state.get("mode"), time.time_ns()
+        )
+        for abs_file, rel in store.walk_files(src):
+            try:
+                st = os.stat(abs_file)
+            except FileNotFoundError:
+                continue
+            key = _stat_key(st)
+            prev = files.get(rel)
+            entry = key + [None]
+            if prev is None:
+                changes.changed.add(rel)
+            elif prev[:4] == key and prev[1] < racy_before:
+                entry[4] = prev[4]
+            else:
+                # stat mudou (ou não é confiável): decide pelo conteúdo
+                entry[4] = file_sha256(abs_file)
+                if prev[4] is None or entry[4] != prev[4]:
+                    changes.changed.add(rel)
+            if entry[4] is None and key[1] >= changes.scanned_ns - RACY_NS:
+                # racy: o hash (antes do backup) é conferido na próxima vez
+                entry[4] = file_sha256(abs_file)
+            changes.snapshot[rel] = entry
+        changes.removed = set(files) - set(changes.snapshot)
+        return changes
+
+    def save(self, changes, backup, mode):
+        """Grava o snapshot (tirado antes do backup) como novo estado"""
+        state = {
+            "format": STATE_FORMAT,
+            "world": self.world,
+            "backup": backup,
+            "mode": mode,
+            "scanned_ns": changes.scanned_ns,
+            "files": changes.snapshot,
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
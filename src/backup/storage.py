@@ -0,0 +1,714 @@
+"""
+Módulo backup/storage.py:
+- Destinos remotos para cópias dos backups: LocalStorage (outra pasta,
+  ex.: disco externo ou NAS montado) e S3Storage (serviços compatíveis
+  com S3: AWS, MinIO, Backblaze B2, Cloudflare R2), com assinatura SigV4
+  feita só com a biblioteca padrão.
+- Os backups .zip e .tar.zst sobem enquanto são gravados: o escritor do
+  arquivo grava em um TeeWriter, que escreve no disco e alimenta o envio.
+  No S3 o envio é multipart, com as partes subindo em paralelo
+  (`workers` threads) e no máximo workers+1 partes na memória.
+- O envio é retomável: o upload id e as partes concluídas ficam em
+  <backups>/.uploads/<backup>.json. Se a rede cair, o backup local
+  termina normalmente e upload_file continua de onde parou, reenviando
+  só as partes que faltam (as já enviadas são conferidas pelo MD5/ETag).
+- `throttle` (ex.: fleet.TokenBucket) limita a banda de envio em bytes/s,
+  compartilhada entre as partes.
+"""
+
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+# o S3 exige partes de ao menos 5 MiB (menos a última)
+PART_SIZE = 8 * 1024 * 1024
+DEFAULT_WORKERS = 4
+RETRIES = 3
+RETRY_DELAY = 0.5
+UPLOADS_DIR = ".uploads"
+PARTIAL_SUFFIX = ".partial"
+
+
+class StorageError(Exception):
+    """Falha ao enviar, listar ou baixar no destino remoto"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def journal_path(backup_dir, name):
+    """Arquivo com o estado do envio retomável do backup"""
+    return os.path.join(backup_dir, UPLOADS_DIR, name + ".json")
+
+
+def _load_journal(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_journal(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _file_parts(path, part_size):
+    """Lista de (número, offset, tamanho) das partes do arquivo"""
+    size = os.path.getsize(path)
+    count = max(1, -(-size // part_size))
+    return [
+        (n + 1, n * part_size, min(part_size, size - n * part_size))
+        for n in range(count)
+    ]
+
+
+def _read_part(path, offset, size):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+class TeeWriter:
+    """Grava no arquivo local e alimenta o envio.
+
+    Uma falha no envio fica em upload.error e não interrompe o backup
+    local; o envio é retomado depois (ver upload_file).
+    """
+
+    def __init__(self, fileobj, upload):
+        self.fileobj = fileobj
+        self.upload = upload
+
+    def write(self, data):
+        self.fileobj.write(data)
+        if self.upload.error is None:
+            try:
+                self.upload.write(data)
+            except Exception as e:
+                self.upload.error = e
+        return len(data)
+
+    def flush(self):
+        self.fileobj.flush()
+
+
+class LocalStorage:
+    """Cópias dos backups em outra pasta"""
+
+    def __init__(self, root, throttle=None):
+        self.root = root
+        self.throttle = throttle
+
+    def _path(self, name):
+        parts = [p for p in name.split("/") if p not in ("", ".")]
+        if not parts or ".." in parts:
+            raise StorageError(f"Nome inválido: {name!r}")
+        return os.path.join(self.root, *parts)
+
+    def open_upload(self, name, journal=None):
+        """Envio alimentado por write(); o arquivo aparece no complete()"""
+        return LocalUpload(self, name)
+
+    def upload_file(self, path, name, journal=None):
+        """Copia o arquivo, continuando de um .partial anterior.
+
+        Retorna {"bytes_sent", "bytes_reused"}.
+        """
+        dst = self._path(name)
+        partial = dst + PARTIAL_SUFFIX
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        size = os.path.getsize(path)
+        try:
+            offset = os.path.getsize(partial)
+        except FileNotFoundError:
+            offset = 0
+        if offset > size:
+            offset = 0
+        sent = 0
+        with open(path, "rb") as src, open(partial, "ab") as out:
+            out.truncate(offset)
+            src.seek(offset)
+            for block in iter(lambda: src.read(CHUNK_SIZE), b""):
+                if self.throttle is not None:
+                    self.throttle.consume(len(block))
+                out.write(block)
+                sent += len(block)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(partial, dst)
+        return {"bytes_sent": sent, "bytes_reused": offset}
+
+    def download(self, name, dst):
+        """Copia o backup remoto para dst"""
+        try:
+            src = open(self._path(name), "rb")
+        except FileNotFoundError:
+            raise StorageError(f"{name}: não encontrado no destino", 404)
+        with src, open(dst, "wb") as out:
+            for block in iter(lambda: src.read(CHUNK_SIZE), b""):
+                out.write(block)
+
+    def list(self, prefix=""):
+        """{nome: tamanho} dos backups enviados, filtrados pelo prefixo"""
+        found = {}
+        for root, _, files in os.walk(self.root):
+            for fname in files:
+                if fname.endswith(PARTIAL_SUFFIX):
+                    continue
+                path = os.path.join(root, fname)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    found[name] = os.path.getsize(path)
+        return found
+
+    def delete(self, name):
+        _remove(self._path(name))
+
+
+class LocalUpload:
+    """Envio em streaming para LocalStorage"""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.error = None
+        self._dst = storage._path(name)
+        os.makedirs(os.path.dirname(self._dst), exist_ok=True)
+        self._out = open(self._dst + PARTIAL_SUFFIX, "wb")
+
+    def write(self, data):
+        if self.storage.throttle is not None:
+            self.storage.throttle.consume(len(data))
+        self._out.write(data)
+
+    def complete(self):
+        if self.error is not None:
+            self._out.close()
+            raise StorageError(
+                f"Envio de {self.name} incompleto: {self.error}"
+            )
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._out.close()
+        os.replace(self._dst + PARTIAL_SUFFIX, self._dst)
+
+    def abort(self):
+        self._out.close()
+        _remove(self._dst + PARTIAL_SUFFIX)
+
+
+def _quote(value, safe="-_.~"):
+    return urllib.parse.quote(value, safe=safe)
+
+
+def _canonical_query(query):
+    return "&".join(
+        f"{_quote(k)}={_quote(str(v))}" for k, v in sorted(query.items())
+    )
+
+
+def _hmac(key, msg):
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_v4(
+    method,
+    path,
+    query,
+    headers,
+    payload_hash,
+    access_key,
+    secret_key,
+    region,
+    amz_date,
+):
+    """Cabeçalho Authorization (AWS Signature Version 4) da requisição.
+
+    Todos os `headers` entram na assinatura; devem incluir host,
+    x-amz-date e x-amz-content-sha256.
+    """
+    values = {k.lower(): " ".join(str(v).split()) for k, v in headers.items()}
+    names = sorted(values)
+    canonical = "\n".join(
+        [
+            method,
+            _quote(path, safe="/-_.~"),
+            _canonical_query(query),
+            "".join(f"{n}:{values[n]}\n" for n in names),
+            ";".join(names),
+            payload_hash,
+        ]
+    )
+    date = amz_date[:8]
+    scope = f"{date}/{region}/s3/aws4_request"
+    to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+        ]
+    )
+    key = ("AWS4" + secret_key).encode("utf-8")
+    for part in (date, region, "s3", "aws4_request"):
+        key = _hmac(key, part)
+    signature = hmac.new(
+        key, to_sign.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={';'.join(names)}, Signature={signature}"
+    )
+
+
+def _xml_find(root, tag):
+    """Elementos com o nome `tag`, ignorando o namespace"""
+    return [e for e in root.iter() if e.tag.rsplit("}", 1)[-1] == tag]
+
+
+def _xml_text(root, tag, default=None):
+    found = _xml_find(root, tag)
+    return found[0].text if found else default
+
+
+def _error_code(data):
+    try:
+        return _xml_text(ET.fromstring(data), "Code", "")
+    except ET.ParseError:
+        return ""
+
+
+class S3Client:
+    """Requisições assinadas a um serviço compatível com S3 (path-style).
+
+    Cada thread usa sua própria conexão; erros de rede e respostas 5xx
+    são repetidos até RETRIES vezes.
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        bucket,
+        access_key,
+        secret_key,
+        region="us-east-1",
+        timeout=60,
+    ):
+        url = urllib.parse.urlsplit(endpoint)
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise ValueError(f"Endpoint inválido: {endpoint}")
+        if not access_key or not secret_key:
+            raise ValueError("Credenciais do S3 ausentes")
+        self.scheme = url.scheme
+        self.host = url.netloc
+        self.base = url.path.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.scheme == "https":
+                conn = http.client.HTTPSConnection(
+                    self.host, timeout=self.timeout
+                )
+            else:
+                conn = http.client.HTTPConnection(
+                    self.host, timeout=self.timeout
+                )
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def request(
+        self, method, key="", query=None, body=b"", ok=(200,), sink=None
+    ):
+        """Envia a requisição e retorna (status, cabeçalhos, corpo).
+
+        Com `sink`, o corpo de uma resposta bem-sucedida é copiado em
+        blocos para o arquivo, sem ficar na memória.
+        """
+        query = query or {}
+        path = f"{self.base}/{self.bucket}"
+        if key:
+            path += "/" + key
+        url = _quote(path, safe="/-_.~")
+        if query:
+            url += "?" + _canonical_query(query)
+        payload_hash = hashlib.sha256(body).hexdigest()
+        error = None
+        for attempt in range(RETRIES):
+            if attempt:
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            headers = {
+                "host": self.host,
+                "x-amz-content-sha256": payload_hash,
+                "x-amz-date": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()),
+            }
+            headers["Authorization"] = sign_v4(
+                method,
+                path,
+                query,
+                headers,
+                payload_hash,
+                self.access_key,
+                self.secret_key,
+                self.region,
+                headers["x-amz-date"],
+            )
+            try:
+                conn = self._connection()
+                conn.request(method, url, body=body, headers=headers)
+                resp = conn.getresponse()
+                if resp.status in ok and sink is not None:
+                    for block in iter(lambda: resp.read(CHUNK_SIZE), b""):
+                        sink.write(block)
+                    data = b""
+                else:
+                    data = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._reset()
+                error = StorageError(f"{method} {path}: {e}")
+                if sink is not None:
+                    # parte do corpo já foi copiada: não dá para repetir
+                    raise error
+                continue
+            if resp.status in ok:
+                return resp.status, resp.headers, data
+            error = StorageError(
+                f"{method} {path}: HTTP {resp.status} {_error_code(data)}",
+                resp.status,
+            )
+            if resp.status < 500:
+                raise error
+        raise error
+
+
+class S3Storage:
+    """Cópias dos backups em um bucket S3, sob `prefix`"""
+
+    def __init__(
+        self,
+        client,
+        prefix="",
+        part_size=PART_SIZE,
+        workers=None,
+        throttle=None,
+    ):
+        if part_size <= 0:
+            raise ValueError(f"part_size inválido: {part_size}")
+        self.client = client
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.part_size = part_size
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.throttle = throttle
+
+    def _key(self, name):
+        return self.prefix + name
+
+    def _create(self, name):
+        _, _, data = self.client.request(
+            "POST", self._key(name), {"uploads": ""}
+        )
+        upload_id = _xml_text(ET.fromstring(data), "UploadId")
+        if not upload_id:
+            raise StorageError(f"{name}: resposta sem UploadId")
+        return upload_id
+
+    def _upload_part(self, name, upload_id, number, data):
+        """Envia uma parte e retorna o ETag (MD5 do conteúdo)"""
+        if self.throttle is not None:
+            self.throttle.consume(len(data))
+        _, headers, _ = self.client.request(
+            "PUT",
+            self._key(name),
+            {"partNumber": str(number), "uploadId": upload_id},
+            data,
+        )
+        etag = (headers.get("ETag") or "").strip('"')
+        if etag != hashlib.md5(data).hexdigest():
+            raise StorageError(f"{name}: ETag da parte {number} não confere")
+        return etag
+
+    def _complete(self, name, upload_id, etags):
+        parts = "".join(
+            f"<Part><PartNumber>{n}</PartNumber>"
+            f'<ETag>"{etags[n]}"</ETag></Part>'
+            for n in sorted(etags)
+        )
+        body = (
+            "<CompleteMultipartUpload>" + parts + "</CompleteMultipartUpload>"
+        ).encode("utf-8")
+        _, _, data = self.client.request(
+            "POST", self._key(name), {"uploadId": upload_id}, body
+        )
+        # o S3 pode responder 200 com um erro no corpo
+        if ET.fromstring(data).tag.rsplit("}", 1)[-1] == "Error":
+            raise StorageError(f"{name}: {_error_code(data)}")
+
+    def _abort(self, name, upload_id):
+        self.client.request(
+            "DELETE", self._key(name), {"uploadId": upload_id}, ok=(200, 204)
+        )
+
+    def _list_parts(self, name, upload_id):
+        """{número: (ETag, tamanho)} das partes já recebidas"""
+        parts = {}
+        marker = "0"
+        while True:
+            _, _, data = self.client.request(
+                "GET",
+                self._key(name),
+                {"uploadId": upload_id, "part-number-marker": marker},
+            )
+            root = ET.fromstring(data)
+            for part in _xml_find(root, "Part"):
+                number = int(_xml_text(part, "PartNumber"))
+                etag = _xml_text(part, "ETag", "").strip('"')
+                parts[number] = (etag, int(_xml_text(part, "Size", "0")))
+            if _xml_text(root, "IsTruncated") != "true":
+                return parts
+            marker = _xml_text(root, "NextPartNumberMarker")
+
+    def open_upload(self, name, journal=None):
+        """Envio multipart alimentado por write() (ver MultipartUpload)"""
+        return MultipartUpload(self, name, journal)
+
+    def upload_file(self, path, name, journal=None):
+        """Envia o arquivo em partes paralelas, retomando pelo `journal`.
+
+        Partes que o servidor já tem (mesmo tamanho e MD5) não são
+        reenviadas. Retorna {"bytes_sent", "bytes_reused"}.
+        """
+        state = _load_journal(journal) if journal else None
+        upload_id = None
+        done = {}
+        if (
+            state
+            and state.get("name") == name
+            and state.get("part_size") == self.part_size
+        ):
+            upload_id = state["upload_id"]
+            try:
+                done = self._list_parts(name, upload_id)
+            except StorageError as e:
+                # envio expirado ou abortado no servidor: recomeça
+                if e.status != 404:
+                    raise
+                upload_id = None
+        if upload_id is None:
+            upload_id = self._create(name)
+        state = {
+            "name": name,
+            "upload_id": upload_id,
+            "part_size": self.part_size,
+            "parts": {},
+        }
+        lock = threading.Lock()
+        if journal:
+            _save_journal(journal, state)
+
+        def one(part):
+            number, offset, size = part
+            data = _read_part(path, offset, size)
+            known = done.get(number)
+            etag = hashlib.md5(data).hexdigest()
+            reused = known == (etag, size)
+            if not reused:
+                etag = self._upload_part(name, upload_id, number, data)
+            with lock:
+                state["parts"][str(number)] = etag
+                if journal:
+                    _save_journal(journal, state)
+            return number, etag, size, reused
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(one, _file_parts(path, self.part_size)))
+        self._complete(name, upload_id, {r[0]: r[1] for r in results})
+        if journal:
+            _remove(journal)
+        return {
+            "bytes_sent": sum(r[2] for r in results if not r[3]),
+            "bytes_reused": sum(r[2] for r in results if r[3]),
+        }
+
+    def download(self, name, dst):
+        """Baixa o backup remoto para dst em streaming"""
+        with open(dst, "wb") as out:
+            self.client.request("GET", self._key(name), sink=out)
+
+    def list(self, prefix=""):
+        """{nome: tamanho} dos objetos sob o prefixo (ListObjectsV2)"""
+        found = {}
+        query = {"list-type": "2", "prefix": self._key(prefix)}
+        while True:
+            _, _, data = self.client.request("GET", "", query)
+            root = ET.fromstring(data)
+            for item in _xml_find(root, "Contents"):
+                key = _xml_text(item, "Key")
+                found[key[len(self.prefix) :]] = int(_xml_text(item, "Size"))
+            token = _xml_text(root, "NextContinuationToken")
+            if _xml_text(root, "IsTruncated") != "true" or not token:
+                return found
+            query = dict(query, **{"continuation-token": token})
+
+    def delete(self, name):
+        self.client.request("DELETE", self._key(name), ok=(200, 204))
+
+
+class MultipartUpload:
+    """Envio multipart alimentado por write(); as partes sobem em paralelo.
+
+    O estado (upload id e partes concluídas) vai para `journal` a cada
+    parte, para que upload_file possa retomar o envio se ele falhar.
+    """
+
+    def __init__(self, storage, name, journal=None):
+        self.storage = storage
+        self.name = name
+        self.journal = journal
+        self.error = None
+        self.upload_id = storage._create(name)
+        self._buffer = bytearray()
+        self._count = 0
+        self._etags = {}
+        self._lock = threading.Lock()
+        # limita as partes na memória (na fila + sendo enviadas)
+        self._slots = threading.Semaphore(storage.workers + 1)
+        self._pool = ThreadPoolExecutor(max_workers=storage.workers)
+        self._save()
+
+    def _save(self):
+        if not self.journal:
+            return
+        _save_journal(
+            self.journal,
+            {
+                "name": self.name,
+                "upload_id": self.upload_id,
+                "part_size": self.storage.part_size,
+                "parts": {str(n): e for n, e in self._etags.items()},
+            },
+        )
+
+    def write(self, data):
+        if self.error is not None:
+            return
+        self._buffer += data
+        size = self.storage.part_size
+        while len(self._buffer) >= size:
+            self._submit(bytes(self._buffer[:size]))
+            del self._buffer[:size]
+
+    def _submit(self, data):
+        self._count += 1
+        self._slots.acquire()
+        self._pool.submit(self._send, self._count, data)
+
+    def _send(self, number, data):
+        try:
+            if self.error is not None:
+                return
+            etag = self.storage._upload_part(
+                self.name, self.upload_id, number, data
+            )
+            with self._lock:
+                self._etags[number] = etag
+                self._save()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._slots.release()
+
+    def complete(self):
+        """Envia a última parte e conclui o envio.
+
+        Se alguma parte falhou, levanta StorageError e mantém o journal
+        para a retomada.
+        """
+        if self.error is None and (self._buffer or not self._count):
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        self._pool.shutdown(wait=True)
+        if self.error is not None:
+            raise StorageError(
+                f"Envio de {self.name} incompleto: {self.error}"
+            )
+        self.storage._complete(self.name, self.upload_id, self._etags)
+        if self.journal:
+            _remove(self.journal)
+
+    def abort(self):
+        """Descarta o envio (backup local cancelado ou com falha)"""
+        self.error = self.error or StorageError("envio cancelado")
+        self._pool.shutdown(wait=True)
+        try:
+            self.storage._abort(self.name, self.upload_id)
+        except StorageError:
+            pass
+        if self.journal:
+            _remove(self.journal)
+
+
+def from_url(url, throttle=None):
+    """Cria o destino a partir de uma URL.
+
+    s3://bucket/prefixo?endpoint=https://...&region=...&part_mb=8&workers=4
+    usa as credenciais de AWS_ACCESS_KEY_ID e AWS_SECRET_ACCESS_KEY; sem
+    endpoint, vale o da AWS na região. Qualquer outro valor (ou file://)
+    é uma pasta local.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme != "s3":
+        if parsed.scheme == "file":
+            url = urllib.parse.unquote(parsed.path)
+        return LocalStorage(url, throttle)
+    if not parsed.netloc:
+        raise ValueError(f"URL sem bucket: {url}")
+    options = dict(urllib.parse.parse_qsl(parsed.query))
+    region = options.get("region", "us-east-1")
+    client = S3Client(
+        options.get("endpoint", f"https://s3.{region}.amazonaws.com"),
+        parsed.netloc,
+        os.environ.get("AWS_ACCESS_KEY_ID"),
+        os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        region,
+    )
+    part_mb = float(options.get("part_mb", PART_SIZE / (1024 * 1024)))
+    return S3Storage(
+        client,
+        parsed.path,
+        part_size=int(part_mb * 1024 * 1024),
+        workers=int(options.get("workers", DEFAULT_WORKERS)),
+        throttle=throttle,
+    )
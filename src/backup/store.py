@@ -0,0 +1,394 @@
+"""
+Módulo backup/store.py:
+- Define BlobStore, armazenamento endereçado por conteúdo (SHA-256).
+- Cada conteúdo é gravado uma única vez em objects/<2 hex>/<hash>.
+- Manifestos (.manifest.json) descrevem um backup incremental como
+  lista de arquivos apontando para blobs do armazenamento.
+- Regiões Anvil (.mca) são gravadas chunk a chunk: cada entrada guarda
+  [índice, timestamp, offset, setores, hash] e só chunks alterados são lidos.
+  O timestamp do chunk tem resolução de 1 s: chunks gravados perto do
+  backup anterior ("racy", como em statcache.py) são sempre relidos.
+- Tabelas LevelDB (.ldb) de mundos Bedrock são reaproveitadas por nome e
+  tamanho (ver leveldb.py).
+- BlobStore conta os bytes lidos (bytes_hashed) e os gravados em blobs
+  novos (bytes_written), usados nas métricas do backup.
+- Blobs reaproveitados por conteúdo têm o mtime renovado, para que a
+  coleta de lixo (ver retention.py) não os apague durante um backup.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+
+from backup import anvil, codec, leveldb, tarzst
+from backup.metrics import Metrics
+
+# Extensão dos manifestos de backups incrementais
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_FORMAT = "mvp-manifest/1"
+
+# Prefixos de 1 byte que identificam o codec do blob
+BLOB_ZLIB = b"z"
+BLOB_STORED = b"s"
+
+# Tamanho do bloco de leitura/escrita em streaming
+CHUNK_SIZE = 1024 * 1024
+
+# chunks com timestamp até 2s antes do backup anterior são "racy" (como
+# statcache.RACY_NS): podem ter sido regravados no mesmo segundo
+RACY_SECONDS = 2
+
+
+class IntegrityError(ValueError):
+    """Conteúdo restaurado não confere com o hash registrado"""
+
+
+class BlobStore:
+    """Armazena conteúdos de arquivos deduplicados por hash SHA-256"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.bytes_hashed = 0
+        self.bytes_written = 0
+
+    def path_for(self, digest):
+        """Retorna o caminho do blob para o hash informado"""
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def has(self, digest):
+        """Indica se o blob já existe no armazenamento"""
+        return os.path.exists(self.path_for(digest))
+
+    def touch(self, digest):
+        """True se o blob existe; renova o mtime (ver retention.GC_GRACE).
+
+        Todo reaproveitamento de blob por um backup novo passa por aqui,
+        para que o GC não apague o blob enquanto o manifesto é montado.
+        """
+        try:
+            os.utime(self.path_for(digest))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _commit(self, tmp_path, digest):
+        """Move o arquivo temporário para o destino final do blob"""
+        dst = self.path_for(digest)
+        if self.touch(digest):
+            os.remove(tmp_path)
+            return
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        self.bytes_written += os.path.getsize(tmp_path)
+        os.replace(tmp_path, dst)
+
+    def _tempfile(self):
+        os.makedirs(self.objects_dir, exist_ok=True)
+        return tempfile.mkstemp(prefix=".tmp-", dir=self.objects_dir)
+
+    def put_bytes(self, data):
+        """Grava bytes no armazenamento e retorna o hash"""
+        digest = hashlib.sha256(data).hexdigest()
+        self.bytes_hashed += len(data)
+        if self.touch(digest):
+            return digest
+        fd, tmp = self._tempfile()
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if codec.is_compressible(data):
+                    out.write(BLOB_ZLIB)
+                    out.write(zlib.compress(data))
+                else:
+                    out.write(BLOB_STORED)
+                    out.write(data)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._commit(tmp, digest)
+        return digest
+
+    def put_file(self, path):
+        """Lê arquivo em streaming, grava o blob e retorna (hash, tamanho)"""
+        sha = hashlib.sha256()
+        comp = None
+        size = 0
+        fd, tmp = self._tempfile()
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+                block = src.read(CHUNK_SIZE)
+                # conteúdo já comprimido é guardado como está
+                if codec.is_compressible(codec.sample(block, path)):
+                    comp = zlib.compressobj()
+                    out.write(BLOB_ZLIB)
+                else:
+                    out.write(BLOB_STORED)
+                while block:
+                    size += len(block)
+                    sha.update(block)
+                    out.write(comp.compress(block) if comp else block)
+                    block = src.read(CHUNK_SIZE)
+                if comp:
+                    out.write(comp.flush())
+        except BaseException:
+            os.remove(tmp)
+            raise
+        digest = sha.hexdigest()
+        self.bytes_hashed += size
+        self._commit(tmp, digest)
+        return digest, size
+
+    def iter_blob(self, digest):
+        """Itera sobre o conteúdo descomprimido de um blob"""
+        with open(self.path_for(digest), "rb") as f:
+            tag = f.read(1)
+            if tag == BLOB_STORED:
+                while True:
+                    block = f.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    yield block
+            elif tag == BLOB_ZLIB:
+                dec = zlib.decompressobj()
+                while True:
+                    block = f.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    yield dec.decompress(block)
+                yield dec.flush()
+            else:
+                raise ValueError(f"Blob com codec desconhecido: {digest}")
+
+    def read(self, digest):
+        """Retorna o conteúdo completo de um blob"""
+        return b"".join(self.iter_blob(digest))
+
+    def write_to(self, digest, dst):
+        """Reconstrói o blob em dst e retorna o SHA-256 do que foi escrito"""
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        sha = hashlib.sha256()
+        with open(dst, "wb") as out:
+            for block in self.iter_blob(digest):
+                sha.update(block)
+                out.write(block)
+        return sha.hexdigest()
+
+
+def is_manifest(fname):
+    """Indica se o nome de arquivo corresponde a um manifesto"""
+    return fname.lower().endswith(MANIFEST_SUFFIX)
+
+
+def load_manifest(path):
+    """Lê um manifesto JSON do disco"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    """Grava o manifesto de forma atômica (temporário + fsync + rename)"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def backup_sort_key(name):
+    """Chave de ordenação cronológica que entende o sufixo -N de colisão"""
+    if is_manifest(name):
+        stem = name[: -len(MANIFEST_SUFFIX)]
+    elif tarzst.is_tarzst(name):
+        stem = name[: -len(tarzst.SUFFIX)]
+    else:
+        stem = os.path.splitext(name)[0]
+    base, sep, n = stem.rpartition("-")
+    if sep and n.isdigit():
+        return base, int(n)
+    return stem, 1
+
+
+def latest_manifest(backup_dir, world_name):
+    """Retorna (caminho, manifesto) do backup incremental mais recente"""
+    prefix = world_name + "_"
+    try:
+        names = sorted(
+            (
+                n
+                for n in os.listdir(backup_dir)
+                if n.startswith(prefix) and is_manifest(n)
+            ),
+            key=backup_sort_key,
+            reverse=True,
+        )
+    except FileNotFoundError:
+        return None, None
+    for name in names:
+        path = os.path.join(backup_dir, name)
+        try:
+            manifest = load_manifest(path)
+        except (OSError, ValueError):
+            continue
+        if manifest.get("world") == world_name:
+            return path, manifest
+    return None, None
+
+
+def walk_files(src):
+    """Lista (caminho absoluto, relativo com "/") na ordem de captura"""
+    found = []
+    for root, _, names in os.walk(src):
+        for name in names:
+            abs_file = os.path.join(root, name)
+            rel = os.path.relpath(abs_file, src).replace(os.sep, "/")
+            found.append((abs_file, rel))
+    found.sort(key=lambda item: leveldb.read_priority(item[1]))
+    return found
+
+
+def build_manifest(store, src, previous=None, progress=None, changes=None):
+    """Percorre o mundo e retorna a lista de arquivos do manifesto.
+
+    Arquivos com mesmo tamanho e mtime_ns do manifesto anterior reutilizam
+    o hash anterior sem leitura (custo de um stat e uma consulta). Tabelas
+    LevelDB imutáveis só precisam de mesmo nome e tamanho. `progress`
+    (ver progress.py) recebe o tamanho de cada arquivo processado e os
+    tempos das fases walk e store. Com `changes` (statcache.Changes do
+    manifesto anterior), só são relidos os arquivos alterados desde ele ou
+    desde a varredura; os demais reaproveitam o manifesto anterior.
+    """
+    metrics = progress.metrics if progress is not None else Metrics()
+    prev_files = {}
+    if previous:
+        prev_files = {e["path"]: e for e in previous.get("files", [])}
+    racy_after = _racy_after(previous)
+    files = []
+    with metrics.phase("walk"):
+        found = walk_files(src)
+    for abs_file, rel in found:
+        if progress is not None:
+            progress.check()
+        table = leveldb.is_immutable_table(rel)
+        try:
+            st = os.stat(abs_file)
+        except FileNotFoundError:
+            if table:
+                # tabela removida por compactação após a leitura do MANIFEST
+                continue
+            raise
+        prev = prev_files.get(rel)
+        entry = {
+            "path": rel,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        read = False
+        if table:
+            same = True
+        elif changes is not None:
+            same = changes.unchanged(rel, st)
+        else:
+            same = prev and prev["mtime_ns"] == st.st_mtime_ns
+        if (
+            prev
+            and same
+            and prev["size"] == st.st_size
+            and _entry_available(store, prev)
+        ):
+            # stat idêntico: reaproveita blob/chunks sem ler o arquivo
+            for key in ("blob", "chunks"):
+                if key in prev:
+                    entry[key] = prev[key]
+        else:
+            read = True
+            with metrics.phase("store"):
+                chunks = None
+                if anvil.is_region_file(rel):
+                    chunks = _region_chunks(store, abs_file, prev, racy_after)
+                if chunks is not None:
+                    entry["chunks"] = chunks
+                else:
+                    try:
+                        entry["blob"], _ = store.put_file(abs_file)
+                    except FileNotFoundError:
+                        if table:
+                            continue
+                        raise
+            metrics.count("files_read")
+        metrics.count("files")
+        files.append(entry)
+        if progress is not None:
+            progress.advance(st.st_size, read=read)
+    files.sort(key=lambda e: e["path"])
+    return files
+
+
+def _entry_available(store, entry):
+    """Confere se os blobs da entrada ainda existem, renovando o mtime"""
+    if "chunks" in entry:
+        return all(store.touch(c[4]) for c in entry["chunks"])
+    return bool(entry.get("blob")) and store.touch(entry["blob"])
+
+
+def _racy_after(previous):
+    """Timestamp de chunk (s) a partir do qual o manifesto não é confiável"""
+    try:
+        started = datetime.strptime(previous["timestamp"], "%Y%m%d_%H%M%S")
+    except (TypeError, KeyError, ValueError):
+        # sem manifesto ou sem horário: nenhum chunk é reaproveitado
+        return 0
+    return started.timestamp() - RACY_SECONDS
+
+
+def _region_chunks(store, path, prev, racy_after=0):
+    """Grava apenas os chunks alterados de uma região .mca.
+
+    Um chunk com mesmos timestamp, offset e setores do manifesto anterior
+    reaproveita o hash sem ser lido, desde que o timestamp seja anterior a
+    `racy_after` (ver _racy_after). Retorna None se a região for inválida,
+    para que o arquivo seja gravado inteiro.
+    """
+    known = {}
+    if prev and "chunks" in prev:
+        known = {c[0]: c for c in prev["chunks"]}
+    try:
+        chunks = []
+        with open(path, "rb") as f:
+            for idx, offset, sectors, ts in anvil.read_header(f):
+                old = known.get(idx)
+                if (
+                    old
+                    and old[1:4] == [ts, offset, sectors]
+                    and ts < racy_after
+                    and store.touch(old[4])
+                ):
+                    digest = old[4]
+                else:
+                    record = anvil.read_record(f, offset, sectors)
+                    digest = store.put_bytes(record)
+                chunks.append([idx, ts, offset, sectors, digest])
+        return chunks
+    except anvil.RegionError:
+        return None
+
+
+def restore_entry(store, entry, dst):
+    """Reconstrói uma entrada do manifesto (arquivo ou região) em dst.
+
+    O SHA-256 de cada blob é conferido; divergência gera IntegrityError.
+    """
+    if "chunks" in entry:
+        chunks = {}
+        for idx, ts, _, _, digest in entry["chunks"]:
+            record = store.read(digest)
+            if hashlib.sha256(record).hexdigest() != digest:
+                raise IntegrityError(
+                    f"{entry['path']}: chunk {idx} corrompido"
+                )
+            chunks[idx] = (ts, record)
+        anvil.write_region(dst, chunks)
+    elif store.write_to(entry["blob"], dst) != entry["blob"]:
+        raise IntegrityError(f"{entry['path']}: hash não confere")
@@ -0,0 +1,409 @@
+"""
+Módulo backup/tarzst.py:
+- Formato .tar.zst com acesso aleatório: um tar comum em que cada
+  cabeçalho e cada pedaço de até FRAME_SIZE bytes de dados é um frame
+  zstd independente. `zstd -d | tar x` lê o arquivo normalmente.
+- No fim vai a tabela de frames do formato "seekable" do zstd (um frame
+  skippable, ignorado pelos descompressores) com o tamanho comprimido e
+  descomprimido de cada frame; o último membro do tar, metadata.json,
+  traz o índice {arquivo: [frame do cabeçalho, frames de dados, tamanho]}.
+- Ler um arquivo do backup custa ler o rodapé, o metadata.json e só os
+  frames daquele arquivo, sem descomprimir o resto.
+- Os membros são comprimidos em paralelo e gravados em ordem, como no
+  ParallelZipWriter; o perfil (ver codec.py) define o nível do zstd e
+  arquivos já comprimidos usam o nível mais rápido.
+- Depende do pacote zstandard (em requirements.txt); check_available()
+  permite recusar o modo logo de início quando ele falta.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backup import codec
+from backup.metrics import Metrics
+
+SUFFIX = ".tar.zst"
+METADATA_MEMBER = "metadata.json"
+# tamanho descomprimido máximo de cada frame de dados
+FRAME_SIZE = 4 * 1024 * 1024
+BLOCK = tarfile.BLOCKSIZE
+SPOOL_LIMIT = 32 * 1024 * 1024
+# nível do zstd por perfil; dados incompressíveis usam FAST_LEVEL
+LEVELS = {"fast": 1, "balanced": 6, "smallest": 19}
+FAST_LEVEL = 1
+
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+_FOOTER = struct.Struct("<IBI")
+_ENTRY = struct.Struct("<II")
+
+
+class TarZstError(ValueError):
+    """Arquivo .tar.zst inválido ou sem índice"""
+
+
+def is_tarzst(fname):
+    """Indica se o nome corresponde a um backup .tar.zst"""
+    return fname.lower().endswith(SUFFIX)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "O formato .tar.zst exige o pacote zstandard "
+            "(pip install zstandard)"
+        )
+    return zstandard
+
+
+def check_available():
+    """Levanta RuntimeError se o pacote zstandard não está instalado"""
+    _zstd()
+
+
+def _padding(size):
+    return b"\0" * (-size % BLOCK)
+
+
+def _header(arcname, size, mtime, mode):
+    info = tarfile.TarInfo(arcname.replace(os.sep, "/"))
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = mode & 0o7777 or 0o644
+    return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+
+class _Member:
+    """Frames comprimidos de um membro, prontos para gravação"""
+
+    def __init__(self, arcname):
+        self.arcname = arcname
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        # [(tamanho comprimido, tamanho descomprimido)] dos frames
+        self.frames = []
+        self.data = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+
+    def add_frame(self, cctx, raw, metrics):
+        with metrics.phase("compress"):
+            frame = cctx.compress(raw)
+        self.data.write(frame)
+        self.frames.append((len(frame), len(raw)))
+
+
+_local = threading.local()
+
+
+def _compressor(level):
+    """ZstdCompressor da thread (não podem ser compartilhados)"""
+    cache = getattr(_local, "compressors", None)
+    if cache is None:
+        cache = _local.compressors = {}
+    if level not in cache:
+        cache[level] = _zstd().ZstdCompressor(
+            level=level, write_checksum=True, write_content_size=True
+        )
+    return cache[level]
+
+
+def _compress_member(
+    blocks, arcname, mtime, mode, profile, metrics, frame_size=FRAME_SIZE
+):
+    """Comprime cabeçalho e dados; executado nas threads do pool.
+
+    O cabeçalho vai em um frame próprio, gerado depois dos dados, para
+    que o tamanho seja o lido de fato (o mundo pode estar em uso). Com
+    frame_size=None os dados ficam em um único frame.
+    """
+    member = _Member(arcname)
+    try:
+        level = None
+        pending = b""
+        for block in blocks:
+            if level is None:
+                threshold = codec.PROFILES[profile][2]
+                compressible = codec.is_compressible(
+                    codec.sample(block, arcname), threshold
+                )
+                level = LEVELS[profile] if compressible else FAST_LEVEL
+            member.size += len(block)
+            member.sha256.update(block)
+            pending += block
+            while frame_size and len(pending) >= frame_size:
+                raw, pending = pending[:frame_size], pending[frame_size:]
+                member.add_frame(_compressor(level), raw, metrics)
+        if pending:
+            pending += _padding(member.size)
+            member.add_frame(_compressor(level), pending, metrics)
+        header = _header(arcname, member.size, mtime, mode)
+        with metrics.phase("compress"):
+            member.header = _compressor(FAST_LEVEL).compress(header)
+        member.header_size = len(header)
+    except BaseException:
+        member.data.close()
+        raise
+    member.data.seek(0)
+    return member
+
+
+def _file_blocks(path, metrics):
+    with metrics.phase("read"):
+        f = open(path, "rb")
+    with f:
+        while True:
+            with metrics.phase("read"):
+                block = f.read(FRAME_SIZE)
+            if not block:
+                return
+            yield block
+
+
+def _compress_file(path, arcname, profile, metrics):
+    with metrics.phase("read"):
+        st = os.stat(path)
+    blocks = _file_blocks(path, metrics)
+    return _compress_member(
+        blocks,
+        arcname,
+        st.st_mtime,
+        st.st_mode,
+        profile,
+        metrics,
+        frame_size=FRAME_SIZE,
+    )
+
+
+class TarZstWriter:
+    """Escreve um .tar.zst comprimindo os membros em paralelo.
+
+    Como no ParallelZipWriter, no máximo 2 * workers membros ficam
+    comprimidos aguardando gravação; `progress` recebe o tamanho de cada
+    membro gravado e os tempos vão para progress.metrics.
+    """
+
+    def __init__(self, fileobj, workers=None, profile=None, progress=None):
+        _zstd()
+        self.fileobj = fileobj
+        self.progress = progress
+        self.metrics = progress.metrics if progress is not None else Metrics()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.profile = codec.check_profile(profile)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = collections.deque()
+        self._frames = []
+        self._index = {}
+        self._hashes = {}
+        self._offset = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # sem close(metadata) o arquivo fica incompleto
+        if not self._closed:
+            self.abort()
+
+    def add_file(self, path, arcname):
+        """Agenda a compressão de um arquivo do disco"""
+        self._submit(_compress_file, path, arcname, self.profile, self.metrics)
+
+    def _submit(self, fn, *args):
+        self._pending.append(self._pool.submit(fn, *args))
+        while len(self._pending) > 2 * self.workers:
+            self._write_member(self._pending.popleft().result())
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self._offset += len(data)
+
+    def _write_member(self, member):
+        """Grava o frame do cabeçalho e os frames de dados do membro"""
+        try:
+            with self.metrics.phase("write"):
+                first = len(self._frames)
+                self._write(member.header)
+                self._frames.append((len(member.header), member.header_size))
+                while True:
+                    block = member.data.read(1024 * 1024)
+                    if not block:
+                        break
+                    self._write(block)
+                self._frames.extend(member.frames)
+        finally:
+            member.data.close()
+        self._index[member.arcname] = [first, len(member.frames), member.size]
+        self._hashes[member.arcname] = member.sha256.hexdigest()
+        self.metrics.count("files")
+        self.metrics.count("bytes_in", member.size)
+        if self.progress is not None:
+            self.progress.advance(member.size)
+
+    def digests(self):
+        """Grava os membros pendentes e retorna {arcname: SHA-256}"""
+        while self._pending:
+            self._write_member(self._pending.popleft().result())
+        return dict(self._hashes)
+
+    def close(self, metadata):
+        """Grava metadata.json (com o índice), o fim do tar e a tabela"""
+        if self._closed:
+            return
+        try:
+            self.digests()
+            meta = dict(metadata, index=self._index)
+            data = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            # penúltimo frame do arquivo: os leitores o acham pela tabela
+            self._write_member(
+                _compress_member(
+                    [data],
+                    METADATA_MEMBER,
+                    time.time(),
+                    0o644,
+                    self.profile,
+                    self.metrics,
+                    frame_size=None,
+                )
+            )
+            with self.metrics.phase("write"):
+                end = _compressor(FAST_LEVEL).compress(b"\0" * (2 * BLOCK))
+                self._write(end)
+                self._frames.append((len(end), 2 * BLOCK))
+                self._write(self._seek_table())
+            self.metrics.count("bytes_out", self._offset)
+        finally:
+            self._closed = True
+            self._pool.shutdown(wait=True)
+
+    def _seek_table(self):
+        body = b"".join(_ENTRY.pack(c, d) for c, d in self._frames)
+        body += _FOOTER.pack(len(self._frames), 0, SEEKABLE_MAGIC)
+        return struct.pack("<II", SKIPPABLE_MAGIC, len(body)) + body
+
+    def abort(self):
+        """Descarta membros pendentes sem finalizar o arquivo"""
+        self._closed = True
+        for future in self._pending:
+            future.cancel()
+        self._pool.shutdown(wait=True)
+        while self._pending:
+            future = self._pending.popleft()
+            if future.done() and not future.cancelled():
+                if future.exception() is None:
+                    future.result().data.close()
+
+
+def _read_seek_table(f):
+    """Lista de (offset, tamanho comprimido, descomprimido) dos frames"""
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    if end < _FOOTER.size + 8:
+        raise TarZstError("Arquivo .tar.zst sem tabela de frames")
+    f.seek(end - _FOOTER.size)
+    count, descriptor, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+    if magic != SEEKABLE_MAGIC:
+        raise TarZstError("Arquivo .tar.zst sem tabela de frames")
+    # bit 7: cada entrada traz também um checksum de 4 bytes
+    entry_size = _ENTRY.size + (4 if descriptor & 0x80 else 0)
+    table_size = count * entry_size + _FOOTER.size
+    start = end - table_size - 8
+    if start < 0:
+        raise TarZstError("Tabela de frames inválida")
+    f.seek(start)
+    skippable, size = struct.unpack("<II", f.read(8))
+    if skippable != SKIPPABLE_MAGIC or size != table_size:
+        raise TarZstError("Tabela de frames inválida")
+    data = f.read(count * entry_size)
+    frames = []
+    offset = 0
+    for i in range(count):
+        csize, dsize = _ENTRY.unpack_from(data, i * entry_size)
+        frames.append((offset, csize, dsize))
+        offset += csize
+    if offset != start:
+        raise TarZstError("Tabela de frames não confere com o arquivo")
+    return frames
+
+
+class TarZstReader:
+    """Acesso aleatório aos membros; cada thread usa seu próprio handle"""
+
+    def __init__(self, path):
+        _zstd()
+        self.path = path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        with open(path, "rb") as f:
+            self.frames = _read_seek_table(f)
+            if len(self.frames) < 3:
+                raise TarZstError("Arquivo .tar.zst sem metadata.json")
+            raw = self._read_frame(f, len(self.frames) - 2)
+        try:
+            self.metadata = json.loads(raw.rstrip(b"\0"))
+            index = self.metadata.pop("index")
+            self.members = {
+                name: (int(first), int(count), int(size))
+                for name, (first, count, size) in index.items()
+            }
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise TarZstError("Índice do .tar.zst inválido")
+
+    def _handle(self):
+        f = getattr(self._local, "file", None)
+        if f is None:
+            f = open(self.path, "rb")
+            self._local.file = f
+            with self._lock:
+                self._handles.append(f)
+        return f
+
+    def _read_frame(self, f, i):
+        """Descomprime um frame (o checksum do zstd é conferido)"""
+        offset, csize, dsize = self.frames[i]
+        f.seek(offset)
+        data = f.read(csize)
+        if len(data) != csize:
+            raise TarZstError(f"Frame {i} truncado")
+        dctx = getattr(self._local, "dctx", None)
+        if dctx is None:
+            dctx = self._local.dctx = _zstd().ZstdDecompressor()
+        try:
+            raw = dctx.decompress(data, max_output_size=dsize)
+        except _zstd().ZstdError as e:
+            raise TarZstError(f"Frame {i} corrompido: {e}")
+        if len(raw) != dsize:
+            raise TarZstError(f"Frame {i} com tamanho inesperado")
+        return raw
+
+    def iter_member(self, name):
+        """Itera sobre o conteúdo de um membro, frame a frame"""
+        first, count, size = self.members[name]
+        f = self._handle()
+        remaining = size
+        for i in range(first + 1, first + 1 + count):
+            block = self._read_frame(f, i)[:remaining]
+            remaining -= len(block)
+            yield block
+        if remaining:
+            raise TarZstError(f"{name}: dados incompletos")
+
+    def read(self, name):
+        """Conteúdo completo de um membro"""
+        return b"".join(self.iter_member(name))
+
+    def close(self):
+        with self._lock:
+            for f in self._handles:
+                f.close()
+            self._handles.clear()
@@ -0,0 +1,186 @@
+"""
+Módulo backup/worldinfo.py:
+- Extrai metadados de um mundo a partir do level.dat (ver nbt.py): nome,
+  último acesso, versão do jogo, seed e tamanho em disco.
+- WorldIndex guarda esses dados em cache (JSON) por mundo, com chave no
+  stat do level.dat (e do levelname.txt): o Minecraft regrava o level.dat
+  a cada save, então mundos parados nunca são relidos nem re-somados.
+"""
+
+import json
+import os
+
+from backup import nbt
+
+LEVEL_FILES = ("level.dat", "level.dat_old")
+INDEX_FORMAT = "mvp-worlds/1"
+
+
+def dir_size(path):
+    """Soma o tamanho dos arquivos da pasta (recursivo, via scandir)"""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for e in entries:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        total += e.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    return total
+
+
+def _version_name(value):
+    """lastOpenedWithVersion do Bedrock: [1, 20, 81, 1, 0] -> 1.20.81.1"""
+    parts = list(value)
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return ".".join(str(p) for p in parts)
+
+
+def _java_info(root):
+    data = root.get("Data", {})
+    seed = data.get("WorldGenSettings", {}).get("seed")
+    if seed is None:
+        seed = data.get("RandomSeed")
+    last = data.get("LastPlayed")
+    return {
+        "name": data.get("LevelName"),
+        # LastPlayed do Java é em milissegundos
+        "last_played": last / 1000 if last else None,
+        "version": data.get("Version", {}).get("Name"),
+        "seed": seed,
+    }
+
+
+def _bedrock_info(root):
+    version = root.get("lastOpenedWithVersion")
+    return {
+        "name": root.get("LevelName"),
+        "last_played": root.get("LastPlayed") or None,
+        "version": _version_name(version) if version else None,
+        "seed": root.get("RandomSeed"),
+    }
+
+
+def read_level(world_dir):
+    """Lê level.dat (ou level.dat_old); retorna (edição, info) ou None"""
+    for name in LEVEL_FILES:
+        path = os.path.join(world_dir, name)
+        try:
+            edition, root = nbt.read_level_dat(path)
+        except (OSError, nbt.NBTError):
+            continue
+        if edition == "java":
+            return edition, _java_info(root)
+        return edition, _bedrock_info(root)
+    return None
+
+
+def read_world_info(world_dir):
+    """Metadados do mundo; campos ausentes ficam None"""
+    info = {
+        "name": None,
+        "edition": None,
+        "last_played": None,
+        "version": None,
+        "seed": None,
+    }
+    level = read_level(world_dir)
+    if level:
+        info["edition"], found = level
+        info.update(found)
+    # Bedrock: levelname.txt é o nome exibido pelo jogo
+    try:
+        with open(
+            os.path.join(world_dir, "levelname.txt"), "r", encoding="utf-8"
+        ) as f:
+            text = f.read().strip()
+        if text:
+            info["name"] = text
+    except (OSError, UnicodeDecodeError):
+        pass
+    if not info["name"]:
+        info["name"] = os.path.basename(world_dir)
+    info["size"] = dir_size(world_dir)
+    return info
+
+
+def _cache_key(world_dir):
+    key = []
+    for name in LEVEL_FILES[:1] + ("levelname.txt",):
+        try:
+            st = os.stat(os.path.join(world_dir, name))
+            key += [st.st_mtime_ns, st.st_size]
+        except OSError:
+            key += [None, None]
+    return key
+
+
+class WorldIndex:
+    """Cache persistente dos metadados dos mundos"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("format") == INDEX_FORMAT:
+                self._entries = state.get("worlds", {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, world_dir):
+        """Metadados do mundo, relendo só se o level.dat mudou"""
+        self._load()
+        world_dir = os.path.abspath(world_dir)
+        key = _cache_key(world_dir)
+        entry = self._entries.get(world_dir)
+        if entry and entry.get("key") == key:
+            return dict(entry["info"])
+        info = read_world_info(world_dir)
+        self._entries[world_dir] = {"key": key, "info": info}
+        self._dirty = True
+        return dict(info)
+
+    def prune(self, parent, keep):
+        """Esquece mundos de `parent` que não estão mais em `keep`"""
+        self._load()
+        parent = os.path.abspath(parent)
+        keep = {os.path.abspath(k) for k in keep}
+        for world_dir in list(self._entries):
+            if os.path.dirname(world_dir) == parent and world_dir not in keep:
+                del self._entries[world_dir]
+                self._dirty = True
+
+    def save(self):
+        """Grava o cache se algo mudou; falhas de escrita são ignoradas"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"format": INDEX_FORMAT, "worlds": self._entries},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            pass
@@ -0,0 +1,787 @@
+"""
+Módulo cli/commands.py:
+- Subcomandos não interativos (typer) para scripts e agendadores:
+  backup, restore, restore-partial (dimensão, regiões ou área de chunks
+  de um mundo Java, ver backup/partial.py), list, verify, prune
+  (retenção GFS, ver backup/retention.py), export (snapshot de hardlinks
+  para .zip) e diff (o que mudou entre dois backups ou entre um backup e
+  o mundo).
+- --storage (ou MVP_STORAGE) envia os backups .zip e .tar.zst a um
+  destino remoto enquanto são gravados (ver backup/storage.py); upload
+  envia ou retoma os que faltam lá e fetch baixa um de volta.
+- Mundos são escolhidos por padrões glob, comparados com o nome da pasta
+  e com o nome exibido; sem padrão, o comando vale para todos.
+- backup de vários mundos roda em paralelo, limitado por --jobs.
+- --format json imprime só o resultado na saída padrão; as mensagens de
+  cada operação vão para a saída de erro.
+- fleet faz o backup de vários servidores descritos em um arquivo de
+  configuração (ver backup/fleet.py); --backup-dir (ou a variável
+  MVP_BACKUP_DIR) troca a pasta de backups dos demais comandos.
+- Códigos de saída: 0 sucesso, 1 alguma operação falhou, 2 uso inválido,
+  3 nenhum mundo ou backup encontrado, 130 interrompido (Ctrl+C).
+"""
+
+import contextlib
+import fnmatch
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import click
+import typer
+
+from backup import (
+    core,
+    detect_bedrock,
+    detect_java,
+    fleet,
+    partial,
+    retention,
+    storage,
+    store,
+    tarzst,
+)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+EXIT_INTERRUPTED = 130
+
+EDITIONS = ("java", "bedrock")
+
+app = typer.Typer(
+    help="Backup de mundos Minecraft sem menus interativos.",
+    no_args_is_help=True,
+    add_completion=False,
+)
+
+EditionOption = typer.Option(
+    "all",
+    "--edition",
+    "-e",
+    click_type=click.Choice(EDITIONS + ("all",)),
+    help="edição (padrão: todas)",
+)
+WorldsPathOption = typer.Option(
+    None,
+    "--worlds-path",
+    help="pasta de mundos (padrão: detectada; exige --edition)",
+)
+FormatOption = typer.Option(
+    "table",
+    "--format",
+    "-f",
+    click_type=click.Choice(["table", "json"]),
+    help="formato da saída",
+)
+PatternsArgument = typer.Argument(
+    None, help="padrões glob de mundos (padrão: todos)", show_default=False
+)
+
+
+@app.callback()
+def main(
+    backup_dir: Optional[str] = typer.Option(
+        None,
+        "--backup-dir",
+        envvar="MVP_BACKUP_DIR",
+        help="pasta dos backups (padrão: backups_worlds)",
+    ),
+    storage_url: Optional[str] = typer.Option(
+        None,
+        "--storage",
+        envvar="MVP_STORAGE",
+        help="destino remoto: pasta ou s3://bucket/prefixo?endpoint=...",
+    ),
+    upload_limit: Optional[float] = typer.Option(
+        None,
+        "--upload-limit",
+        envvar="MVP_UPLOAD_LIMIT",
+        min=0.01,
+        help="limite de envio em MiB/s",
+    ),
+):
+    """Backup de mundos Minecraft sem menus interativos."""
+    if backup_dir:
+        core.manager.use_backup_dir(backup_dir)
+    if storage_url:
+        throttle = None
+        if upload_limit:
+            throttle = fleet.TokenBucket(upload_limit * 1024 * 1024)
+        try:
+            destination = storage.from_url(storage_url, throttle)
+        except ValueError as e:
+            _fail(str(e), EXIT_USAGE)
+        core.manager.use_storage(destination)
+
+
+def _fail(message, code):
+    typer.echo(f"❌ {message}", err=True)
+    raise typer.Exit(code)
+
+
+def _sources(edition, worlds_path):
+    """Lista de (edição, pasta de mundos) a usar"""
+    editions = EDITIONS if edition == "all" else (edition,)
+    if worlds_path is not None:
+        if edition == "all":
+            _fail("--worlds-path exige --edition java ou bedrock", EXIT_USAGE)
+        if not os.path.isdir(worlds_path):
+            _fail(f"Pasta não encontrada: {worlds_path}", EXIT_NOT_FOUND)
+        return [(edition, worlds_path)]
+    detect = {
+        "java": detect_java.get_java_worlds_path,
+        "bedrock": detect_bedrock.get_bedrock_worlds_path,
+    }
+    sources = [(ed, detect[ed]()) for ed in editions]
+    sources = [(ed, path) for ed, path in sources if path]
+    if not sources:
+        _fail(
+            "Caminho não encontrado. O Minecraft pode não estar instalado.",
+            EXIT_NOT_FOUND,
+        )
+    return sources
+
+
+def _matches(names, patterns):
+    """True se algum dos nomes casa com algum padrão (sem padrão: todos)"""
+    if not patterns:
+        return True
+    return any(
+        fnmatch.fnmatch(name, pattern)
+        for name in names
+        for pattern in patterns
+    )
+
+
+def _backup_rows(edition, patterns):
+    """Backups do catálogo cujos mundos (ou nomes) casam com os padrões"""
+    editions = EDITIONS if edition == "all" else (edition,)
+    return [
+        dict(row, edition=ed)
+        for ed in editions
+        for row in core.manager.backup_rows(ed)
+        if _matches((row["world"], row["name"]), patterns)
+    ]
+
+
+def _find_edition(edition, backup_name):
+    """Edição em que está o backup com esse nome"""
+    found = [
+        row
+        for row in _backup_rows(edition, None)
+        if row["name"] == backup_name
+    ]
+    if not found:
+        _fail(f"Backup não encontrado: {backup_name}", EXIT_NOT_FOUND)
+    if len(found) > 1:
+        _fail(
+            f"{backup_name} existe nas duas edições; use --edition",
+            EXIT_USAGE,
+        )
+    return found[0]["edition"]
+
+
+@contextlib.contextmanager
+def _messages(fmt):
+    """Em JSON, desvia as mensagens das operações para a saída de erro"""
+    if fmt == "json":
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    else:
+        yield
+
+
+def _output(rows, columns, fmt):
+    """Imprime as linhas como tabela alinhada ou lista JSON"""
+    if fmt == "json":
+        data = [{c: row.get(c) for c in columns} for row in rows]
+        typer.echo(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    table = [columns] + [
+        ["" if row.get(c) is None else str(row.get(c)) for c in columns]
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    for line in table:
+        typer.echo(
+            "  ".join(v.ljust(w) for v, w in zip(line, widths)).rstrip()
+        )
+
+
+def _result_row(record):
+    return {
+        "edition": record.get("edition"),
+        "world": record.get("world"),
+        "status": record.get("status"),
+        "backup": record.get("backup"),
+        "seconds": round(record.get("wall_seconds", 0), 3),
+        "error": record.get("error"),
+    }
+
+
+@app.command()
+def backup(
+    patterns: Optional[List[str]] = PatternsArgument,
+    edition: str = EditionOption,
+    worlds_path: Optional[str] = WorldsPathOption,
+    mode: str = typer.Option(
+        "zip",
+        click_type=click.Choice(["zip", "incremental", "tarzst", "hardlink"]),
+    ),
+    description: str = typer.Option("", "--description", "-d"),
+    profile: Optional[str] = typer.Option(
+        None,
+        click_type=click.Choice(["fast", "balanced", "smallest"]),
+        help="perfil de compressão (padrão: balanced)",
+    ),
+    jobs: int = typer.Option(
+        2, "--jobs", "-j", min=1, help="backups simultâneos"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="faz backup mesmo de mundos inalterados"
+    ),
+    snapshot: bool = typer.Option(
+        False, "--snapshot", help="copia o mundo para staging antes"
+    ),
+    fmt: str = FormatOption,
+):
+    """Faz backup dos mundos que casam com os padrões."""
+    if any(c in description for c in r"\\/:*?\"<>|"):
+        _fail("Descrição contém caracteres inválidos.", EXIT_USAGE)
+    if mode == "tarzst":
+        try:
+            tarzst.check_available()
+        except RuntimeError as e:
+            _fail(str(e), EXIT_USAGE)
+    targets = [
+        (ed, path, folder)
+        for ed, path in _sources(edition, worlds_path)
+        for folder, name in core.manager.list_worlds(path, sort="name")
+        if _matches((folder, name), patterns)
+    ]
+    if not targets:
+        _fail("Nenhum mundo encontrado.", EXIT_NOT_FOUND)
+    # divide os núcleos entre os backups simultâneos
+    jobs = min(jobs, len(targets))
+    workers = max(1, (os.cpu_count() or 1) // jobs)
+    cancel = threading.Event()
+
+    def run(target):
+        """Backup de um mundo; retorna o registro (ver last_report)"""
+        ed, path, folder = target
+        core.manager.make_backup(
+            path,
+            folder,
+            ed,
+            description,
+            mode=mode,
+            workers=workers,
+            profile=profile,
+            cancel=cancel,
+            # descrição pedida sempre gera um backup novo
+            force=force or bool(description),
+            snapshot=snapshot,
+        )
+        return core.manager.last_report
+
+    interrupted = False
+    with _messages(fmt):
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(run, t) for t in targets]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                # backups em andamento param sem deixar arquivo parcial
+                interrupted = True
+                cancel.set()
+    # a saída do pool espera todos: os futures já têm resultado
+    rows = [_result_row(f.result()) for f in futures]
+    _output(
+        rows,
+        ["edition", "world", "status", "backup", "seconds", "error"],
+        fmt,
+    )
+    if interrupted:
+        raise typer.Exit(EXIT_INTERRUPTED)
+    if any(r["status"] not in ("ok", "skipped") for r in rows):
+        raise typer.Exit(EXIT_FAILED)
+
+
+@app.command()
+def restore(
+    backup_name: str = typer.Argument(..., metavar="BACKUP"),
+    edition: str = EditionOption,
+    worlds_path: Optional[str] = WorldsPathOption,
+    mode: str = typer.Option(
+        "atomic", click_type=click.Choice(["atomic", "delta"])
+    ),
+    delete_extra: bool = typer.Option(
+        False,
+        "--delete-extra",
+        help="no modo delta, apaga arquivos que não estão no backup",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="threads de extração"
+    ),
+    fmt: str = FormatOption,
+):
+    """Restaura um backup (pelo nome do arquivo)."""
+    ed = _find_edition(edition, backup_name)
+    [(_, worlds_path)] = _sources(ed, worlds_path)
+    with _messages(fmt):
+        ok = core.manager.restore_backup(
+            worlds_path,
+            backup_name,
+            ed,
+            workers=jobs,
+            mode=mode,
+            delete_extra=delete_extra,
+        )
+    _output(
+        [_result_row(core.manager.last_report)],
+        ["edition", "world", "status", "backup", "seconds", "error"],
+        fmt,
+    )
+    if not ok:
+        raise typer.Exit(EXIT_FAILED)
+
+
+BoxOption = Tuple[int, int, int, int]
+
+
+@app.command("restore-partial")
+def restore_partial_command(
+    backup_name: str = typer.Argument(..., metavar="BACKUP"),
+    worlds_path: Optional[str] = WorldsPathOption,
+    dimension: str = typer.Option(
+        "overworld",
+        "--dimension",
+        "-d",
+        click_type=click.Choice(list(partial.DIMENSIONS)),
+        help="dimensão a restaurar",
+    ),
+    regions: Optional[List[str]] = typer.Option(
+        None,
+        "--region",
+        "-r",
+        help="arquivo de região (r.X.Z.mca); pode repetir",
+    ),
+    chunks: Optional[BoxOption] = typer.Option(
+        None,
+        "--chunks",
+        metavar="X1 Z1 X2 Z2",
+        help="área em coordenadas de chunk",
+    ),
+    blocks: Optional[BoxOption] = typer.Option(
+        None,
+        "--blocks",
+        metavar="X1 Z1 X2 Z2",
+        help="área em coordenadas de bloco",
+    ),
+    fmt: str = FormatOption,
+):
+    """Restaura só parte de um mundo Java: dimensão, regiões ou área."""
+    if sum(1 for x in (regions, chunks, blocks) if x) > 1:
+        _fail("Use só um de --region, --chunks e --blocks", EXIT_USAGE)
+    try:
+        partial.Selection(dimension, regions, chunks, blocks)
+    except ValueError as e:
+        _fail(str(e), EXIT_USAGE)
+    ed = _find_edition("java", backup_name)
+    [(_, worlds_path)] = _sources(ed, worlds_path)
+    try:
+        with _messages(fmt):
+            ok = core.manager.restore_partial(
+                worlds_path,
+                backup_name,
+                ed,
+                dimension=dimension,
+                regions=regions or None,
+                chunk_box=chunks,
+                block_box=blocks,
+            )
+    except KeyboardInterrupt:
+        raise typer.Exit(EXIT_INTERRUPTED)
+    row = {
+        "edition": ed,
+        "backup": backup_name,
+        "dimension": dimension,
+        "status": "ok" if ok else "failed",
+    }
+    _output([row], ["edition", "backup", "dimension", "status"], fmt)
+    if not ok:
+        raise typer.Exit(EXIT_FAILED)
+
+
+@app.command()
+def export(
+    backup_name: str = typer.Argument(..., metavar="BACKUP"),
+    edition: str = EditionOption,
+    output: Optional[str] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="arquivo .zip de destino (padrão: <backups>/exports/)",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="threads de compressão"
+    ),
+    fmt: str = FormatOption,
+):
+    """Exporta um snapshot de hardlinks (.snap) para .zip."""
+    ed = _find_edition(edition, backup_name)
+    with _messages(fmt):
+        path = core.manager.export_backup(
+            backup_name, ed, dst=output, workers=jobs
+        )
+    row = {
+        "edition": ed,
+        "backup": backup_name,
+        "status": "ok" if path else "failed",
+        "output": path,
+    }
+    _output([row], ["edition", "backup", "status", "output"], fmt)
+    if not path:
+        raise typer.Exit(EXIT_FAILED)
+
+
+def _chunk_counts(chunks):
+    """'+novos -removidos ~alterados' dos chunks de uma região"""
+    if not chunks:
+        return None
+    return (
+        f"+{len(chunks['added'])} -{len(chunks['removed'])} "
+        f"~{len(chunks['changed'])}"
+    )
+
+
+@app.command("diff")
+def diff_command(
+    old_name: str = typer.Argument(..., metavar="BACKUP"),
+    new_name: Optional[str] = typer.Argument(
+        None,
+        metavar="[OUTRO]",
+        help="backup mais novo (padrão: o mundo em disco)",
+        show_default=False,
+    ),
+    edition: str = EditionOption,
+    worlds_path: Optional[str] = WorldsPathOption,
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="threads de comparação"
+    ),
+    fmt: str = FormatOption,
+):
+    """Mostra o que mudou entre dois backups ou entre backup e mundo."""
+    ed = _find_edition(edition, old_name)
+    if new_name is not None:
+        # os dois backups ficam na pasta da mesma edição
+        _find_edition(ed, new_name)
+    else:
+        [(_, worlds_path)] = _sources(ed, worlds_path)
+    with _messages(fmt):
+        result = core.manager.diff_backups(
+            old_name, new_name, ed, worlds_path=worlds_path, workers=jobs
+        )
+    if result is None:
+        raise typer.Exit(EXIT_FAILED)
+    if fmt == "json":
+        typer.echo(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+        return
+    rows = [{"status": "added", "path": rel} for rel in result.added]
+    rows += [{"status": "removed", "path": rel} for rel in result.removed]
+    rows += [
+        {
+            "status": "changed",
+            "path": rel,
+            "chunks": _chunk_counts(result.regions.get(rel)),
+        }
+        for rel in result.changed
+    ]
+    if rows:
+        _output(rows, ["status", "path", "chunks"], fmt)
+
+
+@app.command("list")
+def list_command(
+    patterns: Optional[List[str]] = PatternsArgument,
+    edition: str = EditionOption,
+    worlds_path: Optional[str] = WorldsPathOption,
+    backups: bool = typer.Option(
+        False, "--backups", "-b", help="lista backups em vez de mundos"
+    ),
+    fmt: str = FormatOption,
+):
+    """Lista mundos (ou, com --backups, os backups)."""
+    if backups:
+        rows = _backup_rows(edition, patterns)
+        columns = [
+            "edition",
+            "world",
+            "name",
+            "timestamp",
+            "size",
+            "description",
+        ]
+    else:
+        rows = []
+        for ed, path in _sources(edition, worlds_path):
+            for world in core.manager.world_details(path, sort="name"):
+                if not _matches((world["folder"], world["name"]), patterns):
+                    continue
+                played = world["last_played"]
+                if played:
+                    played = datetime.fromtimestamp(played).isoformat(
+                        timespec="seconds"
+                    )
+                rows.append(dict(world, edition=ed, last_played=played))
+        columns = [
+            "edition",
+            "folder",
+            "name",
+            "last_played",
+            "version",
+            "size",
+        ]
+    _output(rows, columns, fmt)
+    if patterns and not rows:
+        raise typer.Exit(EXIT_NOT_FOUND)
+
+
+@app.command()
+def verify(
+    patterns: Optional[List[str]] = typer.Argument(
+        None,
+        help="padrões glob de mundos ou de backups (padrão: todos)",
+        show_default=False,
+    ),
+    edition: str = EditionOption,
+    latest: bool = typer.Option(
+        False, "--latest", help="só o backup mais recente de cada mundo"
+    ),
+    max_age: Optional[float] = typer.Option(
+        None,
+        "--max-age",
+        min=0,
+        help="pula backups verificados com sucesso há menos de N dias",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="threads de leitura"
+    ),
+    fmt: str = FormatOption,
+):
+    """Confere CRC e SHA-256 de todos os arquivos dos backups."""
+    rows = _backup_rows(edition, patterns)
+    if latest:
+        newest = {(r["edition"], r["world"]): r for r in rows}
+        rows = list(newest.values())
+    if not rows:
+        _fail("Nenhum backup encontrado.", EXIT_NOT_FOUND)
+    with _messages(fmt):
+        for row in rows:
+            core.manager.verify_backup(
+                row["name"],
+                row["edition"],
+                workers=jobs,
+                max_age=None if max_age is None else max_age * 86400,
+            )
+            record = core.manager.last_report
+            row.update(status=record["status"], error=record.get("error"))
+            row["seconds"] = round(record["wall_seconds"], 3)
+    _output(
+        rows, ["edition", "world", "name", "status", "seconds", "error"], fmt
+    )
+    if any(r["status"] not in ("ok", "cached") for r in rows):
+        raise typer.Exit(EXIT_FAILED)
+
+
+@app.command()
+def upload(
+    patterns: Optional[List[str]] = typer.Argument(
+        None,
+        help="padrões glob de mundos ou de backups (padrão: todos)",
+        show_default=False,
+    ),
+    edition: str = EditionOption,
+    force: bool = typer.Option(
+        False, "--force", help="reenvia backups que já estão no destino"
+    ),
+    fmt: str = FormatOption,
+):
+    """Envia ao destino remoto (--storage) os backups que faltam lá."""
+    if core.manager.storage is None:
+        _fail("Informe o destino com --storage ou MVP_STORAGE", EXIT_USAGE)
+    rows = [
+        r
+        for r in _backup_rows(edition, patterns)
+        if r["name"].endswith((".zip", ".tar.zst"))
+    ]
+    if not rows:
+        _fail("Nenhum backup encontrado.", EXIT_NOT_FOUND)
+    remote = {}
+    try:
+        for ed in {r["edition"] for r in rows}:
+            remote[ed] = core.manager.remote_backups(ed)
+    except (OSError, storage.StorageError) as e:
+        _fail(f"Falha ao listar o destino: {e}", EXIT_FAILED)
+    with _messages(fmt):
+        for row in rows:
+            sent = remote[row["edition"]].get(row["name"])
+            if sent == row["size"] and not force:
+                row["status"] = "present"
+                continue
+            ok = core.manager.upload_backup(row["name"], row["edition"])
+            row["status"] = "ok" if ok else "failed"
+    _output(rows, ["edition", "world", "name", "status"], fmt)
+    if any(r["status"] == "failed" for r in rows):
+        raise typer.Exit(EXIT_FAILED)
+
+
+@app.command()
+def fetch(
+    backup_name: str = typer.Argument(..., metavar="BACKUP"),
+    edition: str = typer.Option(
+        ...,
+        "--edition",
+        "-e",
+        click_type=click.Choice(EDITIONS),
+        help="edição do backup",
+    ),
+    fmt: str = FormatOption,
+):
+    """Baixa um backup do destino remoto para a pasta de backups."""
+    if core.manager.storage is None:
+        _fail("Informe o destino com --storage ou MVP_STORAGE", EXIT_USAGE)
+    with _messages(fmt):
+        ok = core.manager.fetch_backup(backup_name, edition)
+    row = {
+        "edition": edition,
+        "backup": backup_name,
+        "status": "ok" if ok else "failed",
+    }
+    _output([row], ["edition", "backup", "status"], fmt)
+    if not ok:
+        raise typer.Exit(EXIT_FAILED)
+
+
+@app.command()
+def prune(
+    patterns: Optional[List[str]] = PatternsArgument,
+    edition: str = EditionOption,
+    keep: int = typer.Option(
+        0, "--keep", "-k", min=0, help="backups mais novos mantidos por mundo"
+    ),
+    hourly: int = typer.Option(
+        0, "--hourly", min=0, help="mantém o mais novo das N horas"
+    ),
+    daily: int = typer.Option(
+        0, "--daily", min=0, help="mantém o mais novo de cada um dos N dias"
+    ),
+    weekly: int = typer.Option(
+        0, "--weekly", min=0, help="mantém o mais novo das N semanas"
+    ),
+    monthly: int = typer.Option(
+        0, "--monthly", min=0, help="mantém o mais novo dos N meses"
+    ),
+    max_size: Optional[float] = typer.Option(
+        None, "--max-size", help="teto de MiB por mundo (apaga os antigos)"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="só mostra o que seria apagado"
+    ),
+    fmt: str = FormatOption,
+):
+    """Apaga os backups fora da política de retenção de cada mundo."""
+    try:
+        policy = retention.Policy(
+            last=keep,
+            hourly=hourly,
+            daily=daily,
+            weekly=weekly,
+            monthly=monthly,
+            max_bytes=int(max_size * 1024 * 1024) if max_size else None,
+        )
+    except ValueError as e:
+        _fail(f"{e}: use --keep, --daily etc. ou --max-size", EXIT_USAGE)
+    worlds = sorted(
+        {(r["edition"], r["world"]) for r in _backup_rows(edition, patterns)}
+    )
+    if patterns and not worlds:
+        _fail("Nenhum backup encontrado.", EXIT_NOT_FOUND)
+    rows = []
+    with _messages(fmt):
+        removed = {}
+        for ed, world in worlds:
+            names = core.manager.prune_backups(
+                ed, world=world, dry_run=dry_run, policy=policy, gc=False
+            )
+            removed.setdefault(ed, []).extend(names)
+            rows.extend(
+                {
+                    "edition": ed,
+                    "world": world,
+                    "name": name,
+                    "status": "dry-run" if dry_run else "removed",
+                }
+                for name in names
+            )
+        # uma coleta por pasta, depois de todos os mundos
+        for ed, names in removed.items():
+            if any(store.is_manifest(n) for n in names):
+                core.manager.collect_garbage(
+                    ed, exclude=names, dry_run=dry_run
+                )
+    _output(rows, ["edition", "world", "name", "status"], fmt)
+
+
+@app.command("fleet")
+def fleet_command(
+    config: str = typer.Argument(
+        ..., metavar="CONFIG", help="arquivo .toml ou .json da frota"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="só mostra os backups na ordem planejada"
+    ),
+    fmt: str = FormatOption,
+):
+    """Backup de vários servidores com limites por disco e de leitura."""
+    try:
+        conf = fleet.load_config(config)
+    except (OSError, ValueError) as e:
+        _fail(f"Configuração inválida: {e}", EXIT_USAGE)
+    jobs = fleet.plan(conf)
+    if not jobs:
+        _fail("Nenhum mundo encontrado.", EXIT_NOT_FOUND)
+    if dry_run:
+        rows = [
+            {
+                "server": job.server.name,
+                "edition": job.server.edition,
+                "world": job.world,
+                "size": job.size,
+            }
+            for job in jobs
+        ]
+        _output(rows, ["server", "edition", "world", "size"], fmt)
+        return
+    scheduler = fleet.FleetScheduler.from_fleet(conf)
+    try:
+        with _messages(fmt):
+            records = scheduler.run(jobs)
+            fleet.apply_retention(conf, records)
+    except KeyboardInterrupt:
+        raise typer.Exit(EXIT_INTERRUPTED)
+    rows = [dict(_result_row(r), server=r["server"]) for r in records]
+    _output(
+        rows,
+        ["server", "edition", "world", "status", "backup", "seconds", "error"],
+        fmt,
+    )
+    if any(r["status"] not in ("ok", "skipped") for r in rows):
+        raise typer.Exit(EXIT_FAILED)
@@ -0,0 +1,188 @@
+import argparse
+import os
+import signal
+import threading
+
+from backup import (
+    core,
+    daemon,
+    detect_bedrock,
+    detect_java,
+    fleet,
+    metrics,
+    rcon,
+    snapshot,
+    storage,
+    tarzst,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Faz backup automático dos mundos que mudaram."
+    )
+    parser.add_argument(
+        "--edition",
+        choices=["java", "bedrock", "all"],
+        default="all",
+        help="edição observada (padrão: todas)",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=daemon.DEFAULT_POLL,
+        help="segundos entre varreduras",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=daemon.DEFAULT_DEBOUNCE,
+        help="segundos sem mudanças antes do backup",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=daemon.DEFAULT_MAX_WAIT,
+        help="faz backup mesmo com o mundo ainda mudando após N segundos",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=daemon.DEFAULT_INTERVAL,
+        help="intervalo mínimo entre backups do mesmo mundo",
+    )
+    parser.add_argument(
+        "--world-interval",
+        action="append",
+        default=[],
+        metavar="MUNDO=SEGUNDOS",
+        help="intervalo específico de um mundo (pode repetir)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=daemon.DEFAULT_CONCURRENCY,
+        help="backups simultâneos",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["zip", "incremental", "tarzst", "hardlink"],
+        default="zip",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="copia o mundo para staging e faz o backup da cópia",
+    )
+    parser.add_argument(
+        "--rcon-host",
+        help="servidor RCON: pausa gravações (save-off) durante a cópia",
+    )
+    parser.add_argument("--rcon-port", type=int, default=rcon.DEFAULT_PORT)
+    parser.add_argument(
+        "--rcon-password",
+        default=os.environ.get("MVP_RCON_PASSWORD", ""),
+        help="senha RCON (padrão: variável MVP_RCON_PASSWORD)",
+    )
+    parser.add_argument(
+        "--backup-dir",
+        default=os.environ.get("MVP_BACKUP_DIR"),
+        help="pasta dos backups (padrão: backups_worlds ou MVP_BACKUP_DIR)",
+    )
+    parser.add_argument(
+        "--storage",
+        default=os.environ.get("MVP_STORAGE"),
+        metavar="DESTINO",
+        help="envia os backups .zip/.tar.zst para uma pasta ou s3://...",
+    )
+    parser.add_argument(
+        "--upload-limit",
+        type=float,
+        metavar="MIB/S",
+        help="limite de banda do envio remoto",
+    )
+    parser.add_argument(
+        "--metrics-log",
+        metavar="ARQUIVO",
+        help="acrescenta as métricas de cada backup como linha JSON",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        metavar="ARQUIVO.prom",
+        help="arquivo .prom para o textfile collector do node_exporter",
+    )
+    args = parser.parse_args(argv)
+    intervals = {}
+    for item in args.world_interval:
+        world, sep, seconds = item.rpartition("=")
+        try:
+            if not sep or not world:
+                raise ValueError(item)
+            intervals[world] = float(seconds)
+        except ValueError:
+            parser.error(f"--world-interval inválido: {item}")
+    args.intervals = intervals
+    if args.upload_limit is not None and args.upload_limit <= 0:
+        parser.error("--upload-limit deve ser positivo")
+    if args.mode == "tarzst":
+        try:
+            tarzst.check_available()
+        except RuntimeError as e:
+            parser.error(str(e))
+    if args.rcon_host:
+        # pausar o servidor só faz sentido copiando para staging
+        args.snapshot = True
+    return args
+
+
+def run_daemon(argv=None):
+    args = parse_args(argv)
+    sources = []
+    if args.edition in ("java", "all"):
+        sources.append(("java", detect_java.get_java_worlds_path()))
+    if args.edition in ("bedrock", "all"):
+        sources.append(("bedrock", detect_bedrock.get_bedrock_worlds_path()))
+    if not any(path for _, path in sources):
+        print(
+            "❌ Caminho não encontrado. O Minecraft pode não estar instalado."
+        )
+        return 1
+    if args.backup_dir:
+        core.manager.use_backup_dir(args.backup_dir)
+    if args.storage:
+        throttle = None
+        if args.upload_limit:
+            throttle = fleet.TokenBucket(args.upload_limit * 1024 * 1024)
+        core.manager.use_storage(storage.from_url(args.storage, throttle))
+    if args.metrics_log:
+        core.manager.metrics_hooks.append(
+            metrics.JsonLinesSink(args.metrics_log)
+        )
+    if args.metrics_textfile:
+        core.manager.metrics_hooks.append(
+            metrics.PrometheusTextfile(args.metrics_textfile)
+        )
+    server = None
+    if args.rcon_host:
+        server = snapshot.ServerControl(
+            rcon.RconClient(args.rcon_host, args.rcon_port, args.rcon_password)
+        )
+    worker = daemon.BackupDaemon(
+        core.manager,
+        sources,
+        poll=args.poll,
+        debounce=args.debounce,
+        max_wait=args.max_wait,
+        interval=args.interval,
+        intervals=args.intervals,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        snapshot=args.snapshot,
+        server=server,
+    )
+    stop = threading.Event()
+    # Ctrl+C / SIGTERM encerram após os backups em andamento
+    signal.signal(signal.SIGINT, lambda *a: stop.set())
+    signal.signal(signal.SIGTERM, lambda *a: stop.set())
+    worker.run(stop)
+    return 0
@@ -2,12 +2,39 @@
 Módulo gui/app.py:
 - Define classe GuiApp para encapsular widgets, callbacks e loop principal.
 - Facilita manutenção ao separar lógica da execução.
+- Backups e restaurações rodam na fila de tarefas (gui/jobs.py), com
+  barra de progresso, ETA e cancelamento, sem travar a janela.
+- Backup com descrição é sempre gravado; sem descrição, mundo sem
+  alterações desde o último backup é avisado em vez de dar sucesso.
 """
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
 
 from backup import core, detect_bedrock, detect_java
+from gui import jobs
+
+SKIPPED = "skipped"
+
+
+def _backup_world(path, world, edition, desc, progress=None, cancel=None):
+    """make_backup da GUI; retorna SKIPPED se o mundo não mudou.
+
+    Com descrição o backup é forçado, para que a tag não se perca.
+    """
+    ok = core.make_backup(
+        path,
+        world,
+        edition,
+        desc,
+        progress=progress,
+        cancel=cancel,
+        force=bool(desc),
+    )
+    report = core.manager.last_report
+    if ok and report and report["status"] == SKIPPED:
+        return SKIPPED
+    return ok
 
 
 class GuiApp:
@@ -19,6 +46,13 @@ class GuiApp:
         self.edicao_var = tk.StringVar(value="java")
         # Construção dos elementos da interface
         self._build_widgets()
+        # Fila de tarefas em segundo plano
+        self.jobs = jobs.JobQueue(
+            self.root,
+            on_update=self._show_progress,
+            on_finish=self._on_job_finish,
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self._close)
         # Atualiza backups ao selecionar um mundo
         self.list_mundos.bind(
             "<<ListboxSelect>>", lambda e: self._on_world_select()
@@ -71,12 +105,24 @@ class GuiApp:
             text="Restaurar Backup",
             command=self._restore_backup,
         ).pack(pady=5)
+        # Progresso da tarefa atual e botão de cancelar
+        frame_jobs = tk.LabelFrame(self.root, text="Tarefas", padx=5, pady=5)
+        frame_jobs.pack(fill=tk.X, padx=10, pady=(5, 0))
+        self.progress_bar = ttk.Progressbar(frame_jobs, maximum=100)
+        self.progress_bar.pack(fill=tk.X)
+        self.label_job = tk.Label(frame_jobs, text="Nenhuma tarefa")
+        self.label_job.pack(pady=(5, 0))
+        self.cancel_button = tk.Button(
+            frame_jobs,
+            text="Cancelar",
+            command=self._cancel_job,
+            state=tk.DISABLED,
+        )
+        self.cancel_button.pack(pady=5)
         # Label de status e botão de fechar
         self.label_status = tk.Label(self.root, text="")
         self.label_status.pack(pady=5)
-        tk.Button(self.root, text="Fechar", command=self.root.destroy).pack(
-            pady=10
-        )
+        tk.Button(self.root, text="Fechar", command=self._close).pack(pady=10)
 
     def _select_edition(self):
         """Carrega mundos e backups para a edição selecionada."""
@@ -91,7 +137,9 @@ class GuiApp:
         self.list_backups.delete(0, tk.END)
         self.desc_entry.delete(0, tk.END)
         # Lista mundos
-        self.worlds_list = core.list_worlds(path) if path else []
+        self.worlds_list = (
+            core.list_worlds(path, sort="last_played") if path else []
+        )
         if self.worlds_list:
             for folder, display in self.worlds_list:
                 self.list_mundos.insert(tk.END, display)
@@ -118,8 +166,7 @@ class GuiApp:
             self.list_backups.insert(tk.END, "(nenhum backup)")
             return
         ed = self.edicao_var.get()
-        all_backs = core.list_backups(ed)
-        backs = [(b, d) for b, d in all_backs if b.startswith(folder + "_")]
+        backs = core.list_backups(ed, world=folder)
         if backs:
             for fname, desc in backs:
                 label = f"{fname} - {desc}" if desc else fname
@@ -155,12 +202,26 @@ class GuiApp:
                 "Erro", "Descrição contém caracteres inválidos."
             )
             return
-        ok = core.make_backup(path, world, ed, desc)
-        if ok:
+        self._submit(
+            f"Backup de '{world}'",
+            _backup_world,
+            (path, world, ed, desc),
+            lambda job: self._backup_done(job, world),
+        )
+
+    def _backup_done(self, job, world):
+        """Resultado do backup, já na thread do Tk."""
+        if job.state == jobs.DONE and job.result == SKIPPED:
+            messagebox.showinfo(
+                "Sem alterações",
+                f"O mundo '{world}' não mudou desde o último backup; "
+                "nenhum backup novo foi criado.",
+            )
+        elif job.state == jobs.DONE:
             messagebox.showinfo(
                 "Sucesso", f"Backup do mundo '{world}' criado com sucesso!"
             )
-        else:
+        elif job.state == jobs.FAILED:
             messagebox.showerror(
                 "Erro", f"Falha ao criar backup do mundo '{world}'."
             )
@@ -181,17 +242,73 @@ class GuiApp:
             if ed == "java"
             else detect_bedrock.get_bedrock_worlds_path()
         )
-        ok = core.restore_backup(path, backup_name, ed)
-        if ok:
+        self._submit(
+            f"Restaurar '{backup_name}'",
+            core.restore_backup,
+            (path, backup_name, ed),
+            lambda job: self._restore_done(job, backup_name),
+        )
+
+    def _restore_done(self, job, backup_name):
+        """Resultado da restauração, já na thread do Tk."""
+        if job.state == jobs.DONE:
             messagebox.showinfo(
                 "Sucesso", f"Backup '{backup_name}' restaurado com sucesso!"
             )
-        else:
+        elif job.state == jobs.FAILED:
             messagebox.showerror(
                 "Erro", f"Falha ao restaurar backup '{backup_name}'."
             )
         self.label_status.config(text=f"Restaurar: {backup_name}")
 
+    def _submit(self, title, func, args, on_done):
+        """Coloca a operação na fila de tarefas."""
+        self.jobs.submit(jobs.Job(title, func, args, on_done=on_done))
+        self.cancel_button.config(state=tk.NORMAL)
+        waiting = len(self.jobs.pending())
+        self.label_status.config(
+            text=f"{title} adicionado à fila ({waiting} aguardando)"
+        )
+
+    def _show_progress(self, job):
+        """Atualiza barra, bytes e ETA da tarefa em execução."""
+        self.progress_bar["value"] = job.fraction() * 100
+        mib = 1024 * 1024
+        text = (
+            f"{job.title}: {job.done / mib:.1f}/{job.total / mib:.1f} MiB"
+            f" - ETA {jobs.format_eta(job.eta())}"
+        )
+        waiting = len(self.jobs.pending())
+        if waiting:
+            text += f" (+{waiting} na fila)"
+        self.label_job.config(text=text)
+
+    def _on_job_finish(self, job):
+        """Limpa o progresso quando a fila esvazia."""
+        if job.state == jobs.CANCELLED:
+            self.label_status.config(text=f"{job.title}: cancelado")
+        if not self.jobs.busy():
+            self.progress_bar["value"] = 0
+            self.label_job.config(text="Nenhuma tarefa")
+            self.cancel_button.config(state=tk.DISABLED)
+
+    def _cancel_job(self):
+        """Cancela a tarefa em execução."""
+        job = self.jobs.cancel()
+        if job is not None:
+            self.label_job.config(text=f"{job.title}: cancelando...")
+
+    def _close(self):
+        """Fecha a janela, cancelando tarefas em andamento."""
+        if self.jobs.busy():
+            if not messagebox.askyesno(
+                "Sair", "Há tarefas em andamento. Cancelar e sair?"
+            ):
+                return
+            self.jobs.cancel_all()
+            self.jobs.wait()
+        self.root.destroy()
+
     def run(self):
         # Inicia o loop de eventos da GUI
         self.root.mainloop()
@@ -0,0 +1,214 @@
+"""
+Módulo gui/jobs.py:
+- Fila de tarefas em segundo plano para a GUI: backups e restaurações
+  rodam em uma thread de trabalho, uma por vez, sem travar a janela.
+- Cada Job acompanha bytes processados e ETA, e pode ser cancelado
+  (o backend descarta arquivos parciais).
+- Progresso e resultados voltam para a thread do Tk por root.after; os
+  widgets nunca são tocados fora do loop de eventos.
+"""
+
+import queue
+import threading
+import time
+
+# estados de um Job
+PENDING = "na fila"
+RUNNING = "executando"
+DONE = "concluído"
+FAILED = "falhou"
+CANCELLED = "cancelado"
+
+
+class Job:
+    """Tarefa da fila: func(*args, progress=..., cancel=..., **kwargs).
+
+    func deve aceitar os argumentos `progress(feito, total)` e `cancel`
+    (threading.Event), como core.make_backup e core.restore_backup.
+    on_done(job) é chamado na thread do Tk quando a tarefa termina.
+    """
+
+    def __init__(self, title, func, args=(), kwargs=None, on_done=None):
+        self.title = title
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.on_done = on_done
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        self.done = 0
+        self.total = 0
+        self.started = None
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Pede o cancelamento (antes ou durante a execução)"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def fraction(self):
+        """Fração concluída entre 0 e 1"""
+        if not self.total:
+            return 0.0
+        return min(1.0, self.done / self.total)
+
+    def eta(self, now=None):
+        """Segundos restantes pela taxa média (None sem dados suficientes)"""
+        if self.started is None or not self.done or not self.total:
+            return None
+        elapsed = (time.monotonic() if now is None else now) - self.started
+        if elapsed <= 0:
+            return None
+        rate = self.done / elapsed
+        return max(0.0, (self.total - self.done) / rate)
+
+    def _progress(self, done, total):
+        # chamado nas threads do backup: só guarda os números
+        self.done = done
+        self.total = total
+
+    def run(self):
+        """Executa a tarefa na thread de trabalho"""
+        if self.cancelled:
+            self.state = CANCELLED
+            return
+        self.state = RUNNING
+        self.started = time.monotonic()
+        try:
+            self.result = self.func(
+                *self.args,
+                progress=self._progress,
+                cancel=self.cancel_event,
+                **self.kwargs,
+            )
+        except Exception as e:
+            self.error = e
+            self.result = False
+        if self.cancelled:
+            self.state = CANCELLED
+        elif self.result is False:
+            self.state = FAILED
+        else:
+            self.state = DONE
+
+
+def format_eta(seconds):
+    """Formata segundos como MM:SS ou H:MM:SS"""
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class JobQueue:
+    """Executa Jobs em ordem em uma thread e avisa a GUI por root.after.
+
+    on_update(job) recebe periodicamente a tarefa em execução e
+    on_finish(job) cada tarefa concluída, sempre na thread do Tk.
+    """
+
+    def __init__(self, root, on_update=None, on_finish=None, interval=100):
+        self.root = root
+        self.on_update = on_update
+        self.on_finish = on_finish
+        self.interval = interval
+        self.current = None
+        self._jobs = queue.Queue()
+        self._finished = queue.Queue()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._polling = False
+
+    def submit(self, job):
+        """Coloca a tarefa na fila e retorna o próprio Job"""
+        with self._lock:
+            self._pending.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._worker, name="backup-jobs", daemon=True
+                )
+                self._thread.start()
+        self._jobs.put(job)
+        self._schedule()
+        return job
+
+    def pending(self):
+        """Tarefas ainda não iniciadas, em ordem"""
+        with self._lock:
+            return list(self._pending)
+
+    def busy(self):
+        with self._lock:
+            return self.current is not None or bool(self._pending)
+
+    def cancel(self):
+        """Cancela a tarefa em execução; a próxima da fila começa depois"""
+        job = self.current
+        if job is not None:
+            job.cancel()
+        return job
+
+    def cancel_all(self):
+        """Cancela a tarefa atual e todas as pendentes"""
+        with self._lock:
+            jobs = list(self._pending)
+            if self.current is not None:
+                jobs.append(self.current)
+        for job in jobs:
+            job.cancel()
+
+    def wait(self, timeout=None):
+        """Espera a fila esvaziar e entrega os resultados; True se vazia"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.busy():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        self._deliver()
+        return not self.busy()
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            with self._lock:
+                self._pending.remove(job)
+                self.current = job
+            job.run()
+            # entrega antes de liberar current: busy() nunca perde o job
+            self._finished.put(job)
+            with self._lock:
+                self.current = None
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.interval, self._poll)
+
+    def _poll(self):
+        """Roda no loop do Tk: entrega resultados e progresso"""
+        self._polling = False
+        self._deliver()
+        if self.busy() or not self._finished.empty():
+            self._schedule()
+
+    def _deliver(self):
+        while True:
+            try:
+                job = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            if job.on_done:
+                job.on_done(job)
+            if self.on_finish:
+                self.on_finish(job)
+        job = self.current
+        if job is not None and self.on_update:
+            self.on_update(job)
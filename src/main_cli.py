@@ -1,4 +1,11 @@
+import sys
+
 from cli.cli_main import run_cli
+from cli.commands import app
 
 if __name__ == "__main__":
-    run_cli()
+    # com argumentos, roda os subcomandos não interativos
+    if len(sys.argv) > 1:
+        app(prog_name="main_cli.py")
+    else:
+        run_cli()
@@ -0,0 +1,6 @@
+import sys
+
+from cli.daemon_main import run_daemon
+
+if __name__ == "__main__":
+    sys.exit(run_daemon())
@@ -0,0 +1,152 @@
+"""
+Módulo de testes para backup.anvil:
+ - test_region_roundtrip: write_region/read_region preservam chunks e timestamps.
+ - test_invalid_header: cabeçalho truncado gera RegionError.
+ - test_incremental_region_delta: só chunks alterados são gravados no store.
+ - test_incremental_region_unchanged_chunks_not_read: chunks inalterados não são lidos.
+ - test_incremental_region_restore: .mca reconstruído é válido e completo.
+ - test_incremental_region_racy_chunk: chunk regravado no mesmo segundo do
+   backup anterior é relido.
+"""
+
+import os
+import struct
+import time
+import zlib
+
+import pytest
+
+from backup import anvil, store
+
+
+def record(payload):
+    data = zlib.compress(payload)
+    return struct.pack(">IB", len(data) + 1, 2) + data
+
+
+def sample_chunks(n=5, ts=100):
+    return {
+        anvil.chunk_index(i, i): (ts + i, record(b"chunk-%d" % i * 500))
+        for i in range(n)
+    }
+
+
+def test_region_roundtrip(tmp_path):
+    """Os chunks gravados são lidos de volta com os mesmos dados."""
+    chunks = sample_chunks()
+    path = tmp_path / "r.0.0.mca"
+    anvil.write_region(str(path), chunks)
+    assert path.stat().st_size % anvil.SECTOR_SIZE == 0
+    assert anvil.read_region(str(path)) == chunks
+    assert anvil.parse_region_bytes(path.read_bytes()) == chunks
+
+
+def test_invalid_header(tmp_path):
+    """Arquivo menor que o cabeçalho é rejeitado."""
+    path = tmp_path / "r.0.0.mca"
+    path.write_bytes(b"\0" * 100)
+    with pytest.raises(anvil.RegionError):
+        anvil.read_region(str(path))
+
+
+def make_world(tmp_path, chunks):
+    worlds = tmp_path / "worlds"
+    region = worlds / "mundo" / "region"
+    region.mkdir(parents=True)
+    (worlds / "mundo" / "level.dat").write_bytes(b"level")
+    anvil.write_region(str(region / "r.0.0.mca"), chunks)
+    return worlds, region / "r.0.0.mca"
+
+
+def test_incremental_region_delta(manager, tmp_path, monkeypatch):
+    """Após alterar um chunk, apenas ele é lido e gravado de novo."""
+    chunks = sample_chunks()
+    worlds, mca = make_world(tmp_path, chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    idx = anvil.chunk_index(2, 2)
+    chunks[idx] = (999, record(b"changed" * 300))
+    anvil.write_region(str(mca), chunks)
+    written = []
+    original = store.BlobStore.put_bytes
+
+    def spy(self, data):
+        written.append(data)
+        return original(self, data)
+
+    monkeypatch.setattr(store.BlobStore, "put_bytes", spy)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    # o layout muda (chunk maior), então chunks realocados são relidos,
+    # mas apenas o alterado gera blob novo
+    assert chunks[idx][1] in written
+    _, manifest = store.latest_manifest(manager.backup_dir_java, "mundo")
+    entry = next(e for e in manifest["files"] if e["path"].endswith(".mca"))
+    assert len(entry["chunks"]) == 5
+    assert "blob" not in entry
+
+
+def test_incremental_region_unchanged_chunks_not_read(
+    manager, tmp_path, monkeypatch
+):
+    """Chunks com mesmo timestamp e localização não são lidos."""
+    chunks = sample_chunks()
+    worlds, mca = make_world(tmp_path, chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    # altera o último chunk mantendo o tamanho em setores
+    idx = max(chunks)
+    chunks[idx] = (555, record(b"chunk-x" * 500))
+    anvil.write_region(str(mca), chunks)
+    reads = []
+    original = anvil.read_record
+
+    def spy(f, offset, sectors):
+        reads.append(offset)
+        return original(f, offset, sectors)
+
+    monkeypatch.setattr(anvil, "read_record", spy)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert len(reads) == 1
+
+
+def test_incremental_region_restore(manager, tmp_path):
+    """Restauração reconstrói um .mca válido com todos os chunks."""
+    chunks = sample_chunks(8)
+    worlds, _ = make_world(tmp_path, chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    name, _ = manager.list_backups("java")[0]
+    dest = tmp_path / "dest"
+    assert manager.restore_backup(str(dest), name, "java")
+    restored = dest / "mundo" / "region" / "r.0.0.mca"
+    assert anvil.read_region(str(restored)) == chunks
+
+
+def test_incremental_region_racy_chunk(manager, tmp_path):
+    """Mesmo timestamp, offset e setores, mas gravado junto com o backup."""
+    now = int(time.time())
+    chunks = sample_chunks(ts=now)
+    worlds, mca = make_world(tmp_path, chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    # mesmo tamanho em setores e mesmo segundo: o cabeçalho não muda
+    idx = max(chunks)
+    ts, _ = chunks[idx]
+    chunks[idx] = (ts, record(b"chunk-x" * 500))
+    anvil.write_region(str(mca), chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    path, _ = store.latest_manifest(manager.backup_dir_java, "mundo")
+    dest = tmp_path / "dest"
+    assert manager.restore_backup(str(dest), os.path.basename(path), "java")
+    restored = dest / "mundo" / "region" / "r.0.0.mca"
+    assert anvil.read_region(str(restored)) == chunks
@@ -0,0 +1,109 @@
+"""
+Módulo de testes para backup.catalog:
+ - test_parse_name: nome do arquivo gera mundo e timestamp.
+ - test_make_backup_indexes: make_backup registra o backup no catálogo.
+ - test_sync_reads_only_changed: sync só abre arquivos novos ou alterados.
+ - test_sync_removes_deleted: arquivos apagados somem do catálogo.
+ - test_list_backups_by_world: filtro por mundo não confunde prefixos.
+ - test_rebuild: rebuild recria o índice a partir dos arquivos.
+"""
+
+import json
+import os
+import zipfile
+
+from backup import catalog
+
+
+def write_zip(directory, name, world, desc=""):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(f"{world}/level.dat", "data")
+        meta = {"world": world, "description": desc, "edition": "java"}
+        z.writestr("metadata.json", json.dumps(meta))
+    return path
+
+
+def test_parse_name():
+    """Nomes no padrão mundo_AAAAMMDD_HHMMSS[-N].ext são interpretados."""
+    assert catalog.parse_name("my_world_20250101_120000.zip") == (
+        "my_world",
+        "20250101_120000",
+    )
+    assert catalog.parse_name("w_20250101_120000-2.manifest.json") == (
+        "w",
+        "20250101_120000",
+    )
+    assert catalog.parse_name("solto.zip") == ("solto", None)
+
+
+def test_make_backup_indexes(manager, tmp_path):
+    """Após make_backup o catálogo já contém mundo, tamanho e arquivos."""
+    worlds = tmp_path / "worlds"
+    (worlds / "mundo").mkdir(parents=True)
+    (worlds / "mundo" / "level.dat").write_bytes(b"x")
+    (worlds / "mundo" / "b.txt").write_bytes(b"y")
+    assert manager.make_backup(str(worlds), "mundo", "java", "desc")
+    [row] = catalog.Catalog(manager.backup_dir_java).query("mundo")
+    assert row["description"] == "desc"
+    assert row["edition"] == "java"
+    assert row["file_count"] == 2
+    assert row["size"] == os.path.getsize(
+        os.path.join(manager.backup_dir_java, row["name"])
+    )
+
+
+def test_sync_reads_only_changed(tmp_path, monkeypatch):
+    """O segundo sync não abre nenhum arquivo inalterado."""
+    d = str(tmp_path)
+    write_zip(d, "a_20250101_000000.zip", "a")
+    write_zip(d, "a_20250102_000000.zip", "a")
+    cat = catalog.Catalog(d)
+    cat.sync()
+    opened = []
+    original = catalog.read_info
+
+    def spy(path):
+        opened.append(os.path.basename(path))
+        return original(path)
+
+    monkeypatch.setattr(catalog, "read_info", spy)
+    cat.sync()
+    assert opened == []
+    write_zip(d, "a_20250103_000000.zip", "a")
+    cat.sync()
+    assert opened == ["a_20250103_000000.zip"]
+
+
+def test_sync_removes_deleted(tmp_path):
+    """Backup apagado do disco sai do catálogo no próximo sync."""
+    d = str(tmp_path)
+    path = write_zip(d, "a_20250101_000000.zip", "a")
+    cat = catalog.Catalog(d)
+    cat.sync()
+    os.remove(path)
+    cat.sync()
+    assert cat.query() == []
+
+
+def test_list_backups_by_world(manager):
+    """Filtrar por 'a' não inclui backups do mundo 'a_b'."""
+    d = manager.backup_dir_java
+    write_zip(d, "a_20250101_000000.zip", "a", "um")
+    write_zip(d, "a_b_20250101_000000.zip", "a_b", "dois")
+    assert manager.list_backups("java", world="a") == [
+        ("a_20250101_000000.zip", "um")
+    ]
+    assert len(manager.list_backups("java")) == 2
+
+
+def test_rebuild(tmp_path):
+    """rebuild relê todos os arquivos e restaura as descrições."""
+    d = str(tmp_path)
+    write_zip(d, "a_20250101_000000.zip", "a", "x")
+    cat = catalog.Catalog(d)
+    cat.sync()
+    cat.rebuild()
+    assert [r["description"] for r in cat.query()] == ["x"]
+    assert catalog.scan(d, "a")[0]["description"] == "x"
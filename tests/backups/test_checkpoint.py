@@ -0,0 +1,160 @@
+"""
+Módulo de testes para backup.checkpoint:
+ - test_resume_after_crash: processo morto no meio do .zip; o próximo
+   backup continua do último ponto sem recomprimir o que já foi gravado.
+ - test_resume_skips_changed: arquivos alterados ou apagados depois da
+   interrupção não ficam com a versão antiga no .zip retomado.
+ - test_leftover_discarded: backup em outro modo descarta o .partial.
+ - test_cleanup_leftovers: list_backups apaga sobras que não podem ser
+   retomadas e mantém as em andamento.
+"""
+
+import json
+import os
+import time
+import zipfile
+
+import pytest
+
+from backup import checkpoint, parallel_zip
+
+
+def make_world(tmp_path, n=6):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    for i in range(n):
+        (w / "region" / f"r.{i}.0.mca").write_bytes(os.urandom(16 * 1024))
+    return worlds, w
+
+
+def crash_after(n):
+    """Callback de progresso que 'mata o processo' na n-ésima entrada"""
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        if len(calls) == n:
+            raise KeyboardInterrupt
+
+    return progress
+
+
+def interrupted(manager, worlds, monkeypatch, n):
+    """Backup .zip interrompido com n entradas confirmadas"""
+    monkeypatch.setattr(checkpoint, "INTERVAL_BYTES", 1)
+    with pytest.raises(KeyboardInterrupt):
+        manager.make_backup(
+            str(worlds), "mundo", "java", workers=1, progress=crash_after(n)
+        )
+    [journal] = [
+        n
+        for n in os.listdir(manager.backup_dir_java)
+        if n.endswith(checkpoint.JOURNAL_SUFFIX)
+    ]
+    path = os.path.join(manager.backup_dir_java, journal)
+    with open(path, encoding="utf-8") as f:
+        return journal[: -len(checkpoint.JOURNAL_SUFFIX)], json.load(f)
+
+
+def spy_compress(monkeypatch):
+    compressed = []
+    original = parallel_zip._compress_file
+
+    def spy(path, arcname, *args):
+        compressed.append(arcname)
+        return original(path, arcname, *args)
+
+    monkeypatch.setattr(parallel_zip, "_compress_file", spy)
+    return compressed
+
+
+def test_resume_after_crash(manager, tmp_path, monkeypatch):
+    """Só as entradas que faltavam são comprimidas na retomada."""
+    worlds, w = make_world(tmp_path)
+    name, journal = interrupted(manager, worlds, monkeypatch, 3)
+    done = {e["arcname"] for e in journal["entries"]}
+    assert len(done) == 3
+    assert not os.path.exists(os.path.join(manager.backup_dir_java, name))
+    # o .partial retomável não é listado nem apagado
+    assert manager.list_backups("java") == []
+    partial = os.path.join(manager.backup_dir_java, name) + ".partial"
+    assert os.path.getsize(partial) >= journal["offset"]
+    compressed = spy_compress(monkeypatch)
+    assert manager.make_backup(str(worlds), "mundo", "java", workers=1)
+    assert len(compressed) == 3
+    assert not done & set(compressed)
+    assert [n for n, _ in manager.list_backups("java")] == [name]
+    assert not any(
+        n.endswith((checkpoint.PARTIAL_SUFFIX, checkpoint.JOURNAL_SUFFIX))
+        for n in os.listdir(manager.backup_dir_java)
+    )
+    path = os.path.join(manager.backup_dir_java, name)
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        meta = json.loads(z.read("metadata.json"))
+        for p in (w / "region").iterdir():
+            assert z.read(f"mundo/region/{p.name}") == p.read_bytes()
+    assert len(meta["sha256"]) == 6
+    assert manager.verify_backup(name, "java")
+
+
+def test_resume_skips_changed(manager, tmp_path, monkeypatch):
+    """Entrada de arquivo alterado é regravada; a de apagado, removida."""
+    worlds, w = make_world(tmp_path)
+    name, journal = interrupted(manager, worlds, monkeypatch, 2)
+    changed, deleted = sorted(e["arcname"] for e in journal["entries"])
+    (w / changed.split("/", 1)[1]).write_bytes(b"alterado")
+    (w / deleted.split("/", 1)[1]).unlink()
+    compressed = spy_compress(monkeypatch)
+    assert manager.make_backup(str(worlds), "mundo", "java", workers=1)
+    assert changed in compressed and deleted not in compressed
+    with zipfile.ZipFile(os.path.join(manager.backup_dir_java, name)) as z:
+        names = z.namelist()
+        assert z.testzip() is None
+        assert z.read(changed) == b"alterado"
+    assert len(names) == len(set(names)) == 6
+    assert deleted not in names
+    assert manager.restore_backup(str(worlds), name, "java")
+    assert (w / changed.split("/", 1)[1]).read_bytes() == b"alterado"
+
+
+def test_leftover_discarded(manager, tmp_path, monkeypatch):
+    """O backup incremental não retoma o .zip e apaga a sobra."""
+    worlds, _ = make_world(tmp_path)
+    name, _ = interrupted(manager, worlds, monkeypatch, 2)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert not any(
+        n.startswith(name) for n in os.listdir(manager.backup_dir_java)
+    )
+
+
+def test_cleanup_leftovers(manager, tmp_path):
+    """Sobras antigas saem; recentes, em uso ou retomáveis ficam."""
+    backup_dir = manager.backup_dir_java
+    os.makedirs(os.path.join(backup_dir, "m_20200101_000000.snap.partial"))
+    old = [
+        "m_20200101_000000.snap.partial",
+        "m_20200101_000000.tar.zst.partial",
+        "m_20200102_000000.zip.checkpoint",
+    ]
+    kept = [
+        "m_20200103_000000.zip.partial",
+        "m_20200103_000000.zip.checkpoint",
+        "m_20200104_000000.tar.zst.partial",
+        "m_20200105_000000.tar.zst.partial",
+    ]
+    for name in old[1:] + kept:
+        with open(os.path.join(backup_dir, name), "wb") as f:
+            f.write(b"x")
+    stale = time.time() - checkpoint.STALE_SECONDS - 60
+    for name in old + kept[:2] + kept[3:]:
+        os.utime(os.path.join(backup_dir, name), (stale, stale))
+    with checkpoint.running(os.path.join(backup_dir, kept[3])):
+        assert manager.list_backups("java") == []
+    assert sorted(os.listdir(backup_dir)) == sorted(kept + ["catalog.sqlite3"])
+    # par retomável abandonado há mais de KEEP_SECONDS também sai
+    now = time.time() + checkpoint.KEEP_SECONDS
+    assert sorted(checkpoint.cleanup(backup_dir, now)) == sorted(kept)
@@ -0,0 +1,106 @@
+"""
+Módulo de testes para backup.codec:
+ - test_choose_incompressible: dados aleatórios e gzip são apenas armazenados.
+ - test_choose_by_profile: dados compressíveis usam o codec do perfil.
+ - test_invalid_profile: perfil desconhecido gera ValueError.
+ - test_make_backup_profile: metadata.json registra o perfil e os métodos variam.
+ - test_blob_stored_when_incompressible: blobs incompressíveis não são recomprimidos.
+ - test_region_sample_skips_header: região .mca com chunks em zlib é
+   armazenada; o cabeçalho não entra na amostra.
+"""
+
+import gzip
+import json
+import os
+import struct
+import zipfile
+import zlib
+
+import pytest
+
+from backup import anvil, codec, store
+
+
+def test_choose_incompressible():
+    """Amostras aleatórias ou com assinatura gzip viram ZIP_STORED."""
+    assert codec.choose(os.urandom(100000))[0] == zipfile.ZIP_STORED
+    gz = gzip.compress(b"a" * 1000)
+    assert codec.choose(gz)[0] == zipfile.ZIP_STORED
+    assert codec.choose(b"tiny")[0] == zipfile.ZIP_STORED
+
+
+@pytest.mark.parametrize(
+    "profile, method",
+    [
+        ("fast", zipfile.ZIP_DEFLATED),
+        ("balanced", zipfile.ZIP_DEFLATED),
+        ("smallest", zipfile.ZIP_LZMA),
+    ],
+)
+def test_choose_by_profile(profile, method):
+    """Dados repetitivos usam o método configurado no perfil."""
+    assert codec.choose(b"minecraft " * 10000, profile)[0] == method
+
+
+def test_invalid_profile():
+    """Perfis fora de PROFILES são rejeitados."""
+    with pytest.raises(ValueError):
+        codec.check_profile("turbo")
+
+
+def test_make_backup_profile(manager, tmp_path):
+    """O perfil vai para metadata.json e cada arquivo recebe seu método."""
+    worlds = tmp_path / "worlds"
+    (worlds / "mundo").mkdir(parents=True)
+    (worlds / "mundo" / "level.dat").write_bytes(gzip.compress(b"x" * 5000))
+    (worlds / "mundo" / "text.json").write_bytes(b'{"a": 1}' * 2000)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", profile="smallest"
+    )
+    [(name, _)] = manager.list_backups("java")
+    with zipfile.ZipFile(os.path.join(manager.backup_dir_java, name)) as z:
+        assert z.testzip() is None
+        assert json.loads(z.read("metadata.json"))["profile"] == "smallest"
+        methods = {i.filename: i.compress_type for i in z.infolist()}
+    assert methods["mundo/level.dat"] == zipfile.ZIP_STORED
+    assert methods["mundo/text.json"] == zipfile.ZIP_LZMA
+
+
+def test_blob_stored_when_incompressible(tmp_path):
+    """put_file grava dados aleatórios com o prefixo BLOB_STORED."""
+    src = tmp_path / "rand.bin"
+    data = os.urandom(200000)
+    src.write_bytes(data)
+    blobs = store.BlobStore(str(tmp_path / "store"))
+    digest, _ = blobs.put_file(str(src))
+    with open(blobs.path_for(digest), "rb") as f:
+        assert f.read(1) == store.BLOB_STORED
+    assert blobs.read(digest) == data
+
+
+def test_region_sample_skips_header(manager, tmp_path):
+    """Chunks já em zlib: a região vai sem recompressão no .zip e no blob."""
+    chunks = {}
+    for idx in range(0, 1024, 7):
+        data = zlib.compress(os.urandom(4000))
+        chunks[idx] = (1, struct.pack(">IB", len(data) + 1, 2) + data)
+    region = anvil.region_bytes(chunks)
+    first = region[: 1024 * 1024]
+    # com o cabeçalho a amostra parece compressível
+    assert codec.choose(first)[0] == zipfile.ZIP_DEFLATED
+    assert codec.sample(first, "level.dat") is first
+    sample = codec.sample(first, "region/r.0.0.mca")
+    assert codec.choose(sample)[0] == zipfile.ZIP_STORED
+    worlds = tmp_path / "worlds"
+    path = worlds / "mundo" / "region" / "r.0.0.mca"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(region)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    with zipfile.ZipFile(os.path.join(manager.backup_dir_java, name)) as z:
+        info = z.getinfo("mundo/region/r.0.0.mca")
+    assert info.compress_type == zipfile.ZIP_STORED
+    blobs = store.BlobStore(str(tmp_path / "store"))
+    digest, _ = blobs.put_file(str(path))
+    with open(blobs.path_for(digest), "rb") as f:
+        assert f.read(1) == store.BLOB_STORED
@@ -0,0 +1,228 @@
+"""
+Módulo de testes para backup.daemon:
+ - test_world_signature: assinatura muda com tamanho ou quantidade de arquivos.
+ - test_debounce: backup só após o mundo ficar quieto por `debounce`.
+ - test_max_wait: mundo que nunca para de mudar é salvo após `max_wait`.
+ - test_only_changed_worlds: só o mundo alterado ganha novo backup.
+ - test_existing_backup_skips_startup: backup mais novo que o mundo evita cópia.
+ - test_interval_per_world: intervalo mínimo por mundo é respeitado.
+ - test_concurrency_limit: no máximo `concurrency` backups simultâneos.
+ - test_failed_backup_retried: falha é repetida após o debounce, não após
+   o intervalo.
+ - test_parse_args: --world-interval vira dicionário de intervalos.
+"""
+
+import threading
+
+import pytest
+
+from backup import daemon
+from cli import daemon_main
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_worlds(tmp_path, *names):
+    worlds = tmp_path / "worlds"
+    for name in names:
+        (worlds / name).mkdir(parents=True)
+        (worlds / name / "level.dat").write_bytes(b"x")
+    return worlds
+
+
+def make_daemon(manager, worlds, clock, **kw):
+    kw.setdefault("debounce", 10)
+    kw.setdefault("max_wait", 100)
+    kw.setdefault("interval", 0)
+    return daemon.BackupDaemon(
+        manager,
+        [("java", str(worlds))],
+        clock=clock,
+        log=lambda msg: None,
+        **kw,
+    )
+
+
+def run_tick(d):
+    started = d.tick()
+    d.wait()
+    return started
+
+
+def test_world_signature(tmp_path):
+    """Novo arquivo ou tamanho diferente alteram a assinatura."""
+    worlds = make_worlds(tmp_path, "a")
+    first = daemon.world_signature(str(worlds / "a"))
+    assert first[:2] == (1, 1)
+    (worlds / "a" / "level.dat").write_bytes(b"xy")
+    second = daemon.world_signature(str(worlds / "a"))
+    assert second[:2] == (1, 2)
+    (worlds / "a" / "new.dat").write_bytes(b"")
+    assert daemon.world_signature(str(worlds / "a"))[0] == 2
+
+
+def test_debounce(manager, tmp_path):
+    """Mudanças seguidas adiam o backup até 10s sem alterações."""
+    worlds = make_worlds(tmp_path, "a")
+    clock = Clock()
+    d = make_daemon(manager, worlds, clock)
+    assert run_tick(d) == []
+    clock.now = 5
+    (worlds / "a" / "level.dat").write_bytes(b"xy")
+    assert run_tick(d) == []
+    clock.now = 14
+    assert run_tick(d) == []
+    clock.now = 15
+    assert run_tick(d) == ["a"]
+    assert len(manager.list_backups("java", world="a")) == 1
+    clock.now = 100
+    assert run_tick(d) == []
+
+
+def test_max_wait(manager, tmp_path):
+    """Com saves a cada 5s, o backup sai em max_wait (30s)."""
+    worlds = make_worlds(tmp_path, "a")
+    clock = Clock()
+    d = make_daemon(manager, worlds, clock, max_wait=30)
+    started = []
+    for t in range(0, 40, 5):
+        clock.now = t
+        (worlds / "a" / "level.dat").write_bytes(b"x" * (t + 2))
+        started.append((t, run_tick(d)))
+    assert [t for t, s in started if s] == [30]
+
+
+def test_only_changed_worlds(manager, tmp_path):
+    """Depois do primeiro ciclo, só o mundo modificado é salvo."""
+    worlds = make_worlds(tmp_path, "a", "b")
+    clock = Clock()
+    d = make_daemon(manager, worlds, clock, concurrency=2)
+    assert run_tick(d) == []
+    clock.now = 10
+    assert sorted(run_tick(d)) == ["a", "b"]
+    (worlds / "b" / "level.dat").write_bytes(b"changed")
+    clock.now = 20
+    run_tick(d)
+    clock.now = 30
+    assert run_tick(d) == ["b"]
+    assert len(manager.list_backups("java", world="a")) == 1
+    assert len(manager.list_backups("java", world="b")) == 2
+
+
+def test_existing_backup_skips_startup(manager, tmp_path):
+    """Um daemon novo não repete backup de mundo já salvo."""
+    worlds = make_worlds(tmp_path, "a")
+    assert manager.make_backup(str(worlds), "a", "java")
+    clock = Clock()
+    d = make_daemon(manager, worlds, clock)
+    clock.now = 1000
+    assert run_tick(d) == []
+
+
+def test_interval_per_world(manager, tmp_path):
+    """Mundo com intervalo de 60s não é salvo de novo antes disso."""
+    worlds = make_worlds(tmp_path, "a")
+    clock = Clock()
+    d = make_daemon(manager, worlds, clock, intervals={"a": 60})
+    assert run_tick(d) == []
+    clock.now = 10
+    assert run_tick(d) == ["a"]
+    (worlds / "a" / "level.dat").write_bytes(b"changed")
+    clock.now = 30
+    assert run_tick(d) == []
+    clock.now = 50
+    assert run_tick(d) == []
+    clock.now = 70
+    assert run_tick(d) == ["a"]
+
+
+class BlockingManager:
+    """Gerenciador falso cujo backup espera um sinal"""
+
+    def __init__(self, real):
+        self.real = real
+        self.gate = threading.Event()
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def list_worlds(self, path):
+        return self.real.list_worlds(path)
+
+    def _dir_for(self, edition):
+        return self.real._dir_for(edition)
+
+    def make_backup(self, *args, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.gate.wait(5)
+        with self.lock:
+            self.running -= 1
+        return True
+
+
+def test_concurrency_limit(manager, tmp_path):
+    """Três mundos alterados e limite 2: o terceiro espera a vez."""
+    worlds = make_worlds(tmp_path, "a", "b", "c")
+    fake = BlockingManager(manager)
+    clock = Clock()
+    d = make_daemon(fake, worlds, clock, concurrency=2)
+    assert d.tick() == []
+    clock.now = 10
+    assert len(d.tick()) == 2
+    assert d.tick() == []
+    fake.gate.set()
+    d.wait()
+    assert len(run_tick(d)) == 1
+    assert fake.peak == 2
+
+
+class FailingManager(BlockingManager):
+    """Gerenciador falso cujo primeiro backup falha"""
+
+    def __init__(self, real):
+        super().__init__(real)
+        self.results = [False, True]
+        self.calls = 0
+
+    def make_backup(self, *args, **kwargs):
+        self.calls += 1
+        return self.results.pop(0)
+
+
+def test_failed_backup_retried(manager, tmp_path):
+    """Backup que falhou volta após o debounce, mesmo com intervalo longo."""
+    worlds = make_worlds(tmp_path, "a")
+    fake = FailingManager(manager)
+    clock = Clock()
+    d = make_daemon(fake, worlds, clock, interval=3600)
+    assert run_tick(d) == []
+    clock.now = 10
+    assert run_tick(d) == ["a"]
+    clock.now = 15
+    assert run_tick(d) == []
+    clock.now = 20
+    assert run_tick(d) == ["a"]
+    assert fake.calls == 2
+    # com sucesso, o intervalo volta a valer
+    (worlds / "a" / "level.dat").write_bytes(b"changed")
+    clock.now = 40
+    assert run_tick(d) == []
+
+
+def test_parse_args():
+    """Intervalos por mundo e validação do formato."""
+    args = daemon_main.parse_args(
+        ["--world-interval", "survival=600", "--concurrency", "2"]
+    )
+    assert args.intervals == {"survival": 600.0}
+    assert args.concurrency == 2
+    with pytest.raises(SystemExit):
+        daemon_main.parse_args(["--world-interval", "semigual"])
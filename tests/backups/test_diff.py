@@ -0,0 +1,149 @@
+"""
+Módulo de testes para backup.diff:
+ - test_backup_to_backup: arquivos e chunks adicionados, removidos e
+   alterados entre dois .zip.
+ - test_no_payload_reads: a comparação não lê o conteúdo das entradas.
+ - test_mixed_formats: .zip, incremental e snapshot do mesmo mundo são
+   iguais entre si.
+ - test_live_world: backup contra o mundo em disco, usando o estado de
+   stat para não reler o que não mudou.
+ - test_diff_failures: backup inexistente ou sem mundo para comparar.
+"""
+
+import os
+import struct
+
+from backup import anvil, restore
+
+
+def record(tag):
+    data = tag.encode() * 10
+    return struct.pack(">IB", len(data) + 1, 2) + data
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    (w / "data").mkdir()
+    (w / "level.dat").write_bytes(b"level" * 100)
+    (w / "data" / "a.dat").write_bytes(b"a" * 500)
+    chunks = {i: (1, record(f"c{i}")) for i in (0, 7, 14, 40)}
+    anvil.write_region(str(w / "region" / "r.0.0.mca"), chunks)
+    # mtimes antigos: fora da janela "racy" do estado de stat
+    for p in w.rglob("*"):
+        os.utime(p, (1_600_000_000, 1_600_000_000))
+    return worlds, w, chunks
+
+
+def backup(manager, worlds, mode="zip"):
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode=mode, force=True
+    )
+    return manager.list_backups("java")[-1][0]
+
+
+def edit_world(w, chunks):
+    chunks = dict(chunks)
+    chunks[7] = (2, record("novo7"))
+    chunks[3] = (2, record("novo3"))
+    del chunks[14]
+    anvil.write_region(str(w / "region" / "r.0.0.mca"), chunks)
+    (w / "level.dat").write_bytes(b"LEVEL" * 100)
+    (w / "data" / "a.dat").unlink()
+    (w / "data" / "b.dat").write_bytes(b"b" * 300)
+
+
+def test_backup_to_backup(manager, tmp_path):
+    """Só o que mudou aparece; a região lista os chunks por índice."""
+    worlds, w, chunks = make_world(tmp_path)
+    old = backup(manager, worlds)
+    edit_world(w, chunks)
+    new = backup(manager, worlds)
+    result = manager.diff_backups(old, new, "java")
+    assert result.added == ["data/b.dat"]
+    assert result.removed == ["data/a.dat"]
+    assert result.changed == ["level.dat", "region/r.0.0.mca"]
+    assert result.regions == {
+        "region/r.0.0.mca": {"added": [3], "removed": [14], "changed": [7]}
+    }
+    info = result.summary()
+    assert info["bytes_added"] == 300
+    assert info["bytes_removed"] == 500
+    assert info["chunks_changed"] == 1
+    assert not result.clean
+    assert manager.diff_backups(old, old, "java").clean
+
+
+def test_no_payload_reads(manager, tmp_path, monkeypatch):
+    """Sem extração: só diretório central e cabeçalho das regiões."""
+    worlds, w, chunks = make_world(tmp_path)
+    old = backup(manager, worlds)
+    edit_world(w, chunks)
+    new = backup(manager, worlds)
+
+    def forbidden(*args):
+        raise AssertionError("conteúdo lido durante o diff")
+
+    for name in ("read_bytes", "extract", "matches", "verify"):
+        monkeypatch.setattr(restore.ZipSource, name, forbidden)
+    result = manager.diff_backups(old, new, "java")
+    assert result is not None
+    assert len(result.changed) == 2
+
+
+def test_mixed_formats(manager, tmp_path, monkeypatch):
+    """Mesmo mundo em três formatos: nenhuma diferença."""
+    worlds, _, _ = make_world(tmp_path)
+    names = [
+        backup(manager, worlds, mode)
+        for mode in ("zip", "incremental", "hardlink")
+    ]
+
+    def forbidden(*args):
+        raise AssertionError("conteúdo lido durante o diff")
+
+    monkeypatch.setattr(restore.ZipSource, "read_bytes", forbidden)
+    monkeypatch.setattr(restore.ManifestSource, "read_bytes", forbidden)
+    for old in names:
+        for new in names:
+            result = manager.diff_backups(old, new, "java")
+            assert result.clean, (old, new)
+            assert result.unchanged == 3
+
+
+def test_live_world(manager, tmp_path, monkeypatch):
+    """Mundo igual ao último backup não é relido; alterações aparecem."""
+    worlds, w, chunks = make_world(tmp_path)
+    old = backup(manager, worlds)
+    called = []
+    original = restore.ZipSource.matches
+
+    def spy(self, info, path):
+        called.append(path)
+        return original(self, info, path)
+
+    monkeypatch.setattr(restore.ZipSource, "matches", spy)
+    result = manager.diff_backups(old, edition="java", worlds_path=worlds)
+    assert result.clean
+    assert result.new == "mundo"
+    assert called == []
+    edit_world(w, chunks)
+    result = manager.diff_backups(old, edition="java", worlds_path=worlds)
+    assert result.added == ["data/b.dat"]
+    assert result.changed == ["level.dat", "region/r.0.0.mca"]
+    assert result.regions["region/r.0.0.mca"]["changed"] == [7]
+
+
+def test_diff_failures(manager, tmp_path):
+    """Falhas retornam None em vez de lançar exceção."""
+    worlds, _, _ = make_world(tmp_path)
+    name = backup(manager, worlds)
+    assert manager.diff_backups("nada.zip", name, "java") is None
+    assert manager.diff_backups(name, edition="java") is None
+    empty = tmp_path / "vazio"
+    empty.mkdir()
+    assert (
+        manager.diff_backups(name, edition="java", worlds_path=str(empty))
+        is None
+    )
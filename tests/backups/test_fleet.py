@@ -0,0 +1,255 @@
+"""
+Módulo de testes para backup.fleet:
+ - test_parse_config: destinos padrão, caminhos relativos e erros.
+ - test_load_toml: configuração TOML com limites por disco.
+ - test_token_bucket_chunks: pedidos grandes são reservados em pedaços.
+ - test_plan_fair_order: servidores alternados, mundos menores antes.
+ - test_scheduler_disk_limit: disco ocupado não segura outros discos.
+ - test_fleet_backup: backup de dois servidores em destinos separados.
+ - test_throttle_only_read_bytes: incremental só gasta o que releu.
+ - test_fleet_retention: retenção por servidor depois dos backups.
+"""
+
+import threading
+import time
+
+import pytest
+
+from backup import fleet
+
+
+def make_world(worlds, name, size):
+    world = worlds / name
+    world.mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"l" * 10)
+    (world / "data.dat").write_bytes(b"x" * size)
+
+
+def test_parse_config(tmp_path):
+    """Destino padrão é <backup_dir>/<nome>; destinos repetidos falham."""
+    conf = fleet.parse_config(
+        {
+            "backup_dir": "bk",
+            "per_disk": 2,
+            "servers": [
+                {"name": "a", "worlds_path": "srv/a"},
+                {
+                    "name": "b",
+                    "worlds_path": "/srv/b",
+                    "edition": "bedrock",
+                    "worlds": "survival*",
+                    "mode": "incremental",
+                },
+            ],
+        },
+        str(tmp_path),
+    )
+    a, b = conf.servers
+    assert a.worlds_path == str(tmp_path / "srv" / "a")
+    assert a.destination == str(tmp_path / "bk" / "a")
+    assert a.manager.backup_dir_java == str(tmp_path / "bk" / "a" / "java")
+    assert (b.edition, b.worlds, b.mode) == (
+        "bedrock",
+        ["survival*"],
+        "incremental",
+    )
+    assert conf.per_disk == 2
+    assert conf.concurrency == fleet.DEFAULT_CONCURRENCY
+    assert conf.read_bps is None
+    with pytest.raises(fleet.FleetError):
+        fleet.parse_config(
+            {
+                "servers": [
+                    {"worlds_path": "a", "destination": "d"},
+                    {"worlds_path": "b", "destination": "d"},
+                ]
+            }
+        )
+    with pytest.raises(fleet.FleetError):
+        fleet.parse_config({"servers": [{"worlds_path": "a"}], "per_disk": 0})
+
+
+def test_load_toml(tmp_path):
+    """Arquivo TOML com [disks] e orçamento de leitura em MB/s."""
+    pytest.importorskip("tomllib")
+    path = tmp_path / "frota.toml"
+    path.write_text(
+        "read_mb_per_s = 50\n"
+        "concurrency = 3\n"
+        "[disks]\n"
+        '"/mnt/hdd" = 1\n'
+        "[[servers]]\n"
+        'name = "survival"\n'
+        'worlds_path = "servers/survival"\n',
+        encoding="utf-8",
+    )
+    conf = fleet.load_config(str(path))
+    assert conf.read_bps == 50 * 1024 * 1024
+    assert conf.concurrency == 3
+    assert conf.disk_limits == {"/mnt/hdd": 1}
+    [server] = conf.servers
+    assert server.worlds_path == str(tmp_path / "servers" / "survival")
+
+
+def test_token_bucket_chunks():
+    """100 bytes a 10 B/s com burst 10: dez reservas de um segundo."""
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = fleet.TokenBucket(10, clock=lambda: now[0], sleep=sleep)
+    bucket.consume(10)
+    assert sleeps == []
+    bucket.consume(100)
+    assert len(sleeps) == 10
+    assert sum(sleeps) == pytest.approx(10.0)
+
+
+def test_plan_fair_order(tmp_path):
+    """Cada rodada pega um mundo de cada servidor, do menor ao maior."""
+    for name, sizes in (("a", [300, 100, 200]), ("b", [50])):
+        for i, size in enumerate(sizes):
+            make_world(tmp_path / name, f"{name}{i}", size)
+    conf = fleet.parse_config(
+        {
+            "servers": [
+                {"name": "a", "worlds_path": "a"},
+                {"name": "b", "worlds_path": "b"},
+            ]
+        },
+        str(tmp_path),
+    )
+    order = [(j.server.name, j.world) for j in fleet.plan(conf)]
+    assert order == [("a", "a1"), ("b", "b0"), ("a", "a2"), ("a", "a0")]
+
+
+def test_scheduler_disk_limit(tmp_path, monkeypatch):
+    """Com 1 backup por disco, o job do disco 2 roda junto com o do 1."""
+    running = []
+    started = []
+    peak = {}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def backup(self, job, cancel):
+        with lock:
+            started.append(job.world)
+            running.append(job)
+            for d in job.disks:
+                peak[d] = max(
+                    peak.get(d, 0), sum(d in j.disks for j in running)
+                )
+        if job.world == "w2":
+            release.set()
+        release.wait(5)
+        time.sleep(0.01)
+        with lock:
+            running.remove(job)
+
+    monkeypatch.setattr(fleet.FleetScheduler, "_backup", backup)
+    server = fleet.Server("s", str(tmp_path), "java", str(tmp_path / "d"))
+    jobs = [
+        fleet.Job(server, "w0", 0, frozenset([1])),
+        fleet.Job(server, "w1", 0, frozenset([1])),
+        fleet.Job(server, "w2", 0, frozenset([2])),
+    ]
+    scheduler = fleet.FleetScheduler(concurrency=3, per_disk=1)
+    scheduler.run(jobs)
+    # w1 espera o disco 1; w2 não fica atrás dele
+    assert started == ["w0", "w2", "w1"]
+    assert peak == {1: 1, 2: 1}
+
+
+def test_fleet_backup(tmp_path):
+    """Registros por servidor e backups em destinos separados."""
+    make_world(tmp_path / "a", "world", 1000)
+    make_world(tmp_path / "b", "world", 2000)
+    conf = fleet.parse_config(
+        {
+            "read_mb_per_s": 100,
+            "servers": [
+                {"name": "a", "worlds_path": "a"},
+                {"name": "b", "worlds_path": "b", "mode": "incremental"},
+            ],
+        },
+        str(tmp_path),
+    )
+    scheduler = fleet.FleetScheduler.from_fleet(conf)
+    records = scheduler.run(fleet.plan(conf))
+    assert [(r["server"], r["status"]) for r in records] == [
+        ("a", "ok"),
+        ("b", "ok"),
+    ]
+    assert "throttle" in records[0]["phases"]
+    a, b = conf.servers
+    assert len(a.manager.list_backups("java")) == 1
+    assert b.manager.list_backups("java")[0][0].endswith(".manifest.json")
+    assert a.manager.metrics_hooks == []
+
+
+def test_throttle_only_read_bytes(manager, tmp_path):
+    """Arquivos reaproveitados do manifesto não consomem o orçamento."""
+    make_world(tmp_path / "worlds", "mundo", 5000)
+
+    class Recorder:
+        def __init__(self):
+            self.total = 0
+
+        def consume(self, nbytes):
+            self.total += nbytes
+
+    worlds = str(tmp_path / "worlds")
+    first = Recorder()
+    assert manager.make_backup(
+        worlds, "mundo", "java", mode="incremental", throttle=first
+    )
+    assert first.total == 5010
+    (tmp_path / "worlds" / "mundo" / "level.dat").write_bytes(b"m" * 20)
+    second = Recorder()
+    assert manager.make_backup(
+        worlds, "mundo", "java", mode="incremental", throttle=second
+    )
+    assert second.total == 20
+
+
+def test_fleet_retention(tmp_path):
+    """Só o servidor com retenção perde os backups antigos."""
+    make_world(tmp_path / "a", "world", 1000)
+    make_world(tmp_path / "b", "world", 1000)
+    conf = fleet.parse_config(
+        {
+            "retention": {"last": 1},
+            "servers": [
+                {"name": "a", "worlds_path": "a"},
+                {"name": "b", "worlds_path": "b", "retention": None},
+            ],
+        },
+        str(tmp_path),
+    )
+    a, b = conf.servers
+    assert a.retention.last == 1
+    assert b.retention is None
+    for server in conf.servers:
+        server.manager.make_backup(
+            server.worlds_path, "world", "java", mode="zip", force=True
+        )
+    records = fleet.FleetScheduler.from_fleet(conf).run(fleet.plan(conf))
+    assert [r["status"] for r in records] == ["skipped", "skipped"]
+    for server in conf.servers:
+        server.manager.make_backup(
+            server.worlds_path, "world", "java", force=True
+        )
+    [(server, world, name)] = fleet.apply_retention(conf, records)
+    assert (server, world) == (a, "world")
+    assert len(a.manager.list_backups("java")) == 1
+    assert len(b.manager.list_backups("java")) == 2
+    with pytest.raises(fleet.FleetError):
+        fleet.parse_config(
+            {
+                "retention": {"daily": -1},
+                "servers": [{"worlds_path": "a"}],
+            }
+        )
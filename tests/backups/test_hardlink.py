@@ -0,0 +1,161 @@
+"""
+Módulo de testes para backup.hardlink:
+ - test_unchanged_files_hardlinked: só o arquivo alterado é copiado.
+ - test_restore_copies_files: o mundo restaurado não compartilha inodes
+   com o snapshot; restauração delta também funciona.
+ - test_catalog_listing: snapshot aparece com descrição e bytes copiados.
+ - test_verify_snapshot: arquivo alterado dentro do snapshot é acusado.
+ - test_export_zip: exportação para .zip com metadata e hashes.
+ - test_prune_snapshot: apagar o antigo não afeta os hardlinks do novo.
+ - test_cancel_leaves_nothing: cancelamento não deixa pasta parcial.
+"""
+
+import json
+import os
+import threading
+import zipfile
+
+from backup import catalog, hardlink
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    (w / "db").mkdir()
+    (w / "level.dat").write_bytes(b"level" * 100)
+    (w / "region" / "r.0.0.mca").write_bytes(os.urandom(8192))
+    (w / "db" / "000005.ldb").write_bytes(b"tabela" * 50)
+    return worlds, w
+
+
+def snapshot_backup(manager, worlds, description=None):
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", description, mode="hardlink"
+    )
+    name = manager.list_backups("java")[-1][0]
+    return name, os.path.join(manager.backup_dir_java, name)
+
+
+def test_unchanged_files_hardlinked(manager, tmp_path):
+    """level.dat alterado é copiado; região e tabela viram hardlinks."""
+    worlds, w = make_world(tmp_path)
+    first, first_path = snapshot_backup(manager, worlds)
+    assert first.endswith(".snap")
+    (w / "level.dat").write_bytes(b"novo" * 10)
+    second, second_path = snapshot_backup(manager, worlds)
+    assert second != first
+    for rel in ("region/r.0.0.mca", "db/000005.ldb"):
+        assert os.path.samefile(
+            os.path.join(first_path, "mundo", rel),
+            os.path.join(second_path, "mundo", rel),
+        )
+    old = os.path.join(first_path, "mundo", "level.dat")
+    new = os.path.join(second_path, "mundo", "level.dat")
+    assert not os.path.samefile(old, new)
+    with open(old, "rb") as f:
+        assert f.read() == b"level" * 100
+    meta = hardlink.load_metadata(second_path)
+    assert meta["bytes_copied"] == 40
+    assert set(meta["sha256"]) == {
+        "level.dat",
+        "region/r.0.0.mca",
+        "db/000005.ldb",
+    }
+
+
+def test_restore_copies_files(manager, tmp_path):
+    """Alterar o mundo restaurado não altera o snapshot."""
+    worlds, w = make_world(tmp_path)
+    original = (w / "region" / "r.0.0.mca").read_bytes()
+    name, path = snapshot_backup(manager, worlds)
+    (w / "region" / "r.0.0.mca").write_bytes(b"griefado")
+    assert manager.restore_backup(str(worlds), name, "java")
+    mca = w / "region" / "r.0.0.mca"
+    assert mca.read_bytes() == original
+    stored = os.path.join(path, "mundo", "region", "r.0.0.mca")
+    assert not os.path.samefile(mca, stored)
+    mca.write_bytes(b"de novo")
+    with open(stored, "rb") as f:
+        assert f.read() == original
+    assert manager.restore_backup(str(worlds), name, "java", mode="delta")
+    assert mca.read_bytes() == original
+
+
+def test_catalog_listing(manager, tmp_path):
+    """O tamanho no catálogo é o que foi copiado de fato."""
+    worlds, w = make_world(tmp_path)
+    snapshot_backup(manager, worlds, "antes")
+    (w / "level.dat").write_bytes(b"x" * 7)
+    name, _ = snapshot_backup(manager, worlds, "depois")
+    rows = manager.backup_rows("java")
+    assert [r["description"] for r in rows] == ["antes", "depois"]
+    assert rows[1]["name"] == name
+    assert rows[1]["size"] == 7
+    assert rows[1]["file_count"] == 3
+    # .partial de um backup interrompido não é listado
+    os.makedirs(os.path.join(manager.backup_dir_java, "x_1.snap.partial"))
+    assert len(catalog.scan(manager.backup_dir_java)) == 2
+    assert len(manager.list_backups("java")) == 2
+
+
+def test_verify_snapshot(manager, tmp_path):
+    """Verificação relê os arquivos e compara com o metadata.json."""
+    worlds, _ = make_world(tmp_path)
+    name, path = snapshot_backup(manager, worlds)
+    assert manager.verify_backup(name, "java")
+    with open(os.path.join(path, "mundo", "level.dat"), "wb") as f:
+        f.write(b"estragado")
+    records = []
+    manager.metrics_hooks.append(records.append)
+    assert not manager.verify_backup(name, "java")
+    assert records[0]["status"] == "corrupt"
+    assert "level.dat" in records[0]["error"]
+
+
+def test_export_zip(manager, tmp_path):
+    """O .zip exportado traz o mundo, a descrição e os hashes."""
+    worlds, w = make_world(tmp_path)
+    name, _ = snapshot_backup(manager, worlds, "offsite")
+    dst = manager.export_backup(name, "java")
+    assert dst == os.path.join(
+        manager.backup_dir_java, "exports", name[: -len(".snap")] + ".zip"
+    )
+    with zipfile.ZipFile(dst) as z:
+        meta = json.loads(z.read("metadata.json"))
+        assert z.read("mundo/level.dat") == b"level" * 100
+    assert meta["description"] == "offsite"
+    assert set(meta["sha256"]) == {
+        "level.dat",
+        "region/r.0.0.mca",
+        "db/000005.ldb",
+    }
+    assert "bytes_copied" not in meta
+    # o .zip não entra na lista de backups da pasta
+    assert len(manager.list_backups("java")) == 1
+    assert manager.export_backup("nada.zip", "java") is None
+
+
+def test_prune_snapshot(manager, tmp_path):
+    """O snapshot restante continua completo depois do prune."""
+    worlds, w = make_world(tmp_path)
+    first, first_path = snapshot_backup(manager, worlds)
+    (w / "level.dat").write_bytes(b"novo")
+    second, _ = snapshot_backup(manager, worlds)
+    assert manager.prune_backups("java", keep=1) == [first]
+    assert not os.path.exists(first_path)
+    assert manager.verify_backup(second, "java")
+
+
+def test_cancel_leaves_nothing(manager, tmp_path):
+    """Backup cancelado não deixa .snap nem .snap.partial."""
+    worlds, _ = make_world(tmp_path)
+    cancel = threading.Event()
+    cancel.set()
+    assert not manager.make_backup(
+        str(worlds), "mundo", "java", mode="hardlink", cancel=cancel
+    )
+    assert not any(
+        n.endswith((".snap", ".partial"))
+        for n in os.listdir(manager.backup_dir_java)
+    )
@@ -0,0 +1,95 @@
+"""
+Módulo de testes para backup.leveldb:
+ - test_classification: tabelas em db/ são imutáveis, demais arquivos não.
+ - test_read_priority: CURRENT, MANIFEST e logs são lidos antes das tabelas.
+ - test_tables_reused_by_name_and_size: .ldb com mesmo nome/tamanho não é relido.
+ - test_restore_rebuilds_db: restauração remove logs/tabelas que sobraram.
+"""
+
+import os
+
+from backup import leveldb, store
+
+
+def test_classification():
+    """Apenas .ldb/.sst diretamente em db/ são tabelas imutáveis."""
+    assert leveldb.is_immutable_table("db/000005.ldb")
+    assert leveldb.is_immutable_table("db/000005.sst")
+    assert not leveldb.is_immutable_table("db/000006.log")
+    assert not leveldb.is_immutable_table("db/CURRENT")
+    assert not leveldb.is_immutable_table("other/000005.ldb")
+
+
+def test_read_priority():
+    """Arquivos mutáveis vêm antes das tabelas na ordem de captura."""
+    paths = [
+        "db/000007.ldb",
+        "db/000008.log",
+        "db/MANIFEST-000004",
+        "db/CURRENT",
+        "level.dat",
+    ]
+    ordered = sorted(paths, key=leveldb.read_priority)
+    assert ordered == [
+        "level.dat",
+        "db/CURRENT",
+        "db/MANIFEST-000004",
+        "db/000008.log",
+        "db/000007.ldb",
+    ]
+
+
+def make_bedrock_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    db = worlds / "abc" / "db"
+    db.mkdir(parents=True)
+    (worlds / "abc" / "levelname.txt").write_text("Mundo")
+    (db / "CURRENT").write_text("MANIFEST-000004\n")
+    (db / "MANIFEST-000004").write_bytes(b"manifest-1")
+    (db / "000006.log").write_bytes(b"log-1")
+    (db / "000005.ldb").write_bytes(b"table-5" * 200)
+    return worlds, db
+
+
+def test_tables_reused_by_name_and_size(manager, tmp_path, monkeypatch):
+    """Tabela tocada (mtime novo) mas de mesmo tamanho não é relida."""
+    worlds, db = make_bedrock_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "abc", "bedrock", mode="incremental"
+    )
+    os.utime(db / "000005.ldb", ns=(1, 1))
+    (db / "000006.log").write_bytes(b"log-2-longer")
+    (db / "000009.ldb").write_bytes(b"table-9")
+    read = []
+    original = store.BlobStore.put_file
+
+    def spy(self, path):
+        read.append(os.path.basename(path))
+        return original(self, path)
+
+    monkeypatch.setattr(store.BlobStore, "put_file", spy)
+    assert manager.make_backup(
+        str(worlds), "abc", "bedrock", mode="incremental"
+    )
+    assert "000005.ldb" not in read
+    assert {"000006.log", "000009.ldb"} <= set(read)
+
+
+def test_restore_rebuilds_db(manager, tmp_path):
+    """Arquivos de db/ ausentes no backup são removidos na restauração."""
+    worlds, db = make_bedrock_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "abc", "bedrock", mode="incremental"
+    )
+    (db / "000010.log").write_bytes(b"newer-log")
+    (db / "000011.ldb").write_bytes(b"newer-table")
+    (db / "CURRENT").write_text("MANIFEST-000012\n")
+    name, _ = manager.list_backups("bedrock")[0]
+    assert manager.restore_backup(str(worlds), name, "bedrock")
+    assert sorted(os.listdir(db)) == [
+        "000005.ldb",
+        "000006.log",
+        "CURRENT",
+        "MANIFEST-000004",
+    ]
+    assert (db / "CURRENT").read_text() == "MANIFEST-000004\n"
@@ -0,0 +1,154 @@
+"""
+Módulo de testes para backup.metrics:
+ - test_zip_backup_record: fases e contadores de um backup .zip.
+ - test_incremental_counters: incremental conta só o que foi relido.
+ - test_status_skipped_and_failed: mundo parado e mundo inexistente.
+ - test_restore_delta_record: restauração delta conta inalterados.
+ - test_hook_error_is_warning: hook com erro não derruba o backup.
+ - test_json_lines_sink: uma linha JSON por operação.
+ - test_prometheus_textfile: .prom com labels escapados e estado persistido;
+   verificação "cached" conta como sucesso.
+"""
+
+import json
+
+from backup import metrics
+
+
+def make_world(tmp_path):
+    world = tmp_path / "worlds" / "mundo"
+    (world / "data").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"level" * 100)
+    (world / "data" / "a.dat").write_bytes(b"a" * 10000)
+    return tmp_path / "worlds"
+
+
+def recorder(manager):
+    records = []
+    manager.metrics_hooks.append(records.append)
+    return records
+
+
+def test_zip_backup_record(manager, tmp_path):
+    """Fases walk/read/compress/write/fsync e razão de compressão."""
+    worlds = make_world(tmp_path)
+    records = recorder(manager)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [rec] = records
+    assert rec["operation"] == "backup"
+    assert rec["status"] == "ok"
+    assert rec["world"] == "mundo"
+    assert rec["backup"].endswith(".zip")
+    for phase in ("scan", "walk", "read", "compress", "write", "fsync"):
+        assert rec["phases"][phase]["calls"] >= 1
+    counters = rec["counters"]
+    # 2 arquivos do mundo + metadata.json
+    assert counters["files"] == 3
+    assert counters["bytes_in"] > 10500
+    assert 0 < rec["ratio"] < 0.1
+    assert rec["wall_seconds"] >= rec["phases"]["fsync"]["seconds"]
+
+
+def test_incremental_counters(manager, tmp_path):
+    """Segundo incremental relê só o arquivo alterado."""
+    worlds = make_world(tmp_path)
+    records = recorder(manager)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    (worlds / "mundo" / "data" / "a.dat").write_bytes(b"b" * 20000)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    first, second = records
+    assert first["counters"]["files_read"] == 2
+    assert second["counters"]["files"] == 2
+    assert second["counters"]["files_read"] == 1
+    assert second["counters"]["bytes_in"] == 20000
+    assert second["counters"]["bytes_out"] > 0
+    assert "store" in second["phases"]
+
+
+def test_status_skipped_and_failed(manager, tmp_path):
+    """Mundo parado gera 'skipped'; mundo inexistente, 'failed'."""
+    worlds = make_world(tmp_path)
+    records = recorder(manager)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert not manager.make_backup(str(worlds), "nada", "java")
+    assert [r["status"] for r in records] == ["ok", "skipped", "failed"]
+    assert records[1]["backup"] == records[0]["backup"]
+    assert "nada" in records[2]["error"]
+
+
+def test_restore_delta_record(manager, tmp_path):
+    """Delta: arquivos iguais contam como files_skipped."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    (worlds / "mundo" / "level.dat").write_bytes(b"outro")
+    records = recorder(manager)
+    assert manager.restore_backup(str(worlds), name, "java", mode="delta")
+    [rec] = records
+    assert rec["operation"] == "restore"
+    assert rec["world"] == "mundo"
+    assert rec["counters"]["files"] == 1
+    assert rec["counters"]["files_skipped"] == 1
+    assert rec["counters"]["bytes_out"] == 500
+    assert "compare" in rec["phases"]
+
+
+def test_hook_error_is_warning(manager, tmp_path, capsys):
+    """Exceção no hook vira aviso; o backup continua válido."""
+    worlds = make_world(tmp_path)
+
+    def broken(record):
+        raise RuntimeError("disco cheio")
+
+    manager.metrics_hooks.append(broken)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert "disco cheio" in capsys.readouterr().out
+
+
+def test_json_lines_sink(manager, tmp_path):
+    """Cada operação acrescenta uma linha ao arquivo."""
+    worlds = make_world(tmp_path)
+    log = tmp_path / "logs" / "metrics.jsonl"
+    manager.metrics_hooks.append(metrics.JsonLinesSink(str(log)))
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["status"] for line in lines] == [
+        "ok",
+        "skipped",
+    ]
+
+
+def test_prometheus_textfile(tmp_path):
+    """Última execução por mundo; sucesso anterior sobrevive a falhas."""
+    path = tmp_path / "mvp.prom"
+    m = metrics.Metrics()
+    m.count("files", 3)
+    ok = m.record("backup", world='a"b', edition="java", status="ok")
+    metrics.PrometheusTextfile(str(path))(ok)
+    # nova instância: o estado vem de mvp.json
+    failed = metrics.Metrics().record(
+        "backup", world='a"b', edition="java", status="failed"
+    )
+    metrics.PrometheusTextfile(str(path))(failed)
+    text = path.read_text(encoding="utf-8")
+    labels = '{operation="backup",edition="java",world="a\\"b"}'
+    assert f"mvp_backup_last_status{labels} 0" in text
+    assert f"mvp_backup_last_success_timestamp_seconds{labels} " in text
+    assert f"mvp_backup_files{labels} 3" not in text
+    assert "# TYPE mvp_backup_duration_seconds gauge" in text
+    assert (tmp_path / "mvp.json").exists()
+    # verificação ignorada por ser recente conta como sucesso
+    cached = metrics.Metrics().record(
+        "verify", world="w", edition="java", status="cached"
+    )
+    metrics.PrometheusTextfile(str(path))(cached)
+    text = path.read_text(encoding="utf-8")
+    labels = '{operation="verify",edition="java",world="w"}'
+    assert f"mvp_backup_last_status{labels} 1" in text
+    assert f"mvp_backup_last_success_timestamp_seconds{labels} " in text
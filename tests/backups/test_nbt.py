@@ -0,0 +1,81 @@
+"""
+Módulo de testes para backup.nbt:
+ - test_loads_all_tags: todos os tipos de tag são lidos (big-endian).
+ - test_loads_little_endian: NBT do Bedrock (little-endian) é lido.
+ - test_truncated: NBT cortado gera NBTError.
+ - test_read_level_dat_formats: gzip (Java) e cabeçalho Bedrock são detectados.
+"""
+
+import gzip
+import struct
+
+import pytest
+
+from backup import nbt
+
+SAMPLE = {
+    "b": (1, -3),
+    "s": (2, 300),
+    "i": (3, 70000),
+    "l": (4, 2**40),
+    "f": (5, 1.5),
+    "d": (6, 2.25),
+    "ba": (7, b"\x01\x02"),
+    "str": (8, "Olá"),
+    "list": (9, (3, [1, 2, 3])),
+    "empty": (9, (0, [])),
+    "nested": (10, {"x": (3, 7)}),
+    "ia": (11, [1, -1]),
+    "la": (12, [2**33]),
+}
+
+
+def test_loads_all_tags(nbt_bytes):
+    """Compound com todos os tipos volta como dict de valores Python."""
+    name, root = nbt.loads(nbt_bytes(SAMPLE, name="raiz"))
+    assert name == "raiz"
+    assert root == {
+        "b": -3,
+        "s": 300,
+        "i": 70000,
+        "l": 2**40,
+        "f": 1.5,
+        "d": 2.25,
+        "ba": b"\x01\x02",
+        "str": "Olá",
+        "list": [1, 2, 3],
+        "empty": [],
+        "nested": {"x": 7},
+        "ia": [1, -1],
+        "la": [2**33],
+    }
+
+
+def test_loads_little_endian(nbt_bytes):
+    """Mesmos dados em little-endian."""
+    data = nbt_bytes({"l": (4, 123456789012)}, little=True)
+    assert nbt.loads(data, little=True)[1] == {"l": 123456789012}
+
+
+def test_truncated(nbt_bytes):
+    """Cortar os últimos bytes gera NBTError."""
+    data = nbt_bytes(SAMPLE)
+    with pytest.raises(nbt.NBTError):
+        nbt.loads(data[:-5])
+    with pytest.raises(nbt.NBTError):
+        nbt.loads(b"\x03\x00\x00")
+
+
+def test_read_level_dat_formats(tmp_path, nbt_bytes):
+    """level.dat gzip é Java; cabeçalho de 8 bytes LE é Bedrock."""
+    java = tmp_path / "java.dat"
+    java.write_bytes(gzip.compress(nbt_bytes({"Data": (10, {})})))
+    assert nbt.read_level_dat(str(java)) == ("java", {"Data": {}})
+    body = nbt_bytes({"LevelName": (8, "B")}, little=True)
+    bedrock = tmp_path / "bedrock.dat"
+    bedrock.write_bytes(struct.pack("<ii", 10, len(body)) + body)
+    assert nbt.read_level_dat(str(bedrock)) == ("bedrock", {"LevelName": "B"})
+    broken = tmp_path / "broken.dat"
+    broken.write_bytes(b"\x1f\x8bxx")
+    with pytest.raises(nbt.NBTError):
+        nbt.read_level_dat(str(broken))
@@ -0,0 +1,165 @@
+"""
+Módulo de testes para backup.partial:
+ - test_selection_block_box: área em blocos vira chunks agrupados por região.
+ - test_restore_chunk_area: só os chunks da área voltam ao estado do backup.
+ - test_restore_region_list: regiões listadas são substituídas inteiras.
+ - test_restore_dimension: dimensão inteira, removendo regiões novas.
+ - test_reads_only_needed_entries: apenas as entradas selecionadas são lidas.
+ - test_restore_partial_incremental: funciona com backups incrementais.
+ - test_menu_partial: opção 'p' do menu chama restore_partial.
+"""
+
+import builtins
+import struct
+
+from backup import anvil, partial, restore
+
+
+def record(tag):
+    data = tag.encode() * 10
+    return struct.pack(">IB", len(data) + 1, 2) + data
+
+
+def region_of(tag, ts=1):
+    return {i: (ts, record(f"{tag}{i}")) for i in range(0, 64, 7)}
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    (w / "DIM-1" / "region").mkdir(parents=True)
+    (w / "level.dat").write_bytes(b"level")
+    anvil.write_region(str(w / "region" / "r.0.0.mca"), region_of("a"))
+    anvil.write_region(str(w / "region" / "r.1.0.mca"), region_of("b"))
+    anvil.write_region(
+        str(w / "DIM-1" / "region" / "r.0.0.mca"), region_of("n")
+    )
+    return worlds, w
+
+
+def grief(w):
+    for rel in (
+        "region/r.0.0.mca",
+        "region/r.1.0.mca",
+        "DIM-1/region/r.0.0.mca",
+    ):
+        anvil.write_region(str(w / rel), region_of("x", ts=9))
+    (w / "level.dat").write_bytes(b"progress")
+
+
+def test_selection_block_box():
+    """Blocos (0..40, 0..20) cobrem chunks 0..2 x 0..1 na região (0, 0)."""
+    sel = partial.Selection(block_box=(0, 0, 40, 20))
+    assert sel.chunks == {
+        (0, 0): {anvil.chunk_index(x, z) for x in range(3) for z in range(2)}
+    }
+    assert sel.wanted("region/r.0.0.mca") == sel.chunks[(0, 0)]
+    assert sel.wanted("region/r.1.0.mca") is False
+    assert sel.wanted("DIM-1/region/r.0.0.mca") is False
+    assert partial.Selection(regions=["r.-1.2.mca"]).regions == {(-1, 2)}
+
+
+def test_restore_chunk_area(manager, tmp_path):
+    """Chunks da área voltam ao backup; os demais e level.dat ficam."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    grief(w)
+    assert manager.restore_partial(
+        str(worlds), name, "java", chunk_box=(0, 0, 7, 0)
+    )
+    chunks = anvil.read_region(str(w / "region" / "r.0.0.mca"))
+    original = region_of("a")
+    assert chunks[0] == original[0]
+    assert chunks[7] == original[7]
+    assert chunks[14] == region_of("x", ts=9)[14]
+    assert (w / "level.dat").read_bytes() == b"progress"
+    other = anvil.read_region(str(w / "region" / "r.1.0.mca"))
+    assert other == region_of("x", ts=9)
+
+
+def test_restore_region_list(manager, tmp_path):
+    """Região listada volta inteira; as outras continuam alteradas."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    grief(w)
+    assert manager.restore_partial(
+        str(worlds), name, "java", regions=["r.1.0.mca"]
+    )
+    assert anvil.read_region(str(w / "region" / "r.1.0.mca")) == region_of("b")
+    assert anvil.read_region(str(w / "region" / "r.0.0.mca")) == region_of(
+        "x", ts=9
+    )
+
+
+def test_restore_dimension(manager, tmp_path):
+    """Nether inteiro volta ao backup e regiões criadas depois somem."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    grief(w)
+    newer = w / "DIM-1" / "region" / "r.5.5.mca"
+    anvil.write_region(str(newer), region_of("z"))
+    assert manager.restore_partial(str(worlds), name, "java", "nether")
+    nether = anvil.read_region(str(w / "DIM-1" / "region" / "r.0.0.mca"))
+    assert nether == region_of("n")
+    assert not newer.exists()
+    assert anvil.read_region(str(w / "region" / "r.0.0.mca")) == region_of(
+        "x", ts=9
+    )
+
+
+def test_reads_only_needed_entries(manager, tmp_path, monkeypatch):
+    """Somente a região pedida é lida do zip."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    read = []
+    original = restore.ZipSource.read_bytes
+
+    def spy(self, info):
+        read.append(info.filename)
+        return original(self, info)
+
+    monkeypatch.setattr(restore.ZipSource, "read_bytes", spy)
+    assert manager.restore_partial(
+        str(worlds), name, "java", regions=["r.1.0.mca"]
+    )
+    assert read == ["mundo/region/r.1.0.mca"]
+
+
+def test_restore_partial_incremental(manager, tmp_path):
+    """Backup incremental: chunks vêm direto dos blobs."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    [(name, _)] = manager.list_backups("java")
+    grief(w)
+    assert manager.restore_partial(
+        str(worlds), name, "java", block_box=(0, 0, 15, 15)
+    )
+    chunks = anvil.read_region(str(w / "region" / "r.0.0.mca"))
+    assert chunks[0] == region_of("a")[0]
+    assert chunks[7] == region_of("x", ts=9)[7]
+
+
+def test_menu_partial(manager, tmp_path, monkeypatch):
+    """Menu: 'p', mundo 1, backup 1, nether, área vazia, sair."""
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    answers = iter(["p", "1", "1", "nether", "", "0"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+    called = {}
+
+    def fake(worlds_path, backup_name, edition, **kw):
+        called.update(kw, backup=backup_name)
+        return True
+
+    monkeypatch.setattr(manager, "restore_partial", fake)
+    manager.menu(str(worlds), "java")
+    assert called["dimension"] == "nether"
+    assert called["regions"] is None and called["block_box"] is None
+    assert called["backup"].startswith("mundo_")
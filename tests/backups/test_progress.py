@@ -0,0 +1,96 @@
+"""
+Módulo de testes para backup.progress:
+ - test_backup_reports_progress: make_backup informa bytes até o total.
+ - test_cancel_zip_removes_partial: cancelar o .zip não deixa arquivo parcial.
+ - test_cancel_incremental_keeps_no_manifest: cancelado, nenhum manifesto é salvo.
+ - test_cancel_restore_keeps_world: cancelar a restauração mantém o mundo.
+"""
+
+import os
+import threading
+
+from backup import restore
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    (worlds / "mundo" / "region").mkdir(parents=True)
+    (worlds / "mundo" / "level.dat").write_bytes(b"level")
+    for i in range(5):
+        (worlds / "mundo" / "region" / f"r.{i}.0.mca").write_bytes(
+            os.urandom(4096)
+        )
+    return worlds
+
+
+def cancel_after_first(cancel):
+    def progress(done, total):
+        cancel.set()
+
+    return progress
+
+
+def test_backup_reports_progress(manager, tmp_path):
+    """O último aviso de progresso chega ao total do mundo."""
+    worlds = make_world(tmp_path)
+    calls = []
+    assert manager.make_backup(
+        str(worlds),
+        "mundo",
+        "java",
+        progress=lambda d, t: calls.append((d, t)),
+    )
+    total = 5 + 5 * 4096
+    assert calls[-1][1] == total
+    assert calls[-1][0] >= total
+    assert [d for d, _ in calls] == sorted(d for d, _ in calls)
+
+
+def test_cancel_zip_removes_partial(manager, tmp_path):
+    """Cancelado no primeiro arquivo: retorna False e nenhum .zip fica."""
+    worlds = make_world(tmp_path)
+    cancel = threading.Event()
+    assert not manager.make_backup(
+        str(worlds),
+        "mundo",
+        "java",
+        workers=1,
+        progress=cancel_after_first(cancel),
+        cancel=cancel,
+    )
+    assert os.listdir(manager.backup_dir_java) == []
+
+
+def test_cancel_incremental_keeps_no_manifest(manager, tmp_path):
+    """Backup incremental cancelado não vira manifesto listável."""
+    worlds = make_world(tmp_path)
+    cancel = threading.Event()
+    assert not manager.make_backup(
+        str(worlds),
+        "mundo",
+        "java",
+        mode="incremental",
+        progress=cancel_after_first(cancel),
+        cancel=cancel,
+    )
+    assert manager.list_backups("java") == []
+
+
+def test_cancel_restore_keeps_world(manager, tmp_path):
+    """Restauração cancelada descarta o staging e não troca o mundo."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    (worlds / "mundo" / "level.dat").write_bytes(b"live")
+    cancel = threading.Event()
+    assert not manager.restore_backup(
+        str(worlds),
+        name,
+        "java",
+        workers=1,
+        progress=cancel_after_first(cancel),
+        cancel=cancel,
+    )
+    assert (worlds / "mundo" / "level.dat").read_bytes() == b"live"
+    assert not os.path.exists(restore.staging_path(str(worlds), "mundo"))
+    assert not os.path.exists(restore.rollback_path(str(worlds), "mundo"))
@@ -0,0 +1,58 @@
+"""
+Módulo de testes para backup.rcon:
+ - test_command_roundtrip: autentica e recebe a resposta do comando.
+ - test_wrong_password: senha errada gera RconError.
+ - test_fragmented_response: respostas acima de 4096 bytes são juntadas.
+ - test_reconnects_after_drop: conexão perdida é refeita no próximo comando.
+"""
+
+import pytest
+
+from backup import rcon
+
+
+def client(server, password=None):
+    if password is None:
+        password = server.password
+    return rcon.RconClient(
+        "127.0.0.1", server.port, password=password, timeout=5
+    )
+
+
+def test_command_roundtrip(rcon_server):
+    """save-all flush retorna o texto do servidor."""
+    rcon_server.responses["save-all flush"] = "Saved the game"
+    with client(rcon_server) as c:
+        assert c.command("save-all flush") == "Saved the game"
+        assert c.command("list") == ""
+    assert rcon_server.commands == ["save-all flush", "list"]
+
+
+def test_wrong_password(rcon_server):
+    """Autenticação recusada (id -1)."""
+    with pytest.raises(rcon.RconError):
+        client(rcon_server, password="errada").connect()
+    assert rcon_server.commands == []
+
+
+def test_fragmented_response(rcon_server):
+    """Três fragmentos (4096 + 4096 + resto) viram uma resposta."""
+    text = "x" * 9000
+    rcon_server.responses["help"] = text
+    rcon_server.responses["exato"] = "y" * 4096
+    with client(rcon_server) as c:
+        assert c.command("help") == text
+        assert c.command("exato") == "y" * 4096
+        assert c.command("depois") == ""
+
+
+def test_reconnects_after_drop(rcon_server):
+    """Depois de um erro de conexão, o cliente reconecta sozinho."""
+    c = client(rcon_server)
+    c.connect()
+    c._sock.close()
+    with pytest.raises(OSError):
+        c.command("save-off")
+    assert c.command("save-on") == ""
+    assert rcon_server.commands == ["save-on"]
+    c.close()
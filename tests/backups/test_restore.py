@@ -0,0 +1,201 @@
+"""
+Módulo de testes para backup.restore:
+ - test_restore_replaces_world: mundo é trocado e o anterior vira rollback.
+ - test_restore_reports_throughput: run retorna arquivos, bytes e taxa.
+ - test_crc_error_keeps_world: CRC inválido não altera o mundo atual.
+ - test_failed_swap_recovers: falha no rename final devolve o mundo antigo.
+ - test_recover_after_crash: rollback órfão é restaurado por recover.
+ - test_rejects_path_traversal: entradas com '..' são recusadas.
+ - test_list_worlds_hides_rollback: pastas de staging/rollback não são mundos.
+ - test_delta_rewrites_only_changed: restauração delta só grava o que mudou.
+ - test_delta_delete_extra: delete_extra apaga arquivos ausentes no backup.
+ - test_delta_incremental_regions: delta compara regiões chunk a chunk.
+"""
+
+import json
+import os
+import zipfile
+
+import pytest
+
+from backup import anvil, restore
+
+
+def make_world(tmp_path, content=b"new"):
+    worlds = tmp_path / "worlds"
+    (worlds / "mundo" / "region").mkdir(parents=True)
+    (worlds / "mundo" / "level.dat").write_bytes(content)
+    for i in range(6):
+        (worlds / "mundo" / "region" / f"r.{i}.0.mca").write_bytes(
+            content * 1000
+        )
+    return worlds
+
+
+def backup_zip(manager, worlds):
+    assert manager.make_backup(str(worlds), "mundo", "java", workers=2)
+    [(name, _)] = manager.list_backups("java")
+    return name
+
+
+def test_restore_replaces_world(manager, tmp_path):
+    """Arquivos fora do backup somem; o mundo antigo vai para rollback."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    (worlds / "mundo" / "level.dat").write_bytes(b"old")
+    (worlds / "mundo" / "extra.txt").write_bytes(b"x")
+    assert manager.restore_backup(str(worlds), name, "java", workers=3)
+    assert (worlds / "mundo" / "level.dat").read_bytes() == b"new"
+    assert not (worlds / "mundo" / "extra.txt").exists()
+    assert (worlds / "mundo" / "mvp2.json").exists()
+    rollback = restore.rollback_path(str(worlds), "mundo")
+    assert open(os.path.join(rollback, "level.dat"), "rb").read() == b"old"
+    assert not os.path.exists(restore.staging_path(str(worlds), "mundo"))
+
+
+def test_restore_reports_throughput(manager, tmp_path):
+    """As estatísticas cobrem todos os arquivos do backup."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    src = os.path.join(manager.backup_dir_java, name)
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    source = restore.open_source(src, manager.backup_dir_java)
+    stats = restore.RestoreEngine(4).run(source, str(dest))
+    assert stats["files"] == 7
+    assert stats["bytes"] == 3 + 6 * 3000
+    assert "MiB/s" in restore.format_stats(stats)
+
+
+def corrupt_zip(path):
+    """Altera um byte dos dados armazenados da primeira entrada .mca"""
+    with zipfile.ZipFile(path) as z:
+        info = next(i for i in z.infolist() if i.filename.endswith(".mca"))
+    with open(path, "r+b") as f:
+        f.seek(info.header_offset + 26)
+        name_len = int.from_bytes(f.read(2), "little")
+        extra_len = int.from_bytes(f.read(2), "little")
+        pos = info.header_offset + 30 + name_len + extra_len
+        f.seek(pos)
+        byte = f.read(1)
+        f.seek(pos)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def test_crc_error_keeps_world(manager, tmp_path):
+    """Backup corrompido falha sem tocar no mundo nem deixar staging."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    corrupt_zip(os.path.join(manager.backup_dir_java, name))
+    (worlds / "mundo" / "level.dat").write_bytes(b"live")
+    assert not manager.restore_backup(str(worlds), name, "java")
+    assert (worlds / "mundo" / "level.dat").read_bytes() == b"live"
+    assert not os.path.exists(restore.staging_path(str(worlds), "mundo"))
+
+
+def test_failed_swap_recovers(manager, tmp_path, monkeypatch):
+    """Se o rename do staging falhar, o mundo original volta ao lugar."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    (worlds / "mundo" / "level.dat").write_bytes(b"live")
+    real_rename = os.rename
+
+    def flaky(src, dst):
+        if src.endswith(".staging"):
+            raise OSError("disco cheio")
+        return real_rename(src, dst)
+
+    monkeypatch.setattr(restore.os, "rename", flaky)
+    assert not manager.restore_backup(str(worlds), name, "java")
+    assert (worlds / "mundo" / "level.dat").read_bytes() == b"live"
+
+
+def test_recover_after_crash(tmp_path):
+    """Mundo ausente com rollback presente é recuperado."""
+    rollback = restore.rollback_path(str(tmp_path), "mundo")
+    os.makedirs(rollback)
+    assert restore.recover(str(tmp_path), "mundo")
+    assert (tmp_path / "mundo").is_dir()
+    assert not restore.recover(str(tmp_path), "mundo")
+
+
+def test_rejects_path_traversal(tmp_path):
+    """Entrada que sai da pasta do mundo aborta a restauração."""
+    path = tmp_path / "evil.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("mundo/../../evil.txt", "x")
+        z.writestr("metadata.json", json.dumps({"world": "mundo"}))
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    source = restore.ZipSource(str(path))
+    with pytest.raises(restore.RestoreError):
+        restore.RestoreEngine(1).run(source, str(dest))
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_list_worlds_hides_rollback(manager, tmp_path):
+    """list_worlds ignora .mundo.rollback criado pela restauração."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    assert manager.restore_backup(str(worlds), name, "java")
+    assert [f for f, _ in manager.list_worlds(str(worlds))] == ["mundo"]
+
+
+def test_delta_rewrites_only_changed(manager, tmp_path, monkeypatch):
+    """Apenas o arquivo alterado é extraído; extras são mantidos."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    (worlds / "mundo" / "region" / "r.2.0.mca").write_bytes(b"griefed")
+    (worlds / "mundo" / "extra.txt").write_bytes(b"x")
+    extracted = []
+    original = restore.ZipSource.extract
+
+    def spy(self, info, dst):
+        extracted.append(info.filename)
+        return original(self, info, dst)
+
+    monkeypatch.setattr(restore.ZipSource, "extract", spy)
+    assert manager.restore_backup(str(worlds), name, "java", mode="delta")
+    assert extracted == ["mundo/region/r.2.0.mca"]
+    region = worlds / "mundo" / "region" / "r.2.0.mca"
+    assert region.read_bytes() == b"new" * 1000
+    assert (worlds / "mundo" / "extra.txt").exists()
+    assert (worlds / "mundo" / "mvp2.json").exists()
+
+
+def test_delta_delete_extra(manager, tmp_path):
+    """Com delete_extra, arquivos que não estão no backup são removidos."""
+    worlds = make_world(tmp_path)
+    name = backup_zip(manager, worlds)
+    (worlds / "mundo" / "extra.txt").write_bytes(b"x")
+    src = os.path.join(manager.backup_dir_java, name)
+    source = restore.open_source(src, manager.backup_dir_java)
+    stats = restore.RestoreEngine(2).run_delta(
+        source, str(worlds), delete_extra=True
+    )
+    assert stats["files"] == 0
+    assert stats["skipped"] == 7
+    assert stats["deleted"] == 1
+    assert not (worlds / "mundo" / "extra.txt").exists()
+
+
+def test_delta_incremental_regions(manager, tmp_path):
+    """Região com mesmos chunks (layout diferente) não é reescrita."""
+    worlds = tmp_path / "worlds"
+    region = worlds / "mundo" / "region"
+    region.mkdir(parents=True)
+    chunks = {i: (i, b"\0\0\0\x05\x02abcd") for i in range(3)}
+    anvil.write_region(str(region / "r.0.0.mca"), chunks)
+    anvil.write_region(str(region / "r.1.0.mca"), chunks)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    [(name, _)] = manager.list_backups("java")
+    changed = dict(chunks)
+    changed[1] = (99, b"\0\0\0\x05\x02wxyz")
+    anvil.write_region(str(region / "r.1.0.mca"), changed)
+    src = os.path.join(manager.backup_dir_java, name)
+    source = restore.open_source(src, manager.backup_dir_java)
+    stats = restore.RestoreEngine(2).run_delta(source, str(worlds))
+    assert stats["files"] == 1
+    assert anvil.read_region(str(region / "r.1.0.mca")) == chunks
@@ -0,0 +1,210 @@
+"""
+Módulo de testes para backup.retention:
+ - test_select_gfs: últimos N e o mais novo por dia, semana e mês.
+ - test_select_max_bytes: o teto descarta os antigos, nunca o mais novo.
+ - test_policy_invalid: política vazia ou negativa é recusada.
+ - test_prune_incremental_gc: blobs só dos backups apagados saem de
+   objects/ e o backup restante continua íntegro.
+ - test_gc_grace_and_dry_run: blobs recentes ficam; dry_run só conta.
+ - test_gc_orphan_state: estado de stat de backup apagado é removido.
+ - test_gc_during_incremental: blobs reaproveitados por um incremental em
+   andamento sobrevivem ao GC mesmo com o manifesto anterior já apagado.
+"""
+
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backup import anvil, retention, statcache, store
+
+
+def rows_at(*stamps):
+    return [
+        {
+            "name": f"mundo_{ts}.zip",
+            "timestamp": ts,
+            "size": 100,
+            "mtime_ns": 0,
+        }
+        for ts in stamps
+    ]
+
+
+def hourly_rows(days):
+    """Um backup a cada 6 horas por `days` dias, terminando em 2024-03-31"""
+    end = datetime(2024, 3, 31, 18)
+    stamps = [end - timedelta(hours=6 * i) for i in range(days * 4)]
+    return rows_at(*(t.strftime("%Y%m%d_%H%M%S") for t in reversed(stamps)))
+
+
+def kept_names(rows, policy):
+    kept, removed = retention.select(rows, policy)
+    assert len(kept) + len(removed) == len(rows)
+    return [row["name"] for row, _ in kept]
+
+
+def test_select_gfs():
+    """3 últimos, 1 por dia em 3 dias, 1 por semana em 2, 1 por mês em 2."""
+    rows = hourly_rows(60)
+    policy = retention.Policy(last=3, daily=3, weekly=2, monthly=2)
+    kept, _ = retention.select(rows, policy)
+    stamps = {row["timestamp"]: reasons for row, reasons in kept}
+    assert stamps == {
+        "20240331_180000": ["last", "daily", "weekly", "monthly"],
+        "20240331_120000": ["last"],
+        "20240331_060000": ["last"],
+        "20240330_180000": ["daily"],
+        "20240329_180000": ["daily"],
+        # domingo 2024-03-24 fecha a semana anterior
+        "20240324_180000": ["weekly"],
+        "20240229_180000": ["monthly"],
+    }
+
+
+def test_select_max_bytes():
+    """Teto de 250 bytes com backups de 100: sobram os dois mais novos."""
+    rows = hourly_rows(2)
+    names = [r["name"] for r in rows]
+    only_cap = retention.Policy(max_bytes=250)
+    assert kept_names(rows, only_cap) == names[::-1][:2]
+    # teto menor que o backup mais novo: ele fica assim mesmo
+    assert kept_names(rows, retention.Policy(max_bytes=1)) == [names[-1]]
+    # o teto vale depois das regras
+    capped = retention.Policy(daily=2, max_bytes=150)
+    assert kept_names(rows, capped) == [names[-1]]
+
+
+def test_policy_invalid():
+    """Sem regra nenhuma (ou com contagem negativa) não há o que manter."""
+    with pytest.raises(ValueError):
+        retention.Policy()
+    with pytest.raises(ValueError):
+        retention.Policy(daily=-1)
+    with pytest.raises(ValueError):
+        retention.Policy.from_dict({"yearly": 2})
+    policy = retention.Policy.from_dict({"last": 2, "max_mb": 1})
+    assert policy.max_bytes == 1024 * 1024
+
+
+def make_world(tmp_path):
+    world = tmp_path / "worlds" / "mundo"
+    (world / "data").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"level" * 100)
+    return tmp_path / "worlds", world
+
+
+def blobs(manager):
+    objects = os.path.join(manager.backup_dir_java, "objects")
+    return {
+        name
+        for root, _, files in os.walk(objects)
+        for name in files
+        if not name.startswith(".")
+    }
+
+
+def test_prune_incremental_gc(manager, tmp_path, monkeypatch):
+    """Três incrementais com um arquivo diferente em cada; mantém o último."""
+    monkeypatch.setattr(retention, "GC_GRACE", 0)
+    worlds, world = make_world(tmp_path)
+    for i in range(3):
+        (world / "data" / "a.dat").write_bytes(os.urandom(4096))
+        assert manager.make_backup(
+            str(worlds), "mundo", "java", mode="incremental", force=True
+        )
+    before = blobs(manager)
+    names = [n for n, _ in manager.list_backups("java")]
+    assert manager.prune_backups("java", keep=1, dry_run=True) == names[:2]
+    assert blobs(manager) == before
+    assert manager.prune_backups("java", keep=1) == names[:2]
+    after = blobs(manager)
+    # level.dat (compartilhado) e o a.dat do último backup
+    assert len(after) == 2
+    assert after < before
+    assert manager.verify_backup(names[2], "java")
+    assert manager.restore_backup(str(worlds), names[2], "java")
+
+
+def test_gc_grace_and_dry_run(manager, tmp_path, monkeypatch):
+    """Blob órfão recente sobrevive; com grace=0, dry_run só conta."""
+    worlds, _ = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    backup_dir = manager.backup_dir_java
+    orphan = os.path.join(backup_dir, "objects", "ff", "ff" * 32)
+    os.makedirs(os.path.dirname(orphan))
+    with open(orphan, "wb") as f:
+        f.write(b"s" + b"x" * 99)
+    result = retention.collect_garbage(backup_dir)
+    assert result["blobs"] == 0
+    result = retention.collect_garbage(backup_dir, dry_run=True, grace=0)
+    assert result == {"blobs": 1, "bytes": 100, "states": 0}
+    assert os.path.exists(orphan)
+    monkeypatch.setattr(retention, "GC_GRACE", 0)
+    assert manager.collect_garbage("java")["blobs"] == 1
+    assert not os.path.exists(orphan)
+    assert len(blobs(manager)) == 1
+
+
+def test_gc_orphan_state(manager, tmp_path):
+    """O .state do mundo aponta para um backup que não existe mais."""
+    worlds, _ = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    cache = statcache.StatCache(manager.backup_dir_java, "mundo")
+    assert cache.load() is not None
+    assert manager.collect_garbage("java")["states"] == 0
+    os.remove(os.path.join(manager.backup_dir_java, name))
+    assert manager.collect_garbage("java")["states"] == 1
+    assert not os.path.exists(cache.path)
+
+
+def test_gc_during_incremental(manager, tmp_path):
+    """Prune + GC no meio do incremental não apaga os blobs reaproveitados."""
+    worlds, world = make_world(tmp_path)
+    (world / "data" / "a.dat").write_bytes(os.urandom(4096))
+    region = world / "region" / "r.0.0.mca"
+    region.parent.mkdir()
+    data = b"chunk" * 20
+    record = struct.pack(">IB", len(data) + 1, 2) + data
+    anvil.write_region(str(region), {i: (1, record) for i in (0, 5)})
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    backup_dir = manager.backup_dir_java
+    [(first, _)] = manager.list_backups("java")
+    # blobs antigos: fora do GC_GRACE se ninguém os renovar
+    old = time.time() - retention.GC_GRACE - 60
+    for root, _, files in os.walk(os.path.join(backup_dir, "objects")):
+        for name in files:
+            os.utime(os.path.join(root, name), (old, old))
+    # região regravada com os mesmos chunks: reaproveitados um a um
+    stamp = region.stat().st_mtime_ns + 10**9
+    os.utime(region, ns=(stamp, stamp))
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        if len(calls) == 3:
+            # o último arquivo foi processado: outro processo poda e coleta
+            os.remove(os.path.join(backup_dir, first))
+            retention.collect_garbage(backup_dir)
+
+    assert manager.make_backup(
+        str(worlds),
+        "mundo",
+        "java",
+        mode="incremental",
+        force=True,
+        progress=progress,
+    )
+    assert len(calls) >= 3
+    [(second, _)] = manager.list_backups("java")
+    assert second.endswith(store.MANIFEST_SUFFIX)
+    assert manager.verify_backup(second, "java")
+    assert manager.restore_backup(str(worlds), second, "java")
+    assert anvil.read_region(str(region))[5][1] == record
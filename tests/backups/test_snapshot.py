@@ -0,0 +1,120 @@
+"""
+Módulo de testes para backup.snapshot:
+ - test_stage_links_only_immutable: .ldb vira hardlink; .mca é copiado.
+ - test_stage_reflink_fallback: sem reflink, cai para cópia uma única vez.
+ - test_server_control_nested: pausas simultâneas enviam um único save-on.
+ - test_snapshot_backup_reads_frozen_copy: gravações após save-on não
+   entram no backup e o staging é removido.
+ - test_snapshot_unchanged_world: mundo parado não é copiado.
+"""
+
+import errno
+import os
+import zipfile
+
+from backup import rcon, snapshot
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    world = worlds / "mundo"
+    (world / "region").mkdir(parents=True)
+    (world / "db").mkdir()
+    (world / "region" / "r.0.0.mca").write_bytes(b"OLD" * 100)
+    (world / "db" / "000010.ldb").write_bytes(b"tabela")
+    (world / "db" / "CURRENT").write_bytes(b"MANIFEST-000002\n")
+    return worlds
+
+
+def server_control(server):
+    client = rcon.RconClient(
+        "127.0.0.1", server.port, password=server.password, timeout=5
+    )
+    return snapshot.ServerControl(client)
+
+
+def test_stage_links_only_immutable(tmp_path):
+    """Tabela LevelDB compartilha o inode; região é cópia independente."""
+    world = make_world(tmp_path) / "mundo"
+    dst = tmp_path / "staged"
+    stats = snapshot.stage(str(world), str(dst), use_reflink=False)
+    assert stats["files"] == 3
+    assert stats["hardlink"] == 1
+    assert stats["copy"] == 2
+    ldb = "db/000010.ldb"
+    assert os.path.samefile(world / ldb, dst / ldb)
+    mca = "region/r.0.0.mca"
+    assert not os.path.samefile(world / mca, dst / mca)
+    assert (dst / mca).stat().st_mtime_ns == (world / mca).stat().st_mtime_ns
+    (world / mca).write_bytes(b"NEW")
+    assert (dst / mca).read_bytes() == b"OLD" * 100
+
+
+def test_stage_reflink_fallback(tmp_path, monkeypatch):
+    """EOPNOTSUPP no primeiro arquivo desativa o reflink no resto."""
+    calls = []
+
+    def no_reflink(src, dst):
+        calls.append(src)
+        raise OSError(errno.EOPNOTSUPP, "sem reflink")
+
+    monkeypatch.setattr(snapshot, "reflink", no_reflink)
+    world = make_world(tmp_path) / "mundo"
+    stats = snapshot.stage(str(world), str(tmp_path / "staged"))
+    assert len(calls) == 1
+    assert stats["reflink"] == 0
+    assert stats["files"] == 3
+
+
+def test_server_control_nested(rcon_server):
+    """Dois backups pausados ao mesmo tempo: save-on só no último."""
+    server = server_control(rcon_server)
+    server.pause()
+    server.pause()
+    server.resume()
+    assert rcon_server.commands == ["save-off", "save-all flush"]
+    server.resume()
+    assert rcon_server.commands[-1] == "save-on"
+    assert len(rcon_server.commands) == 3
+
+
+def test_snapshot_backup_reads_frozen_copy(manager, tmp_path, rcon_server):
+    """O servidor volta a gravar (save-on) antes da compressão."""
+    worlds = make_world(tmp_path)
+    mca = worlds / "mundo" / "region" / "r.0.0.mca"
+
+    def resume(command):
+        # o servidor volta a salvar assim que recebe save-on
+        mca.write_bytes(b"NEW")
+        return "Automatic saving is now enabled"
+
+    rcon_server.responses["save-on"] = resume
+    records = []
+    manager.metrics_hooks.append(records.append)
+    assert manager.make_backup(
+        str(worlds),
+        "mundo",
+        "java",
+        snapshot=True,
+        server=server_control(rcon_server),
+    )
+    assert rcon_server.commands == ["save-off", "save-all flush", "save-on"]
+    assert not os.path.exists(snapshot.snapshot_path(str(worlds), "mundo"))
+    [(name, _)] = manager.list_backups("java")
+    with zipfile.ZipFile(os.path.join(manager.backup_dir_java, name)) as z:
+        assert z.read("mundo/region/r.0.0.mca") == b"OLD" * 100
+    phases = records[0]["phases"]
+    assert phases["pause"]["seconds"] >= phases["stage"]["seconds"]
+
+
+def test_snapshot_unchanged_world(manager, tmp_path, monkeypatch):
+    """Sem alterações desde o último backup, nada é copiado."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java", snapshot=True)
+    staged = []
+    monkeypatch.setattr(
+        "backup.core.stage", lambda src, dst: staged.append(src)
+    )
+    assert manager.make_backup(str(worlds), "mundo", "java", snapshot=True)
+    assert staged == []
+    assert len(manager.list_backups("java")) == 1
@@ -0,0 +1,186 @@
+"""
+Módulo de testes para backup.statcache:
+ - test_unchanged_world_is_noop: segundo backup de mundo parado não cria arquivo.
+ - test_touch_is_not_change: com hash guardado, mtime novo não gera backup.
+ - test_changes_detected: conteúdo novo, arquivo removido e mtime antigo.
+ - test_racy_same_size_rewrite: reescrita de mesmo tamanho e mesmo stat é vista.
+ - test_only_recent_files_hashed: hash só para arquivos com stat recente.
+ - test_force_and_mode: force=True ou outro modo ignoram o atalho.
+ - test_deleted_backup_invalidates: estado de backup apagado é descartado.
+ - test_incremental_changed_list: incremental relê só a lista de alterados.
+ - test_write_after_scan: arquivo gravado depois da varredura não fica com
+   o conteúdo antigo nos modos incremental e hardlink.
+"""
+
+import os
+
+from backup import statcache, store
+
+HOUR_NS = 3600 * 10**9
+
+
+def make_world(tmp_path, age_ns=0):
+    worlds = tmp_path / "worlds"
+    (worlds / "mundo" / "data").mkdir(parents=True)
+    files = {
+        "level.dat": b"level",
+        "data/a.dat": b"a" * 100,
+        "data/b.dat": b"b" * 100,
+    }
+    for rel, data in files.items():
+        path = worlds / "mundo" / rel
+        path.write_bytes(data)
+        if age_ns:
+            mtime = path.stat().st_mtime_ns - age_ns
+            os.utime(path, ns=(mtime, mtime))
+    return worlds
+
+
+def backups(manager):
+    return [n for n, _ in manager.list_backups("java")]
+
+
+def test_unchanged_world_is_noop(manager, tmp_path, capsys):
+    """Mundo sem alterações: make_backup retorna True sem novo arquivo."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert len(backups(manager)) == 1
+    assert "sem alterações" in capsys.readouterr().out
+
+
+def test_touch_is_not_change(manager, tmp_path):
+    """Só o mtime mudou: o hash confirma que o conteúdo é o mesmo."""
+    worlds = make_world(tmp_path, age_ns=HOUR_NS)
+    a = worlds / "mundo" / "data" / "a.dat"
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    # primeira mudança de stat: ainda sem hash de referência
+    os.utime(a)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert len(backups(manager)) == 2
+    cache = statcache.StatCache(manager.backup_dir_java, "mundo")
+    assert cache.load()["files"]["data/a.dat"][4] is not None
+    os.utime(a, ns=(1, 1))
+    assert cache.diff(str(worlds / "mundo")).clean
+
+
+def test_changes_detected(manager, tmp_path):
+    """Escrita, remoção e mtime voltando no tempo contam como mudança."""
+    worlds = make_world(tmp_path, age_ns=HOUR_NS)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    cache = statcache.StatCache(manager.backup_dir_java, "mundo")
+    a = worlds / "mundo" / "data" / "a.dat"
+    old = a.stat().st_mtime_ns - HOUR_NS
+    a.write_bytes(b"x" * 100)
+    os.utime(a, ns=(old, old))
+    (worlds / "mundo" / "data" / "b.dat").unlink()
+    changes = cache.diff(str(worlds / "mundo"))
+    assert changes.changed == {"data/a.dat"}
+    assert changes.removed == {"data/b.dat"}
+    assert not changes.clean
+
+
+def test_racy_same_size_rewrite(manager, tmp_path, monkeypatch):
+    """Sem ctime/inode (ex.: FAT) e no mesmo tick, o hash detecta."""
+    monkeypatch.setattr(
+        statcache, "_stat_key", lambda st: [st.st_size, st.st_mtime_ns, 0, 0]
+    )
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    a = worlds / "mundo" / "data" / "a.dat"
+    mtime = a.stat().st_mtime_ns
+    a.write_bytes(b"z" * 100)
+    os.utime(a, ns=(mtime, mtime))
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert len(backups(manager)) == 2
+
+
+def test_only_recent_files_hashed(manager, tmp_path):
+    """Arquivos antigos não são lidos; recentes guardam o hash."""
+    worlds = make_world(tmp_path, age_ns=HOUR_NS)
+    (worlds / "mundo" / "new.dat").write_bytes(b"fresh")
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    state = statcache.StatCache(manager.backup_dir_java, "mundo").load()
+    assert state["files"]["level.dat"][4] is None
+    assert state["files"]["new.dat"][4] is not None
+    assert state["backup"] == backups(manager)[0]
+
+
+def test_force_and_mode(manager, tmp_path):
+    """force=True cria backup e outro modo não reaproveita o estado."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert manager.make_backup(str(worlds), "mundo", "java", force=True)
+    assert len(backups(manager)) == 2
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert len(backups(manager)) == 3
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert len(backups(manager)) == 3
+
+
+def test_deleted_backup_invalidates(manager, tmp_path):
+    """Se o último backup sumiu, o próximo é feito normalmente."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [name] = backups(manager)
+    os.remove(os.path.join(manager.backup_dir_java, name))
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    assert len(backups(manager)) == 1
+
+
+def test_incremental_changed_list(manager, tmp_path, monkeypatch):
+    """Mesmo tamanho e mtime: a lista do statcache relê só o alterado."""
+    worlds = make_world(tmp_path, age_ns=HOUR_NS)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    a = worlds / "mundo" / "data" / "a.dat"
+    mtime = a.stat().st_mtime_ns
+    a.write_bytes(b"q" * 100)
+    os.utime(a, ns=(mtime, mtime))
+    read = []
+    original = store.BlobStore.put_file
+
+    def spy(self, path):
+        read.append(os.path.basename(path))
+        return original(self, path)
+
+    monkeypatch.setattr(store.BlobStore, "put_file", spy)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert read == ["a.dat"]
+    path, _ = store.latest_manifest(manager.backup_dir_java, "mundo")
+    dest = tmp_path / "dest"
+    name = os.path.basename(path)
+    assert manager.restore_backup(str(dest), name, "java")
+    assert (dest / "mundo" / "data" / "a.dat").read_bytes() == b"q" * 100
+
+
+def test_write_after_scan(manager, tmp_path, monkeypatch):
+    """Gravação de mesmo tamanho entre a varredura e o backup é relida."""
+    worlds = make_world(tmp_path, age_ns=HOUR_NS)
+    b = worlds / "mundo" / "data" / "b.dat"
+    original = statcache.StatCache.diff
+    pending = []
+
+    def diff(self, src):
+        changes = original(self, src)
+        if pending:
+            b.write_bytes(pending.pop())
+        return changes
+
+    monkeypatch.setattr(statcache.StatCache, "diff", diff)
+    for mode, content in (("incremental", b"x"), ("hardlink", b"y")):
+        assert manager.make_backup(str(worlds), "mundo", "java", mode=mode)
+        (worlds / "mundo" / "level.dat").write_bytes(mode.encode())
+        pending.append(content * 100)
+        assert manager.make_backup(str(worlds), "mundo", "java", mode=mode)
+        dest = tmp_path / mode
+        assert manager.restore_backup(str(dest), backups(manager)[-1], "java")
+        restored = dest / "mundo" / "data" / "b.dat"
+        assert restored.read_bytes() == content * 100
@@ -0,0 +1,94 @@
+"""
+Módulo de testes para backup.store:
+ - test_put_bytes_dedup: conteúdos iguais geram um único blob.
+ - test_put_file_roundtrip: blob gravado em streaming é lido de volta igual.
+ - test_incremental_backup_and_restore: manifesto é listado e restaurado.
+ - test_incremental_reuses_unchanged: arquivos inalterados não são relidos.
+"""
+
+import os
+
+from backup import store
+
+
+def test_put_bytes_dedup(tmp_path):
+    """Dois put_bytes com o mesmo conteúdo apontam para o mesmo blob."""
+    blobs = store.BlobStore(str(tmp_path))
+    h1 = blobs.put_bytes(b"abc" * 100)
+    h2 = blobs.put_bytes(b"abc" * 100)
+    assert h1 == h2
+    files = [f for _, _, fs in os.walk(blobs.objects_dir) for f in fs]
+    assert len(files) == 1
+    assert blobs.read(h1) == b"abc" * 100
+
+
+def test_put_file_roundtrip(tmp_path):
+    """put_file grava o conteúdo e write_to reconstrói o arquivo."""
+    src = tmp_path / "big.bin"
+    data = os.urandom(3 * store.CHUNK_SIZE + 17)
+    src.write_bytes(data)
+    blobs = store.BlobStore(str(tmp_path / "store"))
+    digest, size = blobs.put_file(str(src))
+    assert size == len(data)
+    dst = tmp_path / "out" / "big.bin"
+    blobs.write_to(digest, str(dst))
+    assert dst.read_bytes() == data
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    (w / "level.dat").write_bytes(b"level")
+    (w / "region" / "r.0.0.mca").write_bytes(b"region" * 1000)
+    return worlds
+
+
+def test_incremental_backup_and_restore(manager, tmp_path):
+    """Backup incremental aparece em list_backups e é restaurado."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", "inc", mode="incremental"
+    )
+    backs = manager.list_backups("java")
+    assert len(backs) == 1
+    name, desc = backs[0]
+    assert name.startswith("mundo_") and store.is_manifest(name)
+    assert desc == "inc"
+    dest = tmp_path / "dest"
+    assert manager.restore_backup(str(dest), name, "java")
+    assert (dest / "mundo" / "level.dat").read_bytes() == b"level"
+    region = dest / "mundo" / "region" / "r.0.0.mca"
+    assert region.read_bytes() == b"region" * 1000
+    assert (dest / "mundo" / "mvp2.json").exists()
+
+
+def test_incremental_reuses_unchanged(manager, tmp_path, monkeypatch):
+    """Segundo backup só lê os arquivos cujo stat mudou."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    level = worlds / "mundo" / "level.dat"
+    level.write_bytes(b"level-2")
+    read = []
+    original = store.BlobStore.put_file
+
+    def spy(self, path):
+        read.append(os.path.basename(path))
+        return original(self, path)
+
+    monkeypatch.setattr(store.BlobStore, "put_file", spy)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    assert read == ["level.dat"]
+    names = sorted(
+        (n for n, _ in manager.list_backups("java")), key=store.backup_sort_key
+    )
+    assert len(names) == 2
+    latest = store.load_manifest(
+        os.path.join(manager.backup_dir_java, names[-1])
+    )
+    paths = {e["path"] for e in latest["files"]}
+    assert paths == {"level.dat", "region/r.0.0.mca"}
@@ -0,0 +1,184 @@
+"""
+Módulo de testes para backup.tarzst:
+ - test_roundtrip_restore: backup .tar.zst restaurado igual ao original.
+ - test_standard_tar: o arquivo é um tar comum dentro de frames zstd.
+ - test_seek_table_index: índice e tabela de frames batem com os membros.
+ - test_reads_only_member_frames: ler um arquivo só descomprime seus frames.
+ - test_verify_corrupt_frame: frame alterado é acusado pela verificação.
+ - test_partial_and_delta: restauração parcial e delta a partir do .tar.zst.
+ - test_catalog_listing: nome, ordem e descrição vêm do catálogo.
+"""
+
+import io
+import json
+import os
+import struct
+import tarfile
+
+import pytest
+
+from backup import anvil, catalog, store, tarzst
+
+zstandard = pytest.importorskip("zstandard")
+
+
+def record(tag):
+    data = tag.encode() * 10
+    return struct.pack(">IB", len(data) + 1, 2) + data
+
+
+def region_of(tag, ts=1):
+    return {i: (ts, record(f"{tag}{i}")) for i in range(0, 64, 7)}
+
+
+def make_world(tmp_path):
+    worlds = tmp_path / "worlds"
+    w = worlds / "mundo"
+    (w / "region").mkdir(parents=True)
+    (w / "level.dat").write_bytes(b"level" * 200)
+    # maior que um frame: vira vários frames de dados
+    (w / "big.bin").write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    anvil.write_region(str(w / "region" / "r.0.0.mca"), region_of("a"))
+    return worlds, w
+
+
+def backup_tarzst(manager, tmp_path, monkeypatch=None):
+    if monkeypatch:
+        monkeypatch.setattr(tarzst, "FRAME_SIZE", 1024 * 1024)
+    worlds, w = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", "teste", mode="tarzst"
+    )
+    [(name, _)] = manager.list_backups("java")
+    return worlds, w, name, os.path.join(manager.backup_dir_java, name)
+
+
+def test_roundtrip_restore(manager, tmp_path):
+    """Mundo apagado volta byte a byte."""
+    worlds, w, name, _ = backup_tarzst(manager, tmp_path)
+    assert name.endswith(".tar.zst")
+    original = {
+        p.relative_to(w): p.read_bytes() for p in w.rglob("*") if p.is_file()
+    }
+    for p in w.rglob("*"):
+        if p.is_file():
+            p.write_bytes(b"estragado")
+    assert manager.restore_backup(str(worlds), name, "java", workers=4)
+    for rel, data in original.items():
+        assert (w / rel).read_bytes() == data
+
+
+def test_standard_tar(manager, tmp_path):
+    """zstd -d | tar x: membros e metadata.json legíveis sem o índice."""
+    _, w, _, path = backup_tarzst(manager, tmp_path)
+    with open(path, "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            f, read_across_frames=True
+        )
+        raw = reader.read()
+    with tarfile.open(fileobj=io.BytesIO(raw)) as tar:
+        names = tar.getnames()
+        level = tar.extractfile("mundo/level.dat").read()
+        meta = json.loads(tar.extractfile("metadata.json").read())
+    assert names[-1] == "metadata.json"
+    assert set(names[:-1]) == {
+        "mundo/level.dat",
+        "mundo/big.bin",
+        "mundo/region/r.0.0.mca",
+    }
+    assert level == (w / "level.dat").read_bytes()
+    assert meta["description"] == "teste"
+    assert set(meta["index"]) == set(names[:-1])
+
+
+def test_seek_table_index(manager, tmp_path, monkeypatch):
+    """Frames de 1 MiB: o arquivo de 3 MiB ocupa quatro frames de dados."""
+    _, w, _, path = backup_tarzst(manager, tmp_path, monkeypatch)
+    reader = tarzst.TarZstReader(path)
+    try:
+        first, count, size = reader.members["mundo/big.bin"]
+        assert size == (w / "big.bin").stat().st_size
+        assert count == 4
+        data = reader.frames[first + 1 : first + 1 + count]
+        assert sum(dsize for _, _, dsize in data) >= size
+        assert "index" not in reader.metadata
+        assert reader.metadata["world"] == "mundo"
+        assert reader.read("mundo/big.bin") == (w / "big.bin").read_bytes()
+    finally:
+        reader.close()
+    with open(path, "rb") as f:
+        frames = tarzst._read_seek_table(f)
+    assert frames == reader.frames
+    assert frames[-1][2] == 2 * tarfile.BLOCKSIZE
+
+
+def test_reads_only_member_frames(manager, tmp_path, monkeypatch):
+    """level.dat: um frame de dados, sem passar pelo big.bin."""
+    _, w, _, path = backup_tarzst(manager, tmp_path, monkeypatch)
+    reader = tarzst.TarZstReader(path)
+    read = []
+    original = tarzst.TarZstReader._read_frame
+
+    def spy(self, f, i):
+        read.append(i)
+        return original(self, f, i)
+
+    monkeypatch.setattr(tarzst.TarZstReader, "_read_frame", spy)
+    try:
+        first, count, _ = reader.members["mundo/level.dat"]
+        assert reader.read("mundo/level.dat") == (w / "level.dat").read_bytes()
+    finally:
+        reader.close()
+    assert count == 1
+    assert read == [first + 1]
+
+
+def test_verify_corrupt_frame(manager, tmp_path, monkeypatch):
+    """Um byte trocado no meio do big.bin falha no checksum do frame."""
+    _, _, name, path = backup_tarzst(manager, tmp_path, monkeypatch)
+    assert manager.verify_backup(name, "java")
+    reader = tarzst.TarZstReader(path)
+    first, _, _ = reader.members["mundo/big.bin"]
+    offset, csize, _ = reader.frames[first + 2]
+    reader.close()
+    with open(path, "r+b") as f:
+        f.seek(offset + csize // 2)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    records = []
+    manager.metrics_hooks.append(records.append)
+    assert not manager.verify_backup(name, "java")
+    assert records[0]["status"] == "corrupt"
+    assert "big.bin" in records[0]["error"]
+
+
+def test_partial_and_delta(manager, tmp_path):
+    """Só a área pedida volta; o delta reescreve só o que mudou."""
+    worlds, w, name, _ = backup_tarzst(manager, tmp_path)
+    mca = w / "region" / "r.0.0.mca"
+    anvil.write_region(str(mca), region_of("x", ts=9))
+    assert manager.restore_partial(
+        str(worlds), name, "java", block_box=(0, 0, 15, 15)
+    )
+    chunks = anvil.read_region(str(mca))
+    assert chunks[0] == region_of("a")[0]
+    assert chunks[7] == region_of("x", ts=9)[7]
+    (w / "level.dat").write_bytes(b"progresso")
+    big = (w / "big.bin").stat().st_mtime_ns
+    assert manager.restore_backup(str(worlds), name, "java", mode="delta")
+    assert (w / "level.dat").read_bytes() == b"level" * 200
+    assert anvil.read_region(str(mca)) == region_of("a")
+    assert (w / "big.bin").stat().st_mtime_ns == big
+
+
+def test_catalog_listing(manager, tmp_path):
+    """O catálogo lê mundo, data e descrição do metadata.json."""
+    _, _, name, path = backup_tarzst(manager, tmp_path)
+    assert catalog.is_backup_file(name)
+    assert catalog.parse_name(name)[0] == "mundo"
+    info = catalog.read_info(path)
+    assert info["description"] == "teste"
+    older = "mundo_20000101_000000.tar.zst"
+    assert store.backup_sort_key(older) < store.backup_sort_key(name)
+    assert manager.list_backups("java") == [(name, "teste")]
@@ -0,0 +1,123 @@
+"""
+Módulo de testes para BackupManager.verify_backup:
+ - test_zip_records_sha256: metadata.json traz o SHA-256 de cada arquivo.
+ - test_verify_sha_mismatch: conteúdo trocado com CRC válido é detectado.
+ - test_verify_missing_entry: arquivo listado no metadata e ausente do zip.
+ - test_verify_incremental_missing_blob: blob apagado do objects/.
+ - test_verify_cached: --max-age pula só os verificados com sucesso.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+
+from backup import catalog
+
+
+def make_world(tmp_path):
+    world = tmp_path / "worlds" / "mundo"
+    (world / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"level" * 100)
+    (world / "region" / "r.0.0.mca").write_bytes(os.urandom(8192))
+    return tmp_path / "worlds"
+
+
+def backup_zip(manager, tmp_path):
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    return os.path.join(manager.backup_dir_java, name)
+
+
+def rewrite_zip(path, replace=None, drop=None):
+    """Recria o zip trocando/removendo entradas (CRC recalculado)"""
+    with zipfile.ZipFile(path) as z:
+        items = [(i.filename, z.read(i)) for i in z.infolist()]
+    with zipfile.ZipFile(path, "w") as z:
+        for name, data in items:
+            if name == drop:
+                continue
+            if replace and name in replace:
+                data = replace[name]
+            z.writestr(name, data)
+
+
+def recorder(manager):
+    records = []
+    manager.metrics_hooks.append(records.append)
+    return records
+
+
+def test_zip_records_sha256(manager, tmp_path):
+    """Um hash por arquivo do mundo, igual ao do conteúdo."""
+    path = backup_zip(manager, tmp_path)
+    with zipfile.ZipFile(path) as z:
+        meta = json.loads(z.read("metadata.json"))
+        assert set(meta["sha256"]) == {"level.dat", "region/r.0.0.mca"}
+        data = z.read("mundo/level.dat")
+    assert meta["sha256"]["level.dat"] == hashlib.sha256(data).hexdigest()
+    records = recorder(manager)
+    assert manager.verify_backup(os.path.basename(path), "java", workers=4)
+    [rec] = records
+    assert rec["operation"] == "verify"
+    assert rec["status"] == "ok"
+    assert rec["counters"]["files"] == 2
+
+
+def test_verify_sha_mismatch(manager, tmp_path):
+    """O zip é válido, mas o conteúdo não é o do backup original."""
+    path = backup_zip(manager, tmp_path)
+    rewrite_zip(path, replace={"mundo/level.dat": b"outro" * 100})
+    records = recorder(manager)
+    assert not manager.verify_backup(os.path.basename(path), "java")
+    assert records[0]["status"] == "corrupt"
+    assert "SHA-256" in records[0]["error"]
+    assert "level.dat" in records[0]["error"]
+
+
+def test_verify_missing_entry(manager, tmp_path):
+    """Entrada removida do zip aparece como ausente."""
+    path = backup_zip(manager, tmp_path)
+    rewrite_zip(path, drop="mundo/region/r.0.0.mca")
+    records = recorder(manager)
+    assert not manager.verify_backup(os.path.basename(path), "java")
+    assert "region/r.0.0.mca: ausente" in records[0]["error"]
+
+
+def test_verify_incremental_missing_blob(manager, tmp_path):
+    """Blob faltando no armazenamento deduplicado."""
+    worlds = make_world(tmp_path)
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    [(name, _)] = manager.list_backups("java")
+    objects = os.path.join(manager.backup_dir_java, "objects")
+    blob = next(
+        os.path.join(root, f)
+        for root, _, files in os.walk(objects)
+        for f in files
+    )
+    os.remove(blob)
+    assert not manager.verify_backup(name, "java")
+
+
+def test_verify_cached(manager, tmp_path):
+    """Sucesso recente é reaproveitado; arquivo alterado é relido."""
+    path = backup_zip(manager, tmp_path)
+    name = os.path.basename(path)
+    records = recorder(manager)
+    assert manager.verify_backup(name, "java", max_age=3600)
+    assert manager.verify_backup(name, "java", max_age=3600)
+    assert manager.verify_backup(name, "java")
+    assert [r["status"] for r in records] == ["ok", "cached", "ok"]
+    rewrite_zip(path, replace={"mundo/level.dat": b"x"})
+    assert not manager.verify_backup(name, "java", max_age=3600)
+    # falha não vai para o cache: é conferida de novo
+    assert not manager.verify_backup(name, "java", max_age=3600)
+    assert [r["status"] for r in records[3:]] == ["corrupt", "corrupt"]
+    cat = catalog.Catalog(manager.backup_dir_java)
+    last = cat.last_verification(name, os.stat(path))
+    assert last["ok"] is False
+    cat.remove(name)
+    assert cat.last_verification(name, os.stat(path)) is None
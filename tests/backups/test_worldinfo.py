@@ -0,0 +1,133 @@
+"""
+Módulo de testes para backup.worldinfo:
+ - test_java_world_info: nome, último acesso, versão e seed do level.dat Java.
+ - test_bedrock_world_info: levelname.txt e campos do level.dat Bedrock.
+ - test_fallback_level_dat_old: level.dat corrompido usa level.dat_old.
+ - test_cache_skips_unchanged: mundos sem save novo não são relidos.
+ - test_list_worlds_sorted: list_worlds ordena por nome ou último acesso.
+ - test_list_worlds_creates_nothing: sem pasta de backups, o cache fica só
+   em memória.
+"""
+
+import gzip
+import os
+import struct
+
+from backup import nbt, worldinfo
+
+
+def java_level(nbt_bytes, path, name, last_ms, seed=42):
+    data = {
+        "LevelName": (8, name),
+        "LastPlayed": (4, last_ms),
+        "Version": (10, {"Name": (8, "1.21.1")}),
+        "WorldGenSettings": (10, {"seed": (4, seed)}),
+    }
+    path.mkdir(parents=True, exist_ok=True)
+    raw = gzip.compress(nbt_bytes({"Data": (10, data)}))
+    (path / "level.dat").write_bytes(raw)
+
+
+def test_java_world_info(tmp_path, nbt_bytes):
+    """LastPlayed em ms vira segundos; seed vem de WorldGenSettings."""
+    w = tmp_path / "pasta"
+    java_level(nbt_bytes, w, "Meu Mundo", 1_700_000_000_000, seed=-5)
+    (w / "region").mkdir()
+    (w / "region" / "r.0.0.mca").write_bytes(b"x" * 1000)
+    info = worldinfo.read_world_info(str(w))
+    assert info["name"] == "Meu Mundo"
+    assert info["edition"] == "java"
+    assert info["last_played"] == 1_700_000_000
+    assert info["version"] == "1.21.1"
+    assert info["seed"] == -5
+    assert info["size"] == 1000 + os.path.getsize(w / "level.dat")
+
+
+def test_bedrock_world_info(tmp_path, nbt_bytes):
+    """levelname.txt tem prioridade; versão vem de lastOpenedWithVersion."""
+    w = tmp_path / "AbCd="
+    w.mkdir()
+    body = nbt_bytes(
+        {
+            "LevelName": (8, "interno"),
+            "LastPlayed": (4, 1_650_000_000),
+            "RandomSeed": (4, 99),
+            "lastOpenedWithVersion": (9, (3, [1, 20, 81, 1, 0])),
+        },
+        little=True,
+    )
+    (w / "level.dat").write_bytes(struct.pack("<ii", 10, len(body)) + body)
+    (w / "levelname.txt").write_text("Ilha", encoding="utf-8")
+    info = worldinfo.read_world_info(str(w))
+    assert info["name"] == "Ilha"
+    assert info["edition"] == "bedrock"
+    assert info["last_played"] == 1_650_000_000
+    assert info["version"] == "1.20.81.1"
+    assert info["seed"] == 99
+
+
+def test_fallback_level_dat_old(tmp_path, nbt_bytes):
+    """Save interrompido: level.dat inválido, level.dat_old é usado."""
+    w = tmp_path / "pasta"
+    java_level(nbt_bytes, w, "Antigo", 1000)
+    os.replace(w / "level.dat", w / "level.dat_old")
+    (w / "level.dat").write_bytes(b"\x1f\x8b")
+    assert worldinfo.read_world_info(str(w))["name"] == "Antigo"
+    (w / "level.dat_old").unlink()
+    assert worldinfo.read_world_info(str(w))["name"] == "pasta"
+
+
+def test_cache_skips_unchanged(manager, tmp_path, nbt_bytes, monkeypatch):
+    """Segunda listagem não lê level.dat; save novo invalida só aquele."""
+    worlds = tmp_path / "worlds"
+    java_level(nbt_bytes, worlds / "a", "A", 1000)
+    java_level(nbt_bytes, worlds / "b", "B", 2000)
+    os.makedirs(manager.backup_dir)
+    assert sorted(manager.list_worlds(str(worlds))) == [
+        ("a", "A"),
+        ("b", "B"),
+    ]
+    reads = []
+    original = nbt.read_level_dat
+
+    def spy(path):
+        reads.append(os.path.basename(os.path.dirname(path)))
+        return original(path)
+
+    monkeypatch.setattr(nbt, "read_level_dat", spy)
+    # nova instância: o cache vem do disco
+    fresh = type(manager)()
+    fresh.backup_dir = manager.backup_dir
+    assert len(fresh.list_worlds(str(worlds))) == 2
+    assert reads == []
+    java_level(nbt_bytes, worlds / "b", "B2", 3000)
+    assert ("b", "B2") in fresh.list_worlds(str(worlds))
+    assert reads == ["b"]
+
+
+def test_list_worlds_sorted(manager, tmp_path, nbt_bytes):
+    """last_played: mais recente primeiro; name: alfabético."""
+    worlds = tmp_path / "worlds"
+    java_level(nbt_bytes, worlds / "1", "Zeta", 3000)
+    java_level(nbt_bytes, worlds / "2", "alfa", 1000)
+    java_level(nbt_bytes, worlds / "3", "Beta", 2000)
+    (worlds / "4").mkdir()
+    by_play = manager.list_worlds(str(worlds), sort="last_played")
+    assert [f for f, _ in by_play] == ["1", "3", "2", "4"]
+    by_name = manager.list_worlds(str(worlds), sort="name")
+    assert [d for _, d in by_name] == ["4", "alfa", "Beta", "Zeta"]
+    details = manager.world_details(str(worlds), sort="name")
+    assert details[1]["version"] == "1.21.1"
+
+
+def test_list_worlds_creates_nothing(manager, tmp_path, nbt_bytes):
+    """Listar mundos sem pasta de backups não cria pastas nem arquivos."""
+    worlds = tmp_path / "worlds"
+    java_level(nbt_bytes, worlds / "a", "A", 1000)
+    assert manager.list_worlds(str(worlds)) == [("a", "A")]
+    assert not os.path.exists(manager.backup_dir)
+    # o primeiro backup cria a pasta; a próxima listagem grava o cache
+    assert manager.make_backup(str(worlds), "a", "java")
+    manager.list_worlds(str(worlds))
+    index = os.path.join(manager.backup_dir, ".state", ".worlds.json")
+    assert os.path.exists(index)
@@ -0,0 +1,297 @@
+"""
+Módulo de testes para cli.commands:
+ - test_backup_batch_json: backup em lote por glob, em paralelo, saída JSON;
+   mundos inalterados são ignorados, a menos que haja descrição.
+ - test_backup_exit_codes: nenhum mundo (3) e --worlds-path sem edição (2).
+ - test_backup_tarzst_missing: sem zstandard, --mode tarzst é uso inválido.
+ - test_list_backups_table: tabela de backups filtrada por mundo.
+ - test_restore_by_name: restaura pelo nome do arquivo, achando a edição.
+ - test_restore_partial_chunks: só a área de chunks pedida volta; seleção
+   inválida é uso inválido.
+ - test_verify_detects_corruption: blob alterado gera código 1.
+ - test_prune_keeps_latest: --dry-run não apaga; depois sobra o mais novo.
+ - test_prune_policy: sem regra é uso inválido; --max-size limita os bytes.
+ - test_export_snapshot: backup --mode hardlink exportado para .zip.
+ - test_diff_json: diff entre dois backups e entre backup e mundo.
+ - test_upload_and_fetch: --storage em pasta; upload só envia o que falta.
+ - test_fleet_json: frota em JSON, com --dry-run e execução real.
+"""
+
+import json
+import struct
+
+import pytest
+from typer.testing import CliRunner
+
+from backup import anvil, core, tarzst
+from cli import commands
+
+
+@pytest.fixture()
+def cli(manager, monkeypatch):
+    monkeypatch.setattr(core, "manager", manager)
+    try:
+        runner = CliRunner(mix_stderr=False)
+    except TypeError:
+        # click >= 8.2 já separa a saída de erro
+        runner = CliRunner()
+
+    def invoke(*args):
+        return runner.invoke(commands.app, [str(a) for a in args])
+
+    return invoke
+
+
+def make_worlds(tmp_path, *names):
+    worlds = tmp_path / "worlds"
+    for name in names:
+        world = worlds / name
+        (world / "data").mkdir(parents=True)
+        (world / "level.dat").write_bytes(b"level" * 100)
+        (world / "data" / "a.dat").write_bytes(name.encode() * 1000)
+    return worlds
+
+
+def test_backup_batch_json(cli, manager, tmp_path):
+    """Só os mundos que casam com o glob; mensagens vão para stderr."""
+    worlds = make_worlds(tmp_path, "mundo1", "mundo2", "outro")
+    args = ["backup", "mundo*", "-e", "java", "--worlds-path", worlds]
+    result = cli(*args, "--jobs", 2, "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    rows = json.loads(result.stdout)
+    assert [(r["world"], r["status"]) for r in rows] == [
+        ("mundo1", "ok"),
+        ("mundo2", "ok"),
+    ]
+    assert "Backup salvo" in result.stderr
+    assert len(manager.list_backups("java")) == 2
+    # segunda execução: mundos inalterados
+    rows = json.loads(cli(*args, "--format", "json").stdout)
+    assert {r["status"] for r in rows} == {"skipped"}
+    # com descrição o backup é gravado mesmo sem alterações
+    rows = json.loads(cli(*args, "-d", "tag", "--format", "json").stdout)
+    assert {r["status"] for r in rows} == {"ok"}
+    assert len(manager.list_backups("java", world="mundo1")) == 2
+
+
+def test_backup_exit_codes(cli, tmp_path):
+    """Códigos de saída distintos para erro de uso e nada encontrado."""
+    worlds = make_worlds(tmp_path, "mundo")
+    result = cli("backup", "nada*", "-e", "java", "--worlds-path", worlds)
+    assert result.exit_code == commands.EXIT_NOT_FOUND
+    result = cli("backup", "--worlds-path", worlds)
+    assert result.exit_code == commands.EXIT_USAGE
+
+
+def test_backup_tarzst_missing(cli, manager, tmp_path, monkeypatch):
+    """O erro sai antes de qualquer backup, com a instrução de instalar."""
+
+    def missing():
+        raise RuntimeError("O formato .tar.zst exige o pacote zstandard")
+
+    monkeypatch.setattr(tarzst, "_zstd", missing)
+    worlds = make_worlds(tmp_path, "mundo")
+    args = ["backup", "-e", "java", "--worlds-path", worlds]
+    result = cli(*args, "--mode", "tarzst")
+    assert result.exit_code == commands.EXIT_USAGE
+    assert "zstandard" in result.stderr
+    assert manager.list_backups("java") == []
+
+
+def test_list_backups_table(cli, manager, tmp_path):
+    """Cabeçalho e uma linha por backup do mundo pedido."""
+    worlds = make_worlds(tmp_path, "mundo", "outro")
+    for name in ("mundo", "outro"):
+        assert manager.make_backup(str(worlds), name, "java", "tag")
+    result = cli("list", "mundo", "--backups")
+    assert result.exit_code == 0
+    header, *lines = result.stdout.splitlines()
+    assert header.split() == [
+        "edition",
+        "world",
+        "name",
+        "timestamp",
+        "size",
+        "description",
+    ]
+    assert len(lines) == 1
+    assert lines[0].startswith("java") and lines[0].endswith("tag")
+
+
+def test_restore_by_name(cli, manager, tmp_path):
+    """Sem --edition, o backup é procurado nas duas edições."""
+    worlds = make_worlds(tmp_path, "mundo")
+    assert manager.make_backup(str(worlds), "mundo", "bedrock")
+    [(name, _)] = manager.list_backups("bedrock")
+    (worlds / "mundo" / "data" / "a.dat").write_bytes(b"estragado")
+    result = cli("restore", name, "--worlds-path", worlds)
+    assert result.exit_code == 0, result.stdout
+    assert (worlds / "mundo" / "data" / "a.dat").read_bytes() == (
+        b"mundo" * 1000
+    )
+    result = cli("restore", "nada.zip", "-e", "java", "--worlds-path", worlds)
+    assert result.exit_code == commands.EXIT_NOT_FOUND
+
+
+def test_restore_partial_chunks(cli, manager, tmp_path):
+    """--chunks restaura só a área; o resto do mundo fica como está."""
+    worlds = make_worlds(tmp_path, "mundo")
+    region = worlds / "mundo" / "region" / "r.0.0.mca"
+    region.parent.mkdir()
+
+    def chunks(tag, ts):
+        data = tag.encode() * 10
+        record = struct.pack(">IB", len(data) + 1, 2) + data
+        return {i: (ts, record) for i in (0, 7, 14)}
+
+    anvil.write_region(str(region), chunks("a", 1))
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    [(name, _)] = manager.list_backups("java")
+    anvil.write_region(str(region), chunks("x", 9))
+    args = ["restore-partial", name, "--worlds-path", worlds]
+    result = cli(*args, "--chunks", 0, 0, 7, 0, "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    [row] = json.loads(result.stdout)
+    assert (row["edition"], row["status"]) == ("java", "ok")
+    restored = anvil.read_region(str(region))
+    assert restored[0] == chunks("a", 1)[0]
+    assert restored[7] == chunks("a", 1)[7]
+    assert restored[14] == chunks("x", 9)[14]
+    result = cli(*args, "--region", "r.0.0.mca", "--chunks", 0, 0, 1, 1)
+    assert result.exit_code == commands.EXIT_USAGE
+    result = cli(*args, "--region", "regiao.mca")
+    assert result.exit_code == commands.EXIT_USAGE
+    result = cli("restore-partial", "nada.zip", "--worlds-path", worlds)
+    assert result.exit_code == commands.EXIT_NOT_FOUND
+
+
+def test_verify_detects_corruption(cli, manager, tmp_path):
+    """Incremental com blob alterado em disco é marcado como corrupt."""
+    worlds = make_worlds(tmp_path, "mundo")
+    assert manager.make_backup(
+        str(worlds), "mundo", "java", mode="incremental"
+    )
+    result = cli("verify", "mundo", "--format", "json")
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)[0]["status"] == "ok"
+    objects = tmp_path / "backups" / "java" / "objects"
+    blob = next(p for p in objects.rglob("*") if p.is_file())
+    blob.write_bytes(b"s" + b"lixo")
+    result = cli("verify", "--format", "json")
+    assert result.exit_code == commands.EXIT_FAILED
+    assert json.loads(result.stdout)[0]["status"] == "corrupt"
+
+
+def test_prune_keeps_latest(cli, manager, tmp_path):
+    """Mantém os N mais recentes de cada mundo."""
+    worlds = make_worlds(tmp_path, "mundo", "outro")
+    for _ in range(3):
+        assert manager.make_backup(str(worlds), "mundo", "java", force=True)
+    assert manager.make_backup(str(worlds), "outro", "java")
+    names = [n for n, _ in manager.list_backups("java", world="mundo")]
+    result = cli("prune", "--keep", 1, "--dry-run", "--format", "json")
+    assert result.exit_code == 0
+    assert [r["name"] for r in json.loads(result.stdout)] == names[:2]
+    assert len(manager.list_backups("java")) == 4
+    result = cli("prune", "mundo", "-k", 1)
+    assert result.exit_code == 0
+    assert manager.list_backups("java", world="mundo")[0][0] == names[2]
+    assert len(manager.list_backups("java")) == 2
+
+
+def test_prune_policy(cli, manager, tmp_path):
+    """Teto menor que dois backups: sobra só o mais novo."""
+    worlds = make_worlds(tmp_path, "mundo")
+    for _ in range(3):
+        assert manager.make_backup(str(worlds), "mundo", "java", force=True)
+    names = [n for n, _ in manager.list_backups("java")]
+    assert cli("prune").exit_code == commands.EXIT_USAGE
+    size = sum(r["size"] for r in manager.backup_rows("java"))
+    result = cli("prune", "--max-size", size / 3 / 2**20, "-f", "json")
+    assert result.exit_code == 0
+    assert [r["name"] for r in json.loads(result.stdout)] == names[:2]
+    assert [n for n, _ in manager.list_backups("java")] == names[2:]
+
+
+def test_export_snapshot(cli, manager, tmp_path):
+    """O .zip vai para o caminho de --output; .zip comum não exporta."""
+    worlds = make_worlds(tmp_path, "mundo")
+    result = cli(
+        "backup", "-e", "java", "--worlds-path", worlds, "--mode", "hardlink"
+    )
+    assert result.exit_code == 0, result.stderr
+    [(name, _)] = manager.list_backups("java")
+    out = tmp_path / "offsite" / "mundo.zip"
+    result = cli("export", name, "-o", out, "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    assert json.loads(result.stdout)[0]["output"] == str(out)
+    assert out.exists()
+    assert manager.make_backup(str(worlds), "mundo", "java", force=True)
+    zip_name = manager.list_backups("java")[-1][0]
+    assert cli("export", zip_name).exit_code == commands.EXIT_FAILED
+
+
+def test_diff_json(cli, manager, tmp_path):
+    """Arquivo alterado aparece no JSON; sem OUTRO, compara com o mundo."""
+    worlds = make_worlds(tmp_path, "mundo")
+    assert manager.make_backup(str(worlds), "mundo", "java")
+    (worlds / "mundo" / "level.dat").write_bytes(b"novo")
+    assert manager.make_backup(str(worlds), "mundo", "java", force=True)
+    old, new = [name for name, _ in manager.list_backups("java")]
+    result = cli("diff", old, new, "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    data = json.loads(result.stdout)
+    assert data["changed"] == ["level.dat"]
+    assert data["files_unchanged"] == 1
+    result = cli("diff", old, "-e", "java", "--worlds-path", worlds)
+    assert result.exit_code == 0, result.stderr
+    assert "changed  level.dat" in result.stdout
+    missing = cli("diff", "nada.zip", "--format", "json")
+    assert missing.exit_code == commands.EXIT_NOT_FOUND
+
+
+def test_upload_and_fetch(cli, manager, tmp_path):
+    """O backup sobe junto com a gravação; fetch traz de volta."""
+    worlds = make_worlds(tmp_path, "mundo")
+    remote = tmp_path / "nas"
+    args = ["--storage", remote]
+    assert cli("upload").exit_code == commands.EXIT_USAGE
+    result = cli(*args, "backup", "-e", "java", "--worlds-path", worlds)
+    assert result.exit_code == 0, result.stderr
+    [(name, _)] = manager.list_backups("java")
+    assert (remote / "java" / name).exists()
+    result = cli(*args, "upload", "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    assert json.loads(result.stdout)[0]["status"] == "present"
+    (remote / "java" / name).unlink()
+    result = cli(*args, "upload", "--format", "json")
+    assert json.loads(result.stdout)[0]["status"] == "ok"
+    (tmp_path / "backups" / "java" / name).unlink()
+    result = cli(*args, "fetch", name, "-e", "java")
+    assert result.exit_code == 0, result.stderr
+    assert manager.verify_backup(name, "java")
+
+
+def test_fleet_json(cli, tmp_path):
+    """O plano lista os mundos; a execução grava no destino configurado."""
+    make_worlds(tmp_path / "srv", "mundo")
+    config = tmp_path / "frota.json"
+    config.write_text(
+        json.dumps(
+            {
+                "backup_dir": "bk",
+                "servers": [{"name": "s1", "worlds_path": "srv/worlds"}],
+            }
+        ),
+        encoding="utf-8",
+    )
+    result = cli("fleet", config, "--dry-run", "--format", "json")
+    assert result.exit_code == 0
+    assert [r["world"] for r in json.loads(result.stdout)] == ["mundo"]
+    result = cli("fleet", config, "--format", "json")
+    assert result.exit_code == 0, result.stderr
+    [row] = json.loads(result.stdout)
+    assert (row["server"], row["status"]) == ("s1", "ok")
+    assert (tmp_path / "bk" / "s1" / "java" / row["backup"]).exists()
+    config.write_text("{}", encoding="utf-8")
+    assert cli("fleet", config).exit_code == commands.EXIT_USAGE
@@ -1,6 +1,331 @@
 import pathlib
 import sys
 
+import pytest
+
 # Adiciona a pasta src ao path para import do módulo backup
 root = pathlib.Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(root))
+
+
+@pytest.fixture()
+def manager(tmp_path):
+    """BackupManager com diretórios de backup isolados em tmp_path."""
+    from backup.core import BackupManager
+
+    mgr = BackupManager()
+    base = tmp_path / "backups"
+    mgr.backup_dir = str(base)
+    mgr.backup_dir_java = str(base / "java")
+    mgr.backup_dir_bedrock = str(base / "bedrock")
+    return mgr
+
+
+def _encode_nbt(tag, value, order):
+    """Codifica um payload NBT a partir de (tag, valor) tipados"""
+    import struct
+
+    scalars = {1: "b", 2: "h", 3: "i", 4: "q", 5: "f", 6: "d"}
+    if tag in scalars:
+        return struct.pack(order + scalars[tag], value)
+    if tag == 8:
+        raw = value.encode("utf-8")
+        return struct.pack(order + "H", len(raw)) + raw
+    if tag == 7:
+        return struct.pack(order + "i", len(value)) + bytes(value)
+    if tag in (11, 12):
+        fmt = "i" if tag == 11 else "q"
+        return struct.pack(f"{order}i{len(value)}{fmt}", len(value), *value)
+    if tag == 9:
+        item, items = value
+        out = struct.pack(order + "bi", item, len(items))
+        return out + b"".join(_encode_nbt(item, v, order) for v in items)
+    if tag == 10:
+        out = b""
+        for name, (child, v) in value.items():
+            raw = name.encode("utf-8")
+            out += struct.pack(order + "bH", child, len(raw)) + raw
+            out += _encode_nbt(child, v, order)
+        return out + b"\0"
+    raise ValueError(tag)
+
+
+@pytest.fixture()
+def nbt_bytes():
+    """Gera NBT: nbt_bytes({"Nome": (tag, valor)}, little=False)."""
+
+    def encode(root, little=False, name=""):
+        order = "<" if little else ">"
+        return _encode_nbt(10, {name: (10, root)}, order)[:-1]
+
+    return encode
+
+
+class FakeRconServer:
+    """Servidor RCON local: registra comandos e responde como o Minecraft"""
+
+    def __init__(self, password="segredo"):
+        import socketserver
+        import threading
+
+        self.password = password
+        self.commands = []
+        # comando -> resposta (ou função chamada com o comando)
+        self.responses = {}
+        fake = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                fake._serve(self.request)
+
+        self._server = socketserver.ThreadingTCPServer(
+            ("127.0.0.1", 0), Handler
+        )
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def _serve(self, sock):
+        from backup import rcon
+
+        authed = False
+        while True:
+            try:
+                request_id, kind, body = rcon.read_packet(sock)
+            except (rcon.RconError, OSError):
+                return
+            text = body.decode("utf-8")
+            if kind == rcon.TYPE_AUTH:
+                authed = text == self.password
+                reply = request_id if authed else -1
+                sock.sendall(rcon.encode_packet(reply, 2, ""))
+                continue
+            if not authed:
+                return
+            self.commands.append(text)
+            answer = self.responses.get(text, "")
+            if callable(answer):
+                answer = answer(text)
+            data = answer.encode("utf-8")
+            # fragmentos de até 4096 bytes, como o servidor do jogo
+            for i in range(0, len(data), 4096):
+                sock.sendall(
+                    rcon.encode_packet(
+                        request_id, 0, data[i : i + 4096].decode("utf-8")
+                    )
+                )
+            if len(data) % 4096 == 0:
+                sock.sendall(rcon.encode_packet(request_id, 0, ""))
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture()
+def rcon_server():
+    """Servidor RCON falso em 127.0.0.1 (porta em rcon_server.port)."""
+    server = FakeRconServer()
+    yield server
+    server.close()
+
+
+class FakeS3Server:
+    """Serviço compatível com S3 em memória (path-style, um bucket).
+
+    Confere a assinatura SigV4 de cada requisição. `fail_parts` mapeia
+    número de parte -> quantas vezes responder 500 antes de aceitar.
+    """
+
+    ACCESS_KEY = "AKIDTESTE"
+    SECRET_KEY = "segredo/teste"
+
+    def __init__(self, bucket="backups", page_size=1000):
+        import http.server
+        import threading
+
+        self.bucket = bucket
+        self.page_size = page_size
+        self.objects = {}
+        # upload id -> (chave, {número: dados})
+        self.uploads = {}
+        self.fail_parts = {}
+        self.requests = []
+        self._ids = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self)
+
+            do_PUT = do_POST = do_DELETE = do_GET
+
+        self._server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), Handler
+        )
+        self._server.daemon_threads = True
+        self.endpoint = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def client(self):
+        from backup import storage
+
+        return storage.S3Client(
+            self.endpoint, self.bucket, self.ACCESS_KEY, self.SECRET_KEY
+        )
+
+    def _reply(self, req, status, body=b"", headers=None):
+        req.send_response(status)
+        for name, value in (headers or {}).items():
+            req.send_header(name, value)
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+        req.wfile.write(body)
+
+    def _error(self, req, status, code):
+        body = f"<Error><Code>{code}</Code></Error>".encode()
+        self._reply(req, status, body)
+
+    def _check_signature(self, req, path, query, body):
+        import hashlib
+        import re
+
+        from backup import storage
+
+        auth = req.headers.get("Authorization", "")
+        m = re.match(
+            r"AWS4-HMAC-SHA256 Credential=([^/]+)/\d+/([^/]+)/s3/"
+            r"aws4_request, SignedHeaders=([^,]+), Signature=",
+            auth,
+        )
+        if not m or m.group(1) != self.ACCESS_KEY:
+            return False
+        payload_hash = hashlib.sha256(body).hexdigest()
+        if req.headers.get("x-amz-content-sha256") != payload_hash:
+            return False
+        signed = {n: req.headers.get(n, "") for n in m.group(3).split(";")}
+        expected = storage.sign_v4(
+            req.command,
+            path,
+            query,
+            signed,
+            payload_hash,
+            self.ACCESS_KEY,
+            self.SECRET_KEY,
+            m.group(2),
+            req.headers.get("x-amz-date", ""),
+        )
+        return expected == auth
+
+    def _handle(self, req):
+        import hashlib
+        import urllib.parse
+
+        url = urllib.parse.urlsplit(req.path)
+        path = urllib.parse.unquote(url.path)
+        query = dict(urllib.parse.parse_qsl(url.query, True))
+        body = req.rfile.read(int(req.headers.get("Content-Length") or 0))
+        with self._lock:
+            self.requests.append((req.command, path, query))
+        if not self._check_signature(req, path, query, body):
+            return self._error(req, 403, "SignatureDoesNotMatch")
+        prefix = f"/{self.bucket}"
+        if path == prefix and req.command == "GET":
+            return self._list(req, query)
+        key = path[len(prefix) + 1 :]
+        upload_id = query.get("uploadId")
+        with self._lock:
+            if req.command == "POST" and "uploads" in query:
+                self._ids += 1
+                uid = f"up{self._ids}"
+                self.uploads[uid] = (key, {})
+                body = (
+                    "<InitiateMultipartUploadResult>"
+                    f"<UploadId>{uid}</UploadId>"
+                    "</InitiateMultipartUploadResult>"
+                ).encode()
+                return self._reply(req, 200, body)
+            if upload_id is not None and upload_id not in self.uploads:
+                return self._error(req, 404, "NoSuchUpload")
+            if req.command == "PUT" and upload_id:
+                number = int(query["partNumber"])
+                if self.fail_parts.get(number, 0) > 0:
+                    self.fail_parts[number] -= 1
+                    return self._error(req, 500, "InternalError")
+                self.uploads[upload_id][1][number] = body
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                return self._reply(req, 200, headers={"ETag": etag})
+            if req.command == "POST" and upload_id:
+                _, parts = self.uploads.pop(upload_id)
+                self.objects[key] = b"".join(parts[n] for n in sorted(parts))
+                return self._reply(
+                    req, 200, b"<CompleteMultipartUploadResult/>"
+                )
+            if req.command == "DELETE" and upload_id:
+                del self.uploads[upload_id]
+                return self._reply(req, 204)
+            if req.command == "GET" and upload_id:
+                parts = self.uploads[upload_id][1]
+                items = "".join(
+                    f"<Part><PartNumber>{n}</PartNumber>"
+                    f'<ETag>"{hashlib.md5(parts[n]).hexdigest()}"</ETag>'
+                    f"<Size>{len(parts[n])}</Size></Part>"
+                    for n in sorted(parts)
+                )
+                body = f"<ListPartsResult>{items}</ListPartsResult>"
+                return self._reply(req, 200, body.encode())
+            if req.command == "GET":
+                if key not in self.objects:
+                    return self._error(req, 404, "NoSuchKey")
+                return self._reply(req, 200, self.objects[key])
+            if req.command == "DELETE":
+                self.objects.pop(key, None)
+                return self._reply(req, 204)
+        self._error(req, 400, "NotImplemented")
+
+    def _list(self, req, query):
+        prefix = query.get("prefix", "")
+        with self._lock:
+            keys = sorted(k for k in self.objects if k.startswith(prefix))
+            token = query.get("continuation-token")
+            if token:
+                keys = [k for k in keys if k > token]
+            page = keys[: self.page_size]
+            truncated = len(keys) > len(page)
+            items = "".join(
+                f"<Contents><Key>{k}</Key>"
+                f"<Size>{len(self.objects[k])}</Size></Contents>"
+                for k in page
+            )
+        more = (
+            f"<IsTruncated>true</IsTruncated>"
+            f"<NextContinuationToken>{page[-1]}</NextContinuationToken>"
+            if truncated
+            else "<IsTruncated>false</IsTruncated>"
+        )
+        body = f"<ListBucketResult>{items}{more}</ListBucketResult>"
+        self._reply(req, 200, body.encode())
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture()
+def s3_server():
+    """Serviço S3 falso em 127.0.0.1 (endpoint em s3_server.endpoint)."""
+    server = FakeS3Server()
+    yield server
+    server.close()
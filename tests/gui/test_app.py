@@ -7,6 +7,10 @@ Módulo de testes para gui.app:
  - test_create_backup_success: make_backup com sucesso aciona showinfo e atualiza lista_backups.
  - test_restore_backup_no_selection: sem backup selecionado, label_status indica erro.
  - test_restore_backup_success: restore_backup com sucesso aciona showinfo e atualiza label_status.
+ - test_create_backup_cancel: cancelar a tarefa não mostra sucesso nem erro.
+ - test_create_backup_skipped: mundo sem alterações mostra aviso, não sucesso.
+ - test_backup_world_force: com descrição o backup é gravado mesmo sem
+   alterações; sem descrição, o resultado indica que foi ignorado.
 """
 
 import tkinter as tk
@@ -15,6 +19,7 @@ from tkinter import messagebox
 import pytest
 
 from backup import core
+from gui import app as gui_app
 from gui.app import GuiApp
 
 
@@ -38,8 +43,8 @@ def test_initial_state(app):
 def test_select_edition_empty(app, monkeypatch):
     """Se não houver mundos ou backups, listas indicam mensagem de vazio."""
     # Override detecção de caminhos
-    monkeypatch.setattr(core, "list_worlds", lambda path: [])
-    monkeypatch.setattr(core, "list_backups", lambda ed: [])
+    monkeypatch.setattr(core, "list_worlds", lambda path, sort=None: [])
+    monkeypatch.setattr(core, "list_backups", lambda ed, world=None: [])
     app._select_edition()
     # Mensagem de nenhum mundo/backups
     assert app.list_mundos.get(0) == "(nenhum mundo encontrado)"
@@ -73,17 +78,22 @@ def test_create_backup_invalid_desc(app, monkeypatch):
 def test_create_backup_success(app, monkeypatch):
     """make_backup True chama showinfo e lista de backups é atualizada."""
     # setup worlds list and selection
+    app.worlds_list = [("w", "w")]
     app.list_mundos.insert(tk.END, "w")
     app.list_mundos.selection_set(0)
     app.desc_entry.insert(0, "tag")
     # mock detect paths
-    monkeypatch.setattr(core, "make_backup", lambda p, w, e, d: True)
-    monkeypatch.setattr(core, "list_backups", lambda e: [("b.zip", "tag")])
+    monkeypatch.setattr(core, "make_backup", lambda p, w, e, d, **kw: True)
+    monkeypatch.setattr(
+        core, "list_backups", lambda e, world=None: [("b.zip", "tag")]
+    )
     infos = []
     monkeypatch.setattr(
         messagebox, "showinfo", lambda title, msg: infos.append((title, msg))
     )
     app._create_backup()
+    # backup roda em segundo plano; espera a fila
+    app.jobs.wait(timeout=5)
     # showinfo foi chamado com sucesso
     assert infos and "criado com sucesso" in infos[0][1]
     # lista_backup atualizada
@@ -102,17 +112,83 @@ def test_restore_backup_success(app, monkeypatch):
     # setup backups list and selection
     app.list_backups.insert(tk.END, "x.zip")
     app.list_backups.selection_set(0)
-    monkeypatch.setattr(core, "restore_backup", lambda p, n, e: True)
+    monkeypatch.setattr(core, "restore_backup", lambda p, n, e, **kw: True)
     infos = []
     monkeypatch.setattr(
         messagebox, "showinfo", lambda title, msg: infos.append((title, msg))
     )
     app._restore_backup()
+    app.jobs.wait(timeout=5)
     assert infos and "restaurado com sucesso" in infos[0][1]
     assert "Restaurar: x.zip" == app.label_status["text"]
     monkeypatch.setattr(
         messagebox, "showinfo", lambda title, msg: infos.append((title, msg))
     )
     app._restore_backup()
+    app.jobs.wait(timeout=5)
     assert infos and "restaurado com sucesso" in infos[0][1]
     assert "Restaurar: x.zip" == app.label_status["text"]
+
+
+def test_create_backup_cancel(app, monkeypatch):
+    """Tarefa cancelada termina sem showinfo/showerror."""
+    app.worlds_list = [("w", "w")]
+    app.list_mundos.insert(tk.END, "w")
+    app.list_mundos.selection_set(0)
+
+    def slow(p, w, e, d, **kw):
+        kw["cancel"].wait(5)
+        return False
+
+    monkeypatch.setattr(core, "make_backup", slow)
+    monkeypatch.setattr(core, "list_backups", lambda e, world=None: [])
+    shows = []
+    monkeypatch.setattr(messagebox, "showinfo", lambda *a: shows.append(a))
+    monkeypatch.setattr(messagebox, "showerror", lambda *a: shows.append(a))
+    app._create_backup()
+    app._cancel_job()
+    app.jobs.cancel_all()
+    assert app.jobs.wait(timeout=5)
+    assert shows == []
+    assert "cancelado" in app.label_status["text"]
+
+
+def test_create_backup_skipped(app, manager, tmp_path, monkeypatch):
+    """Backup ignorado por falta de alterações não diz 'criado'."""
+    monkeypatch.setattr(core, "manager", manager)
+    monkeypatch.setattr(core, "make_backup", manager.make_backup)
+    monkeypatch.setattr(core, "list_backups", manager.list_backups)
+    worlds = tmp_path / "worlds"
+    (worlds / "w").mkdir(parents=True)
+    (worlds / "w" / "level.dat").write_bytes(b"level")
+    monkeypatch.setattr(
+        gui_app.detect_java, "get_java_worlds_path", lambda: str(worlds)
+    )
+    assert manager.make_backup(str(worlds), "w", "java")
+    app.worlds_list = [("w", "w")]
+    app.list_mundos.insert(tk.END, "w")
+    app.list_mundos.selection_set(0)
+    infos = []
+    monkeypatch.setattr(
+        messagebox, "showinfo", lambda title, msg: infos.append((title, msg))
+    )
+    app._create_backup()
+    app.jobs.wait(timeout=5)
+    assert infos and infos[0][0] == "Sem alterações"
+    assert "criado com sucesso" not in infos[0][1]
+    assert len(manager.list_backups("java")) == 1
+
+
+def test_backup_world_force(manager, tmp_path, monkeypatch):
+    """A tag pedida na GUI sempre gera um backup novo."""
+    monkeypatch.setattr(core, "manager", manager)
+    monkeypatch.setattr(core, "make_backup", manager.make_backup)
+    worlds = tmp_path / "worlds"
+    (worlds / "w").mkdir(parents=True)
+    (worlds / "w" / "level.dat").write_bytes(b"level")
+    assert gui_app._backup_world(str(worlds), "w", "java", "") is True
+    result = gui_app._backup_world(str(worlds), "w", "java", "")
+    assert result == gui_app.SKIPPED
+    assert gui_app._backup_world(str(worlds), "w", "java", "tag") is True
+    descriptions = [d for _, d in manager.list_backups("java")]
+    assert descriptions == ["", "tag"]
@@ -0,0 +1,131 @@
+"""
+Módulo de testes para gui.jobs:
+ - test_submit_does_not_block: submit retorna enquanto a tarefa roda.
+ - test_results_via_after: on_finish só roda pelo root.after, na thread do Tk.
+ - test_queue_order: tarefas da fila rodam uma por vez, em ordem.
+ - test_cancel_running_and_pending: cancelamento para a atual e pula as pendentes.
+ - test_progress_and_eta: fração e ETA vêm dos bytes processados.
+ - test_failed_job: exceção ou retorno False marcam a tarefa como falha.
+"""
+
+import threading
+
+from gui import jobs
+
+
+class FakeRoot:
+    """Substitui tk.Tk: guarda os callbacks de after para rodar no teste"""
+
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, fn):
+        self.calls.append(fn)
+
+    def pump(self):
+        calls, self.calls = self.calls, []
+        for fn in calls:
+            fn()
+
+
+def task(gate=None, log=None, name=None):
+    def run(progress=None, cancel=None):
+        if gate is not None:
+            gate.wait(5)
+        if log is not None:
+            log.append(name)
+        return True
+
+    return run
+
+
+def test_submit_does_not_block():
+    """A tarefa segue rodando depois que submit retorna."""
+    gate = threading.Event()
+    queue = jobs.JobQueue(FakeRoot())
+    job = queue.submit(jobs.Job("t", task(gate)))
+    assert job.state in (jobs.PENDING, jobs.RUNNING)
+    assert queue.busy()
+    gate.set()
+    assert queue.wait(timeout=5)
+    assert job.state == jobs.DONE and job.result is True
+
+
+def test_results_via_after():
+    """Resultado é entregue no pump do root, não na thread de trabalho."""
+    root = FakeRoot()
+    seen = []
+    queue = jobs.JobQueue(
+        root, on_finish=lambda j: seen.append(threading.current_thread())
+    )
+    done = threading.Event()
+    job = jobs.Job("t", task(), on_done=lambda j: done.set())
+    queue.submit(job)
+    while not seen:
+        root.pump()
+    assert done.is_set()
+    assert seen == [threading.main_thread()]
+
+
+def test_queue_order():
+    """Três tarefas terminam na ordem de submissão."""
+    log = []
+    gate = threading.Event()
+    queue = jobs.JobQueue(FakeRoot())
+    queue.submit(jobs.Job("a", task(gate, log, "a")))
+    queue.submit(jobs.Job("b", task(None, log, "b")))
+    queue.submit(jobs.Job("c", task(None, log, "c")))
+    assert len(queue.pending()) >= 2
+    gate.set()
+    assert queue.wait(timeout=5)
+    assert log == ["a", "b", "c"]
+
+
+def test_cancel_running_and_pending():
+    """cancel_all interrompe a atual; pendentes nem começam."""
+    started = threading.Event()
+    called = []
+
+    def slow(progress=None, cancel=None):
+        started.set()
+        cancel.wait(5)
+        return False
+
+    finished = []
+    queue = jobs.JobQueue(FakeRoot(), on_finish=finished.append)
+    first = queue.submit(jobs.Job("lento", slow))
+    second = queue.submit(jobs.Job("depois", task(None, called, "x")))
+    assert started.wait(5)
+    queue.cancel_all()
+    assert queue.wait(timeout=5)
+    assert first.state == jobs.CANCELLED
+    assert second.state == jobs.CANCELLED
+    assert called == []
+    assert finished == [first, second]
+
+
+def test_progress_and_eta():
+    """Metade dos bytes em 10s deixa ETA de 10s."""
+    job = jobs.Job("t", task())
+    assert job.eta() is None and job.fraction() == 0.0
+    job.started = 100.0
+    job._progress(50, 100)
+    assert job.fraction() == 0.5
+    assert job.eta(now=110.0) == 10.0
+    assert jobs.format_eta(10.0) == "00:10"
+    assert jobs.format_eta(3725) == "1:02:05"
+    assert jobs.format_eta(None) == "--:--"
+
+
+def test_failed_job():
+    """Retorno False e exceções viram estado de falha."""
+
+    def boom(progress=None, cancel=None):
+        raise OSError("disco cheio")
+
+    queue = jobs.JobQueue(FakeRoot())
+    bad = queue.submit(jobs.Job("f", lambda progress, cancel: False))
+    err = queue.submit(jobs.Job("e", boom))
+    assert queue.wait(timeout=5)
+    assert bad.state == jobs.FAILED
+    assert err.state == jobs.FAILED and isinstance(err.error, OSError)